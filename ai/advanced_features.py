@@ -24,6 +24,8 @@ import uuid
 import numpy as np
 from datetime import datetime
 
+from clm_backend.metrics import observe
+
 logger = logging.getLogger(__name__)
 genai.configure(api_key=settings.GEMINI_API_KEY)
 
@@ -129,7 +131,8 @@ Contract excerpt (first 8000 chars):
 Return ONLY the JSON object."""
 
             logger.info(f"Extracting obligations from document: {document_id}")
-            response = model.generate_content(extraction_prompt)
+            with observe('gemini', 'extract_obligations'):
+                response = model.generate_content(extraction_prompt)
             
             try:
                 response_text = response.text.strip()
@@ -226,7 +229,7 @@ Return ONLY the JSON object."""
                     
                     similarities = []
                     for chunk in chunks:
-                        if chunk.embedding:
+                        if chunk.embedding is not None:
                             try:
                                 chunk_vec = np.array(chunk.embedding, dtype=np.float32)
                                 query_vec = np.array(clause_embedding, dtype=np.float32)
@@ -289,7 +292,8 @@ Improvements should focus on:
 - Alignment with industry standards"""
 
             logger.info(f"Generating clause suggestion")
-            response = model.generate_content(suggestion_prompt)
+            with observe('gemini', 'suggest_clause'):
+                response = model.generate_content(suggestion_prompt)
             
             try:
                 response_text = response.text.strip()
@@ -397,7 +401,8 @@ Summary should cover:
 - Termination conditions"""
 
             logger.info(f"Generating summary for document: {doc_id}")
-            response = model.generate_content(summary_prompt)
+            with observe('gemini', 'summarize_document'):
+                response = model.generate_content(summary_prompt)
             
             try:
                 response_text = response.text.strip()
@@ -512,7 +517,7 @@ Summary should cover:
             logger.info(f"Searching {chunks.count()} chunks for similar clauses")
             
             for chunk in chunks:
-                if not chunk.embedding:
+                if chunk.embedding is None:
                     continue
                 
                 try:
@@ -0,0 +1,77 @@
+"""
+Non-blocking streamed Gemini generation
+
+Calls the Gemini REST streamGenerateContent endpoint (alt=sse) with httpx.AsyncClient
+instead of the SDK's blocking iterator, so a streaming view awaits each chunk on the
+event loop (see clm_backend/sse.py). Cancelling the consumer, e.g. when the client
+disconnects, leaves the ``async with`` blocks and closes the upstream connection,
+which stops the generation.
+"""
+
+import json
+import logging
+from typing import AsyncIterator, Optional
+
+import httpx
+from django.conf import settings
+
+from clm_backend.metrics import observe
+
+logger = logging.getLogger(__name__)
+
+GEMINI_STREAM_URL = 'https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent'
+GEMINI_STREAM_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+
+class GeminiStreamError(Exception):
+    """Gemini rejected the request or reported an error mid-stream"""
+
+
+def _chunk_text(payload: dict) -> str:
+    if isinstance(payload.get('error'), dict):
+        raise GeminiStreamError(payload['error'].get('message') or 'Gemini stream error')
+    parts = []
+    for candidate in (payload.get('candidates') or [])[:1]:
+        for part in ((candidate.get('content') or {}).get('parts') or []):
+            if isinstance(part.get('text'), str):
+                parts.append(part['text'])
+    return ''.join(parts)
+
+
+async def stream_gemini_text(
+    model_name: str,
+    prompt: str,
+    api_key: Optional[str] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    tier: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Yield the text deltas of a streamed Gemini generation
+
+    The body runs while the response is consumed, after the request's tier label has
+    been reset; pass the tier captured when the response was built.
+    """
+    api_key = (api_key or getattr(settings, 'GEMINI_API_KEY', '') or '').strip()
+    body = {'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]}
+
+    with observe('gemini', 'stream_draft', tier=tier):
+        async with httpx.AsyncClient(timeout=GEMINI_STREAM_TIMEOUT, transport=transport) as client:
+            async with client.stream(
+                'POST',
+                GEMINI_STREAM_URL.format(model=model_name),
+                params={'alt': 'sse'},
+                headers={'x-goog-api-key': api_key},
+                json=body,
+            ) as response:
+                if response.status_code >= 400:
+                    detail = (await response.aread()).decode('utf-8', 'replace')[:500]
+                    raise GeminiStreamError(f"Gemini returned {response.status_code}: {detail}")
+
+                async for line in response.aiter_lines():
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[len('data:'):].strip()
+                    if not data:
+                        continue
+                    delta = _chunk_text(json.loads(data))
+                    if delta:
+                        yield delta
@@ -10,6 +10,8 @@ from repository.embeddings_service import VoyageEmbeddingsService
 from django.conf import settings
 import numpy as np
 
+from clm_backend.metrics import observe, tenant_context
+
 logger = logging.getLogger(__name__)
 
 def _get_genai():
@@ -152,7 +154,8 @@ def generate_draft_async(self, task_id: str, tenant_id: str, contract_type: str,
         
         logger.info(f"Sending generation request to Gemini, prompt length: {len(prompt)}")
         
-        response = model.generate_content(prompt)
+        with tenant_context(tenant_id), observe('gemini', 'generate_draft'):
+            response = model.generate_content(prompt)
         generated_text = response.text
         
         logger.info(f"Generated draft length: {len(generated_text)} characters")
@@ -0,0 +1,183 @@
+"""
+Tests for non-blocking Gemini streaming and the SSE endpoints built on it
+"""
+
+import asyncio
+import json
+from unittest import mock
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from contracts.models import Contract
+
+from . import streaming
+from .models import DraftGenerationTask
+from .streaming import GeminiStreamError, stream_gemini_text
+
+
+def _sse_body(*texts):
+    return ''.join(
+        f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': text}]}}]})}\r\n\r\n" for text in texts
+    ).encode('utf-8')
+
+
+class _HangingStream(httpx.AsyncByteStream):
+    """Sends one chunk, then waits forever; records whether it was closed"""
+
+    def __init__(self):
+        self.closed = False
+
+    async def __aiter__(self):
+        yield _sse_body('first')
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        self.closed = True
+
+
+async def _collect(stream):
+    return [delta async for delta in stream]
+
+
+class TestStreamGeminiText(SimpleTestCase):
+    """Deltas are parsed from the SSE body; cancelling closes the upstream stream"""
+
+    def test_deltas(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=_sse_body('Hel', 'lo')))
+
+        deltas = asyncio.run(_collect(stream_gemini_text('gemini-test', 'prompt', api_key='k', transport=transport)))
+
+        assert deltas == ['Hel', 'lo']
+
+    def test_error_status_raises(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(429, json={'error': {'message': 'quota'}}))
+
+        with self.assertRaises(GeminiStreamError):
+            asyncio.run(_collect(stream_gemini_text('gemini-test', 'prompt', api_key='k', transport=transport)))
+
+    def test_cancel_closes_upstream(self):
+        upstream = _HangingStream()
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, stream=upstream))
+
+        async def consume_then_cancel():
+            received = asyncio.Event()
+
+            async def consume():
+                async for _ in stream_gemini_text('gemini-test', 'prompt', api_key='k', transport=transport):
+                    received.set()
+
+            task = asyncio.create_task(consume())
+            await received.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(consume_then_cancel())
+
+        assert upstream.closed
+
+
+async def _fake_stream(model_name, prompt, api_key=None, tier=None):
+    for delta in ('Revised ', 'contract'):
+        yield delta
+
+
+@override_settings(GEMINI_API_KEY='test-key')
+class TestContractGenerateStream(TestCase):
+    """The contract AI edit endpoint streams SSE frames from the async generator"""
+
+    def test_events(self):
+        user = get_user_model().objects.create_user(email='stream@example.com', password='pass1234')
+        contract = Contract.objects.create(tenant_id=user.tenant_id, title='NDA', created_by=user.user_id)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with mock.patch('contracts.views.stream_gemini_text', _fake_stream), \
+                mock.patch('contracts.views.ClauseEmbeddingIndex.relevant', return_value=[]):
+            response = client.post(
+                f'/api/v1/contracts/{contract.id}/ai/generate-stream/',
+                {'prompt': 'tighten it', 'current_text': 'Old text'},
+                format='json',
+            )
+            body = b''.join(response.streaming_content).decode('utf-8')
+
+        assert response['Content-Type'] == 'text/event-stream'
+        events = [frame.split('\n')[0] for frame in body.strip().split('\n\n')]
+        assert events == ['event: meta', 'event: delta', 'event: delta', 'event: done']
+        assert '"delta": "contract"' in body
+
+    def test_stream_observation_keeps_request_tier(self):
+        user = get_user_model().objects.create_user(email='tier@example.com', password='pass1234')
+        contract = Contract.objects.create(tenant_id=user.tenant_id, title='NDA', created_by=user.user_id)
+        token = RefreshToken.for_user(user).access_token
+        token['tenant_id'] = str(user.tenant_id)
+        token['tenant_tier'] = 'enterprise'
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=_sse_body('Revised')))
+        labels = {'subsystem': 'gemini', 'operation': 'stream_draft', 'tier': 'enterprise', 'outcome': 'ok'}
+        before = REGISTRY.get_sample_value('clm_operations_total', labels) or 0.0
+
+        def upstream(*args, **kwargs):
+            return streaming.stream_gemini_text(*args, transport=transport, **kwargs)
+
+        with mock.patch('contracts.views.stream_gemini_text', upstream), \
+                mock.patch('contracts.views.ClauseEmbeddingIndex.relevant', return_value=[]):
+            response = client.post(
+                f'/api/v1/contracts/{contract.id}/ai/generate-stream/',
+                {'prompt': 'tighten it', 'current_text': 'Old text'},
+                format='json',
+            )
+            # Consumed after the middleware has reset the tier ContextVar
+            b''.join(response.streaming_content)
+
+        assert REGISTRY.get_sample_value('clm_operations_total', labels) == before + 1
+
+
+@override_settings(GEMINI_API_KEY='test-key')
+class TestTemplateStreamTaskSave(TestCase):
+    """The template stream records its task from the stream's worker thread"""
+
+    def _stream(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        with mock.patch('ai.views.stream_gemini_text', _fake_stream), \
+                mock.patch('ai.views.ClauseEmbeddingIndex.relevant', return_value=[]):
+            response = client.post(
+                '/api/v1/ai/generate/template-stream/',
+                {'prompt': 'tighten it', 'current_text': 'Old text'},
+                format='json',
+            )
+            return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_closes_worker_connections_after_save(self):
+        user = get_user_model().objects.create_user(email='template@example.com', password='pass1234')
+        with mock.patch('ai.views.DraftGenerationTask.save') as save, \
+                mock.patch('ai.views.connections') as worker_connections:
+            body = self._stream(user)
+
+        assert 'event: done' in body
+        assert save.call_args.kwargs['update_fields'] == ['status', 'completed_at', 'citations', 'updated_at']
+        worker_connections.close_all.assert_called_once()
+
+    def test_save_failure_is_logged(self):
+        user = get_user_model().objects.create_user(email='template-fail@example.com', password='pass1234')
+        create = DraftGenerationTask.save
+
+        def save(task, *args, **kwargs):
+            if kwargs.get('update_fields'):
+                raise OperationalError('connection closed')
+            return create(task, *args, **kwargs)
+
+        with mock.patch.object(DraftGenerationTask, 'save', save), \
+                self.assertLogs('ai.views', level='WARNING') as logs:
+            body = self._stream(user)
+
+        assert 'event: done' in body
+        assert any('connection closed' in line for line in logs.output)
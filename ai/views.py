@@ -2,11 +2,13 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.http import StreamingHttpResponse
 from .models import AIInferenceModel, DraftGenerationTask, ClauseAnchor
 from .serializers import AIInferenceSerializer, DraftGenerationTaskSerializer, ClauseAnchorSerializer
+from .streaming import stream_gemini_text
 from .tasks import generate_draft_async
 from .pii_protection import PIIScrubber, ScrubberAuditLog
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connections
 from django.utils import timezone
 import uuid
 import logging
@@ -16,7 +18,9 @@ from repository.embeddings_service import VoyageEmbeddingsService
 import google.generativeai as genai
 from django.conf import settings
 import numpy as np
-from contracts.models import Clause
+from contracts.services import ClauseEmbeddingIndex
+from clm_backend.metrics import current_tenant_tier, observe
+from clm_backend.sse import sse_event, sse_response
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +28,23 @@ logger = logging.getLogger(__name__)
 genai.configure(api_key=settings.GEMINI_API_KEY)
 
 
+def _save_stream_task(task, update_fields):
+    """
+    Save a task from inside a streaming response
+
+    Under WSGI the stream's sync_to_async calls run on asgiref's shared executor
+    thread, whose database connection no request_finished ever closes. Stale
+    connections are dropped before the save and the thread's connections are
+    closed after it, so the next stream does not pick up one the server has
+    since closed.
+    """
+    close_old_connections()
+    try:
+        task.save(update_fields=update_fields)
+    finally:
+        connections.close_all()
+
+
 class AIViewSet(viewsets.ViewSet):
     """
     AI Endpoints for draft generation, metadata extraction, and classification
@@ -144,7 +165,8 @@ class AIViewSet(viewsets.ViewSet):
             ---
             """
             
-            response = model.generate_content(prompt)
+            with observe('gemini', 'extract_metadata'):
+                response = model.generate_content(prompt)
             
             # Basic parsing and validation
             import json
@@ -267,57 +289,8 @@ class AIViewSet(viewsets.ViewSet):
         except Exception:
             task = None
 
-        # Retrieve relevant clauses using Voyage Law-2.
-        def _pick_relevant_clauses() -> list[dict]:
-            try:
-                embeddings_service = VoyageEmbeddingsService()
-                query_embedding = embeddings_service.embed_query(prompt)
-                if not query_embedding:
-                    return []
-
-                qs = Clause.objects.filter(tenant_id=request.user.tenant_id, status='published')
-                if contract_type:
-                    qs = qs.filter(contract_type=contract_type)
-
-                items = list(qs.order_by('-updated_at')[:40])
-                if not items:
-                    return []
-
-                texts = [f"{c.name}\n\n{c.content}"[:8000] for c in items]
-                embeddings = embeddings_service.embed_batch(texts)
-
-                q = np.array(query_embedding, dtype=np.float32)
-                qn = float(np.linalg.norm(q))
-                if qn <= 0:
-                    return []
-
-                scored: list[tuple[float, Clause]] = []
-                for clause, emb in zip(items, embeddings):
-                    if not emb:
-                        continue
-                    v = np.array(emb, dtype=np.float32)
-                    vn = float(np.linalg.norm(v))
-                    if vn <= 0:
-                        continue
-                    sim = float(np.dot(q, v) / (qn * vn))
-                    scored.append((sim, clause))
-
-                scored.sort(key=lambda x: x[0], reverse=True)
-                out = []
-                for sim, clause in scored[:5]:
-                    out.append(
-                        {
-                            'clause_id': clause.clause_id,
-                            'name': clause.name,
-                            'similarity': round(sim, 4),
-                            'content': clause.content,
-                        }
-                    )
-                return out
-            except Exception:
-                return []
-
-        relevant = _pick_relevant_clauses()
+        # Retrieve relevant clauses: one indexed top-k over the tenant's clause embeddings.
+        relevant = ClauseEmbeddingIndex.relevant(request.user.tenant_id, prompt, contract_type=contract_type)
         clauses_block = ''
         if relevant:
             blocks = []
@@ -356,49 +329,45 @@ Relevant clause library (optional):
 ---
 """.strip()
 
-        def event_stream():
-            try:
-                payload = {'model': model_name}
-                if task is not None:
-                    payload['task_id'] = task.task_id
-                yield f"event: meta\ndata: {json.dumps(payload)}\n\n"
-            except Exception:
-                pass
+        # The stream is consumed after MetricsMiddleware resets the request's tier
+        tier = current_tenant_tier()
+
+        async def event_stream():
+            payload = {'model': model_name}
+            if task is not None:
+                payload['task_id'] = task.task_id
+            yield sse_event('meta', payload)
 
             try:
-                model = genai.GenerativeModel(model_name)
-                for chunk in model.generate_content(generation_prompt, stream=True):
-                    delta = getattr(chunk, 'text', None)
-                    if not delta:
-                        continue
-                    yield f"event: delta\ndata: {json.dumps({'delta': delta})}\n\n"
+                async for delta in stream_gemini_text(model_name, generation_prompt, tier=tier):
+                    yield sse_event('delta', {'delta': delta})
 
                 if task is not None:
                     try:
                         task.status = 'completed'
                         task.completed_at = timezone.now()
                         task.citations = [c.get('clause_id') for c in (relevant or []) if c.get('clause_id')]
-                        task.save(update_fields=['status', 'completed_at', 'citations', 'updated_at'])
-                    except Exception:
-                        pass
-                yield f"event: done\ndata: {json.dumps({'ok': True})}\n\n"
-            except GeneratorExit:
-                # Client disconnected early; keep status as-is (processing) so
-                # the generation is still counted for usage KPIs.
-                raise
+                        await sync_to_async(_save_stream_task)(
+                            task, ['status', 'completed_at', 'citations', 'updated_at']
+                        )
+                    except Exception as save_error:
+                        logger.warning(f"Failed to mark draft task {task.task_id} completed: {save_error}")
+                yield sse_event('done', {'ok': True})
             except Exception as e:
                 if task is not None:
                     try:
                         task.status = 'failed'
                         task.error_message = str(e)[:4000]
                         task.completed_at = timezone.now()
-                        task.save(update_fields=['status', 'error_message', 'completed_at', 'updated_at'])
-                    except Exception:
-                        pass
-                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
-
-        resp = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
-        resp['Cache-Control'] = 'no-cache'
-        resp['X-Accel-Buffering'] = 'no'
-        return resp
+                        await sync_to_async(_save_stream_task)(
+                            task, ['status', 'error_message', 'completed_at', 'updated_at']
+                        )
+                    except Exception as save_error:
+                        logger.warning(f"Failed to mark draft task {task.task_id} failed: {save_error}")
+                yield sse_event('error', {'error': str(e)})
+            # A client disconnect cancels the stream (CancelledError/GeneratorExit are
+            # not Exceptions); the task stays 'processing' so the generation is still
+            # counted for usage KPIs.
+
+        return sse_response(request, event_stream())
 
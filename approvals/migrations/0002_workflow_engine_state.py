@@ -0,0 +1,84 @@
+# Generated by Django 5.0 on 2026-10-17 06:46
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalStatisticsModel',
+            fields=[
+                ('scope', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('total_requests', models.PositiveIntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('approval_seconds_total', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'approval_statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='ApprovalRuleModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('entity_type', models.CharField(max_length=100)),
+                ('conditions', models.JSONField(default=dict)),
+                ('approvers', models.JSONField(default=list)),
+                ('approval_levels', models.PositiveSmallIntegerField(default=1)),
+                ('timeout_days', models.PositiveSmallIntegerField(default=7)),
+                ('escalation_enabled', models.BooleanField(default=True)),
+                ('notification_enabled', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'approval_rules',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['entity_type', 'created_at'], name='appr_rule_type_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ApprovalRequestModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('entity_id', models.CharField(max_length=255)),
+                ('entity_type', models.CharField(max_length=100)),
+                ('requester_id', models.CharField(max_length=255)),
+                ('requester_email', models.CharField(blank=True, max_length=255)),
+                ('requester_name', models.CharField(blank=True, max_length=255)),
+                ('approver_id', models.CharField(max_length=255)),
+                ('approver_email', models.CharField(blank=True, max_length=255)),
+                ('approver_name', models.CharField(blank=True, max_length=255)),
+                ('document_title', models.CharField(blank=True, max_length=500)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('normal', 'Normal'), ('high', 'High'), ('urgent', 'Urgent')], default='normal', max_length=10)),
+                ('metadata', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled'), ('escalated', 'Escalated')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+                ('rejected_at', models.DateTimeField(blank=True, null=True)),
+                ('rejection_reason', models.TextField(blank=True, null=True)),
+                ('approval_comment', models.TextField(blank=True, null=True)),
+                ('expiry_date', models.DateTimeField()),
+                ('email_sent', models.BooleanField(default=False)),
+                ('reminder_sent_count', models.PositiveIntegerField(default=0)),
+                ('escalated', models.BooleanField(default=False)),
+                ('rule', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requests', to='approvals.approvalrulemodel')),
+            ],
+            options={
+                'db_table': 'approval_requests',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'approver_id'], name='appr_req_status_approver_idx'), models.Index(fields=['status', 'entity_type'], name='appr_req_status_type_idx'), models.Index(fields=['status', 'expiry_date'], name='appr_req_status_expiry_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-17 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0002_workflow_engine_state'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='approvalmodel',
+            index=models.Index(fields=['tenant_id', 'approver_id', 'status', 'created_at', 'id'], name='approvals_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='approvalmodel',
+            index=models.Index(fields=['tenant_id', 'status', 'created_at'], name='approvals_tenant_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='approvalmodel',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='approvals_pending_created_idx'),
+        ),
+    ]
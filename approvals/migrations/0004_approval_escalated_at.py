@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-17 08:01
+
+from django.db import migrations, models
+from django.db.models.functions import Now
+
+
+def reopen_escalated(apps, schema_editor):
+    # Rows escalated by earlier releases were moved to status 'escalated', which
+    # approve/reject and the inbox do not accept; put them back in the queue
+    ApprovalModel = apps.get_model('approvals', 'ApprovalModel')
+    ApprovalModel.objects.filter(status='escalated').update(status='pending', escalated_at=Now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0003_approval_inbox_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='approvalmodel',
+            name='approvals_pending_created_idx',
+        ),
+        migrations.AddField(
+            model_name='approvalmodel',
+            name='escalated_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='approvalmodel',
+            index=models.Index(condition=models.Q(('escalated_at__isnull', True), ('status', 'pending')), fields=['created_at'], name='approvals_pending_created_idx'),
+        ),
+        migrations.RunPython(reopen_escalated, migrations.RunPython.noop),
+    ]
@@ -14,7 +14,110 @@ class ApprovalModel(models.Model):
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     approved_at = models.DateTimeField(null=True)
+    # Set by the overdue escalation job; the approval stays pending and actionable
+    escalated_at = models.DateTimeField(null=True)
     
     class Meta:
         db_table = 'approvals'
         app_label = 'approvals'
+        indexes = [
+            # Approver inbox, keyset-paginated on (created_at, id)
+            models.Index(fields=['tenant_id', 'approver_id', 'status', 'created_at', 'id'], name='approvals_inbox_idx'),
+            # Per-tenant overdue escalation
+            models.Index(fields=['tenant_id', 'status', 'created_at'], name='approvals_tenant_status_idx'),
+            # Finding tenants with overdue approvals; only pending, not yet escalated rows are indexed
+            models.Index(
+                fields=['created_at'],
+                name='approvals_pending_created_idx',
+                condition=models.Q(status='pending', escalated_at__isnull=True),
+            ),
+        ]
+
+
+class ApprovalRuleModel(models.Model):
+    """Approval rule used by approvals.workflow_engine.ApprovalWorkflowEngine"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    name = models.CharField(max_length=255)
+    entity_type = models.CharField(max_length=100)
+    conditions = models.JSONField(default=dict)
+    approvers = models.JSONField(default=list)
+    approval_levels = models.PositiveSmallIntegerField(default=1)
+    timeout_days = models.PositiveSmallIntegerField(default=7)
+    escalation_enabled = models.BooleanField(default=True)
+    notification_enabled = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'approval_rules'
+        app_label = 'approvals'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['entity_type', 'created_at'], name='appr_rule_type_created_idx'),
+        ]
+
+
+class ApprovalRequestModel(models.Model):
+    """Approval request managed by ApprovalWorkflowEngine"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+        ('cancelled', 'Cancelled'),
+        ('escalated', 'Escalated'),
+    ]
+    PRIORITY_CHOICES = [('low', 'Low'), ('normal', 'Normal'), ('high', 'High'), ('urgent', 'Urgent')]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    entity_id = models.CharField(max_length=255)
+    entity_type = models.CharField(max_length=100)
+    requester_id = models.CharField(max_length=255)
+    requester_email = models.CharField(max_length=255, blank=True)
+    requester_name = models.CharField(max_length=255, blank=True)
+    approver_id = models.CharField(max_length=255)
+    approver_email = models.CharField(max_length=255, blank=True)
+    approver_name = models.CharField(max_length=255, blank=True)
+    document_title = models.CharField(max_length=500, blank=True)
+    priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='normal')
+    rule = models.ForeignKey(ApprovalRuleModel, null=True, blank=True, on_delete=models.SET_NULL, related_name='requests')
+    metadata = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    approved_at = models.DateTimeField(null=True, blank=True)
+    rejected_at = models.DateTimeField(null=True, blank=True)
+    rejection_reason = models.TextField(null=True, blank=True)
+    approval_comment = models.TextField(null=True, blank=True)
+    expiry_date = models.DateTimeField()
+    email_sent = models.BooleanField(default=False)
+    reminder_sent_count = models.PositiveIntegerField(default=0)
+    escalated = models.BooleanField(default=False)
+    
+    class Meta:
+        db_table = 'approval_requests'
+        app_label = 'approvals'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'approver_id'], name='appr_req_status_approver_idx'),
+            models.Index(fields=['status', 'entity_type'], name='appr_req_status_type_idx'),
+            models.Index(fields=['status', 'expiry_date'], name='appr_req_status_expiry_idx'),
+        ]
+
+
+class ApprovalStatisticsModel(models.Model):
+    """
+    Running totals for ApprovalWorkflowEngine.get_statistics
+
+    Updated with F() expressions in the same transaction as each request write,
+    so reading statistics is a single-row lookup.
+    """
+    scope = models.CharField(max_length=50, primary_key=True)
+    total_requests = models.PositiveIntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    approval_seconds_total = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'approval_statistics'
+        app_label = 'approvals'
@@ -5,4 +5,4 @@ class ApprovalSerializer(serializers.ModelSerializer):
     class Meta:
         model = ApprovalModel
         fields = '__all__'
-        read_only_fields = ['id', 'tenant_id', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'tenant_id', 'created_at', 'escalated_at']
\ No newline at end of file
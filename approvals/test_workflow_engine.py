@@ -0,0 +1,98 @@
+"""
+Tests for the database-backed approval workflow engine
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import ApprovalRequestModel
+from .workflow_engine import ApprovalStatus, ApprovalWorkflowEngine
+
+
+class TestApprovalWorkflowEngine(TestCase):
+    """Rules, requests and counters persist across engine instances"""
+
+    def setUp(self):
+        self.engine = ApprovalWorkflowEngine()
+
+    def _request(self, engine=None, entity=None, approver_id='user-finance-001'):
+        return (engine or self.engine).create_approval_request(
+            entity_id='contract-001',
+            entity_type='contract',
+            entity=entity or {'status': 'draft'},
+            requester_id='user-john-001',
+            requester_email='john@company.com',
+            requester_name='John Smith',
+            approver_id=approver_id,
+            approver_email='finance@company.com',
+            approver_name='Finance',
+            document_title='Service Agreement',
+            priority='high',
+        )
+
+    def test_state_shared_across_engine_instances(self):
+        rule = self.engine.create_rule(
+            name='Standard', entity_type='contract', conditions={'status': ['draft', 'pending']},
+            approvers=['finance@company.com'],
+        )
+        request, _ = self._request()
+
+        other = ApprovalWorkflowEngine()
+        stored = other.get_request(request.request_id)
+        assert stored.rule_id == rule.rule_id
+        assert other.get_rule(rule.rule_id).name == 'Standard'
+
+        success, _ = other.approve_request(request.request_id, comment='ok')
+        assert success is True
+        assert self.engine.get_request(request.request_id).status == ApprovalStatus.APPROVED
+
+    def test_rule_matching_scoped_by_entity_type(self):
+        self.engine.create_rule(name='Invoices', entity_type='invoice', conditions={}, approvers=[])
+        contract_rule = self.engine.create_rule(
+            name='High value', entity_type='contract', conditions={'value': ['high']}, approvers=[],
+        )
+
+        matched, _ = self._request(entity={'value': 'high'})
+        unmatched, _ = self._request(entity={'value': 'low'})
+
+        assert matched.rule_id == contract_rule.rule_id
+        assert unmatched.rule_id is None
+
+    def test_counters_maintained_incrementally(self):
+        first, _ = self._request()
+        second, _ = self._request()
+        third, _ = self._request()
+        ApprovalRequestModel.objects.filter(pk=first.request_id).update(
+            created_at=timezone.now() - timedelta(hours=2)
+        )
+
+        assert self.engine.approve_request(first.request_id)[0] is True
+        assert self.engine.reject_request(second.request_id, 'no')[0] is True
+        # Already decided: no double counting
+        assert self.engine.approve_request(first.request_id)[0] is False
+
+        with self.assertNumQueries(3):
+            stats = self.engine.get_statistics()
+
+        assert stats['total_requests'] == 3
+        assert stats['pending'] == 1
+        assert stats['approved'] == 1
+        assert stats['rejected'] == 1
+        assert stats['avg_approval_time_hours'] == 2.0
+        assert [r.request_id for r in self.engine.list_pending_requests()] == [third.request_id]
+
+    def test_expired_pending_requests_counted(self):
+        request, _ = self._request()
+        ApprovalRequestModel.objects.filter(pk=request.request_id).update(
+            expiry_date=timezone.now() - timedelta(days=1)
+        )
+
+        assert self.engine.get_statistics()['expired'] == 1
+        assert self.engine.get_request(request.request_id).is_expired() is True
+
+    def test_unknown_ids(self):
+        assert self.engine.get_request('not-a-uuid') is None
+        assert self.engine.approve_request('not-a-uuid')[0] is False
+        assert self.engine.delete_rule('not-a-uuid') is False
@@ -1,8 +1,19 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
 from .models import ApprovalModel
 from .serializers import ApprovalSerializer
 
+
+class ApprovalInboxPagination(CursorPagination):
+    """Keyset pagination over approvals_inbox_idx; no OFFSET, no COUNT(*)"""
+    ordering = ('created_at', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
 class ApprovalViewSet(viewsets.ModelViewSet):
     queryset = ApprovalModel.objects.all()
     serializer_class = ApprovalSerializer
@@ -13,4 +24,14 @@ class ApprovalViewSet(viewsets.ModelViewSet):
         return ApprovalModel.objects.filter(tenant_id=self.request.user.tenant_id)
     
     def perform_create(self, serializer):
-        serializer.save(tenant_id=self.request.user.tenant_id)
\ No newline at end of file
+        serializer.save(tenant_id=self.request.user.tenant_id)
+
+    @action(detail=False, methods=['get'], pagination_class=ApprovalInboxPagination)
+    def pending(self, request):
+        """GET /approvals/pending/?cursor=&page_size=
+
+        The current user's pending approvals, oldest first
+        """
+        approvals = self.get_queryset().filter(approver_id=request.user.user_id, status='pending')
+        page = self.paginate_queryset(approvals)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
@@ -6,6 +6,13 @@ from enum import Enum
 import uuid
 import json
 
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ApprovalRequestModel, ApprovalRuleModel, ApprovalStatisticsModel
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,7 +71,24 @@ class ApprovalRule:
         self.timeout_days = timeout_days
         self.escalation_enabled = escalation_enabled
         self.notification_enabled = notification_enabled
-        self.created_at = datetime.now()
+        self.created_at = timezone.now()
+    
+    @classmethod
+    def from_model(cls, row: ApprovalRuleModel) -> 'ApprovalRule':
+        """Build from a stored rule"""
+        rule = cls(
+            rule_id=str(row.id),
+            name=row.name,
+            entity_type=row.entity_type,
+            conditions=row.conditions,
+            approvers=row.approvers,
+            approval_levels=row.approval_levels,
+            timeout_days=row.timeout_days,
+            escalation_enabled=row.escalation_enabled,
+            notification_enabled=row.notification_enabled
+        )
+        rule.created_at = row.created_at
+        return rule
     
     def matches(self, entity: Dict) -> bool:
         """Check if entity matches this rule"""
@@ -145,18 +169,49 @@ class ApprovalRequest:
         self.metadata = metadata or {}
         
         self.status = ApprovalStatus.PENDING
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.created_at = timezone.now()
+        self.updated_at = timezone.now()
         self.approved_at = None
         self.rejected_at = None
         self.rejection_reason = None
         self.approval_comment = None
-        self.expiry_date = datetime.now() + timedelta(days=7)
+        self.expiry_date = timezone.now() + timedelta(days=7)
         
         self.email_sent = False
         self.reminder_sent_count = 0
         self.escalated = False
     
+    @classmethod
+    def from_model(cls, row: ApprovalRequestModel) -> 'ApprovalRequest':
+        """Build from a stored request"""
+        request = cls(
+            entity_id=row.entity_id,
+            entity_type=row.entity_type,
+            requester_id=row.requester_id,
+            requester_email=row.requester_email,
+            requester_name=row.requester_name,
+            approver_id=row.approver_id,
+            approver_email=row.approver_email,
+            approver_name=row.approver_name,
+            document_title=row.document_title,
+            priority=ApprovalPriority(row.priority),
+            rule_id=str(row.rule_id) if row.rule_id else None,
+            metadata=row.metadata
+        )
+        request.request_id = str(row.id)
+        request.status = ApprovalStatus(row.status)
+        request.created_at = row.created_at
+        request.updated_at = row.updated_at
+        request.approved_at = row.approved_at
+        request.rejected_at = row.rejected_at
+        request.rejection_reason = row.rejection_reason
+        request.approval_comment = row.approval_comment
+        request.expiry_date = row.expiry_date
+        request.email_sent = row.email_sent
+        request.reminder_sent_count = row.reminder_sent_count
+        request.escalated = row.escalated
+        return request
+    
     def approve(self, comment: str = "") -> bool:
         """Mark as approved"""
         if self.status != ApprovalStatus.PENDING:
@@ -164,9 +219,9 @@ class ApprovalRequest:
             return False
         
         self.status = ApprovalStatus.APPROVED
-        self.approved_at = datetime.now()
+        self.approved_at = timezone.now()
         self.approval_comment = comment
-        self.updated_at = datetime.now()
+        self.updated_at = timezone.now()
         logger.info(f"Approval request {self.request_id} approved")
         return True
     
@@ -177,15 +232,15 @@ class ApprovalRequest:
             return False
         
         self.status = ApprovalStatus.REJECTED
-        self.rejected_at = datetime.now()
+        self.rejected_at = timezone.now()
         self.rejection_reason = reason
-        self.updated_at = datetime.now()
+        self.updated_at = timezone.now()
         logger.info(f"Approval request {self.request_id} rejected")
         return True
     
     def is_expired(self) -> bool:
         """Check if approval request has expired"""
-        return datetime.now() > self.expiry_date and self.status == ApprovalStatus.PENDING
+        return timezone.now() > self.expiry_date and self.status == ApprovalStatus.PENDING
     
     def to_dict(self) -> Dict:
         """Convert to dictionary"""
@@ -213,12 +268,17 @@ class ApprovalWorkflowEngine:
     """
     Main approval workflow engine
     Manages rules, requests, and notifications
+    
+    Rules and requests are stored in the database (approvals.models), so every
+    process (web workers, Celery) shares the same state. Statistics come from
+    counters updated in the same transaction as each request write.
     """
     
+    # Row of ApprovalStatisticsModel holding the engine's counters
+    STATISTICS_SCOPE = 'global'
+    
     def __init__(self):
         """Initialize workflow engine"""
-        self.rules: Dict[str, ApprovalRule] = {}
-        self.requests: Dict[str, ApprovalRequest] = {}
         self.email_service = None  # Will be injected
         self.notification_service = None  # Will be injected
         logger.info("ApprovalWorkflowEngine initialized")
@@ -260,9 +320,7 @@ class ApprovalWorkflowEngine:
         Returns:
             Created ApprovalRule
         """
-        rule_id = str(uuid.uuid4())
-        rule = ApprovalRule(
-            rule_id=rule_id,
+        row = ApprovalRuleModel.objects.create(
             name=name,
             entity_type=entity_type,
             conditions=conditions,
@@ -272,25 +330,28 @@ class ApprovalWorkflowEngine:
             escalation_enabled=escalation_enabled,
             notification_enabled=notification_enabled
         )
-        self.rules[rule_id] = rule
-        logger.info(f"Created approval rule: {rule.name}")
-        return rule
+        logger.info(f"Created approval rule: {row.name}")
+        return ApprovalRule.from_model(row)
     
     def get_rule(self, rule_id: str) -> Optional[ApprovalRule]:
         """Get rule by ID"""
-        return self.rules.get(rule_id)
+        row = self._get_row(ApprovalRuleModel, rule_id)
+        return ApprovalRule.from_model(row) if row else None
     
     def list_rules(self, entity_type: Optional[str] = None) -> List[ApprovalRule]:
         """List all rules, optionally filtered by entity type"""
-        rules = list(self.rules.values())
+        rows = ApprovalRuleModel.objects.all()
         if entity_type:
-            rules = [r for r in rules if r.entity_type == entity_type]
-        return rules
+            rows = rows.filter(entity_type=entity_type)
+        return [ApprovalRule.from_model(row) for row in rows]
     
     def delete_rule(self, rule_id: str) -> bool:
         """Delete a rule"""
-        if rule_id in self.rules:
-            del self.rules[rule_id]
+        try:
+            deleted, _ = ApprovalRuleModel.objects.filter(pk=rule_id).delete()
+        except (ValueError, ValidationError):
+            return False
+        if deleted:
             logger.info(f"Deleted approval rule: {rule_id}")
             return True
         return False
@@ -324,42 +385,49 @@ class ApprovalWorkflowEngine:
         except KeyError:
             priority_enum = ApprovalPriority.NORMAL
         
-        # Find matching rule
+        # Find matching rule (oldest first) among the rules for this entity type
         matching_rule = None
-        for rule in self.rules.values():
-            if rule.entity_type == entity_type and rule.matches(entity):
+        for row in ApprovalRuleModel.objects.filter(entity_type=entity_type).order_by('created_at'):
+            rule = ApprovalRule.from_model(row)
+            if rule.matches(entity):
                 matching_rule = rule
                 break
         
         # Create request
-        request = ApprovalRequest(
-            entity_id=entity_id,
-            entity_type=entity_type,
-            requester_id=requester_id,
-            requester_email=requester_email,
-            requester_name=requester_name,
-            approver_id=approver_id,
-            approver_email=approver_email,
-            approver_name=approver_name,
-            document_title=document_title,
-            priority=priority_enum,
-            rule_id=matching_rule.rule_id if matching_rule else None,
-            metadata=metadata
-        )
+        with transaction.atomic():
+            row = ApprovalRequestModel.objects.create(
+                entity_id=entity_id,
+                entity_type=entity_type,
+                requester_id=requester_id,
+                requester_email=requester_email,
+                requester_name=requester_name,
+                approver_id=approver_id,
+                approver_email=approver_email,
+                approver_name=approver_name,
+                document_title=document_title,
+                priority=priority_enum.value,
+                rule_id=matching_rule.rule_id if matching_rule else None,
+                metadata=metadata or {},
+                expiry_date=timezone.now() + timedelta(days=7)
+            )
+            self._bump_counters(total_requests=1, pending=1)
         
-        self.requests[request.request_id] = request
+        request = ApprovalRequest.from_model(row)
         logger.info(f"Created approval request: {request.request_id}")
         
         # Send notification if enabled
         notification_sent = False
         if matching_rule and matching_rule.notification_enabled:
             notification_sent = self._send_approval_notification(request)
+            if request.email_sent:
+                ApprovalRequestModel.objects.filter(pk=row.pk).update(email_sent=True)
         
         return request, notification_sent
     
     def get_request(self, request_id: str) -> Optional[ApprovalRequest]:
         """Get request by ID"""
-        return self.requests.get(request_id)
+        row = self._get_row(ApprovalRequestModel, request_id)
+        return ApprovalRequest.from_model(row) if row else None
     
     def approve_request(
         self,
@@ -379,13 +447,37 @@ class ApprovalWorkflowEngine:
         if request.status != ApprovalStatus.PENDING:
             return False, f"Request already {request.status.value}"
         
-        success = request.approve(comment)
-        if success:
-            # Send approval notification
-            self._send_approval_notification(request, status='approved')
-            return True, "Request approved successfully"
+        now = timezone.now()
+        with transaction.atomic():
+            # Conditional update: another process may have decided it meanwhile
+            updated = ApprovalRequestModel.objects.filter(
+                pk=request.request_id,
+                status=ApprovalStatus.PENDING.value
+            ).update(
+                status=ApprovalStatus.APPROVED.value,
+                approved_at=now,
+                approval_comment=comment,
+                updated_at=now
+            )
+            if updated:
+                self._bump_counters(
+                    pending=-1,
+                    approved=1,
+                    approval_seconds_total=(now - request.created_at).total_seconds()
+                )
+        
+        if not updated:
+            return False, "Failed to approve request"
+        
+        request.status = ApprovalStatus.APPROVED
+        request.approved_at = now
+        request.approval_comment = comment
+        request.updated_at = now
+        logger.info(f"Approval request {request.request_id} approved")
         
-        return False, "Failed to approve request"
+        # Send approval notification
+        self._send_approval_notification(request, status='approved')
+        return True, "Request approved successfully"
     
     def reject_request(
         self,
@@ -405,13 +497,32 @@ class ApprovalWorkflowEngine:
         if request.status != ApprovalStatus.PENDING:
             return False, f"Request already {request.status.value}"
         
-        success = request.reject(reason)
-        if success:
-            # Send rejection notification
-            self._send_approval_notification(request, status='rejected')
-            return True, "Request rejected successfully"
+        now = timezone.now()
+        with transaction.atomic():
+            updated = ApprovalRequestModel.objects.filter(
+                pk=request.request_id,
+                status=ApprovalStatus.PENDING.value
+            ).update(
+                status=ApprovalStatus.REJECTED.value,
+                rejected_at=now,
+                rejection_reason=reason,
+                updated_at=now
+            )
+            if updated:
+                self._bump_counters(pending=-1, rejected=1)
+        
+        if not updated:
+            return False, "Failed to reject request"
+        
+        request.status = ApprovalStatus.REJECTED
+        request.rejected_at = now
+        request.rejection_reason = reason
+        request.updated_at = now
+        logger.info(f"Approval request {request.request_id} rejected")
         
-        return False, "Failed to reject request"
+        # Send rejection notification
+        self._send_approval_notification(request, status='rejected')
+        return True, "Request rejected successfully"
     
     def list_pending_requests(
         self,
@@ -419,15 +530,32 @@ class ApprovalWorkflowEngine:
         entity_type: Optional[str] = None
     ) -> List[ApprovalRequest]:
         """List pending approval requests"""
-        requests = [r for r in self.requests.values() if r.status == ApprovalStatus.PENDING]
+        rows = ApprovalRequestModel.objects.filter(status=ApprovalStatus.PENDING.value)
         
         if approver_id:
-            requests = [r for r in requests if r.approver_id == approver_id]
+            rows = rows.filter(approver_id=approver_id)
         
         if entity_type:
-            requests = [r for r in requests if r.entity_type == entity_type]
+            rows = rows.filter(entity_type=entity_type)
         
-        return requests
+        return [ApprovalRequest.from_model(row) for row in rows]
+    
+    # ====== STORAGE ======
+    
+    @staticmethod
+    def _get_row(model, pk: str):
+        try:
+            return model.objects.filter(pk=pk).first()
+        except (ValueError, ValidationError):
+            return None
+    
+    def _bump_counters(self, **deltas) -> None:
+        """Apply deltas to the statistics row (call inside the write's transaction)"""
+        counters = ApprovalStatisticsModel.objects.filter(scope=self.STATISTICS_SCOPE)
+        changes = {field: F(field) + delta for field, delta in deltas.items()}
+        if not counters.update(**changes):
+            ApprovalStatisticsModel.objects.get_or_create(scope=self.STATISTICS_SCOPE)
+            counters.update(**changes)
     
     # ====== NOTIFICATIONS ======
     
@@ -525,21 +653,22 @@ class ApprovalWorkflowEngine:
     
     def get_statistics(self) -> Dict:
         """Get approval workflow statistics"""
-        total = len(self.requests)
-        pending = sum(1 for r in self.requests.values() if r.status == ApprovalStatus.PENDING)
-        approved = sum(1 for r in self.requests.values() if r.status == ApprovalStatus.APPROVED)
-        rejected = sum(1 for r in self.requests.values() if r.status == ApprovalStatus.REJECTED)
-        expired = sum(1 for r in self.requests.values() if r.is_expired())
+        counters = ApprovalStatisticsModel.objects.filter(scope=self.STATISTICS_SCOPE).first()
+        total = counters.total_requests if counters else 0
+        pending = counters.pending if counters else 0
+        approved = counters.approved if counters else 0
+        rejected = counters.rejected if counters else 0
+        
+        # Index range scan on (status, expiry_date); expiry depends on the clock
+        expired = ApprovalRequestModel.objects.filter(
+            status=ApprovalStatus.PENDING.value,
+            expiry_date__lt=timezone.now()
+        ).count()
         
         # Average approval time
-        approved_requests = [r for r in self.requests.values() if r.approved_at]
         avg_time_hours = 0
-        if approved_requests:
-            total_hours = sum(
-                (r.approved_at - r.created_at).total_seconds() / 3600
-                for r in approved_requests
-            )
-            avg_time_hours = total_hours / len(approved_requests)
+        if approved:
+            avg_time_hours = counters.approval_seconds_total / 3600 / approved
         
         return {
             'total_requests': total,
@@ -550,13 +679,16 @@ class ApprovalWorkflowEngine:
             'approval_rate': (approved / total * 100) if total > 0 else 0,
             'rejection_rate': (rejected / total * 100) if total > 0 else 0,
             'avg_approval_time_hours': round(avg_time_hours, 2),
-            'total_rules': len(self.rules)
+            'total_rules': ApprovalRuleModel.objects.count()
         }
     
     def export_data(self) -> Dict:
         """Export all workflow data"""
         return {
-            'rules': [rule.to_dict() for rule in self.rules.values()],
-            'requests': [request.to_dict() for request in self.requests.values()],
+            'rules': [rule.to_dict() for rule in self.list_rules()],
+            'requests': [
+                ApprovalRequest.from_model(row).to_dict()
+                for row in ApprovalRequestModel.objects.all()
+            ],
             'statistics': self.get_statistics()
         }
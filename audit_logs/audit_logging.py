@@ -6,10 +6,17 @@ Logs all API requests with:
 - Request hash (for deduplication)
 - Response status, latency
 - Automatically enforces retention policy
+
+Requests are stored as audit_logs.models.AuditLogModel rows (entity_type
+'api_request', details in `changes`) by the buffered sink in audit_logs.sink
+(bulk_create from a background thread); body hashes are computed there, off the
+response path. clm_backend.middleware.AuditLoggingMiddleware, the mounted
+middleware, logs through log_api_request as well.
 """
 
 import logging
 import hashlib
+import ipaddress
 import json
 import time
 from datetime import datetime, timedelta
@@ -17,105 +24,130 @@ from typing import Optional, Dict, Any
 from django.utils.deprecation import MiddlewareMixin
 from django.http import HttpRequest, HttpResponse
 from django.db import models
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast
 from django.utils import timezone
 from django.core.management.base import BaseCommand
 from django.conf import settings
 import uuid
 
+from . import partitions
+from .models import API_REQUEST_ENTITY, AuditLogModel
+from .sink import Deferred, audit_log_sink
+
 logger = logging.getLogger(__name__)
 
+# Response bodies are hashed up to this many bytes
+RESPONSE_HASH_LIMIT = 10240
+
+
+def sha256_hex(data: bytes, limit: Optional[int] = None) -> str:
+    """SHA-256 of ``data`` (only its first ``limit`` bytes when given)"""
+    if limit is not None:
+        data = data[:limit]
+    return hashlib.sha256(data or b'').hexdigest()
+
 
 # ============================================================================
-# AUDIT LOG MODELS
+# AUDIT LOG RECORDS
 # ============================================================================
 
-class AuditLogModel(models.Model):
+# API requests are stored as audit_logs rows of entity type API_REQUEST_ENTITY; the
+# request details (endpoint, status, latency, hashes) live in `changes`. Entity
+# analytics read AuditLogModel.objects.entity_events(), which leaves them out.
+
+METHOD_ACTIONS = {
+    'GET': 'view',
+    'HEAD': 'view',
+    'OPTIONS': 'view',
+    'POST': 'create',
+    'PUT': 'update',
+    'PATCH': 'update',
+    'DELETE': 'delete',
+}
+
+
+def request_hash(method: str, path: str, user_id: Optional[Any], body: bytes) -> str:
+    """Hash of a request (method, path, user, body) for deduplication"""
+    hash_input = f"{method}:{path}:{user_id}:{hashlib.sha256(body or b'').hexdigest()}"
+    return hashlib.sha256(hash_input.encode()).hexdigest()
+
+
+def _resolve_details(details: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute Deferred detail values; runs in the audit sink at flush time"""
+    resolved = {}
+    for key, value in details.items():
+        if isinstance(value, Deferred):
+            try:
+                value = value()
+            except Exception as e:
+                logger.warning(f"Audit log detail {key} could not be computed: {e}")
+                value = None
+        resolved[key] = value
+    return resolved
+
+
+def _entity_id(request_id: Optional[str]) -> uuid.UUID:
+    try:
+        return uuid.UUID(str(request_id))
+    except (TypeError, ValueError):
+        return uuid.uuid4()
+
+
+def _ip_address(value: Optional[str]) -> Optional[str]:
+    try:
+        return str(ipaddress.ip_address((value or '').strip()))
+    except ValueError:
+        return None
+
+
+def log_api_request(request_data: Dict[str, Any]) -> Optional[AuditLogModel]:
     """
-    Comprehensive audit log for all API requests
+    Queue an audit log entry for an API request on the buffered sink
+    
+    Detail values may be sink Deferreds; they are computed when the batch is written.
+    With AUDIT_LOG_ASYNC off the entry is inserted before returning. Requests
+    without a tenant and user (anonymous calls) are not recorded.
+    
+    Args:
+        request_data: {
+            'tenant_id': str,
+            'user_id': str,
+            'method': str,
+            'endpoint': str,
+            'ip_address': str,
+            'request_id': str,
+            ...any other details: 'status_code', 'latency_ms', 'request_hash',
+            'request_body_hash', 'response_body_hash', 'user_agent', ...
+        }
     
-    Stores: endpoint, user, tenant, method, status, timestamp, hash, etc.
+    Returns:
+        The queued (unsaved in async mode) record, or None if it was not logged
     """
-    
-    HTTP_METHODS = [
-        ('GET', 'GET'),
-        ('POST', 'POST'),
-        ('PUT', 'PUT'),
-        ('PATCH', 'PATCH'),
-        ('DELETE', 'DELETE'),
-        ('HEAD', 'HEAD'),
-        ('OPTIONS', 'OPTIONS'),
-    ]
-    
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
-    tenant_id = models.UUIDField(null=True, blank=True, db_index=True)
-    user_id = models.UUIDField(null=True, blank=True, db_index=True)
-    username = models.CharField(max_length=255, null=True, blank=True)
-    
-    # Request details
-    endpoint = models.CharField(max_length=500, db_index=True)
-    method = models.CharField(max_length=10, choices=HTTP_METHODS)
-    request_hash = models.CharField(max_length=64, db_index=True, unique=True)
-    
-    # Request content
-    request_body_hash = models.CharField(max_length=64, blank=True)
-    request_headers_summary = models.JSONField(default=dict)
-    
-    # Response details
-    status_code = models.IntegerField(db_index=True)
-    response_body_hash = models.CharField(max_length=64, blank=True)
-    
-    # Performance
-    latency_ms = models.IntegerField()  # Response time in milliseconds
-    
-    # Audit trail
-    ip_address = models.GenericIPAddressField(null=True, blank=True)
-    user_agent = models.TextField(blank=True)
-    
-    # Metadata
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
-    
-    class Meta:
-        db_table = 'audit_logs'
-        app_label = 'audit_logs'
-        indexes = [
-            models.Index(fields=['tenant_id', 'created_at']),
-            models.Index(fields=['user_id', 'created_at']),
-            models.Index(fields=['endpoint', 'created_at']),
-            models.Index(fields=['status_code', 'created_at']),
-        ]
-        verbose_name_plural = 'Audit Logs'
-    
-    def __str__(self):
-        return f"{self.method} {self.endpoint} [{self.status_code}] ({self.latency_ms}ms)"
-    
-    @classmethod
-    def log_request(cls, request_data: Dict[str, Any]) -> Optional['AuditLogModel']:
-        """
-        Create audit log entry
-        
-        Args:
-            request_data: {
-                'tenant_id': str,
-                'user_id': str,
-                'username': str,
-                'endpoint': str,
-                'method': str,
-                'status_code': int,
-                'latency_ms': int,
-                'request_hash': str,
-                'ip_address': str,
-                'user_agent': str,
-                'request_body_hash': str,
-                'response_body_hash': str,
-                'request_headers_summary': dict,
-            }
-        """
-        try:
-            log = cls.objects.create(**request_data)
-            return log
-        except Exception as e:
-            logger.error(f"Failed to create audit log: {e}")
-            return None
+    tenant_id = request_data.get('tenant_id')
+    user_id = request_data.get('user_id')
+    if not tenant_id or not user_id:
+        return None
+
+    details = {
+        key: value for key, value in request_data.items()
+        if key not in ('tenant_id', 'user_id', 'ip_address')
+    }
+    try:
+        log = AuditLogModel(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            entity_type=API_REQUEST_ENTITY,
+            entity_id=_entity_id(request_data.get('request_id')),
+            action=METHOD_ACTIONS.get(str(request_data.get('method') or '').upper(), 'view'),
+            changes=Deferred(_resolve_details, details),
+            ip_address=_ip_address(request_data.get('ip_address')),
+        )
+    except Exception as e:
+        logger.error(f"Failed to create audit log: {e}")
+        return None
+
+    return log if audit_log_sink.enqueue(log) else None
 
 
 # ============================================================================
@@ -182,7 +214,7 @@ class AuditLoggingMiddleware(MiddlewareMixin):
             request_data['latency_ms'] = latency
             request_data['error'] = str(e)
             
-            AuditLogModel.log_request(request_data)
+            log_api_request(request_data)
             raise
         
         # Update with response info
@@ -192,10 +224,10 @@ class AuditLoggingMiddleware(MiddlewareMixin):
         request_data['response_body_hash'] = self._hash_response(response, request)
         
         # Log the request
-        AuditLogModel.log_request(request_data)
+        log_api_request(request_data)
         
         # Log slow requests
-        if latency > settings.AUDIT_LOG_SLOW_REQUEST_THRESHOLD:
+        if latency > getattr(settings, 'AUDIT_LOG_SLOW_REQUEST_THRESHOLD', 5000):
             logger.warning(
                 f"SLOW_REQUEST: {request.method} {request.path} "
                 f"took {latency}ms (user: {request_data.get('user_id')})"
@@ -214,9 +246,10 @@ class AuditLoggingMiddleware(MiddlewareMixin):
         """Extract and prepare request data for logging"""
         
         # Get user info
-        tenant_id = getattr(request.user, 'tenant_id', None)
-        user_id = getattr(request.user, 'user_id', None)
-        username = getattr(request.user, 'username', 'anonymous')
+        user = getattr(request, 'user', None)
+        tenant_id = getattr(user, 'tenant_id', None)
+        user_id = getattr(user, 'user_id', None)
+        username = getattr(user, 'username', 'anonymous')
         
         # Get IP address
         ip_address = self._get_client_ip(request)
@@ -224,22 +257,18 @@ class AuditLoggingMiddleware(MiddlewareMixin):
         # Get user agent
         user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]
         
-        # Build request hash (includes method, path, user, body)
-        request_hash = self._generate_request_hash(
-            method=request.method,
-            path=request.path,
-            user_id=user_id,
-            body=request.body if not self._should_exclude_body(request.path) else b''
-        )
-        
-        # Hash request body
-        request_body_hash = ''
+        # Hashes are computed by the audit sink when the record is flushed
+        body = b''
         if not self._should_exclude_body(request.path):
             try:
-                request_body_hash = hashlib.sha256(request.body or b'').hexdigest()
+                body = request.body or b''
             except:
                 pass
         
+        # Request hash (includes method, path, user, body)
+        request_hash = Deferred(self._generate_request_hash, request.method, request.path, user_id, body)
+        request_body_hash = Deferred(sha256_hex, body)
+        
         # Extract headers summary
         headers_summary = {
             'content_type': request.META.get('CONTENT_TYPE', ''),
@@ -258,6 +287,7 @@ class AuditLoggingMiddleware(MiddlewareMixin):
             'request_headers_summary': headers_summary,
             'ip_address': ip_address,
             'user_agent': user_agent,
+            'request_id': getattr(request, 'request_id', None),
         }
     
     def _should_exclude_body(self, path: str) -> bool:
@@ -269,19 +299,17 @@ class AuditLoggingMiddleware(MiddlewareMixin):
     
     def _generate_request_hash(self, method: str, path: str, user_id: Optional[str], body: bytes) -> str:
         """Generate unique hash for request (for deduplication)"""
-        hash_input = f"{method}:{path}:{user_id}:{hashlib.sha256(body or b'').hexdigest()}"
-        return hashlib.sha256(hash_input.encode()).hexdigest()
+        return request_hash(method, path, user_id, body)
     
-    def _hash_response(self, response: HttpResponse, request: HttpRequest) -> str:
-        """Hash response body"""
+    def _hash_response(self, response: HttpResponse, request: HttpRequest):
+        """Deferred hash of the response body (computed by the audit sink)"""
         if self._should_exclude_body(request.path):
             return ''
         
         try:
+            # Streaming responses have no content; only the first 10KB is hashed
             content = response.content if hasattr(response, 'content') else b''
-            # Only hash first 10KB to avoid large response logging
-            content = content[:10240]
-            return hashlib.sha256(content).hexdigest()
+            return Deferred(sha256_hex, content, RESPONSE_HASH_LIMIT)
         except:
             return ''
     
@@ -304,75 +332,78 @@ class AuditLoggingMiddleware(MiddlewareMixin):
 class AuditLogRetentionPolicy:
     """
     Implements log retention policy
-    
+
+    audit_logs is range-partitioned on created_at (see audit_logs.partitions), so
+    expired logs are removed by dropping whole partitions rather than deleting rows.
+    Off Postgres the table is not partitioned and rows are deleted in batches.
+    Retention is opt-in: with no retention_days and no AUDIT_LOG_RETENTION_DAYS
+    nothing is removed.
+
     Configuration in settings.py:
-    AUDIT_LOG_RETENTION_DAYS = 90  # Keep logs for 90 days
-    AUDIT_LOG_CLEANUP_BATCH_SIZE = 1000  # Delete 1000 at a time
+    AUDIT_LOG_RETENTION_DAYS = 90  # Keep logs for 90 days (unset: keep everything)
+    AUDIT_LOG_CLEANUP_BATCH_SIZE = 1000  # Row-delete fallback batch size
     AUDIT_LOG_SLOW_REQUEST_THRESHOLD = 5000  # 5 seconds in ms
     """
     
     @staticmethod
-    def cleanup_old_logs(retention_days: int = None) -> int:
+    def cleanup_old_logs(retention_days: int = None) -> Dict[str, int]:
         """
-        Delete logs older than retention period
+        Drop log partitions older than retention period
         
         Args:
             retention_days: Days to keep (uses settings if not provided)
         
         Returns:
-            Number of logs deleted
+            {'partitions_dropped': int, 'rows_deleted': int}, see cleanup_by_batch
         """
-        if retention_days is None:
-            retention_days = getattr(settings, 'AUDIT_LOG_RETENTION_DAYS', 90)
-        
-        cutoff_date = timezone.now() - timedelta(days=retention_days)
-        
-        try:
-            deleted_count, _ = AuditLogModel.objects.filter(
-                created_at__lt=cutoff_date
-            ).delete()
-            
-            logger.info(f"Deleted {deleted_count} old audit logs (older than {cutoff_date})")
-            return deleted_count
-        
-        except Exception as e:
-            logger.error(f"Error cleaning up audit logs: {e}")
-            return 0
+        return AuditLogRetentionPolicy.cleanup_by_batch(retention_days=retention_days)
     
     @staticmethod
-    def cleanup_by_batch(batch_size: int = None, retention_days: int = None) -> int:
+    def cleanup_by_batch(batch_size: int = None, retention_days: int = None) -> Dict[str, int]:
         """
-        Delete logs in batches to avoid locking database
+        Drop expired partitions; one DDL statement per partition regardless of size
         
         Args:
-            batch_size: Size of each batch
+            batch_size: Size of each delete batch when the table is not partitioned
             retention_days: Days to keep
         
         Returns:
-            Total deleted
+            {'partitions_dropped': partitions removed,
+             'rows_deleted': rows deleted one by one (from the default partition,
+             or from the whole table when it is not partitioned)}
         """
-        batch_size = batch_size or getattr(settings, 'AUDIT_LOG_CLEANUP_BATCH_SIZE', 1000)
-        retention_days = retention_days or getattr(settings, 'AUDIT_LOG_RETENTION_DAYS', 90)
-        
-        cutoff_date = timezone.now() - timedelta(days=retention_days)
-        total_deleted = 0
-        
-        while True:
-            # Delete in small batches
-            logs_to_delete = AuditLogModel.objects.filter(
-                created_at__lt=cutoff_date
-            )[:batch_size]
-            
-            if not logs_to_delete.exists():
-                break
-            
-            ids = list(logs_to_delete.values_list('id', flat=True))
-            deleted_count, _ = AuditLogModel.objects.filter(id__in=ids).delete()
-            total_deleted += deleted_count
-            
-            logger.info(f"Deleted batch of {deleted_count} logs, total: {total_deleted}")
-        
-        return total_deleted
+        result = {'partitions_dropped': 0, 'rows_deleted': 0}
+        cutoff_date = partitions.retention_cutoff(retention_days)
+        if cutoff_date is None:
+            logger.info("Audit log retention is not configured; nothing removed")
+            return result
+
+        try:
+            if partitions.is_partitioned():
+                expired = partitions.expire_before(cutoff_date)
+                result['partitions_dropped'] = len(expired['removed'])
+                result['rows_deleted'] = expired['rows_deleted']
+                logger.info(
+                    f"Dropped {result['partitions_dropped']} audit log partitions and "
+                    f"{result['rows_deleted']} rows (older than {cutoff_date})"
+                )
+                return result
+
+            batch_size = batch_size or getattr(settings, 'AUDIT_LOG_CLEANUP_BATCH_SIZE', 1000)
+            while True:
+                ids = list(
+                    AuditLogModel.objects.filter(created_at__lt=cutoff_date).values_list('id', flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+                deleted_count, _ = AuditLogModel.objects.filter(id__in=ids).delete()
+                result['rows_deleted'] += deleted_count
+            logger.info(f"Deleted {result['rows_deleted']} old audit logs (older than {cutoff_date})")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error cleaning up audit logs: {e}")
+            return result
 
 
 # ============================================================================
@@ -382,17 +413,34 @@ class AuditLogRetentionPolicy:
 class AuditLogAnalyzer:
     """
     Analyze audit logs for security insights
+
+    Works on the API request records written by log_api_request. Every query is
+    bounded on both sides by window(), so the planner only scans the audit_logs
+    partitions the window touches.
     """
+
+    @staticmethod
+    def window(days: int) -> Dict[str, datetime]:
+        """created_at filter for the last ``days`` days"""
+        now = timezone.now()
+        return {'created_at__gte': now - timedelta(days=days), 'created_at__lt': now}
+
+    @staticmethod
+    def requests(days: int) -> models.QuerySet:
+        """API request records of the last ``days`` days, with their details as columns"""
+        return AuditLogModel.objects.filter(
+            entity_type=API_REQUEST_ENTITY, **AuditLogAnalyzer.window(days)
+        ).annotate(
+            endpoint=KeyTextTransform('endpoint', 'changes'),
+            method=KeyTextTransform('method', 'changes'),
+            status_code=Cast(KeyTextTransform('status_code', 'changes'), models.IntegerField()),
+            latency_ms=Cast(KeyTextTransform('latency_ms', 'changes'), models.IntegerField()),
+        )
     
     @staticmethod
     def get_user_activity(user_id: str, days: int = 7) -> Dict[str, Any]:
         """Get user activity summary"""
-        cutoff = timezone.now() - timedelta(days=days)
-        
-        logs = AuditLogModel.objects.filter(
-            user_id=user_id,
-            created_at__gte=cutoff
-        )
+        logs = AuditLogAnalyzer.requests(days).filter(user_id=user_id)
         
         return {
             'user_id': user_id,
@@ -407,12 +455,7 @@ class AuditLogAnalyzer:
     @staticmethod
     def get_tenant_activity(tenant_id: str, days: int = 7) -> Dict[str, Any]:
         """Get tenant activity summary"""
-        cutoff = timezone.now() - timedelta(days=days)
-        
-        logs = AuditLogModel.objects.filter(
-            tenant_id=tenant_id,
-            created_at__gte=cutoff
-        )
+        logs = AuditLogAnalyzer.requests(days).filter(tenant_id=tenant_id)
         
         return {
             'tenant_id': tenant_id,
@@ -432,12 +475,7 @@ class AuditLogAnalyzer:
     @staticmethod
     def get_error_summary(days: int = 7) -> Dict[str, Any]:
         """Get error summary"""
-        cutoff = timezone.now() - timedelta(days=days)
-        
-        error_logs = AuditLogModel.objects.filter(
-            status_code__gte=400,
-            created_at__gte=cutoff
-        )
+        error_logs = AuditLogAnalyzer.requests(days).filter(status_code__gte=400)
         
         return {
             'total_errors': error_logs.count(),
@@ -457,20 +495,18 @@ class AuditLogAnalyzer:
     @staticmethod
     def find_suspicious_activity(days: int = 7) -> Dict[str, Any]:
         """Find potentially suspicious activity"""
-        cutoff = timezone.now() - timedelta(days=days)
+        requests = AuditLogAnalyzer.requests(days)
         
         # Find users with many 401/403 errors
-        suspicious_users = AuditLogModel.objects.filter(
+        suspicious_users = requests.filter(
             status_code__in=[401, 403],
-            created_at__gte=cutoff
         ).values('user_id').annotate(
             count=models.Count('*')
         ).filter(count__gte=5).order_by('-count')
         
         # Find IP addresses with many failures
-        suspicious_ips = AuditLogModel.objects.filter(
+        suspicious_ips = requests.filter(
             status_code__gte=400,
-            created_at__gte=cutoff
         ).values('ip_address').annotate(
             count=models.Count('*')
         ).filter(count__gte=10).order_by('-count')
@@ -529,9 +565,10 @@ class Command(BaseCommand):
                 )
             )
         else:
-            deleted = AuditLogRetentionPolicy.cleanup_by_batch(batch_size, retention_days)
+            result = AuditLogRetentionPolicy.cleanup_by_batch(batch_size, retention_days)
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'Successfully deleted {deleted} audit logs'
+                    f"Successfully removed {result['partitions_dropped']} expired audit log partitions "
+                    f"and {result['rows_deleted']} rows"
                 )
             )
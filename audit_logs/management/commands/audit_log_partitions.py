@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from audit_logs import partitions
+
+
+class Command(BaseCommand):
+    help = "Create upcoming audit_logs partitions and drop the ones past retention (run daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ahead", type=int, default=None, help="Future partitions to keep ready (default: AUDIT_LOG_PARTITIONS_AHEAD)")
+        parser.add_argument("--retention-days", type=int, default=None, help="Drop partitions that end before now minus N days (default: AUDIT_LOG_RETENTION_DAYS; no retention if unset)")
+        parser.add_argument("--detach-only", action="store_true", help="Detach expired partitions but keep their tables (for archiving)")
+        parser.add_argument("--no-retention", action="store_true", help="Only create partitions")
+        parser.add_argument("--dry-run", action="store_true", help="Print the partitions that would be dropped")
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            raise CommandError("audit_logs is not a partitioned table (run migrations on PostgreSQL)")
+
+        cutoff = partitions.retention_cutoff(options.get("retention_days"))
+        if cutoff is None:
+            options["no_retention"] = True
+            self.stdout.write("No retention configured (AUDIT_LOG_RETENTION_DAYS); no partitions will be removed")
+        if options.get("dry_run"):
+            if cutoff is None:
+                return
+            expired = [p.name for p in partitions.list_partitions() if p.end <= cutoff]
+            self.stdout.write(f"DRY RUN: would remove {len(expired)} partitions ending before {cutoff:%Y-%m-%d}")
+            for name in expired:
+                self.stdout.write(f"  {name}")
+            return
+
+        created = partitions.ensure_partitions(ahead=options.get("ahead"))
+        for name in created:
+            self.stdout.write(f"created {name}")
+
+        removed = []
+        if not options.get("no_retention"):
+            removed = partitions.drop_partitions_before(cutoff, detach_only=bool(options.get("detach_only")))
+            for name in removed:
+                self.stdout.write(f"{'detached' if options.get('detach_only') else 'dropped'} {name}")
+
+        self.stdout.write(self.style.SUCCESS(f"Audit log partitions: {len(created)} created, {len(removed)} removed"))
@@ -0,0 +1,94 @@
+"""
+Convert audit_logs into a table range-partitioned on created_at
+
+Existing rows are copied into monthly partitions; the primary key becomes
+(id, created_at) because Postgres requires the partition key in every unique
+constraint. Other databases are left as they are.
+
+The DDL is written out here rather than taken from audit_logs.partitions, so the
+migration does not change when that module or the settings do.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from django.db import migrations, models
+
+# Monthly partitions created beyond the current month
+PARTITIONS_AHEAD = 3
+
+
+def _is_partitioned(cursor):
+    cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('audit_logs')")
+    return cursor.fetchone() is not None
+
+
+def _next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _month_start(day):
+    return datetime(day.year, day.month, 1, tzinfo=timezone.utc)
+
+
+def partition_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        if _is_partitioned(cursor):
+            return
+        cursor.execute('ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned')
+        cursor.execute('ALTER TABLE audit_logs_unpartitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_unpartitioned_pkey')
+        cursor.execute(
+            'CREATE TABLE audit_logs (LIKE audit_logs_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            'PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute('ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id, created_at)')
+        cursor.execute('CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT')
+
+        cursor.execute('SELECT MIN(created_at) FROM audit_logs_unpartitioned')
+        oldest = cursor.fetchone()[0]
+        today = datetime.now(timezone.utc).date()
+        month = (oldest.astimezone(timezone.utc).date() if oldest else today).replace(day=1)
+        last = today.replace(day=1)
+        for _ in range(PARTITIONS_AHEAD):
+            last = _next_month(last)
+        while month <= last:
+            start, end = _month_start(month), _month_start(_next_month(month))
+            cursor.execute(
+                f'CREATE TABLE audit_logs_p{month:%Y_%m} PARTITION OF audit_logs '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            month = _next_month(month)
+
+        cursor.execute('INSERT INTO audit_logs SELECT * FROM audit_logs_unpartitioned')
+        cursor.execute('DROP TABLE audit_logs_unpartitioned')
+
+
+def unpartition_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        if not _is_partitioned(cursor):
+            return
+        cursor.execute('CREATE TABLE audit_logs_unpartitioned (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute('INSERT INTO audit_logs_unpartitioned SELECT * FROM audit_logs')
+        cursor.execute('DROP TABLE audit_logs')
+        cursor.execute('ALTER TABLE audit_logs_unpartitioned RENAME TO audit_logs')
+        cursor.execute('ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit_logs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_table, unpartition_table),
+        migrations.AddIndex(
+            model_name="auditlogmodel",
+            index=models.Index(fields=["tenant_id", "created_at"], name="audit_logs_tenant_created_idx"),
+        ),
+    ]
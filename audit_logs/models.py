@@ -1,6 +1,16 @@
 from django.db import models
 import uuid
 
+# entity_type of the per-request records written by audit_logging.log_api_request
+API_REQUEST_ENTITY = 'api_request'
+
+
+class AuditLogQuerySet(models.QuerySet):
+    def entity_events(self):
+        """Changes to business entities, without the per-request API records"""
+        return self.exclude(entity_type=API_REQUEST_ENTITY)
+
+
 class AuditLogModel(models.Model):
     ACTION_TYPES = [('create', 'Create'), ('update', 'Update'), ('delete', 'Delete'), ('view', 'View')]
     
@@ -13,7 +23,14 @@ class AuditLogModel(models.Model):
     changes = models.JSONField(default=dict)
     ip_address = models.GenericIPAddressField(null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = AuditLogQuerySet.as_manager()
     
     class Meta:
         db_table = 'audit_logs'
         app_label = 'audit_logs'
+        # Range-partitioned on created_at; see audit_logs/partitions.py
+        indexes = [models.Index(fields=['tenant_id', 'created_at'], name='audit_logs_tenant_created_idx')]
+
+    def __str__(self):
+        return f"{self.action} {self.entity_type} {self.entity_id}"
@@ -0,0 +1,230 @@
+"""
+Time-range partitions for the audit_logs table
+
+audit_logs is range-partitioned on created_at (migration 0002). Partitions are
+created ahead of time by ``manage.py audit_log_partitions`` (also run daily by the
+beat task in audit_logs.tasks); a row outside every range lands in
+audit_logs_default, so an insert never fails because maintenance fell behind.
+
+Retention is opt-in (AUDIT_LOG_RETENTION_DAYS). It detaches and drops whole
+partitions instead of deleting rows, and any query that filters on created_at
+only scans the partitions its window touches.
+Postgres requires the partition key in the primary key, so the table's PK is
+(id, created_at); Django still treats id alone as the primary key.
+
+Configuration in settings.py:
+AUDIT_LOG_PARTITION_INTERVAL = 'month'  # or 'day'
+AUDIT_LOG_PARTITIONS_AHEAD = 3          # Future partitions kept ready
+AUDIT_LOG_RETENTION_DAYS = None         # Opt-in; when set, partitions that end
+                                        # before now minus N days are dropped
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import List, Optional, Union
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'audit_logs'
+DEFAULT_PARTITION = f'{TABLE}_default'
+INTERVALS = ('day', 'month')
+
+_NAME_RE = re.compile(rf'^{TABLE}_p(\d{{4}})_(\d{{2}})(?:_(\d{{2}}))?$')
+
+
+@dataclass(frozen=True)
+class Partition:
+    """One range partition: rows with start <= created_at < end"""
+
+    name: str
+    start: datetime
+    end: datetime
+
+    def overlaps(self, other: 'Partition') -> bool:
+        return self.start < other.end and other.start < self.end
+
+
+def partition_interval(interval: Optional[str] = None) -> str:
+    interval = (interval or getattr(settings, 'AUDIT_LOG_PARTITION_INTERVAL', 'month')).strip().lower()
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown audit log partition interval: {interval}")
+    return interval
+
+
+def _utc_date(moment: Union[date, datetime]) -> date:
+    if isinstance(moment, datetime):
+        if timezone.is_aware(moment):
+            moment = moment.astimezone(dt_timezone.utc)
+        return moment.date()
+    return moment
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def partition_for(moment: Union[date, datetime], interval: Optional[str] = None) -> Partition:
+    """The partition (existing or not) that holds rows created at ``moment``"""
+    day = _utc_date(moment)
+    if partition_interval(interval) == 'day':
+        start, end = day, day + timedelta(days=1)
+        name = f'{TABLE}_p{start:%Y_%m_%d}'
+    else:
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        name = f'{TABLE}_p{start:%Y_%m}'
+    return Partition(name, _midnight(start), _midnight(end))
+
+
+def _parse(name: str) -> Optional[Partition]:
+    match = _NAME_RE.match(name)
+    if not match:
+        return None
+    year, month, day = match.groups()
+    if day is None:
+        return partition_for(date(int(year), int(month), 1), 'month')
+    return partition_for(date(int(year), int(month), int(day)), 'day')
+
+
+def is_partitioned() -> bool:
+    """True when audit_logs is a partitioned table (always false off Postgres)"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [TABLE])
+        return cursor.fetchone() is not None
+
+
+def list_partitions() -> List[Partition]:
+    """Attached range partitions, oldest first (the default partition is not listed)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(%s)',
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = [partition for partition in map(_parse, names) if partition is not None]
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def create_partition(partition: Partition) -> None:
+    """
+    Create and attach ``partition``
+
+    Rows already in the default partition for its range are moved first; otherwise
+    ATTACH would fail. With partitions created ahead of time there are none.
+    """
+    qn = connection.ops.quote_name
+    bounds = f"FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {qn(partition.name)} (LIKE {qn(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {qn(DEFAULT_PARTITION)} WHERE created_at >= %s AND created_at < %s RETURNING *) '
+            f'INSERT INTO {qn(partition.name)} SELECT * FROM moved',
+            [partition.start, partition.end],
+        )
+        cursor.execute(f'ALTER TABLE {qn(TABLE)} ATTACH PARTITION {qn(partition.name)} {bounds}')
+    logger.info(f"Created audit log partition {partition.name}")
+
+
+def ensure_partitions(
+    ahead: Optional[int] = None,
+    since: Optional[Union[date, datetime]] = None,
+    interval: Optional[str] = None,
+) -> List[str]:
+    """
+    Create missing partitions from ``since`` (default: now) through ``ahead``
+    intervals past the current one
+
+    Ranges that overlap an existing partition (e.g. after switching interval) are
+    skipped. Returns the names of the partitions created.
+    """
+    if not is_partitioned():
+        return []
+    interval = partition_interval(interval)
+    if ahead is None:
+        ahead = int(getattr(settings, 'AUDIT_LOG_PARTITIONS_AHEAD', 3))
+
+    last = partition_for(timezone.now(), interval)
+    for _ in range(max(ahead, 0)):
+        last = partition_for(last.end, interval)
+
+    existing = list_partitions()
+    created = []
+    partition = partition_for(since or timezone.now(), interval)
+    while partition.start <= last.start:
+        if not any(partition.overlaps(other) for other in existing):
+            create_partition(partition)
+            existing.append(partition)
+            created.append(partition.name)
+        partition = partition_for(partition.end, interval)
+    return created
+
+
+def expire_before(cutoff: datetime, detach_only: bool = False) -> dict:
+    """
+    Detach (and unless ``detach_only``, drop) every partition that ends at or
+    before ``cutoff``; rows older than ``cutoff`` in the default partition are
+    deleted with one statement
+
+    The partition holding ``cutoff`` is kept whole, so retention is exact to the
+    partition interval. Returns {'removed': partition names, 'rows_deleted': rows
+    deleted from the default partition}.
+    """
+    if not is_partitioned():
+        return {'removed': [], 'rows_deleted': 0}
+    qn = connection.ops.quote_name
+    removed = []
+    for partition in list_partitions():
+        if partition.end > cutoff:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(partition.name)}')
+            if not detach_only:
+                cursor.execute(f'DROP TABLE {qn(partition.name)}')
+        removed.append(partition.name)
+        logger.info(f"{'Detached' if detach_only else 'Dropped'} audit log partition {partition.name}")
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {qn(DEFAULT_PARTITION)} WHERE created_at < %s', [cutoff])
+        rows_deleted = max(cursor.rowcount, 0)
+    if rows_deleted:
+        logger.info(f"Deleted {rows_deleted} expired rows from {DEFAULT_PARTITION}")
+    return {'removed': removed, 'rows_deleted': rows_deleted}
+
+
+def drop_partitions_before(cutoff: datetime, detach_only: bool = False) -> List[str]:
+    """expire_before(), returning only the names of the partitions removed"""
+    return expire_before(cutoff, detach_only=detach_only)['removed']
+
+
+def retention_cutoff(retention_days: Optional[int] = None) -> Optional[datetime]:
+    """
+    Start of the retained window, or None when no retention is configured
+
+    Retention is opt-in: nothing is dropped unless ``retention_days`` is passed or
+    AUDIT_LOG_RETENTION_DAYS is set.
+    """
+    if retention_days is None:
+        retention_days = getattr(settings, 'AUDIT_LOG_RETENTION_DAYS', None)
+    if retention_days is None:
+        return None
+    return timezone.now() - timedelta(days=int(retention_days))
+
+
+def maintain_partitions(
+    ahead: Optional[int] = None, retention_days: Optional[int] = None, detach_only: bool = False
+) -> dict:
+    """Create upcoming partitions and, when retention is configured, drop expired ones"""
+    cutoff = retention_cutoff(retention_days)
+    return {
+        'created': ensure_partitions(ahead=ahead),
+        'removed': drop_partitions_before(cutoff, detach_only=detach_only) if cutoff is not None else [],
+    }
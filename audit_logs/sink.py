@@ -0,0 +1,275 @@
+"""
+Buffered audit log writer
+
+Audit records are queued in-process and written with one bulk_create per batch by a
+background flusher thread, so logging an API call costs a deque append instead of an
+INSERT on the request path. Expensive field values (body hashes) can be passed as
+Deferred and are computed by the flusher, not by the request.
+
+Configuration in settings.py:
+AUDIT_LOG_ASYNC = True              # False writes each record immediately
+AUDIT_LOG_FLUSHER = True            # False: no background thread, call flush() yourself
+AUDIT_LOG_BATCH_SIZE = 500          # Flush as soon as this many records are queued
+AUDIT_LOG_FLUSH_INTERVAL = 1.0      # ...or after this many seconds
+AUDIT_LOG_QUEUE_MAX = 10000         # Bound on queued records
+AUDIT_LOG_OVERFLOW = 'drop_oldest'  # or 'drop_newest' when the queue is full
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, models, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class Deferred:
+    """A field value computed at flush time: Deferred(func, *args)"""
+
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func: Callable[..., Any], *args):
+        self.func = func
+        self.args = args
+
+    def __call__(self) -> Any:
+        return self.func(*self.args)
+
+
+class AuditLogSink:
+    """
+    Bounded in-process queue of unsaved model instances, flushed with bulk_create
+
+    Any argument left as None is read from settings on use, so override_settings
+    applies to the shared sink.
+    """
+
+    OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+
+    def __init__(
+        self,
+        async_mode: Optional[bool] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_queue_size: Optional[int] = None,
+        overflow: Optional[str] = None,
+        autostart: Optional[bool] = None,
+    ):
+        """
+        Args:
+            async_mode: Queue records (True) or write each one immediately (False)
+            batch_size: Records per bulk_create, and the queue length that wakes the flusher
+            flush_interval: Seconds between time-based flushes
+            max_queue_size: Queued records kept before the overflow policy applies
+            overflow: 'drop_oldest' or 'drop_newest'
+            autostart: Start the flusher thread on first enqueue; when False the
+                caller is responsible for calling flush()
+        """
+        if overflow is not None and overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self._async_mode = async_mode
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_queue_size = max_queue_size
+        self._overflow = overflow
+        self._autostart = autostart
+
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._atexit_registered = False
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    # ------------------------------------------------------------------
+    # Settings
+    # ------------------------------------------------------------------
+
+    @property
+    def async_mode(self) -> bool:
+        if self._async_mode is not None:
+            return self._async_mode
+        return bool(getattr(settings, 'AUDIT_LOG_ASYNC', True))
+
+    @property
+    def autostart(self) -> bool:
+        if self._autostart is not None:
+            return self._autostart
+        return bool(getattr(settings, 'AUDIT_LOG_FLUSHER', True))
+
+    @property
+    def batch_size(self) -> int:
+        return max(1, int(self._batch_size or getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 500)))
+
+    @property
+    def flush_interval(self) -> float:
+        return float(self._flush_interval or getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 1.0))
+
+    @property
+    def max_queue_size(self) -> int:
+        return max(1, int(self._max_queue_size or getattr(settings, 'AUDIT_LOG_QUEUE_MAX', 10000)))
+
+    @property
+    def overflow(self) -> str:
+        policy = self._overflow or getattr(settings, 'AUDIT_LOG_OVERFLOW', 'drop_oldest')
+        return policy if policy in self.OVERFLOW_POLICIES else 'drop_oldest'
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def enqueue(self, obj: models.Model) -> bool:
+        """
+        Queue an unsaved model instance for writing
+
+        Returns:
+            False if the record was rejected (queue full under 'drop_newest') or,
+            in synchronous mode, could not be written
+        """
+        if not self.async_mode:
+            return self._write_one(obj)
+
+        with self._lock:
+            if len(self._queue) >= self.max_queue_size:
+                self.dropped += 1
+                if self.overflow == 'drop_newest':
+                    self._warn_dropped()
+                    return False
+                self._queue.popleft()
+                self._warn_dropped()
+            self._queue.append(obj)
+            queued = len(self._queue)
+
+        if queued >= self.batch_size:
+            self._wakeup.set()
+        if self.autostart:
+            self._ensure_worker()
+        return True
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of records written"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    count = min(self.batch_size, len(self._queue))
+                    batch = [self._queue.popleft() for _ in range(count)]
+                if not batch:
+                    break
+                written += self._write_batch(batch)
+        return written
+
+    def close(self, timeout: float = 5.0) -> int:
+        """Stop the flusher thread and write whatever it left queued; returns that count"""
+        self._stop.set()
+        self._wakeup.set()
+        worker = self._worker
+        if worker is not None and worker.is_alive() and worker is not threading.current_thread():
+            worker.join(timeout)
+        self._worker = None
+        self._stop.clear()
+        return self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'queued': len(self._queue),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _warn_dropped(self) -> None:
+        # Log the first drop and then every 1000th, not one line per request
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(f"Audit log queue full ({self.max_queue_size}); {self.dropped} records dropped so far")
+
+    def _ensure_worker(self) -> None:
+        pid = os.getpid()
+        if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+                return
+            # A forked child (e.g. preforking app server) inherits the queue but not the thread
+            self._worker = threading.Thread(target=self._run, name='audit-log-flusher', daemon=True)
+            self._worker_pid = pid
+            self._worker.start()
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if not self._queue:
+                continue
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Audit log flusher error: {e}")
+            finally:
+                close_old_connections()
+
+    @staticmethod
+    def _resolve(obj: models.Model) -> models.Model:
+        for field in obj._meta.concrete_fields:
+            value = getattr(obj, field.attname, None)
+            if isinstance(value, Deferred):
+                try:
+                    setattr(obj, field.attname, value())
+                except Exception as e:
+                    logger.warning(f"Audit log field {field.name} could not be computed: {e}")
+                    setattr(obj, field.attname, field.get_default())
+        return obj
+
+    def _write_one(self, obj: models.Model) -> bool:
+        try:
+            with transaction.atomic():
+                self._resolve(obj).save(force_insert=True)
+            self.written += 1
+            return True
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Failed to create audit log: {e}")
+            return False
+
+    def _write_batch(self, batch: List[models.Model]) -> int:
+        by_model: Dict[type, List[models.Model]] = {}
+        for obj in batch:
+            by_model.setdefault(type(obj), []).append(obj)
+
+        written = 0
+        for model, objs in by_model.items():
+            try:
+                objs = [self._resolve(obj) for obj in objs]
+                with transaction.atomic():
+                    # Conflicting rows are skipped rather than failing the batch
+                    model.objects.bulk_create(objs, batch_size=self.batch_size, ignore_conflicts=True)
+                written += len(objs)
+            except Exception as e:
+                self.failed += len(objs)
+                logger.error(f"Failed to write {len(objs)} audit logs: {e}")
+        self.written += written
+        return written
+
+
+# Shared by audit_logging.log_api_request and the audit middleware
+audit_log_sink = AuditLogSink()
@@ -0,0 +1,22 @@
+"""
+Celery tasks for audit logs
+
+maintain_audit_log_partitions runs daily on the beat schedule: it creates the next
+AUDIT_LOG_PARTITIONS_AHEAD partitions and, only when AUDIT_LOG_RETENTION_DAYS is
+set, drops the ones past it.
+"""
+import logging
+
+from celery import shared_task
+
+from audit_logs import partitions
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def maintain_audit_log_partitions():
+    """Create upcoming audit_logs partitions and drop expired ones (if retention is configured)"""
+    result = partitions.maintain_partitions()
+    logger.info(f"Audit log partitions: {len(result['created'])} created, {len(result['removed'])} removed")
+    return result
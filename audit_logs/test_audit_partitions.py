@@ -0,0 +1,123 @@
+"""
+Tests for time-range partitioning of audit_logs
+"""
+
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import partitions
+from .models import AuditLogModel
+
+
+def _log(created_at=None):
+    log = AuditLogModel.objects.create(
+        tenant_id=uuid.uuid4(), user_id=uuid.uuid4(), entity_type='contract',
+        entity_id=uuid.uuid4(), action='view',
+    )
+    if created_at is not None:
+        AuditLogModel.objects.filter(pk=log.pk).update(created_at=created_at)
+    return log
+
+
+def _names():
+    return [partition.name for partition in partitions.list_partitions()]
+
+
+class TestPartitionBounds(SimpleTestCase):
+    """Partition names and ranges per interval"""
+
+    def test_month_and_day(self):
+        month = partitions.partition_for(date(2025, 12, 17), 'month')
+        assert month.name == 'audit_logs_p2025_12'
+        assert month.start == datetime(2025, 12, 1, tzinfo=dt_timezone.utc)
+        assert month.end == datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+        day = partitions.partition_for(datetime(2026, 2, 28, 23, 0, tzinfo=dt_timezone.utc), 'day')
+        assert day.name == 'audit_logs_p2026_02_28'
+        assert day.end == datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+        assert partitions._parse(day.name) == day
+
+        with self.assertRaises(ValueError):
+            partitions.partition_interval('week')
+
+
+class TestAuditLogPartitions(TestCase):
+    """Partitions are created ahead, expired ones are dropped, windows are pruned"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.old = self.now - timedelta(days=400)
+        partitions.ensure_partitions(ahead=2)
+
+    def test_table_is_partitioned_with_partitions_ahead(self):
+        assert partitions.is_partitioned()
+        upcoming = partitions.partition_for(self.now)
+        for _ in range(2):
+            upcoming = partitions.partition_for(upcoming.end)
+
+        assert partitions.partition_for(self.now).name in _names()
+        assert upcoming.name in _names()
+        assert partitions.ensure_partitions(ahead=2) == []
+
+    def test_rows_outside_ranges_move_into_new_partition(self):
+        log = _log(created_at=self.old)
+        old_partition = partitions.partition_for(self.old)
+        assert old_partition.name not in _names()
+
+        assert partitions.ensure_partitions(ahead=0, since=self.old)[0] == old_partition.name
+
+        assert AuditLogModel.objects.get(pk=log.pk).created_at == self.old
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {old_partition.name}')
+            assert cursor.fetchone()[0] == 1
+
+    def test_retention_drops_partitions_not_rows(self):
+        partitions.ensure_partitions(ahead=0, since=self.old)
+        expired = _log(created_at=self.old)
+        current = _log()
+        stray = _log(created_at=datetime(1999, 1, 5, tzinfo=dt_timezone.utc))  # default partition
+
+        removed = partitions.drop_partitions_before(self.now - timedelta(days=90))
+
+        assert partitions.partition_for(self.old).name in removed
+        assert partitions.partition_for(self.now).name not in removed
+        assert set(AuditLogModel.objects.values_list('pk', flat=True)) == {current.pk}
+        assert not AuditLogModel.objects.filter(pk__in=[expired.pk, stray.pk]).exists()
+
+    def test_window_scans_only_touched_partitions(self):
+        partitions.ensure_partitions(ahead=0, since=self.old)
+
+        plan = AuditLogModel.objects.filter(
+            created_at__gte=self.now - timedelta(days=1), created_at__lt=self.now
+        ).explain()
+
+        assert partitions.partition_for(self.now).name in plan
+        assert partitions.partition_for(self.old).name not in plan
+
+    def test_management_command(self):
+        partitions.ensure_partitions(ahead=0, since=self.old)
+        out = StringIO()
+
+        call_command('audit_log_partitions', '--ahead', '1', '--retention-days', '90', stdout=out)
+
+        assert f'dropped {partitions.partition_for(self.old).name}' in out.getvalue()
+        assert partitions.partition_for(self.old).name not in _names()
+
+    @override_settings(AUDIT_LOG_RETENTION_DAYS=None)
+    def test_retention_is_opt_in(self):
+        partitions.ensure_partitions(ahead=0, since=self.old)
+        expired = _log(created_at=self.old)
+        out = StringIO()
+
+        assert partitions.maintain_partitions(ahead=1)['removed'] == []
+        call_command('audit_log_partitions', '--ahead', '1', stdout=out)
+
+        assert 'No retention configured' in out.getvalue()
+        assert partitions.partition_for(self.old).name in _names()
+        assert AuditLogModel.objects.filter(pk=expired.pk).exists()
@@ -0,0 +1,161 @@
+"""
+Tests for the buffered audit log sink
+"""
+
+import hashlib
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .audit_logging import API_REQUEST_ENTITY, request_hash
+from .models import AuditLogModel
+from .sink import AuditLogSink, Deferred
+
+
+def _entry(**overrides):
+    data = {
+        'tenant_id': uuid.uuid4(),
+        'user_id': uuid.uuid4(),
+        'entity_type': 'contract',
+        'entity_id': uuid.uuid4(),
+        'action': 'update',
+        'changes': {},
+    }
+    data.update(overrides)
+    return AuditLogModel(**data)
+
+
+class TestAuditLogSink(TestCase):
+    """Queueing, batching and overflow"""
+
+    def buffered(self, **kwargs):
+        # No flusher thread: it would write through its own DB connection
+        kwargs.setdefault('batch_size', 100)
+        return AuditLogSink(async_mode=True, autostart=False, **kwargs)
+
+    def test_sync_mode_writes_immediately(self):
+        sink = AuditLogSink(async_mode=False)
+
+        assert sink.enqueue(_entry()) is True
+        assert AuditLogModel.objects.count() == 1
+
+    def test_buffered_records_written_in_one_insert_on_flush(self):
+        sink = self.buffered()
+        for _ in range(5):
+            sink.enqueue(_entry())
+
+        assert AuditLogModel.objects.count() == 0
+        with self.assertNumQueries(3):  # savepoint, INSERT, release
+            assert sink.flush() == 5
+        assert AuditLogModel.objects.count() == 5
+        assert sink.stats() == {'queued': 0, 'written': 5, 'dropped': 0, 'failed': 0}
+
+    def test_deferred_values_computed_at_flush(self):
+        sink = self.buffered()
+        calls = []
+
+        def digest(body):
+            calls.append(body)
+            return {'sha256': hashlib.sha256(body).hexdigest()}
+
+        entry = _entry(changes=Deferred(digest, b'payload'))
+        sink.enqueue(entry)
+        assert calls == []
+
+        sink.flush()
+
+        assert calls == [b'payload']
+        stored = AuditLogModel.objects.get(pk=entry.pk)
+        assert stored.changes == {'sha256': hashlib.sha256(b'payload').hexdigest()}
+
+    def test_drop_oldest_keeps_newest_records(self):
+        sink = self.buffered(max_queue_size=2, overflow='drop_oldest')
+        entries = [_entry(entity_type=f'e{i}') for i in range(3)]
+
+        assert all(sink.enqueue(entry) for entry in entries)
+        sink.flush()
+
+        assert sorted(AuditLogModel.objects.values_list('entity_type', flat=True)) == ['e1', 'e2']
+        assert sink.dropped == 1
+
+    def test_drop_newest_rejects_when_full(self):
+        sink = self.buffered(max_queue_size=1, overflow='drop_newest')
+
+        assert sink.enqueue(_entry(entity_type='kept')) is True
+        assert sink.enqueue(_entry(entity_type='lost')) is False
+        sink.flush()
+
+        assert list(AuditLogModel.objects.values_list('entity_type', flat=True)) == ['kept']
+
+    def test_failed_batch_is_counted_not_raised(self):
+        sink = self.buffered()
+        sink.enqueue(_entry(tenant_id=None))
+
+        assert sink.flush() == 0
+        assert sink.failed == 1
+        # The surrounding transaction is still usable
+        assert AuditLogModel.objects.count() == 0
+
+    def test_close_flushes_remaining(self):
+        sink = self.buffered(batch_size=2)
+        for _ in range(3):
+            sink.enqueue(_entry())
+
+        assert sink.close() == 3
+        assert AuditLogModel.objects.count() == 3
+
+
+class TestAuditMiddlewareThroughSink(TestCase):
+    """The mounted audit middleware queues API requests on the sink"""
+
+    def test_api_request_lands_via_sink(self):
+        user = get_user_model().objects.create_user(email='audit@example.com', password='pass1234')
+        client = APIClient()
+        client.force_authenticate(user)
+        request_id = str(uuid.uuid4())
+        sink = AuditLogSink(async_mode=True, autostart=False)
+
+        with mock.patch('audit_logs.audit_logging.audit_log_sink', sink):
+            response = client.get('/api/v1/contracts/', HTTP_X_REQUEST_ID=request_id)
+
+        assert AuditLogModel.objects.count() == 0
+        assert sink.flush() == 1
+        log = AuditLogModel.objects.get()
+        assert (log.tenant_id, log.user_id) == (user.tenant_id, user.user_id)
+        assert (log.entity_type, log.entity_id, log.action) == (API_REQUEST_ENTITY, uuid.UUID(request_id), 'view')
+        assert log.changes['endpoint'] == '/api/v1/contracts/'
+        assert log.changes['status_code'] == response.status_code
+        assert log.changes['request_hash'] == request_hash('GET', '/api/v1/contracts/', user.user_id, b'')
+        assert log.changes['response_body_hash'] == hashlib.sha256(response.content).hexdigest()
+
+    def test_anonymous_request_not_logged(self):
+        sink = AuditLogSink(async_mode=True, autostart=False)
+
+        with mock.patch('audit_logs.audit_logging.audit_log_sink', sink):
+            APIClient().get('/api/v1/contracts/')
+
+        assert sink.stats()['queued'] == 0
+
+    def test_api_traffic_leaves_feature_usage_unchanged(self):
+        admin = get_user_model().objects.create_user(email='admin@example.com', password='pass1234', is_staff=True)
+        AuditLogModel.objects.create(
+            tenant_id=admin.tenant_id, user_id=admin.user_id, entity_type='contract',
+            entity_id=uuid.uuid4(), action='update',
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        sink = AuditLogSink(async_mode=True, autostart=False)
+
+        with mock.patch('audit_logs.audit_logging.audit_log_sink', sink):
+            before = client.get('/api/v1/admin/feature-usage/').json()
+            for _ in range(3):
+                client.get('/api/v1/contracts/')
+            assert sink.flush() == 4
+            after = client.get('/api/v1/admin/feature-usage/').json()
+
+        assert AuditLogModel.objects.filter(entity_type=API_REQUEST_ENTITY).count() == 4
+        assert [feature['feature'] for feature in after['top_features']] == ['contract']
+        assert after == before
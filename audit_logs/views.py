@@ -23,10 +23,11 @@ class AuditLogViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         last_24h = timezone.now() - timedelta(hours=24)
+        logs = AuditLogModel.objects.entity_events()
         stats = {
-            'total_logs': AuditLogModel.objects.count(),
-            'last_24h': AuditLogModel.objects.filter(created_at__gte=last_24h).count(),
-            'by_action': dict(AuditLogModel.objects.values('action').annotate(count=Count('id')).values_list('action', 'count')),
-            'by_entity': dict(AuditLogModel.objects.values('entity_type').annotate(count=Count('id')).values_list('entity_type', 'count'))
+            'total_logs': logs.count(),
+            'last_24h': logs.filter(created_at__gte=last_24h).count(),
+            'by_action': dict(logs.values('action').annotate(count=Count('id')).values_list('action', 'count')),
+            'by_entity': dict(logs.values('entity_type').annotate(count=Count('id')).values_list('entity_type', 'count'))
         }
         return Response(stats)
@@ -321,7 +321,7 @@ class AdminAnalyticsView(APIView):
         templates_by_day = day_bucket_map(templates_qs, 'created_at', day_trend_start)
         firma_sent_by_day = day_bucket_map(firma_sc_qs, 'sent_at', day_trend_start)
         firma_completed_by_day = day_bucket_map(firma_sc_qs, 'completed_at', day_trend_start)
-        audit_by_day = day_bucket_map(AuditLogModel.objects.filter(tenant_id=tenant_id), 'created_at', day_trend_start)
+        audit_by_day = day_bucket_map(AuditLogModel.objects.entity_events().filter(tenant_id=tenant_id), 'created_at', day_trend_start)
 
         trends_7d = []
         for d in day_starts:
@@ -433,7 +433,7 @@ class AdminAnalyticsView(APIView):
                 }
             },
             'activity_summary': {
-                'audit_logs_last_7d': AuditLogModel.objects.filter(tenant_id=tenant_id, created_at__gte=last_7d).count(),
+                'audit_logs_last_7d': AuditLogModel.objects.entity_events().filter(tenant_id=tenant_id, created_at__gte=last_7d).count(),
                 'workflow_logs_last_7d': WorkflowLog.objects.filter(contract__tenant_id=tenant_id, timestamp__gte=last_7d).count(),
                 'signnow_events_last_7d': SigningAuditLog.objects.filter(esignature_contract__contract__tenant_id=tenant_id, created_at__gte=last_7d).count(),
                 'firma_events_last_7d': FirmaSigningAuditLog.objects.filter(firma_signature_contract__contract__tenant_id=tenant_id, created_at__gte=last_7d).count(),
@@ -458,7 +458,7 @@ class AdminFeatureUsageView(APIView):
 
         # Feature usage by entity type over time
         feature_data = (
-            AuditLogModel.objects.filter(
+            AuditLogModel.objects.entity_events().filter(
                 tenant_id=tenant_id,
                 created_at__gte=last_6_months
             )
@@ -480,7 +480,7 @@ class AdminFeatureUsageView(APIView):
 
         # Top features by total usage
         top_features_data = (
-            AuditLogModel.objects.filter(
+            AuditLogModel.objects.entity_events().filter(
                 tenant_id=tenant_id,
                 created_at__gte=last_6_months
             )
@@ -501,7 +501,7 @@ class AdminFeatureUsageView(APIView):
 
         # User feature preferences (top users by feature usage)
         user_feature_data = (
-            AuditLogModel.objects.filter(
+            AuditLogModel.objects.entity_events().filter(
                 tenant_id=tenant_id,
                 created_at__gte=last_6_months
             )
@@ -511,7 +511,7 @@ class AdminFeatureUsageView(APIView):
         )
 
         users_with_activity = (
-            AuditLogModel.objects.filter(
+            AuditLogModel.objects.entity_events().filter(
                 tenant_id=tenant_id,
                 created_at__gte=last_6_months
             )
@@ -599,7 +599,7 @@ class AdminUserFeatureUsageView(APIView):
 
         # Get all users and their feature usage
         users_with_activity = (
-            AuditLogModel.objects.filter(
+            AuditLogModel.objects.entity_events().filter(
                 tenant_id=tenant_id,
                 created_at__gte=last_6_months
             )
@@ -619,7 +619,7 @@ class AdminUserFeatureUsageView(APIView):
             if user_obj:
                 # Get feature breakdown for this user
                 user_features = (
-                    AuditLogModel.objects.filter(
+                    AuditLogModel.objects.entity_events().filter(
                         tenant_id=tenant_id,
                         user_id=user_id,
                         created_at__gte=last_6_months
@@ -639,7 +639,7 @@ class AdminUserFeatureUsageView(APIView):
 
         # Feature usage distribution across all users
         all_user_features = (
-            AuditLogModel.objects.filter(
+            AuditLogModel.objects.entity_events().filter(
                 tenant_id=tenant_id,
                 created_at__gte=last_6_months
             )
@@ -685,7 +685,7 @@ class AdminActivityView(APIView):
         limit = max(1, min(limit, 200))
 
         audit_rows = list(
-            AuditLogModel.objects.filter(tenant_id=tenant_id)
+            AuditLogModel.objects.entity_events().filter(tenant_id=tenant_id)
             .order_by('-created_at')[:limit]
         )
         workflow_rows = list(
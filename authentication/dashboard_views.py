@@ -106,7 +106,7 @@ class DashboardInsightsView(APIView):
 
         # -------------------- Feature usage (Audit logs) --------------------
         feature_rows = (
-            AuditLogModel.objects.filter(tenant_id=tenant_id, user_id=user_id, created_at__gte=since_30d)
+            AuditLogModel.objects.entity_events().filter(tenant_id=tenant_id, user_id=user_id, created_at__gte=since_30d)
             .values('entity_type')
             .annotate(count=Count('id'))
             .order_by('-count')
@@ -137,7 +137,7 @@ class DashboardInsightsView(APIView):
 
         # -------------------- Activity trend (last 14 days) --------------------
         day_rows = (
-            AuditLogModel.objects.filter(tenant_id=tenant_id, user_id=user_id, created_at__gte=since_14d)
+            AuditLogModel.objects.entity_events().filter(tenant_id=tenant_id, user_id=user_id, created_at__gte=since_14d)
             .annotate(day=TruncDay('created_at'))
             .values('day')
             .annotate(count=Count('id'))
@@ -13,6 +13,8 @@ from typing import Any, Optional
 
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from clm_backend.metrics import set_tenant_tier
+
 
 @dataclass
 class JWTClaimsUser:
@@ -23,6 +25,7 @@ class JWTClaimsUser:
     tenant_id: Optional[str] = None
     is_admin: bool = False
     is_superadmin: bool = False
+    tenant_tier: Optional[str] = None
 
     is_authenticated: bool = True
     is_anonymous: bool = False
@@ -44,10 +47,14 @@ class StatelessJWTAuthentication(JWTAuthentication):
             # Let upstream error handling deal with malformed tokens.
             user_id = ""
 
+        # Label hot-path metrics for the rest of this request (reset by MetricsMiddleware)
+        set_tenant_tier(validated_token.get("tenant_tier"))
+
         return JWTClaimsUser(
             user_id=user_id,
             email=validated_token.get("email"),
             tenant_id=validated_token.get("tenant_id"),
             is_admin=bool(validated_token.get("is_admin") or validated_token.get("role") == "admin"),
             is_superadmin=bool(validated_token.get("is_superadmin") or validated_token.get("role") == "superadmin"),
+            tenant_tier=validated_token.get("tenant_tier"),
         )
@@ -0,0 +1,313 @@
+"""
+Local read-through cache for R2 objects
+
+R2StorageService.get_file_bytes consults this cache before downloading. Entries are
+keyed by object key and remember the object's ETag:
+
+- Tier 1: in-process LRU of small objects, bounded by R2_CACHE_MEMORY_MAX_BYTES
+- Tier 2: files under R2_CACHE_DIR, bounded by R2_CACHE_MAX_BYTES and shared by
+  the worker processes on a host. Off unless R2_CACHE_DIR is set, so tenant
+  documents are only written where the deployment chose to keep them.
+
+The directory itself is the disk tier's state: every write re-scans it under a
+file lock and evicts the least recently read files until the whole directory fits
+the budget, so N workers share one budget and see each other's evictions.
+
+A cached copy of a mutable key (e.g. `.../editor/latest.json`) is revalidated with
+a conditional GET (If-None-Match); R2 answers 304 without a body when it is still
+current. Keys matching R2_CACHE_IMMUTABLE_PATTERNS (versioned objects such as
+`contracts/{id}/v{n}.docx`, never rewritten) are served without asking R2.
+
+Both tiers are best-effort: a failing disk never breaks a download.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts lock per process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+DEFAULT_IMMUTABLE_PATTERNS = [r'(^|/)contracts/[^/]+/v\d+\.[A-Za-z0-9]+$']
+
+LOCK_NAME = '.lock'
+TEMP_PREFIX = '.tmp-'
+# Temp files this old were left by a process that died mid-write
+STALE_TEMP_SECONDS = 3600
+
+
+class R2ObjectCache:
+    """Two-tier (memory + disk) LRU of R2 object bytes keyed by object key and ETag"""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        memory_max_bytes: Optional[int] = None,
+        max_object_bytes: Optional[int] = None,
+        immutable_patterns: Optional[List[str]] = None,
+    ):
+        """Initialize cache tiers from settings (overridable for tests)"""
+        # No directory, no disk tier
+        self.directory = (directory if directory is not None else getattr(settings, 'R2_CACHE_DIR', '')) or None
+        self.max_bytes = int(max_bytes if max_bytes is not None else getattr(settings, 'R2_CACHE_MAX_BYTES', 512 * MB))
+        self.memory_max_bytes = int(
+            memory_max_bytes if memory_max_bytes is not None else getattr(settings, 'R2_CACHE_MEMORY_MAX_BYTES', 32 * MB)
+        )
+        self.max_object_bytes = int(
+            max_object_bytes if max_object_bytes is not None else getattr(settings, 'R2_CACHE_MAX_OBJECT_BYTES', 64 * MB)
+        )
+        patterns = immutable_patterns if immutable_patterns is not None else getattr(
+            settings, 'R2_CACHE_IMMUTABLE_PATTERNS', DEFAULT_IMMUTABLE_PATTERNS
+        )
+        self._immutable = [re.compile(p) for p in patterns or []]
+
+        self._memory: 'OrderedDict[str, Tuple[str, bytes]]' = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def is_immutable(self, key: str) -> bool:
+        """True for keys whose content never changes once written"""
+        return any(p.search(key or '') for p in self._immutable)
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """(etag, data) of the cached copy, or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if not self.directory:
+            return entry
+
+        path = self._data_path(key)
+        if entry is not None:
+            # Keep the disk copy from looking idle to the other processes' evictions
+            self._touch(path)
+            return entry
+        try:
+            with open(path + '.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(path, 'rb') as f:
+                data = f.read()
+        except (OSError, ValueError):
+            # Never cached, or evicted by another process sharing the directory
+            return None
+        if not isinstance(meta, dict) or meta.get('key') != key or meta.get('size') != len(data) or not meta.get('etag'):
+            return None
+        self._touch(path)
+        self._remember(key, meta['etag'], data)
+        return meta['etag'], data
+
+    def put(self, key: str, etag: str, data: bytes) -> None:
+        """Store ``data`` as the copy of ``key`` at ``etag`` in both tiers"""
+        if not key or not etag or data is None or len(data) > self.max_object_bytes:
+            return
+        self._remember(key, etag, data)
+        if self.directory:
+            self._write_disk(key, etag, data)
+
+    def invalidate(self, key: str) -> None:
+        """Drop the local copy of ``key`` (after this process overwrites or deletes it)"""
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= len(entry[1])
+        if self.directory:
+            self._remove_files(self._data_path(key))
+
+    def clear(self) -> None:
+        """Empty both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if not self.directory:
+            return
+        try:
+            with self._directory_lock():
+                for _, _, path in self._scan():
+                    self._remove_files(path)
+        except OSError as e:
+            logger.warning(f"R2 cache clear failed in {self.directory}: {str(e)}")
+
+    def stats(self) -> Dict:
+        """Tier sizes; disk figures cover every process sharing the directory"""
+        files = self._scan() if self.directory else []
+        with self._lock:
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(files),
+                'disk_bytes': sum(size for _, size, _ in files),
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _data_path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _remember(self, key: str, etag: str, data: bytes) -> None:
+        """Insert into the memory LRU, evicting by byte budget"""
+        size = len(data)
+        # One object may take at most a quarter of the memory tier
+        if size * 4 > self.memory_max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous[1])
+            self._memory[key] = (etag, data)
+            self._memory_bytes += size
+            while self._memory and self._memory_bytes > self.memory_max_bytes:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _write_disk(self, key: str, etag: str, data: bytes) -> None:
+        path = self._data_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers in other processes never see a partial file
+            for target, content in (
+                (path, data),
+                (path + '.json', json.dumps({'key': key, 'etag': etag, 'size': len(data)}).encode('utf-8')),
+            ):
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=TEMP_PREFIX)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp, target)
+            self._touch(path)
+        except OSError as e:
+            logger.warning(f"R2 cache write failed for {key}: {str(e)}")
+            return
+
+        try:
+            with self._directory_lock():
+                files = self._scan()
+                total = sum(size for _, size, _ in files)
+                for _, size, old_path in files:
+                    if total <= self.max_bytes:
+                        break
+                    self._remove_files(old_path)
+                    total -= size
+        except OSError as e:
+            logger.warning(f"R2 cache eviction failed in {self.directory}: {str(e)}")
+
+    def _scan(self) -> List[Tuple[int, int, str]]:
+        """(last read ns, size, path) of every cached object on disk, least recently read first"""
+        files = []
+        now = time.time()
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    if name.startswith(TEMP_PREFIX):
+                        if now - os.path.getmtime(path) > STALE_TEMP_SECONDS:
+                            os.remove(path)
+                        continue
+                    if name == LOCK_NAME or name.endswith('.json'):
+                        continue
+                    st = os.stat(path)
+                except OSError:
+                    # Removed by another process mid-scan
+                    continue
+                files.append((st.st_mtime_ns, st.st_size, path))
+        files.sort()
+        return files
+
+    def _directory_lock(self):
+        """Exclusive lock on the directory across processes (thread lock where fcntl is unavailable)"""
+        return _DirectoryLock(os.path.join(self.directory, LOCK_NAME))
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        """Mark ``path`` as just read; eviction goes by these times"""
+        try:
+            now = time.time_ns()
+            os.utime(path, ns=(now, now))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove_files(path: str) -> None:
+        for target in (path + '.json', path):
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+
+
+class _DirectoryLock:
+    """flock on a lock file, held for the duration of a ``with`` block"""
+
+    _thread_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is None:
+            return self
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except OSError:
+            self._release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self._release()
+        return False
+
+    def _release(self):
+        if self._file is not None:
+            # Closing the file drops the flock
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+_r2_object_cache: Optional[R2ObjectCache] = None
+_r2_object_cache_lock = threading.Lock()
+
+
+def get_r2_object_cache() -> Optional[R2ObjectCache]:
+    """The process-wide R2 object cache, or None when R2_CACHE_ENABLED is off"""
+    global _r2_object_cache
+    if not getattr(settings, 'R2_CACHE_ENABLED', True):
+        return None
+    if _r2_object_cache is None:
+        with _r2_object_cache_lock:
+            if _r2_object_cache is None:
+                _r2_object_cache = R2ObjectCache()
+    return _r2_object_cache
+
+
+def reset_r2_object_cache() -> None:
+    global _r2_object_cache
+    with _r2_object_cache_lock:
+        _r2_object_cache = None
@@ -1,17 +1,92 @@
 """
 Cloudflare R2 Storage Service
+
+Building a botocore client costs hundreds of milliseconds and several megabytes, so
+every R2StorageService shares one process-wide client (get_r2_client). boto3 clients
+are thread-safe; its connection pool is sized by R2_MAX_POOL_CONNECTIONS for
+threaded workers. Large objects can be streamed instead of held in memory:
+open_file / iter_file_chunks / download_fileobj for reads, upload_fileobj (multipart
+above R2_MULTIPART_THRESHOLD) for writes. get_file_bytes reads through a local
+object cache (authentication.r2_cache).
 """
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from django.conf import settings
+import threading
 import uuid
 import mimetypes
 import re
 import hashlib
 import unicodedata
 from urllib.parse import quote
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+from authentication.r2_cache import get_r2_object_cache
+from clm_backend.metrics import instrument, observe, record_cache_lookup
+
+MB = 1024 * 1024
+
+_client_lock = threading.Lock()
+_client = None
+_client_key = None
+
+
+def _client_settings() -> tuple:
+    return (
+        getattr(settings, 'R2_ENDPOINT_URL', ''),
+        getattr(settings, 'R2_ACCESS_KEY_ID', ''),
+        getattr(settings, 'R2_SECRET_ACCESS_KEY', ''),
+        int(getattr(settings, 'R2_CONNECT_TIMEOUT', 5) or 5),
+        int(getattr(settings, 'R2_READ_TIMEOUT', 30) or 30),
+        int(getattr(settings, 'R2_MAX_POOL_CONNECTIONS', 32) or 32),
+    )
+
+
+def get_r2_client():
+    """The process-wide S3 client for R2, rebuilt only when the R2 settings change"""
+    global _client, _client_key
+    key = _client_settings()
+    client = _client
+    if client is not None and _client_key == key:
+        return client
+    with _client_lock:
+        if _client is None or _client_key != key:
+            endpoint_url, access_key_id, secret_access_key, connect_timeout, read_timeout, pool = key
+            # boto3's default session is not thread-safe; build on a private one
+            _client = boto3.session.Session().client(
+                's3',
+                endpoint_url=endpoint_url,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key,
+                config=Config(
+                    signature_version='s3v4',
+                    connect_timeout=connect_timeout,
+                    read_timeout=read_timeout,
+                    retries={'max_attempts': 3, 'mode': 'standard'},
+                    max_pool_connections=pool,
+                    tcp_keepalive=True,
+                ),
+                region_name='auto'
+            )
+            _client_key = key
+        return _client
+
+
+def reset_r2_client() -> None:
+    global _client, _client_key
+    with _client_lock:
+        _client = None
+        _client_key = None
+
+
+def _transfer_config() -> TransferConfig:
+    return TransferConfig(
+        multipart_threshold=int(getattr(settings, 'R2_MULTIPART_THRESHOLD', 16 * MB) or 16 * MB),
+        multipart_chunksize=int(getattr(settings, 'R2_MULTIPART_CHUNKSIZE', 8 * MB) or 8 * MB),
+        max_concurrency=int(getattr(settings, 'R2_MULTIPART_CONCURRENCY', 4) or 4),
+    )
 
 
 class R2StorageService:
@@ -32,21 +107,10 @@ class R2StorageService:
                 'Cloudflare R2 is not configured. Missing: ' + ', '.join(missing)
             )
 
-        self.client = boto3.client(
-            's3',
-            endpoint_url=settings.R2_ENDPOINT_URL,
-            aws_access_key_id=settings.R2_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
-            config=Config(
-                signature_version='s3v4',
-                connect_timeout=int(getattr(settings, 'R2_CONNECT_TIMEOUT', 5) or 5),
-                read_timeout=int(getattr(settings, 'R2_READ_TIMEOUT', 30) or 30),
-                retries={'max_attempts': 3, 'mode': 'standard'},
-            ),
-            region_name='auto'
-        )
+        self.client = get_r2_client()
         self.bucket_name = settings.R2_BUCKET_NAME
     
+    @instrument('r2', 'put_object')
     def upload_file(self, file_obj, tenant_id, filename=None):
         """
         Upload a file to R2
@@ -73,17 +137,14 @@ class R2StorageService:
             content_type = 'application/octet-stream'
         
         try:
-            self.client.put_object(
-                Bucket=self.bucket_name,
-                Key=r2_key,
-                Body=file_obj.read(),
-                ContentType=content_type,
-                Metadata=self._sanitize_metadata(
-                    {
-                        'tenant_id': str(tenant_id),
-                        'original_filename': filename,
-                    }
-                ),
+            self._upload_stream(
+                file_obj,
+                r2_key,
+                content_type=content_type,
+                metadata={
+                    'tenant_id': str(tenant_id),
+                    'original_filename': filename,
+                },
             )
             return r2_key
         except ClientError as e:
@@ -123,6 +184,7 @@ class R2StorageService:
             md_out[str(k)] = cls._sanitize_metadata_value(v)
         return md_out
 
+    @instrument('r2', 'put_object')
     def put_bytes(
         self,
         key: str,
@@ -151,6 +213,7 @@ class R2StorageService:
                 ContentType=content_type or 'application/octet-stream',
                 Metadata=md,
             )
+            self._invalidate_cached(key)
             return str(key)
         except ClientError as e:
             raise Exception(f"Failed to upload bytes to R2: {str(e)}")
@@ -172,6 +235,45 @@ class R2StorageService:
             metadata=metadata,
         )
 
+    def _upload_stream(
+        self,
+        fileobj: BinaryIO,
+        key: str,
+        *,
+        content_type: str = 'application/octet-stream',
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        # Read in chunks; multipart upload once the object passes R2_MULTIPART_THRESHOLD
+        self.client.upload_fileobj(
+            fileobj,
+            self.bucket_name,
+            str(key),
+            ExtraArgs={
+                'ContentType': content_type or 'application/octet-stream',
+                'Metadata': self._sanitize_metadata(metadata),
+            },
+            Config=_transfer_config(),
+        )
+        self._invalidate_cached(key)
+
+    @instrument('r2', 'put_object')
+    def upload_fileobj(
+        self,
+        key: str,
+        fileobj: BinaryIO,
+        *,
+        content_type: str = 'application/octet-stream',
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Upload a file-like object to a specific R2 key without reading it into memory."""
+        if not key or not str(key).strip():
+            raise Exception('R2 key is required')
+        try:
+            self._upload_stream(fileobj, key, content_type=content_type, metadata=metadata)
+            return str(key)
+        except ClientError as e:
+            raise Exception(f"Failed to upload file to R2: {str(e)}")
+
     @staticmethod
     def sanitize_filename(filename: str) -> str:
         name = (filename or '').strip()
@@ -180,6 +282,7 @@ class R2StorageService:
         name = re.sub(r'\s+', '_', name).strip('_')
         return name or f"file_{uuid.uuid4()}"
 
+    @instrument('r2', 'put_object')
     def upload_private_file(self, file_obj, tenant_id: str, user_id: str, filename: Optional[str] = None) -> Dict[str, Any]:
         """Upload a private file under a per-user prefix.
 
@@ -195,18 +298,15 @@ class R2StorageService:
         if not content_type:
             content_type = 'application/octet-stream'
 
-        self.client.put_object(
-            Bucket=self.bucket_name,
-            Key=r2_key,
-            Body=file_obj.read(),
-            ContentType=content_type,
-            Metadata=self._sanitize_metadata(
-                {
-                    'tenant_id': str(tenant_id),
-                    'user_id': str(user_id),
-                    'original_filename': original_name,
-                }
-            ),
+        self._upload_stream(
+            file_obj,
+            r2_key,
+            content_type=content_type,
+            metadata={
+                'tenant_id': str(tenant_id),
+                'user_id': str(user_id),
+                'original_filename': original_name,
+            },
         )
 
         return {
@@ -215,6 +315,7 @@ class R2StorageService:
             'content_type': content_type,
         }
 
+    @instrument('r2', 'put_object')
     def upload_review_contract_file(self, file_obj, tenant_id: str, user_id: str, filename: Optional[str] = None) -> Dict[str, Any]:
         """Upload a contract intended for review/validation under a dedicated prefix."""
         original_name = filename or getattr(file_obj, 'name', '') or 'review'
@@ -227,20 +328,17 @@ class R2StorageService:
         if not content_type:
             content_type = 'application/octet-stream'
 
-        self.client.put_object(
-            Bucket=self.bucket_name,
-            Key=r2_key,
-            Body=file_obj.read(),
-            ContentType=content_type,
-            Metadata=self._sanitize_metadata(
-                {
-                    'tenant_id': str(tenant_id),
-                    'user_id': str(user_id),
-                    'original_filename': original_name,
-                    'purpose': 'review_contract',
-                    'file_ext': ext,
-                }
-            ),
+        self._upload_stream(
+            file_obj,
+            r2_key,
+            content_type=content_type,
+            metadata={
+                'tenant_id': str(tenant_id),
+                'user_id': str(user_id),
+                'original_filename': original_name,
+                'purpose': 'review_contract',
+                'file_ext': ext,
+            },
         )
 
         return {
@@ -249,6 +347,7 @@ class R2StorageService:
             'content_type': content_type,
         }
 
+    @instrument('r2', 'list_objects')
     def list_objects(self, prefix: str, max_keys: int = 200) -> List[Dict[str, Any]]:
         """List objects under a prefix."""
         try:
@@ -267,6 +366,7 @@ class R2StorageService:
         except ClientError as e:
             raise Exception(f"Failed to list objects: {str(e)}")
     
+    @instrument('r2', 'presign')
     def generate_presigned_url(self, r2_key, expiration=3600):
         """
         Generate a presigned URL for secure file access
@@ -292,14 +392,81 @@ class R2StorageService:
             raise Exception(f"Failed to generate presigned URL: {str(e)}")
 
     def get_file_bytes(self, r2_key: str) -> bytes:
-        """Download an object from R2 and return its bytes."""
+        """Download an object from R2 and return its bytes.
+
+        Reads through the local object cache (authentication.r2_cache): immutable keys
+        are served locally, other cached keys are revalidated with If-None-Match.
+        """
+        cache = get_r2_object_cache()
+        cached = cache.get(r2_key) if cache is not None else None
+        if cached is not None and cache.is_immutable(r2_key):
+            record_cache_lookup('r2', 'local_hit')
+            return cached[1]
+
+        params = {'Bucket': self.bucket_name, 'Key': r2_key}
+        if cached is not None:
+            params['IfNoneMatch'] = cached[0]
         try:
-            resp = self.client.get_object(Bucket=self.bucket_name, Key=r2_key)
-            body = resp.get('Body')
-            return body.read() if body else b''
+            with observe('r2', 'get_object'):
+                resp = self.client.get_object(**params)
+                body = resp.get('Body')
+                data = body.read() if body else b''
         except ClientError as e:
+            if cached is not None and self._is_not_modified(e):
+                record_cache_lookup('r2', 'revalidated')
+                return cached[1]
             raise Exception(f"Failed to download file from R2: {str(e)}")
+
+        if cache is not None:
+            record_cache_lookup('r2', 'miss')
+            cache.put(r2_key, resp.get('ETag') or '', data)
+        return data
+
+    @staticmethod
+    def _is_not_modified(error: ClientError) -> bool:
+        response = getattr(error, 'response', None) or {}
+        status = (response.get('ResponseMetadata') or {}).get('HTTPStatusCode')
+        return status == 304 or (response.get('Error') or {}).get('Code') in ('304', 'NotModified')
+
+    def _invalidate_cached(self, key: str) -> None:
+        cache = get_r2_object_cache()
+        if cache is not None:
+            cache.invalidate(str(key))
     
+    @instrument('r2', 'get_object')
+    def open_file(self, r2_key: str):
+        """Open an object for streaming; returns a file-like body the caller must close.
+
+        Suitable for FileResponse, which reads it in blocks and closes it.
+        """
+        try:
+            resp = self.client.get_object(Bucket=self.bucket_name, Key=r2_key)
+            return resp['Body']
+        except ClientError as e:
+            raise Exception(f"Failed to download file from R2: {str(e)}")
+
+    def iter_file_chunks(self, r2_key: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """Yield an object's bytes in chunks of R2_STREAM_CHUNK_SIZE."""
+        chunk_size = int(chunk_size or getattr(settings, 'R2_STREAM_CHUNK_SIZE', MB) or MB)
+        body = self.open_file(r2_key)
+        try:
+            for chunk in body.iter_chunks(chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            body.close()
+
+    @instrument('r2', 'get_object')
+    def download_fileobj(self, r2_key: str, fileobj: BinaryIO) -> BinaryIO:
+        """Download an object into a writable file-like object (ranged GETs for large objects)."""
+        try:
+            self.client.download_fileobj(self.bucket_name, r2_key, fileobj, Config=_transfer_config())
+            fileobj.seek(0)
+            return fileobj
+        except ClientError as e:
+            raise Exception(f"Failed to download file from R2: {str(e)}")
+
+    @instrument('r2', 'delete_object')
     def delete_file(self, r2_key):
         """
         Delete a file from R2
@@ -315,10 +482,12 @@ class R2StorageService:
                 Bucket=self.bucket_name,
                 Key=r2_key
             )
+            self._invalidate_cached(r2_key)
             return True
         except ClientError as e:
             raise Exception(f"Failed to delete file from R2: {str(e)}")
     
+    @instrument('r2', 'head_object')
     def file_exists(self, r2_key):
         """
         Check if a file exists in R2
@@ -0,0 +1,181 @@
+"""
+Tests for the shared R2 client and streaming object I/O
+"""
+
+import io
+import tempfile
+
+from botocore.response import StreamingBody
+from botocore.stub import ANY, Stubber
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+
+from .r2_cache import R2ObjectCache, reset_r2_object_cache
+from .r2_service import R2StorageService, get_r2_client, reset_r2_client
+
+
+@override_settings(
+    R2_ENDPOINT_URL='https://account.r2.cloudflarestorage.com',
+    R2_ACCESS_KEY_ID='key',
+    R2_SECRET_ACCESS_KEY='secret',
+    R2_BUCKET_NAME='bucket',
+)
+class TestR2StorageService(SimpleTestCase):
+    """Services share one client; objects stream in chunks in both directions"""
+
+    def setUp(self):
+        reset_r2_client()
+        self.addCleanup(reset_r2_client)
+
+    def _stub(self, service):
+        stubber = Stubber(service.client)
+        stubber.activate()
+        self.addCleanup(stubber.deactivate)
+        return stubber
+
+    def test_client_is_shared(self):
+        first, second = R2StorageService(), R2StorageService()
+
+        assert first.client is second.client
+        assert first.client.meta.config.max_pool_connections == 32
+        with override_settings(R2_MAX_POOL_CONNECTIONS=8):
+            assert get_r2_client() is not first.client
+            assert get_r2_client().meta.config.max_pool_connections == 8
+
+    def test_iter_file_chunks(self):
+        service = R2StorageService()
+        data = b'x' * 10
+        body = StreamingBody(io.BytesIO(data), len(data))
+        self._stub(service).add_response(
+            'get_object', {'Body': body, 'ContentLength': len(data)}, {'Bucket': 'bucket', 'Key': 'a.pdf'}
+        )
+
+        chunks = list(service.iter_file_chunks('a.pdf', chunk_size=4))
+
+        assert chunks == [b'xxxx', b'xxxx', b'xx']
+        assert body._raw_stream.closed
+
+    def test_upload_streams_file_object(self):
+        service = R2StorageService()
+        self._stub(service).add_response(
+            'put_object',
+            {'ETag': '"abc"'},
+            {
+                'Bucket': 'bucket', 'Key': ANY, 'Body': ANY, 'ContentType': 'application/pdf',
+                'Metadata': {'tenant_id': 't1', 'original_filename': 'Deal.pdf'},
+            },
+        )
+
+        key = service.upload_file(ContentFile(b'%PDF-1.4', name='Deal.pdf'), 't1', 'Deal.pdf')
+
+        assert key.startswith('t1/contracts/') and key.endswith('.pdf')
+
+
+def _object(data, etag):
+    return {'Body': StreamingBody(io.BytesIO(data), len(data)), 'ContentLength': len(data), 'ETag': etag}
+
+
+@override_settings(
+    R2_ENDPOINT_URL='https://account.r2.cloudflarestorage.com',
+    R2_ACCESS_KEY_ID='key',
+    R2_SECRET_ACCESS_KEY='secret',
+    R2_BUCKET_NAME='bucket',
+    R2_CACHE_ENABLED=True,
+)
+class TestR2ReadThroughCache(SimpleTestCase):
+    """get_file_bytes serves repeat reads locally, revalidating mutable keys by ETag"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(R2_CACHE_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for reset in (reset_r2_client, reset_r2_object_cache):
+            reset()
+            self.addCleanup(reset)
+
+        self.service = R2StorageService()
+        self.stubber = Stubber(self.service.client)
+        self.stubber.activate()
+        self.addCleanup(self.stubber.deactivate)
+
+    def test_mutable_key_revalidates(self):
+        key = 't1/contracts/c1/editor/latest.json'
+        self.stubber.add_response('get_object', _object(b'{"v": 1}', '"e1"'), {'Bucket': 'bucket', 'Key': key})
+        self.stubber.add_client_error(
+            'get_object', service_error_code='304', http_status_code=304,
+            expected_params={'Bucket': 'bucket', 'Key': key, 'IfNoneMatch': '"e1"'},
+        )
+        self.stubber.add_response(
+            'get_object', _object(b'{"v": 2}', '"e2"'), {'Bucket': 'bucket', 'Key': key, 'IfNoneMatch': '"e1"'}
+        )
+
+        assert self.service.get_file_bytes(key) == b'{"v": 1}'
+        assert self.service.get_file_bytes(key) == b'{"v": 1}'
+        assert self.service.get_file_bytes(key) == b'{"v": 2}'
+        self.stubber.assert_no_pending_responses()
+
+    def test_immutable_key_served_locally(self):
+        key = 'contracts/c1/v3.docx'
+        self.stubber.add_response('get_object', _object(b'docx', '"e1"'), {'Bucket': 'bucket', 'Key': key})
+
+        assert self.service.get_file_bytes(key) == b'docx'
+        assert self.service.get_file_bytes(key) == b'docx'
+
+        # A fresh process finds the copy on disk
+        reset_r2_object_cache()
+        assert self.service.get_file_bytes(key) == b'docx'
+
+    def test_write_invalidates(self):
+        key = 'contracts/c1/v1.docx'
+        self.stubber.add_response('get_object', _object(b'old', '"e1"'), {'Bucket': 'bucket', 'Key': key})
+        self.stubber.add_response('put_object', {'ETag': '"e2"'}, None)
+        self.stubber.add_response('get_object', _object(b'new', '"e2"'), {'Bucket': 'bucket', 'Key': key})
+
+        self.service.get_file_bytes(key)
+        self.service.put_bytes(key, b'new')
+
+        assert self.service.get_file_bytes(key) == b'new'
+
+
+class TestR2ObjectCache(SimpleTestCase):
+    """Both tiers evict least recently used objects by byte budget"""
+
+    def test_lru_by_bytes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = R2ObjectCache(directory=directory, max_bytes=25, memory_max_bytes=40)
+            cache.put('a', '"a"', b'a' * 10)
+            cache.put('b', '"b"', b'b' * 10)
+            cache.get('a')
+            cache.put('c', '"c"', b'c' * 10)
+
+            assert cache.stats()['disk_bytes'] == 20
+            assert cache.stats()['memory_bytes'] == 30
+            assert R2ObjectCache(directory=directory).get('b') is None
+            assert R2ObjectCache(directory=directory).get('a') == ('"a"', b'a' * 10)
+
+    def test_budget_is_shared_by_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Two workers on one host, each without a memory tier
+            first, second = (R2ObjectCache(directory=directory, max_bytes=25, memory_max_bytes=0) for _ in range(2))
+            first.put('a', '"a"', b'a' * 10)
+            second.put('b', '"b"', b'b' * 10)
+            first.put('c', '"c"', b'c' * 10)
+
+            assert first.stats()['disk_bytes'] == second.stats()['disk_bytes'] == 20
+            assert second.get('a') is None
+            assert second.get('b') == ('"b"', b'b' * 10)
+
+            # An invalidation in one process removes the copy for all of them
+            first.invalidate('b')
+            assert second.get('b') is None
+
+    @override_settings(R2_CACHE_DIR='')
+    def test_no_directory_keeps_memory_only(self):
+        cache = R2ObjectCache()
+        cache.put('a', '"a"', b'a' * 10)
+
+        assert cache.directory is None
+        assert cache.get('a') == ('"a"', b'a' * 10)
+        assert cache.stats()['disk_entries'] == 0
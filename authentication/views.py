@@ -17,6 +17,7 @@ from django.utils import timezone
 from .models import User
 from .otp_service import OTPService
 from tenants.models import TenantModel
+from clm_backend.metrics import tenant_tier_for
 
 from .openapi_serializers import (
     ForgotPasswordRequestSerializer,
@@ -151,11 +152,13 @@ class TokenView(APIView):
         refresh['tenant_id'] = str(user.tenant_id)
         refresh['is_admin'] = is_admin
         refresh['is_superadmin'] = is_superadmin
+        refresh['tenant_tier'] = tenant_tier_for(user.tenant_id)
         access = refresh.access_token
         access['email'] = user.email
         access['tenant_id'] = str(user.tenant_id)
         access['is_admin'] = is_admin
         access['is_superadmin'] = is_superadmin
+        access['tenant_tier'] = refresh['tenant_tier']
         user.last_login = timezone.now()
         user.save(update_fields=['last_login'])
         
@@ -384,11 +387,13 @@ class VerifyEmailOTPView(APIView):
             refresh['tenant_id'] = str(user.tenant_id)
             refresh['is_admin'] = is_admin
             refresh['is_superadmin'] = is_superadmin
+            refresh['tenant_tier'] = tenant_tier_for(user.tenant_id)
             access = refresh.access_token
             access['email'] = user.email
             access['tenant_id'] = str(user.tenant_id)
             access['is_admin'] = is_admin
             access['is_superadmin'] = is_superadmin
+            access['tenant_tier'] = refresh['tenant_tier']
             user.last_login = timezone.now()
             user.save(update_fields=['last_login'])
             
@@ -521,11 +526,13 @@ class GoogleLoginView(APIView):
         refresh['tenant_id'] = str(user.tenant_id)
         refresh['is_admin'] = is_admin
         refresh['is_superadmin'] = is_superadmin
+        refresh['tenant_tier'] = tenant_tier_for(user.tenant_id)
         access = refresh.access_token
         access['email'] = user.email
         access['tenant_id'] = str(user.tenant_id)
         access['is_admin'] = is_admin
         access['is_superadmin'] = is_superadmin
+        access['tenant_tier'] = refresh['tenant_tier']
 
         user.last_login = timezone.now()
         user.save(update_fields=['last_login'])
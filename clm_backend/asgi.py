@@ -1,5 +1,10 @@
 """
 ASGI config for clm_backend project.
+
+Serve the SSE endpoints (AI generate streams, Firma webhook stream) from here so
+open streams run as coroutines instead of pinning sync workers (see clm_backend/sse.py):
+
+    gunicorn clm_backend.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
@@ -1,10 +1,194 @@
+"""Prometheus scrape endpoint and hot-path instrumentation.
+
+`MetricsMiddleware` records HTTP-level latency. Inside a request, the subsystems that
+dominate latency (Voyage embeddings, search queries, Gemini, R2, PDF generation) are
+timed with `observe()` / `@instrument()`:
+
+    with observe('embeddings', 'voyage_embed', batch_size=len(texts)):
+        response = client.embed(texts, ...)
+
+    @instrument('r2', 'get_object')
+    def get_file_bytes(self, r2_key): ...
+
+Every observation is labelled with the subsystem, the operation and the tenant tier
+(the tenant's subscription plan). The tier comes from the `tenant_tier` JWT claim for
+API requests, or from `tenant_context(tenant_id)` in background code.
+"""
+
 from __future__ import annotations
 
+import functools
 import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Optional
 
 from django.http import HttpRequest, HttpResponse
 
+try:
+    from prometheus_client import Counter, Histogram
+except Exception:  # pragma: no cover
+    Counter = None
+    Histogram = None
+
+
+if Counter is not None and Histogram is not None:
+    OPERATION_LATENCY = Histogram(
+        'clm_operation_duration_seconds',
+        'Duration of instrumented hot-path operations (seconds)',
+        ['subsystem', 'operation', 'tier'],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    )
+    OPERATION_COUNT = Counter(
+        'clm_operations_total',
+        'Instrumented hot-path operations by outcome (ok, error, cancelled)',
+        ['subsystem', 'operation', 'tier', 'outcome'],
+    )
+    OPERATION_BATCH_SIZE = Histogram(
+        'clm_operation_batch_size',
+        'Items per batched operation (e.g. texts per embedding call)',
+        ['subsystem', 'operation', 'tier'],
+        buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+    )
+    CACHE_LOOKUPS = Counter(
+        'clm_cache_lookups_total',
+        'Cache lookups by result (e.g. local_hit, shared_hit, miss)',
+        ['cache', 'result', 'tier'],
+    )
+else:
+    OPERATION_LATENCY = None
+    OPERATION_COUNT = None
+    OPERATION_BATCH_SIZE = None
+    CACHE_LOOKUPS = None
+
+
+UNKNOWN_TIER = 'unknown'
+TENANT_TIER_TTL_SECONDS = 300
+
+_tenant_tier: ContextVar[Optional[str]] = ContextVar('clm_tenant_tier', default=None)
+_tier_by_tenant: dict = {}
+_tier_lock = threading.Lock()
+
+
+def _normalize_tier(tier) -> str:
+    tier = str(tier or '').strip().lower()
+    return tier[:32] or UNKNOWN_TIER
+
+
+def set_tenant_tier(tier):
+    """Set the tier label for the current request/task; returns a token for reset_tenant_tier"""
+    return _tenant_tier.set(_normalize_tier(tier) if tier else None)
+
+
+def reset_tenant_tier(token) -> None:
+    _tenant_tier.reset(token)
+
+
+def current_tenant_tier() -> str:
+    return _tenant_tier.get() or UNKNOWN_TIER
+
+
+def tenant_tier_for(tenant_id) -> str:
+    """Look up a tenant's subscription plan (one query, then cached in-process)"""
+    if not tenant_id:
+        return UNKNOWN_TIER
+    key = str(tenant_id)
+    now = time.monotonic()
+    with _tier_lock:
+        cached = _tier_by_tenant.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+    try:
+        from tenants.models import TenantModel
+
+        plan = TenantModel.objects.filter(id=key).values_list('subscription_plan', flat=True).first()
+    except Exception:
+        plan = None
+
+    tier = _normalize_tier(plan)
+    with _tier_lock:
+        _tier_by_tenant[key] = (tier, now + TENANT_TIER_TTL_SECONDS)
+    return tier
+
+
+@contextmanager
+def tenant_context(tenant_id=None, tier: Optional[str] = None):
+    """Label observations in this block with the tenant's tier (for Celery tasks, scripts)"""
+    token = set_tenant_tier(tier or tenant_tier_for(tenant_id))
+    try:
+        yield
+    finally:
+        reset_tenant_tier(token)
+
+
+class Observation:
+    """Handle yielded by observe(); mark a swallowed failure with ``failed()``"""
+
+    __slots__ = ('batch_size', 'outcome')
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size
+        self.outcome = 'ok'
+
+    def failed(self) -> None:
+        self.outcome = 'error'
+
+
+@contextmanager
+def observe(subsystem: str, operation: str, batch_size: Optional[int] = None, tier: Optional[str] = None):
+    """Time a block and count its outcome; exceptions are recorded and re-raised
+
+    ``tier`` overrides the current tier label, for work that outlives the request
+    context (e.g. a streamed response consumed after MetricsMiddleware has reset it).
+    """
+    observation = Observation(batch_size)
+    started = time.perf_counter()
+    try:
+        yield observation
+    except Exception:
+        observation.outcome = 'error'
+        raise
+    except BaseException:
+        # GeneratorExit from a closed stream, KeyboardInterrupt, ...
+        observation.outcome = 'cancelled'
+        raise
+    finally:
+        if OPERATION_LATENCY is not None:
+            try:
+                tier = _normalize_tier(tier) if tier else current_tenant_tier()
+                OPERATION_LATENCY.labels(subsystem, operation, tier).observe(time.perf_counter() - started)
+                OPERATION_COUNT.labels(subsystem, operation, tier, observation.outcome).inc()
+                if observation.batch_size is not None:
+                    OPERATION_BATCH_SIZE.labels(subsystem, operation, tier).observe(observation.batch_size)
+            except Exception:
+                pass
+
+
+def instrument(subsystem: str, operation: str):
+    """Decorator form of observe()"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with observe(subsystem, operation):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_cache_lookup(cache_name: str, result: str, count: int = 1) -> None:
+    if CACHE_LOOKUPS is None or count <= 0:
+        return
+    try:
+        CACHE_LOOKUPS.labels(cache_name, result, current_tenant_tier()).inc(count)
+    except Exception:
+        pass
+
 
 def _is_authorized(request: HttpRequest) -> bool:
     token = (os.getenv('METRICS_TOKEN') or '').strip()
@@ -2,9 +2,8 @@
 Middleware for tenant isolation and audit logging
 """
 import logging
-import json
-import hashlib
 import uuid
+import re
 import time
 from django.db import connection
 from django.utils.deprecation import MiddlewareMixin
@@ -17,6 +16,10 @@ except Exception:  # pragma: no cover
     Counter = None
     Histogram = None
 
+from audit_logs.audit_logging import RESPONSE_HASH_LIMIT, log_api_request, request_hash, sha256_hex
+from audit_logs.sink import Deferred
+from clm_backend.metrics import reset_tenant_tier, set_tenant_tier
+
 logger = logging.getLogger(__name__)
 audit_logger = logging.getLogger('audit')
 
@@ -75,6 +78,9 @@ class RequestIdMiddleware(MiddlewareMixin):
 class AuditLoggingMiddleware(MiddlewareMixin):
     """
     Middleware to log all API requests for audit trail
+
+    Records go through the buffered audit sink (audit_logs.audit_logging.log_api_request);
+    request/response hashes are passed as Deferreds and computed when the sink flushes.
     """
     
     # Endpoints to exclude from logging (noisy/frequent)
@@ -83,6 +89,10 @@ class AuditLoggingMiddleware(MiddlewareMixin):
         '/static/',
         '/media/',
     ]
+
+    # Request bodies are hashed only for these methods and up to this size
+    BODY_HASH_METHODS = ('POST', 'PUT', 'PATCH')
+    BODY_HASH_MAX_BYTES = 1024 * 1024
     
     def should_log(self, path):
         """Check if this path should be logged"""
@@ -91,40 +101,33 @@ class AuditLoggingMiddleware(MiddlewareMixin):
                 return False
         return True
     
-    def get_request_hash(self, request):
-        """Create hash of request for integrity checking"""
+    def get_request_body(self, request):
+        """Request body to hash later (empty for reads, uploads and large bodies)"""
+        if request.method not in self.BODY_HASH_METHODS:
+            return b''
+        if request.META.get('CONTENT_TYPE', '').startswith('multipart/'):
+            return b''
         try:
-            data = {
-                'method': request.method,
-                'path': request.path,
-                'timestamp': timezone.now().isoformat(),
-            }
-            
-            # Add body for POST/PUT requests
-            if request.method in ['POST', 'PUT', 'PATCH']:
-                try:
-                    body = request.body.decode('utf-8') if request.body else ''
-                    if len(body) < 1000:  # Only hash if small enough
-                        data['body'] = body
-                except:
-                    pass
-            
-            json_str = json.dumps(data, sort_keys=True)
-            return hashlib.sha256(json_str.encode()).hexdigest()
+            if int(request.META.get('CONTENT_LENGTH') or 0) > self.BODY_HASH_MAX_BYTES:
+                return b''
+            return request.body or b''
         except Exception as e:
-            logger.warning(f"Could not generate request hash: {e}")
-            return None
+            logger.warning(f"Could not read request body for audit hash: {e}")
+            return b''
+
+    @staticmethod
+    def get_user_ids(request):
+        """(user_id, tenant_id) of the authenticated user, or (None, None)"""
+        user = getattr(request, 'user', None)
+        if not bool(getattr(user, 'is_authenticated', False)):
+            return None, None
+        user_id = getattr(user, 'user_id', None) or getattr(user, 'id', None) or getattr(user, 'pk', None)
+        return user_id, getattr(user, 'tenant_id', None)
     
     def process_request(self, request):
         """Store request info for later logging"""
         if self.should_log(request.path):
-            user = getattr(request, 'user', None)
-            is_authed = bool(getattr(user, 'is_authenticated', False))
-            user_id = None
-            tenant_id = None
-            if is_authed:
-                user_id = getattr(user, 'user_id', None) or getattr(user, 'id', None) or getattr(user, 'pk', None)
-                tenant_id = getattr(user, 'tenant_id', None)
+            user_id, tenant_id = self.get_user_ids(request)
 
             # Store info on request object for access in process_response
             request._audit_log_data = {
@@ -133,7 +136,8 @@ class AuditLoggingMiddleware(MiddlewareMixin):
                 'remote_addr': self.get_client_ip(request),
                 'user_id': user_id,
                 'tenant_id': tenant_id,
-                'request_hash': self.get_request_hash(request),
+                'body': self.get_request_body(request),
+                'started': time.monotonic(),
                 'timestamp': timezone.now(),
                 'request_id': getattr(request, 'request_id', None),
             }
@@ -148,24 +152,51 @@ class AuditLoggingMiddleware(MiddlewareMixin):
                 
                 # Only log API endpoints
                 if audit_data['path'].startswith('/api/'):
+                    # Token authentication happens in the view; DRF copies the user back
+                    user_id, tenant_id = self.get_user_ids(request)
+                    user_id = user_id or audit_data['user_id']
+                    tenant_id = tenant_id or audit_data['tenant_id']
+
                     # Log to audit logger
                     audit_logger.info(
                         f"API_CALL|method={audit_data['method']}|endpoint={audit_data['path']}|"
-                        f"status={response.status_code}|user_id={audit_data['user_id']}|"
-                        f"tenant_id={audit_data['tenant_id']}|ip={audit_data['remote_addr']}|"
-                        f"request_id={audit_data.get('request_id')}|hash={audit_data['request_hash']}"
+                        f"status={response.status_code}|user_id={user_id}|"
+                        f"tenant_id={tenant_id}|ip={audit_data['remote_addr']}|"
+                        f"request_id={audit_data.get('request_id')}"
                     )
                     
                     # Log errors to warning
                     if response.status_code >= 400:
                         logger.warning(
                             f"API Error: {audit_data['method']} {audit_data['path']} - "
-                            f"Status: {response.status_code} - User: {audit_data['user_id']}"
+                            f"Status: {response.status_code} - User: {user_id}"
                         )
+
+                    self.log_to_sink(audit_data, response, user_id, tenant_id)
             except Exception as e:
                 logger.error(f"Failed to log API call: {str(e)}")
         
         return response
+
+    def log_to_sink(self, audit_data, response, user_id, tenant_id):
+        """Queue the audit record; hashing is deferred to the sink's flush"""
+        body = audit_data['body']
+        record = {
+            'tenant_id': tenant_id,
+            'user_id': user_id,
+            'method': audit_data['method'],
+            'endpoint': audit_data['path'][:500],
+            'status_code': response.status_code,
+            'latency_ms': int((time.monotonic() - audit_data['started']) * 1000),
+            'ip_address': audit_data['remote_addr'],
+            'request_id': audit_data.get('request_id'),
+            'request_hash': Deferred(request_hash, audit_data['method'], audit_data['path'], user_id, body),
+            'request_body_hash': Deferred(sha256_hex, body),
+        }
+        # Streaming responses are not buffered, so they are not hashed
+        if not getattr(response, 'streaming', False):
+            record['response_body_hash'] = Deferred(sha256_hex, response.content, RESPONSE_HASH_LIMIT)
+        log_api_request(record)
     
     @staticmethod
     def get_client_ip(request):
@@ -258,9 +289,18 @@ class MetricsMiddleware(MiddlewareMixin):
 
     def process_request(self, request):
         request._metrics_start_ts = timezone.now()
+        # Authentication sets the tier label for this request; don't inherit the last one
+        request._metrics_tier_token = set_tenant_tier(None)
         return None
 
     def process_response(self, request, response):
+        token = getattr(request, '_metrics_tier_token', None)
+        if token is not None:
+            try:
+                reset_tenant_tier(token)
+            except Exception:
+                pass
+
         if not getattr(request, 'path', '').startswith('/api/'):
             return response
 
@@ -289,27 +329,57 @@ class MetricsMiddleware(MiddlewareMixin):
         return response
 
 
-class SlowQueryLoggingMiddleware(MiddlewareMixin):
-    """Log slow DB queries per-request.
+_SQL_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SQL_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)', re.IGNORECASE)
+_SQL_SPACE_RE = re.compile(r'\s+')
+
+
+def sql_fingerprint(sql: str) -> str:
+    """Normalize a statement so the same query with different literals/params matches.
 
-    Enable by setting `DB_SLOW_QUERY_MS` (e.g. 200).
-    This uses Django's `connection.execute_wrapper` to time individual queries
-    during request handling and logs any query above the threshold.
+    String and numeric literals become `?` and `IN (...)` lists collapse to `IN (?)`.
+    """
+    normalized = _SQL_STRING_RE.sub('?', sql or '')
+    normalized = _SQL_NUMBER_RE.sub('?', normalized)
+    normalized = _SQL_IN_LIST_RE.sub('IN (?)', normalized)
+    return _SQL_SPACE_RE.sub(' ', normalized).strip()
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more queries than its endpoint's DB_QUERY_BUDGETS entry allows"""
+
+
+class SlowQueryLoggingMiddleware(MiddlewareMixin):
+    """Per-request DB query profiler.
+
+    Uses Django's `connection.execute_wrapper` to time every query during request
+    handling. Active when `DB_SLOW_QUERY_MS` is set (e.g. 200) or `DB_QUERY_PROFILER`
+    is on:
+
+    - logs any single query above `DB_SLOW_QUERY_MS`;
+    - fingerprints each statement (literals normalized) and logs fingerprints repeated
+      at least `DB_N_PLUS_ONE_THRESHOLD` times as likely N+1 patterns;
+    - adds `X-DB-Queries` and a `Server-Timing: db;dur=...` entry to the response;
+    - checks the query count against `DB_QUERY_BUDGETS` (keyed by URL view name, e.g.
+      'contract-recent'). Over budget is logged, or raises QueryBudgetExceeded when
+      `DB_QUERY_BUDGET_STRICT` is on (the default under `manage.py test`).
     """
 
     def __init__(self, get_response=None):
         super().__init__(get_response)
-        try:
-            self.threshold_ms = int(getattr(settings, 'DB_SLOW_QUERY_MS', 0) or 0)
-        except Exception:
-            self.threshold_ms = 0
         self._logger = logging.getLogger('clm_backend.slowdb')
 
     def __call__(self, request):
-        if not self.threshold_ms:
+        try:
+            threshold_ms = int(getattr(settings, 'DB_SLOW_QUERY_MS', 0) or 0)
+        except Exception:
+            threshold_ms = 0
+        if not threshold_ms and not getattr(settings, 'DB_QUERY_PROFILER', False):
             return self.get_response(request)
 
-        threshold_ms = self.threshold_ms
+        stats = {'count': 0, 'ms': 0.0}
+        fingerprints = {}
 
         def _wrapper(execute, sql, params, many, context):
             started = time.monotonic()
@@ -317,31 +387,90 @@ class SlowQueryLoggingMiddleware(MiddlewareMixin):
                 return execute(sql, params, many, context)
             finally:
                 elapsed_ms = (time.monotonic() - started) * 1000.0
-                if elapsed_ms < threshold_ms:
-                    return
-
-                # Avoid flooding logs with huge payloads.
-                sql_s = (sql or '').strip().replace('\n', ' ')
-                if len(sql_s) > 2000:
-                    sql_s = sql_s[:2000] + '…'
-
-                params_s = None
+                stats['count'] += 1
+                stats['ms'] += elapsed_ms
                 try:
-                    params_s = repr(params)
-                    if len(params_s) > 1000:
-                        params_s = params_s[:1000] + '…'
+                    fingerprint = sql_fingerprint(sql)
+                    fingerprints[fingerprint] = fingerprints.get(fingerprint, 0) + 1
                 except Exception:
-                    params_s = '<unrepr>'
-
-                self._logger.warning(
-                    'SLOW_DB_QUERY ms=%.1f method=%s path=%s request_id=%s sql=%s params=%s',
-                    elapsed_ms,
-                    getattr(request, 'method', ''),
-                    getattr(request, 'path', ''),
-                    getattr(request, 'request_id', None),
-                    sql_s,
-                    params_s,
-                )
+                    pass
+
+                if threshold_ms and elapsed_ms >= threshold_ms:
+                    self._log_slow_query(request, elapsed_ms, sql, params)
 
         with connection.execute_wrapper(_wrapper):
-            return self.get_response(request)
+            response = self.get_response(request)
+
+        self._report(request, response, stats, fingerprints)
+        return response
+
+    def _log_slow_query(self, request, elapsed_ms, sql, params):
+        # Avoid flooding logs with huge payloads.
+        sql_s = (sql or '').strip().replace('\n', ' ')
+        if len(sql_s) > 2000:
+            sql_s = sql_s[:2000] + '…'
+
+        params_s = None
+        try:
+            params_s = repr(params)
+            if len(params_s) > 1000:
+                params_s = params_s[:1000] + '…'
+        except Exception:
+            params_s = '<unrepr>'
+
+        self._logger.warning(
+            'SLOW_DB_QUERY ms=%.1f method=%s path=%s request_id=%s sql=%s params=%s',
+            elapsed_ms,
+            getattr(request, 'method', ''),
+            getattr(request, 'path', ''),
+            getattr(request, 'request_id', None),
+            sql_s,
+            params_s,
+        )
+
+    @staticmethod
+    def _view_name(request) -> str:
+        match = getattr(request, 'resolver_match', None)
+        return (getattr(match, 'view_name', None) or '') if match else ''
+
+    def _report(self, request, response, stats, fingerprints):
+        count = stats['count']
+        view_name = self._view_name(request)
+
+        try:
+            response.headers['X-DB-Queries'] = str(count)
+            timing = f'db;dur={stats["ms"]:.1f};desc="{count} queries"'
+            existing = response.headers.get('Server-Timing')
+            response.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+        except Exception:
+            pass
+
+        try:
+            repeat_threshold = int(getattr(settings, 'DB_N_PLUS_ONE_THRESHOLD', 5) or 0)
+        except Exception:
+            repeat_threshold = 0
+        if repeat_threshold:
+            for fingerprint, repeats in fingerprints.items():
+                if repeats >= repeat_threshold:
+                    sql_s = fingerprint if len(fingerprint) <= 500 else fingerprint[:500] + '…'
+                    self._logger.warning(
+                        'N_PLUS_ONE_QUERY repeats=%d view=%s path=%s request_id=%s sql=%s',
+                        repeats,
+                        view_name,
+                        getattr(request, 'path', ''),
+                        getattr(request, 'request_id', None),
+                        sql_s,
+                    )
+
+        budgets = getattr(settings, 'DB_QUERY_BUDGETS', None) or {}
+        budget = budgets.get(view_name) if view_name else None
+        if budget is None or count <= int(budget):
+            return
+
+        message = (
+            f'{view_name} ran {count} queries (budget {budget}) '
+            f'for {getattr(request, "method", "")} {getattr(request, "path", "")}'
+        )
+        if getattr(settings, 'DB_QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(message)
+        self._logger.warning('DB_QUERY_BUDGET_EXCEEDED %s', message)
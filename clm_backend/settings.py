@@ -2,6 +2,7 @@ from pathlib import Path
 from datetime import timedelta
 import sys
 import os
+import json
 from urllib.parse import urlparse, parse_qs, unquote
 from dotenv import load_dotenv
 
@@ -136,6 +137,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'clm_backend.wsgi.application'
+ASGI_APPLICATION = 'clm_backend.asgi.application'
 
 # Database configuration (Supabase/PostgreSQL only)
 DATABASE_URL = os.getenv('DATABASE_URL', '').strip()
@@ -411,6 +413,9 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# True under `manage.py test`; a few defaults below differ for the test suite
+_RUNNING_TESTS = any(arg == 'test' for arg in sys.argv)
+
 # Cloudflare R2 settings (used by authentication.r2_service.R2StorageService)
 R2_ACCOUNT_ID = os.getenv('R2_ACCOUNT_ID', '')
 R2_ACCESS_KEY_ID = os.getenv('R2_ACCESS_KEY_ID', '')
@@ -419,6 +424,23 @@ R2_BUCKET_NAME = os.getenv('R2_BUCKET_NAME', '')
 R2_ENDPOINT_URL = os.getenv('R2_ENDPOINT_URL', '')
 R2_CONNECT_TIMEOUT = int(os.getenv('R2_CONNECT_TIMEOUT', '5'))
 R2_READ_TIMEOUT = int(os.getenv('R2_READ_TIMEOUT', '30'))
+# One shared client per process; size the pool for the worker's thread count
+R2_MAX_POOL_CONNECTIONS = int(os.getenv('R2_MAX_POOL_CONNECTIONS', '32'))
+R2_STREAM_CHUNK_SIZE = int(os.getenv('R2_STREAM_CHUNK_SIZE', str(1024 * 1024)))
+# Uploads/downloads above the threshold use multipart / ranged transfers
+R2_MULTIPART_THRESHOLD = int(os.getenv('R2_MULTIPART_THRESHOLD', str(16 * 1024 * 1024)))
+R2_MULTIPART_CHUNKSIZE = int(os.getenv('R2_MULTIPART_CHUNKSIZE', str(8 * 1024 * 1024)))
+R2_MULTIPART_CONCURRENCY = int(os.getenv('R2_MULTIPART_CONCURRENCY', '4'))
+# Read-through cache for get_file_bytes (authentication.r2_cache.R2ObjectCache):
+# memory LRU plus, when R2_CACHE_DIR is set, a disk LRU shared by the workers on
+# a host. Cached copies are revalidated by ETag unless the key matches
+# R2_CACHE_IMMUTABLE_PATTERNS.
+R2_CACHE_ENABLED = os.getenv('R2_CACHE_ENABLED', 'False' if _RUNNING_TESTS else 'True').strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+R2_CACHE_DIR = os.getenv('R2_CACHE_DIR', '')  # Unset keeps the cache in memory only
+R2_CACHE_MAX_BYTES = int(os.getenv('R2_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+R2_CACHE_MEMORY_MAX_BYTES = int(os.getenv('R2_CACHE_MEMORY_MAX_BYTES', str(32 * 1024 * 1024)))
+R2_CACHE_MAX_OBJECT_BYTES = int(os.getenv('R2_CACHE_MAX_OBJECT_BYTES', str(64 * 1024 * 1024)))
+R2_CACHE_IMMUTABLE_PATTERNS = [r'(^|/)contracts/[^/]+/v\d+\.[A-Za-z0-9]+$']
 
 if not R2_ENDPOINT_URL and R2_ACCOUNT_ID:
     R2_ENDPOINT_URL = f"https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com"
@@ -527,6 +549,20 @@ if _csrf_trusted:
 # Use in staging/load-test runs, not as a permanent production default.
 DB_SLOW_QUERY_MS = int(os.getenv('DB_SLOW_QUERY_MS', '0') or '0')
 
+# Per-request query profiler (clm_backend.middleware.SlowQueryLoggingMiddleware): adds
+# X-DB-Queries / Server-Timing headers, logs SQL fingerprints repeated at least
+# DB_N_PLUS_ONE_THRESHOLD times, and checks DB_QUERY_BUDGETS (URL view name -> max
+# queries). Over budget raises under `manage.py test` so regressions fail CI.
+DB_QUERY_PROFILER = os.getenv('DB_QUERY_PROFILER', 'True' if _RUNNING_TESTS else 'False').strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv('DB_N_PLUS_ONE_THRESHOLD', '5') or '0')
+DB_QUERY_BUDGET_STRICT = os.getenv('DB_QUERY_BUDGET_STRICT', 'True' if _RUNNING_TESTS else 'False').strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+DB_QUERY_BUDGETS = {
+    'contract-recent': 2,
+    'contract-statistics': 1,
+    'approval-pending': 2,
+    **json.loads(os.getenv('DB_QUERY_BUDGETS', '{}') or '{}'),
+}
+
 REDIS_URL = (os.getenv('REDIS_URL', '') or os.getenv('CACHE_REDIS_URL', '')).strip()
 if REDIS_URL:
     CACHES = {
@@ -544,6 +580,50 @@ else:
         }
     }
 
+# Firma webhook events for the SSE stream (contracts.firma_events). With a Redis
+# URL, events reach streams held by any worker/pod; without one they stay in-process.
+FIRMA_EVENT_BUS_URL = (os.getenv('FIRMA_EVENT_BUS_URL', '') or REDIS_URL).strip()
+FIRMA_EVENT_HISTORY = int(os.getenv('FIRMA_EVENT_HISTORY', '100'))  # Per contract, for Last-Event-ID replay
+FIRMA_EVENT_SUBSCRIBER_BUFFER = int(os.getenv('FIRMA_EVENT_SUBSCRIBER_BUFFER', '200'))
+
+# Embedding cache (repository.embeddings_service.EmbeddingCacheService)
+# In-process LRU in front of the CACHES backend above; vectors are keyed by
+# (model, input_type, sha256(normalized text)) so identical text is embedded once.
+EMBEDDING_CACHE_ALIAS = os.getenv('EMBEDDING_CACHE_ALIAS', 'default')
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '4096'))
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv('EMBEDDING_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+EMBEDDING_CACHE_TIMEOUT = int(os.getenv('EMBEDDING_CACHE_TIMEOUT', str(30 * 24 * 60 * 60)))
+
+# Repository chunk similarity search: 'pgvector' (HNSW index, default) or 'memory'
+# (per-tenant float32 matrix scored in-process; also the automatic fallback when the
+# pgvector query fails). REPOSITORY_CHUNK_MATRIX_MAX_TENANTS bounds resident matrices.
+REPOSITORY_CHUNK_SEARCH_BACKEND = os.getenv('REPOSITORY_CHUNK_SEARCH_BACKEND', 'pgvector').strip().lower()
+REPOSITORY_CHUNK_MATRIX_MAX_TENANTS = int(os.getenv('REPOSITORY_CHUNK_MATRIX_MAX_TENANTS', '8'))
+
+# Filtered HNSW queries (tenant, status, ...) on pgvector < 0.8 widen the candidate
+# list to this many rows (repository.vector_search); 0.8+ uses iterative scans instead.
+PGVECTOR_FILTERED_EF_SEARCH = int(os.getenv('PGVECTOR_FILTERED_EF_SEARCH', '400'))
+
+# Hybrid search ranking (search.services.HybridSearchService): 'rrf' runs FTS, vector
+# and recency scoring in one SQL statement; 'weighted' is the legacy two-query merge.
+SEARCH_HYBRID_MODE = os.getenv('SEARCH_HYBRID_MODE', 'rrf').strip().lower()
+
+# Contract business rules (contracts.services.CompiledRuleSet) are compiled once per
+# tenant and kept in-process until a BusinessRule/Clause write bumps the version stamp.
+CONTRACT_RULE_CACHE_MAX_TENANTS = int(os.getenv('CONTRACT_RULE_CACHE_MAX_TENANTS', '64'))
+
+# Merge-field templates (contracts.utils.template_renderer) are tokenized once and the
+# compiled form is kept in an in-process LRU keyed by content hash.
+CONTRACT_TEMPLATE_CACHE_MAX_ENTRIES = int(os.getenv('CONTRACT_TEMPLATE_CACHE_MAX_ENTRIES', '256'))
+
+# Dashboard statistics (contracts.services.ContractStatistics) read a per-tenant
+# monthly rollup table instead of aggregating the contracts table when this is on.
+CONTRACT_STATS_ROLLUP = os.getenv('CONTRACT_STATS_ROLLUP', 'False').lower() in ('1', 'true', 'yes')
+
+# Hot read-only contract endpoints cache their responses per tenant (contracts.response_cache);
+# writes invalidate through signals, this bounds staleness otherwise. 0 disables.
+CONTRACT_RESPONSE_CACHE_TIMEOUT = int(os.getenv('CONTRACT_RESPONSE_CACHE_TIMEOUT', '300'))
+
 # Email Configuration - Google SMTP with App Password
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -567,3 +647,61 @@ CELERY_TIMEZONE = 'UTC'
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes max
 CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes soft limit
+
+# Periodic tasks (run `celery -A clm_backend beat` alongside the workers)
+# Overdue approval escalation is opt-in; it stamps approvals pending longer than
+# APPROVAL_ESCALATION_DAYS as escalated (they stay pending and actionable).
+APPROVAL_ESCALATION_ENABLED = os.getenv('APPROVAL_ESCALATION_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+APPROVAL_ESCALATION_DAYS = int(os.getenv('APPROVAL_ESCALATION_DAYS', '3'))
+APPROVAL_ESCALATION_BATCH_SIZE = int(os.getenv('APPROVAL_ESCALATION_BATCH_SIZE', '500'))
+CELERY_BEAT_SCHEDULE = {
+    'maintain-audit-log-partitions': {
+        'task': 'audit_logs.tasks.maintain_audit_log_partitions',
+        'schedule': float(os.getenv('AUDIT_LOG_PARTITION_MAINTENANCE_INTERVAL_SECONDS', str(24 * 60 * 60))),
+    },
+}
+if APPROVAL_ESCALATION_ENABLED:
+    CELERY_BEAT_SCHEDULE['escalate-overdue-approvals'] = {
+        'task': 'workflows.tasks.escalate_overdue_approvals',
+        'schedule': float(os.getenv('APPROVAL_ESCALATION_INTERVAL_SECONDS', str(15 * 60))),
+    }
+if CONTRACT_STATS_ROLLUP:
+    CELERY_BEAT_SCHEDULE['rebuild-contract-statistics'] = {
+        'task': 'contracts.tasks.rebuild_contract_statistics',
+        'schedule': float(os.getenv('CONTRACT_STATS_REBUILD_INTERVAL_SECONDS', str(60 * 60))),
+    }
+
+# Document ingestion runs as a Celery chain (repository.tasks); the upload request
+# only stores the file. Falls back to in-request processing if the broker is down.
+DOCUMENT_INGEST_ASYNC = os.getenv('DOCUMENT_INGEST_ASYNC', 'True').strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+
+# Clause embeddings (contracts.services.ClauseEmbeddingIndex) are refreshed by a
+# Celery task after a clause's text changes; tests embed inline. Run
+# `manage.py backfill_clause_embeddings` once for clauses that predate the column.
+CLAUSE_EMBEDDINGS_ASYNC = (
+    os.getenv('CLAUSE_EMBEDDINGS_ASYNC', 'True').strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+    and not _RUNNING_TESTS
+)
+
+# Audit logs are queued in-process and bulk-inserted by a background thread
+# (audit_logs.sink). Tests run without the flusher thread (it would write through
+# its own connection, outside the test transaction) and flush the sink explicitly,
+# so API requests cost no audit queries there either. When the queue is full the
+# overflow policy ('drop_oldest' or 'drop_newest') decides which record is lost.
+AUDIT_LOG_ASYNC = os.getenv('AUDIT_LOG_ASYNC', 'True').strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+AUDIT_LOG_FLUSHER = not _RUNNING_TESTS
+AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', '500'))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL', '1.0'))
+AUDIT_LOG_QUEUE_MAX = int(os.getenv('AUDIT_LOG_QUEUE_MAX', '10000'))
+AUDIT_LOG_OVERFLOW = os.getenv('AUDIT_LOG_OVERFLOW', 'drop_oldest').strip().lower()
+
+# audit_logs is range-partitioned on created_at (audit_logs.partitions). The daily
+# beat task / `manage.py audit_log_partitions` keeps AUDIT_LOG_PARTITIONS_AHEAD
+# future partitions ready. Dropping old partitions is opt-in: only when
+# AUDIT_LOG_RETENTION_DAYS is set are partitions older than that removed.
+# The interval is 'month' or 'day'; changing it only affects new partitions.
+AUDIT_LOG_PARTITION_INTERVAL = os.getenv('AUDIT_LOG_PARTITION_INTERVAL', 'month').strip().lower()
+AUDIT_LOG_PARTITIONS_AHEAD = int(os.getenv('AUDIT_LOG_PARTITIONS_AHEAD', '3'))
+AUDIT_LOG_RETENTION_DAYS = (
+    int(os.getenv('AUDIT_LOG_RETENTION_DAYS')) if os.getenv('AUDIT_LOG_RETENTION_DAYS', '').strip() else None
+)
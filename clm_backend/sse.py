@@ -0,0 +1,62 @@
+"""
+Server-Sent Events responses backed by async generators
+
+Streaming endpoints write their event stream once, as an async generator. Served
+through clm_backend/asgi.py (e.g. `gunicorn clm_backend.asgi:application -k
+uvicorn.workers.UvicornWorker`), Django iterates it on the event loop: an open
+stream is a suspended coroutine rather than a pinned worker thread, so one process
+holds hundreds of them. When the client disconnects Django cancels the response
+task, which raises CancelledError inside the generator at whatever upstream call it
+is awaiting; generators clean up in ``finally``.
+
+Under WSGI the same generator is driven one event at a time on a private event loop
+(iterate_sync); closing the response closes the generator the same way.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Iterator
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+KEEPALIVE = ': keepalive\n\n'
+
+
+def sse_event(event: str, data: Any, event_id: Any = None) -> str:
+    """One SSE frame; ``data`` is JSON-encoded"""
+    id_line = f"id: {event_id}\n" if event_id is not None else ''
+    return f"{id_line}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def is_asgi(request) -> bool:
+    """True when the (DRF or Django) request is being served by the ASGI handler"""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def iterate_sync(stream: AsyncIterator[str]) -> Iterator[str]:
+    """Drive an async generator from synchronous code on a private event loop"""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(stream.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        try:
+            loop.run_until_complete(stream.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+
+def sse_response(request, stream: AsyncIterator[str]) -> StreamingHttpResponse:
+    """text/event-stream response over ``stream``, async under ASGI and sync under WSGI"""
+    response = StreamingHttpResponse(
+        stream if is_asgi(request) else iterate_sync(stream),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
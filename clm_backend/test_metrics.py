@@ -0,0 +1,91 @@
+"""
+Tests for hot-path Prometheus instrumentation
+"""
+
+import uuid
+
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from authentication.jwt_auth import StatelessJWTAuthentication
+from repository.embeddings_service import EmbeddingCacheService
+from tenants.models import TenantModel
+
+from . import metrics
+from .metrics import instrument, observe, tenant_context, tenant_tier_for
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestObserve(TestCase):
+    """observe()/@instrument record latency, outcome and batch size per tier"""
+
+    def test_outcomes_and_batch_size(self):
+        labels = {'subsystem': 'test', 'operation': 'observe', 'tier': 'enterprise'}
+        count_before = _sample('clm_operation_duration_seconds_count', **labels)
+        errors_before = _sample('clm_operations_total', outcome='error', **labels)
+
+        with tenant_context(tier='Enterprise'):
+            with observe('test', 'observe', batch_size=16):
+                pass
+            with self.assertRaises(ValueError):
+                with observe('test', 'observe'):
+                    raise ValueError('boom')
+            with observe('test', 'observe') as observation:
+                observation.failed()
+
+        assert _sample('clm_operation_duration_seconds_count', **labels) == count_before + 3
+        assert _sample('clm_operations_total', outcome='error', **labels) == errors_before + 2
+        assert _sample('clm_operation_batch_size_sum', **labels) >= 16
+        assert metrics.current_tenant_tier() == metrics.UNKNOWN_TIER
+
+    def test_instrument_decorator(self):
+        @instrument('test', 'decorated')
+        def work(value):
+            return value * 2
+
+        labels = {'subsystem': 'test', 'operation': 'decorated', 'tier': 'unknown', 'outcome': 'ok'}
+        before = _sample('clm_operations_total', **labels)
+
+        assert work(21) == 42
+        assert work.__name__ == 'work'
+        assert _sample('clm_operations_total', **labels) == before + 1
+
+    def test_tenant_tier_lookup_cached(self):
+        tenant = TenantModel.objects.create(
+            name=f't-{uuid.uuid4()}', domain=f'{uuid.uuid4()}.example.com', subscription_plan='Pro'
+        )
+
+        with self.assertNumQueries(1):
+            assert tenant_tier_for(tenant.id) == 'pro'
+            assert tenant_tier_for(tenant.id) == 'pro'
+        assert tenant_tier_for(None) == metrics.UNKNOWN_TIER
+
+    def test_jwt_claim_sets_request_tier(self):
+        token = metrics.set_tenant_tier(None)
+        try:
+            user = StatelessJWTAuthentication().get_user({'user_id': 'u1', 'tenant_tier': 'Business'})
+            assert user.tenant_tier == 'Business'
+            assert metrics.current_tenant_tier() == 'business'
+        finally:
+            metrics.reset_tenant_tier(token)
+
+
+class TestEmbeddingCacheMetrics(TestCase):
+    """Embedding cache lookups are counted by result"""
+
+    def test_hits_and_misses_counted(self):
+        cache = EmbeddingCacheService()
+        key = cache.make_key('voyage-law-2', 'document', f'text {uuid.uuid4()}')
+        cache.set(key, [0.1, 0.2])
+
+        before = {
+            result: _sample('clm_cache_lookups_total', cache='embeddings', result=result, tier='unknown')
+            for result in ('local_hit', 'miss')
+        }
+        cache.get_many([key, f'missing-{uuid.uuid4()}'])
+
+        assert _sample('clm_cache_lookups_total', cache='embeddings', result='local_hit', tier='unknown') == before['local_hit'] + 1
+        assert _sample('clm_cache_lookups_total', cache='embeddings', result='miss', tier='unknown') == before['miss'] + 1
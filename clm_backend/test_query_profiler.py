@@ -0,0 +1,92 @@
+"""
+Tests for the per-request query profiler in SlowQueryLoggingMiddleware
+"""
+
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from contracts.models import Contract
+
+from .middleware import QueryBudgetExceeded, SlowQueryLoggingMiddleware, sql_fingerprint
+
+
+def _run_queries(count):
+    def view(request):
+        with connection.cursor() as cursor:
+            for i in range(count):
+                cursor.execute('SELECT %s', [i])
+        return HttpResponse('ok')
+
+    return view
+
+
+class TestSqlFingerprint(TestCase):
+    """Same statement with different literals shares a fingerprint"""
+
+    def test_literals_and_in_lists_normalized(self):
+        assert sql_fingerprint("SELECT * FROM t WHERE id = 5 AND name = 'O''Brien'") == (
+            'SELECT * FROM t WHERE id = ? AND name = ?'
+        )
+        assert sql_fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)') == sql_fingerprint(
+            'SELECT  *\n FROM t WHERE id IN (%s)'
+        )
+
+
+@override_settings(DB_QUERY_PROFILER=True, DB_N_PLUS_ONE_THRESHOLD=3, DB_QUERY_BUDGET_STRICT=False)
+class TestQueryProfilerMiddleware(TestCase):
+    """Query counting, N+1 detection and headers"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_headers_and_n_plus_one_logged(self):
+        middleware = SlowQueryLoggingMiddleware(_run_queries(4))
+
+        with self.assertLogs('clm_backend.slowdb', level='WARNING') as logs:
+            response = middleware(self.factory.get('/api/v1/things/'))
+
+        assert response['X-DB-Queries'] == '4'
+        assert response['Server-Timing'].startswith('db;dur=')
+        assert any('N_PLUS_ONE_QUERY repeats=4' in line for line in logs.output)
+
+    @override_settings(DB_QUERY_PROFILER=False, DB_SLOW_QUERY_MS=0)
+    def test_disabled_by_default(self):
+        response = SlowQueryLoggingMiddleware(_run_queries(1))(self.factory.get('/'))
+
+        assert not response.has_header('X-DB-Queries')
+
+
+class TestQueryBudgets(TestCase):
+    """Endpoint budgets from DB_QUERY_BUDGETS"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='budget@example.com', password='pass1234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(5):
+            Contract.objects.create(tenant_id=self.user.tenant_id, title=f'C{i}', created_by=self.user.user_id)
+
+    def test_recent_within_budget(self):
+        response = self.client.get('/api/v1/contracts/recent/', {'limit': 5})
+
+        assert response.status_code == 200
+        assert len(response.data) == 5
+        assert int(response['X-DB-Queries']) <= 2
+
+    @override_settings(DB_QUERY_BUDGETS={'contract-recent': 1}, DB_QUERY_BUDGET_STRICT=True)
+    def test_over_budget_fails_in_strict_mode(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/api/v1/contracts/recent/', {'limit': 5, 'nocache': uuid.uuid4().hex})
+
+    @override_settings(DB_QUERY_BUDGETS={'contract-recent': 1}, DB_QUERY_BUDGET_STRICT=False)
+    def test_over_budget_logged_otherwise(self):
+        with self.assertLogs('clm_backend.slowdb', level='WARNING') as logs:
+            response = self.client.get('/api/v1/contracts/recent/', {'limit': 5, 'nocache': uuid.uuid4().hex})
+
+        assert response.status_code == 200
+        assert any('DB_QUERY_BUDGET_EXCEEDED contract-recent' in line for line in logs.output)
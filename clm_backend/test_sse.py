@@ -0,0 +1,45 @@
+"""
+Tests for the async-generator SSE response helpers
+"""
+
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase
+
+from .sse import iterate_sync, sse_event, sse_response
+
+
+class TestSSEResponse(SimpleTestCase):
+    """One async generator serves both ASGI and WSGI"""
+
+    def test_asgi_streams_async_generator(self):
+        async def stream():
+            yield sse_event('ping', {})
+
+        response = sse_response(AsyncRequestFactory().get('/'), stream())
+
+        assert response.is_async
+        assert response['Content-Type'] == 'text/event-stream'
+
+    def test_wsgi_iterates_and_closing_cleans_up(self):
+        cleaned_up = []
+
+        async def stream():
+            try:
+                for i in range(100):
+                    yield sse_event('n', i, event_id=i)
+            finally:
+                cleaned_up.append(True)
+
+        response = sse_response(RequestFactory().get('/'), stream())
+        chunks = iter(response.streaming_content)
+
+        assert not response.is_async
+        assert next(chunks) == b'id: 0\nevent: n\ndata: 0\n\n'
+        response.close()
+        assert cleaned_up == [True]
+
+    def test_iterate_sync_runs_to_completion(self):
+        async def stream():
+            for i in range(3):
+                yield str(i)
+
+        assert list(iterate_sync(stream())) == ['0', '1', '2']
@@ -0,0 +1,10 @@
+"""
+Helpers shared by the apps' test modules
+"""
+
+
+def unit_vector(index: int, dim: int = 1024) -> list:
+    """One-hot embedding: cosine similarity is 1 with itself and 0 with any other index"""
+    vector = [0.0] * dim
+    vector[index] = 1.0
+    return vector
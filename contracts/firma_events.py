@@ -0,0 +1,204 @@
+"""
+Firma signing event bus for the webhook SSE stream
+
+Webhook handlers publish per-contract events; firma_webhook_stream subscribers
+receive them with an id so a reconnecting browser (EventSource sends Last-Event-ID)
+replays what it missed. Two backends share one interface:
+
+- RedisFirmaEventBus (FIRMA_EVENT_BUS_URL, defaulting to REDIS_URL): one Redis
+  stream per contract. XADD caps history at FIRMA_EVENT_HISTORY entries, and each
+  subscriber reads with XREAD BLOCK from its own cursor. Events therefore reach
+  streams held by any worker or pod. Replay and live delivery use the same cursor,
+  so no event is skipped or repeated between them.
+- InMemoryFirmaEventBus (no Redis configured): the same semantics inside one
+  process, for development and tests.
+
+Each subscriber buffers at most FIRMA_EVENT_SUBSCRIBER_BUFFER undelivered events;
+a subscriber that falls further behind loses the oldest ones.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# (event id, payload), or None: once the subscription is registered (before any
+# replay), then whenever nothing arrived within the keepalive interval
+FirmaEvent = Optional[Tuple[str, dict]]
+
+
+def _history_size() -> int:
+    return max(int(getattr(settings, 'FIRMA_EVENT_HISTORY', 100)), 1)
+
+
+def _buffer_size() -> int:
+    return max(int(getattr(settings, 'FIRMA_EVENT_SUBSCRIBER_BUFFER', 200)), 1)
+
+
+class InMemoryFirmaEventBus:
+    """Process-local bus: integer event ids, a capped history and one bounded queue per subscriber"""
+
+    class _Subscriber:
+        def __init__(self, after: int):
+            self.loop = asyncio.get_running_loop()
+            self.queue: asyncio.Queue = asyncio.Queue(maxsize=_buffer_size())
+            self.after = after
+
+        def _put(self, event: Tuple[str, dict]) -> None:
+            if self.queue.full():
+                self.queue.get_nowait()
+            self.queue.put_nowait(event)
+
+        def deliver(self, event: Tuple[str, dict]) -> None:
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sequence: Dict[str, int] = {}
+        self._history: Dict[str, Deque[Tuple[int, dict]]] = {}
+        self._subscribers: Dict[str, Set['InMemoryFirmaEventBus._Subscriber']] = {}
+
+    def publish(self, contract_id: str, payload: dict) -> str:
+        with self._lock:
+            seq = self._sequence.get(contract_id, 0) + 1
+            self._sequence[contract_id] = seq
+            history = self._history.get(contract_id)
+            if history is None:
+                history = self._history[contract_id] = deque(maxlen=_history_size())
+            history.append((seq, payload))
+            subscribers = list(self._subscribers.get(contract_id) or ())
+        for subscriber in subscribers:
+            try:
+                subscriber.deliver((str(seq), payload))
+            except RuntimeError:
+                # The subscriber's event loop is closed; its stream is ending
+                pass
+        return str(seq)
+
+    def subscriber_count(self, contract_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(contract_id) or ())
+
+    async def subscribe(
+        self, contract_id: str, last_event_id: Optional[str], keepalive: float
+    ) -> AsyncIterator[FirmaEvent]:
+        """Events for ``contract_id`` (see FirmaEvent), replaying those after ``last_event_id``"""
+        try:
+            after = int(last_event_id) if last_event_id else None
+        except ValueError:
+            after = None
+
+        with self._lock:
+            history = list(self._history.get(contract_id) or ())
+            latest = self._sequence.get(contract_id, 0)
+            subscriber = self._Subscriber(latest)
+            self._subscribers.setdefault(contract_id, set()).add(subscriber)
+        try:
+            yield None
+            if after is not None:
+                for seq, payload in history[-_buffer_size():]:
+                    if seq > after:
+                        yield str(seq), payload
+            while True:
+                try:
+                    event_id, payload = await asyncio.wait_for(subscriber.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if int(event_id) > subscriber.after:
+                    yield event_id, payload
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(contract_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        self._subscribers.pop(contract_id, None)
+
+
+class RedisFirmaEventBus:
+    """Cross-process bus on one Redis stream per contract"""
+
+    KEY = 'firma:events:{contract_id}'
+    # Streams of finished signings expire once nobody has published for a day
+    TTL_SECONDS = 24 * 60 * 60
+
+    def __init__(self, url: str):
+        import redis
+
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, contract_id: str, payload: dict) -> str:
+        key = self.KEY.format(contract_id=contract_id)
+        pipe = self._client.pipeline()
+        pipe.xadd(key, {'data': json.dumps(payload)}, maxlen=_history_size(), approximate=True)
+        pipe.expire(key, self.TTL_SECONDS)
+        event_id, _ = pipe.execute()
+        return event_id.decode() if isinstance(event_id, bytes) else str(event_id)
+
+    async def subscribe(
+        self, contract_id: str, last_event_id: Optional[str], keepalive: float
+    ) -> AsyncIterator[FirmaEvent]:
+        """Events for ``contract_id`` (see FirmaEvent), replaying those after ``last_event_id``"""
+        import redis.asyncio as aioredis
+
+        key = self.KEY.format(contract_id=contract_id)
+        # Connections belong to the subscriber's event loop; closed when the stream ends
+        client = aioredis.Redis.from_url(self.url)
+        try:
+            cursor = last_event_id
+            if not cursor:
+                latest = await client.xrevrange(key, count=1)
+                cursor = latest[0][0] if latest else '0-0'
+            yield None
+            while True:
+                try:
+                    response = await client.xread({key: cursor}, count=_buffer_size(), block=int(keepalive * 1000))
+                except Exception as e:
+                    if 'Invalid stream ID' not in str(e):
+                        raise
+                    # Last-Event-ID from another backend or garbage: start from now
+                    latest = await client.xrevrange(key, count=1)
+                    cursor = latest[0][0] if latest else '0-0'
+                    continue
+                if not response:
+                    yield None
+                    continue
+                for entry_id, fields in response[0][1]:
+                    cursor = entry_id
+                    event_id = entry_id.decode() if isinstance(entry_id, bytes) else str(entry_id)
+                    try:
+                        payload = json.loads(fields.get(b'data') or fields.get('data') or '{}')
+                    except ValueError:
+                        continue
+                    yield event_id, payload
+        finally:
+            await client.aclose()
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def firma_event_bus():
+    """The process-wide bus: Redis when FIRMA_EVENT_BUS_URL is set, in-memory otherwise"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                url = (getattr(settings, 'FIRMA_EVENT_BUS_URL', '') or '').strip()
+                _bus = RedisFirmaEventBus(url) if url else InMemoryFirmaEventBus()
+    return _bus
+
+
+def reset_firma_event_bus() -> None:
+    global _bus
+    with _bus_lock:
+        _bus = None
@@ -1,4 +1,5 @@
 import logging
+from contextlib import aclosing
 from io import BytesIO
 from datetime import timedelta
 import os
@@ -6,8 +7,6 @@ import hashlib
 import json
 import time
 import uuid
-from queue import Empty, Queue
-from threading import Lock
 
 
 import re
@@ -17,7 +16,7 @@ import textwrap
 from django.core.files.base import ContentFile
 from django.core.mail import send_mail
 from django.db.models import Q
-from django.http import FileResponse, StreamingHttpResponse
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import status
@@ -31,6 +30,8 @@ from contracts.models import Contract, ContractVersion, FirmaSignatureContract,
 from contracts.models import TemplateFile
 from contracts.utils.template_files_db import get_or_import_template_from_filesystem
 from authentication.r2_service import R2StorageService
+from clm_backend.sse import KEEPALIVE, sse_event, sse_response
+from contracts.firma_events import firma_event_bus
 
 from django.conf import settings
 
@@ -1686,15 +1687,12 @@ def firma_get_executed_document(request, contract_id: str):
 
    r2 = R2StorageService()
 
-   # Prefer cached executed copy.
+   # Prefer cached executed copy, streamed straight from R2.
    if record.executed_r2_key:
        try:
-           cached = r2.get_file_bytes(record.executed_r2_key)
-           if cached:
-               pdf_file = BytesIO(cached)
-               pdf_file.seek(0)
-               filename = f"signed_contract_{contract_id}.pdf"
-               return FileResponse(pdf_file, as_attachment=True, filename=filename, content_type='application/pdf')
+           cached = r2.open_file(record.executed_r2_key)
+           filename = f"signed_contract_{contract_id}.pdf"
+           return FileResponse(cached, as_attachment=True, filename=filename, content_type='application/pdf')
        except Exception:
            pass
 
@@ -1727,8 +1725,11 @@ def firma_get_executed_document(request, contract_id: str):
    # Guardrail: if executed bytes match original bytes in real mode, refuse.
    if pdf_bytes and not mock_mode:
        try:
-           original_bytes = r2.get_file_bytes(record.original_r2_key) if record.original_r2_key else b''
-           if original_bytes and original_bytes == pdf_bytes:
+           original_digest = hashlib.sha256()
+           if record.original_r2_key:
+               for chunk in r2.iter_file_chunks(record.original_r2_key):
+                   original_digest.update(chunk)
+           if record.original_r2_key and original_digest.digest() == hashlib.sha256(pdf_bytes).digest():
                return Response(
                    {
                        'error': 'Executed document appears to be unsigned',
@@ -1794,26 +1795,18 @@ def firma_get_certificate_document(request, contract_id: str):
    filename = f"signed_contract_{contract_id}_certificate.pdf"
    return FileResponse(pdf_file, as_attachment=True, filename=filename, content_type='application/pdf')
 
-_FIRMA_STREAM_LOCK = Lock()
-_FIRMA_STREAMS: dict[str, set[Queue]] = {}
+FIRMA_STREAM_KEEPALIVE_SECONDS = 25
+
 
 def _firma_stream_publish(contract_id: str, payload: dict) -> None:
    try:
        cid = str(contract_id)
        if not cid:
            return
-       with _FIRMA_STREAM_LOCK:
-           subscribers = list(_FIRMA_STREAMS.get(cid) or [])
-       if not subscribers:
-           return
-       for q in subscribers:
-           try:
-               q.put_nowait(payload)
-           except Exception:
-               # best-effort
-               pass
-   except Exception:
-       return
+       firma_event_bus().publish(cid, payload)
+   except Exception as e:
+       # best-effort: the UI still polls firma_check_status
+       logger.warning(f"Failed to publish Firma event for contract {contract_id}: {e}")
 
 
 @api_view(['GET'])
@@ -2099,34 +2092,29 @@ def firma_webhook_receive(request):
 def firma_webhook_stream(request, contract_id: str):
    """Server-Sent Events stream for the UI to get near-real-time notifications."""
    cid = str(contract_id)
-   q: Queue = Queue(maxsize=200)
-
-   with _FIRMA_STREAM_LOCK:
-       _FIRMA_STREAMS.setdefault(cid, set()).add(q)
-
-   def gen():
-       try:
-           yield 'event: ready\ndata: {}\n\n'
-           while True:
-               try:
-                   item = q.get(timeout=25)
-                   yield f"event: firma\ndata: {json.dumps(item)}\n\n"
-               except Empty:
-                   yield ': keepalive\n\n'
-       finally:
-           with _FIRMA_STREAM_LOCK:
-               try:
-                   subs = _FIRMA_STREAMS.get(cid)
-                   if subs and q in subs:
-                       subs.remove(q)
-                   if subs is not None and len(subs) == 0:
-                       _FIRMA_STREAMS.pop(cid, None)
-               except Exception:
-                   pass
+   # Events carry webhook payloads and can be replayed, so only the contract's tenant may subscribe
+   try:
+      uuid.UUID(cid)
+   except ValueError:
+      raise Http404
+   get_object_or_404(Contract, id=cid, tenant_id=request.user.tenant_id)
+   # EventSource resends the last id on reconnect; ?last_event_id= covers first connects
+   last_event_id = (request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id') or '').strip() or None
+
+   async def gen():
+       ready = False
+       events = firma_event_bus().subscribe(cid, last_event_id, keepalive=FIRMA_STREAM_KEEPALIVE_SECONDS)
+       async with aclosing(events):
+           async for event in events:
+               if event is None:
+                   # The first tick means the subscription is live
+                   yield KEEPALIVE if ready else 'event: ready\ndata: {}\n\n'
+                   ready = True
+               else:
+                   event_id, payload = event
+                   yield sse_event('firma', payload, event_id=event_id)
 
-   resp = StreamingHttpResponse(gen(), content_type='text/event-stream')
-   resp['Cache-Control'] = 'no-cache'
-   return resp
+   return sse_response(request, gen())
 
 
 @api_view(['POST'])
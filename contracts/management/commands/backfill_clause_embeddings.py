@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from contracts.models import Clause
+from contracts.services import ClauseEmbeddingIndex
+
+
+class Command(BaseCommand):
+    help = "Store embeddings for clauses that have none or whose text changed since they were embedded"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", default=None, help="Tenant UUID (default: all tenants)")
+        parser.add_argument("--batch-size", type=int, default=64, help="Clauses per embedding batch call")
+        parser.add_argument("--force", action="store_true", help="Re-embed every clause (e.g. after switching from mock to Voyage embeddings)")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the clauses that would be embedded")
+
+    def handle(self, *args, **options):
+        tenant_id = None
+        tenant_raw = (options.get("tenant") or "").strip()
+        if tenant_raw:
+            try:
+                tenant_id = uuid.UUID(tenant_raw)
+            except ValueError as e:
+                raise CommandError(f"Invalid --tenant UUID: {tenant_raw} ({e})")
+
+        if options.get("dry_run"):
+            clauses = Clause.objects.only(*ClauseEmbeddingIndex.FIELDS)
+            if tenant_id is not None:
+                clauses = clauses.filter(tenant_id=tenant_id)
+            pending = sum(
+                1 for clause in clauses.iterator(chunk_size=500)
+                if options.get("force") or ClauseEmbeddingIndex.is_stale(clause)
+            )
+            self.stdout.write(f"DRY RUN: {pending} clauses would be embedded")
+            return
+
+        started = time.monotonic()
+        totals = ClauseEmbeddingIndex.backfill(
+            tenant_id=tenant_id,
+            batch_size=max(int(options.get("batch_size") or 64), 1),
+            force=bool(options.get("force")),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Embedded {totals['embedded']} of {totals['scanned']} clauses in {time.monotonic() - started:.1f}s"
+            )
+        )
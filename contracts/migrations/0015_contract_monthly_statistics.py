@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-17 06:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0014_rename_template_fi_tenant__925725_idx_tmpl_tenant_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractMonthlyStatistics',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tenant_id', models.UUIDField(help_text='Tenant ID for RLS')),
+                ('month', models.DateField(help_text='First day of the month contracts were created in')),
+                ('status', models.CharField(help_text='Contract workflow status', max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'contract_monthly_statistics',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='contractmonthlystatistics',
+            constraint=models.UniqueConstraint(fields=('tenant_id', 'month', 'status'), name='ct_monthly_stats_uniq'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-17 07:05
+
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0015_contract_monthly_statistics'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE EXTENSION IF NOT EXISTS vector;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddField(
+            model_name='clause',
+            name='embedding',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=1024, null=True),
+        ),
+        migrations.AddField(
+            model_name='clause',
+            name='embedding_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='clause',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='clause_embedding_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+    ]
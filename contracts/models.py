@@ -2,6 +2,7 @@
 Contract and Workflow models with tenant isolation
 """
 from django.db import models
+from pgvector.django import HnswIndex, VectorField
 import uuid
 
 
@@ -106,6 +107,10 @@ class Clause(models.Model):
     created_by = models.UUIDField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Voyage law-2 embedding of name + content, kept current by contracts.signals
+    # (see ClauseEmbeddingIndex). embedding_hash is the sha256 of the embedded text.
+    embedding = VectorField(dimensions=1024, null=True, blank=True)
+    embedding_hash = models.CharField(max_length=64, blank=True, default='')
     
     class Meta:
         db_table = 'clauses'
@@ -114,6 +119,13 @@ class Clause(models.Model):
         indexes = [
             models.Index(fields=['tenant_id', 'contract_type']),
             models.Index(fields=['clause_id']),
+            HnswIndex(
+                name='clause_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
         ]
     
     def __str__(self):
@@ -192,6 +204,28 @@ class Contract(models.Model):
         return f"{self.title} ({self.status})"
 
 
+class ContractMonthlyStatistics(models.Model):
+    """
+    Per-tenant rollup of contract counts by creation month and status.
+    Maintained by contracts.services.ContractStatistics when CONTRACT_STATS_ROLLUP is on.
+    """
+    id = models.BigAutoField(primary_key=True)
+    tenant_id = models.UUIDField(help_text='Tenant ID for RLS')
+    month = models.DateField(help_text='First day of the month contracts were created in')
+    status = models.CharField(max_length=20, help_text='Contract workflow status')
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'contract_monthly_statistics'
+        constraints = [
+            models.UniqueConstraint(fields=['tenant_id', 'month', 'status'], name='ct_monthly_stats_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.tenant_id} {self.month:%Y-%m} {self.status}: {self.count}"
+
+
 class ContractVersion(models.Model):
     """
     Immutable contract version with document and provenance tracking
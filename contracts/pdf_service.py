@@ -12,6 +12,8 @@ from typing import Optional, Dict, Any
 from jinja2 import Template
 import logging
 
+from clm_backend.metrics import instrument
+
 logger = logging.getLogger(__name__)
 
 # HTML Template for Contract PDF
@@ -375,6 +377,7 @@ class PDFGenerationService:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.template = Template(CONTRACT_PDF_TEMPLATE)
     
+    @instrument('pdf', 'generate_pdf')
     def generate_pdf(
         self,
         template_data: Dict[str, Any],
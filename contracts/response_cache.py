@@ -0,0 +1,127 @@
+"""
+Tenant-scoped response cache for hot read-only contract endpoints
+
+Responses are stored in the Django cache under a key built from the endpoint scope,
+the tenant (and optionally the user), the sorted query params and the tenant's
+version stamp for every data group the endpoint depends on ('contracts', 'clauses',
+'templates'). Writes bump the group's stamp (see contracts/signals.py), so stale
+entries are never read again and simply age out.
+
+Every cached response carries an ETag; a request whose If-None-Match matches gets an
+empty 304. A repeat hit costs two cache round trips and no database queries.
+QuerySet.update()/bulk_create() bypass signals; call invalidate_responses() after
+those, otherwise CONTRACT_RESPONSE_CACHE_TIMEOUT bounds staleness.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import uuid
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_VERSION_KEY = 'contracts:response_version:{tenant_id}:{group}'
+RESPONSE_KEY = 'contracts:response:{scope}:{tenant_id}:{digest}'
+
+
+def invalidate_responses(tenant_id, *groups: str) -> None:
+    """Make the tenant's cached responses that depend on ``groups`` stale"""
+    tenant_key = str(tenant_id)
+    try:
+        cache.set_many(
+            {RESPONSE_VERSION_KEY.format(tenant_id=tenant_key, group=group): uuid.uuid4().hex for group in groups},
+            None,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to bump response cache version for tenant {tenant_key}: {str(e)}")
+
+
+def _versions(tenant_key: str, groups: Iterable[str]) -> list:
+    keys = [RESPONSE_VERSION_KEY.format(tenant_id=tenant_key, group=group) for group in groups]
+    if not keys:
+        return []
+    found = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+    for key, version in missing.items():
+        cache.add(key, version, None)
+    if missing:
+        found.update(cache.get_many(list(missing)))
+    return [found.get(key) for key in keys]
+
+
+def _etag(data) -> str:
+    return '"' + hashlib.sha256(JSONRenderer().render(data)).hexdigest()[:32] + '"'
+
+
+def _etag_matches(request, etag: str) -> bool:
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(',')]
+    return '*' in candidates or any(
+        (value[2:] if value.startswith('W/') else value) == etag for value in candidates
+    )
+
+
+def _respond(request, data, etag: str) -> Response:
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if _etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(data, headers=headers)
+
+
+def cached_response(scope: str, depends_on: Iterable[str] = (), per_user: bool = False, timeout: Optional[int] = None):
+    """Cache a read-only viewset action's 200 responses per tenant and query params
+
+    Place below @action. ``depends_on`` names the data groups whose writes invalidate
+    the response; ``per_user`` adds the requesting user to the key.
+    """
+    depends_on = tuple(depends_on)
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            ttl = timeout if timeout is not None else int(getattr(settings, 'CONTRACT_RESPONSE_CACHE_TIMEOUT', 300))
+            tenant_id = getattr(request.user, 'tenant_id', None)
+            if ttl <= 0 or tenant_id is None:
+                return view_method(self, request, *args, **kwargs)
+
+            tenant_key = str(tenant_id)
+            key = None
+            try:
+                params = sorted((name, request.query_params.getlist(name)) for name in request.query_params)
+                user_key = str(getattr(request.user, 'user_id', '')) if per_user else ''
+                digest = hashlib.sha256(
+                    json.dumps([_versions(tenant_key, depends_on), user_key, params]).encode('utf-8')
+                ).hexdigest()
+                key = RESPONSE_KEY.format(scope=scope, tenant_id=tenant_key, digest=digest)
+                cached = cache.get(key)
+                if cached is not None:
+                    return _respond(request, cached['data'], cached['etag'])
+            except Exception as e:
+                logger.warning(f"Response cache read failed for {scope}: {str(e)}")
+
+            response = view_method(self, request, *args, **kwargs)
+            if key is None or response.status_code != status.HTTP_200_OK:
+                return response
+
+            try:
+                data = json.loads(JSONRenderer().render(response.data))
+                etag = _etag(data)
+                cache.set(key, {'data': data, 'etag': etag}, ttl)
+            except Exception as e:
+                logger.warning(f"Response cache write failed for {scope}: {str(e)}")
+                return response
+            return _respond(request, data, etag)
+
+        return wrapper
+
+    return decorator
@@ -1,11 +1,18 @@
 import uuid
 import hashlib
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from docx import Document
 from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from io import BytesIO
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DateField
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
 import io
 import os
@@ -17,11 +24,14 @@ from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 import logging
 
+from clm_backend.metrics import observe
+
 from .models import (
     Contract, ContractVersion, ContractClause, 
     ContractTemplate, Clause, BusinessRule, WorkflowLog,
-    GenerationJob
+    GenerationJob, ContractMonthlyStatistics
 )
+from .utils.template_renderer import render_template
 
 logger = logging.getLogger(__name__)
 
@@ -31,97 +41,233 @@ SIGNNOW_AUTH_URL = "https://app.signnow.com/oauth2/authorize"
 SIGNNOW_TOKEN_URL = "https://api.signnow.com/oauth2/token"
 
 
+# Operators accepted in rule condition keys: {"<field>__<op>": expected}
+CONDITION_OPERATORS = {
+    'gte': lambda actual, expected: actual >= expected,
+    'lte': lambda actual, expected: actual <= expected,
+    'gt': lambda actual, expected: actual > expected,
+    'lt': lambda actual, expected: actual < expected,
+    'in': lambda actual, expected: actual in expected,
+    'contains': lambda actual, expected: expected in actual,
+}
+
+
+def compile_condition(condition: Optional[Dict]) -> Callable[[Dict], bool]:
+    """
+    Pre-parse a rule condition dict into a predicate over a context dict
+
+    Keys are split into (field, operator) once here instead of on every evaluation.
+    A '<field>__<op>' key fails when the field is missing from the context; an
+    unknown operator only checks that the field is present.
+    """
+    checks = []
+    for key, expected in (condition or {}).items():
+        if '__' in key:
+            field, operator = key.rsplit('__', 1)
+
+            def check(context, field=field, expected=expected, compare=CONDITION_OPERATORS.get(operator)):
+                actual = context.get(field)
+                if actual is None:
+                    return False
+                return compare is None or compare(actual, expected)
+        else:
+            def check(context, field=key, expected=expected):
+                return context.get(field) == expected
+        checks.append(check)
+
+    if not checks:
+        return lambda context: True
+    if len(checks) == 1:
+        return checks[0]
+    return lambda context: all(check(context) for check in checks)
+
+
+class CompiledRule:
+    """An active BusinessRule with its conditions compiled to a predicate"""
+
+    __slots__ = ('name', 'description', 'rule_type', 'action', 'contract_types', 'matches')
+
+    def __init__(self, name: str, description: str, rule_type: str, action: Dict, contract_types, conditions: Dict):
+        self.name = name
+        self.description = description
+        self.rule_type = rule_type
+        self.action = action or {}
+        self.contract_types = frozenset(contract_types or [])
+        self.matches = compile_condition(conditions)
+
+    def applies_to(self, contract_type: str) -> bool:
+        return not self.contract_types or contract_type in self.contract_types
+
+
+class CompiledRuleSet:
+    """In-process, per-tenant rule set: active BusinessRules plus published clause alternatives
+
+    Built with two queries and then reused, so the RuleEngine calls for a whole
+    contract hit the database only when the set is (re)built. Rules are indexed by
+    rule_type and, lazily, by contract_type; clause_suggestion rules by their
+    action's target_clause_id.
+
+    Staleness is tracked with a per-tenant version stamp in the Django cache, bumped
+    by BusinessRule/Clause save/delete signals (see contracts/signals.py), so every
+    worker process notices writes made elsewhere. QuerySet.update() and bulk_create()
+    bypass signals; call invalidate() after those.
+    """
+
+    VERSION_KEY = 'contracts:rule_set_version:{tenant_id}'
+
+    _rule_sets: 'OrderedDict[str, CompiledRuleSet]' = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, tenant_id: str, version: Optional[str], rules: List[CompiledRule], clause_alternatives: Dict[str, List]):
+        self.tenant_id = tenant_id
+        self.version = version
+        # clause_id -> [(trigger predicate or None, alternative dict)]
+        self.clause_alternatives = clause_alternatives
+
+        self.rules_by_type: Dict[str, List[CompiledRule]] = {}
+        self.suggestions_by_target: Dict[Any, List[CompiledRule]] = {}
+        for rule in rules:
+            self.rules_by_type.setdefault(rule.rule_type, []).append(rule)
+            if rule.rule_type == 'clause_suggestion':
+                self.suggestions_by_target.setdefault(rule.action.get('target_clause_id'), []).append(rule)
+        self._by_contract_type: Dict[Tuple[str, str], List[CompiledRule]] = {}
+
+    @classmethod
+    def for_tenant(cls, tenant_id) -> 'CompiledRuleSet':
+        """Get the tenant's rule set, rebuilding it if a rule or clause changed since it was built"""
+        tenant_key = str(tenant_id)
+        version = cls._current_version(tenant_key)
+
+        with cls._lock:
+            current = cls._rule_sets.get(tenant_key)
+            # Without a version stamp (cache down) staleness can't be detected; rebuild
+            if current is not None and version is not None and current.version == version:
+                cls._rule_sets.move_to_end(tenant_key)
+                return current
+
+        built = cls._build(tenant_key, version)
+
+        with cls._lock:
+            cls._rule_sets[tenant_key] = built
+            cls._rule_sets.move_to_end(tenant_key)
+            max_tenants = int(getattr(settings, 'CONTRACT_RULE_CACHE_MAX_TENANTS', 64))
+            while len(cls._rule_sets) > max(max_tenants, 1):
+                cls._rule_sets.popitem(last=False)
+        return built
+
+    @classmethod
+    def invalidate(cls, tenant_id) -> None:
+        """Mark the tenant's rule set stale in every process"""
+        tenant_key = str(tenant_id)
+        try:
+            cache.set(cls.VERSION_KEY.format(tenant_id=tenant_key), uuid.uuid4().hex, None)
+        except Exception as e:
+            logger.warning(f"Failed to bump rule set version for tenant {tenant_key}: {str(e)}")
+        with cls._lock:
+            cls._rule_sets.pop(tenant_key, None)
+
+    @classmethod
+    def _current_version(cls, tenant_key: str) -> Optional[str]:
+        key = cls.VERSION_KEY.format(tenant_id=tenant_key)
+        try:
+            cache.add(key, uuid.uuid4().hex, None)
+            return cache.get(key)
+        except Exception:
+            return None
+
+    @classmethod
+    def _build(cls, tenant_key: str, version: Optional[str]) -> 'CompiledRuleSet':
+        rules = [
+            CompiledRule(
+                name=row['name'],
+                description=row['description'],
+                rule_type=row['rule_type'],
+                action=row['action'],
+                contract_types=row['contract_types'],
+                conditions=row['conditions'],
+            )
+            for row in BusinessRule.objects.filter(
+                tenant_id=tenant_key,
+                is_active=True
+            ).order_by('-priority', '-created_at').values(
+                'name', 'description', 'rule_type', 'action', 'contract_types', 'conditions'
+            )
+        ]
+
+        # Latest published version of each clause wins
+        clause_alternatives = {}
+        for clause_id, alternatives in Clause.objects.filter(
+            tenant_id=tenant_key,
+            status='published'
+        ).order_by('clause_id', 'version').values_list('clause_id', 'alternatives'):
+            clause_alternatives[clause_id] = [
+                (compile_condition(alt['trigger_rules']) if alt.get('trigger_rules') else None, alt)
+                for alt in alternatives or []
+            ]
+
+        logger.debug(f"Built rule set for tenant {tenant_key}: {len(rules)} rules, {len(clause_alternatives)} clauses")
+        return cls(tenant_key, version, rules, clause_alternatives)
+
+    def rules_for(self, rule_type: str, contract_type: str) -> List[CompiledRule]:
+        """Rules of a type that apply to a contract type, highest priority first"""
+        key = (rule_type, contract_type)
+        rules = self._by_contract_type.get(key)
+        if rules is None:
+            rules = [rule for rule in self.rules_by_type.get(rule_type, []) if rule.applies_to(contract_type)]
+            self._by_contract_type[key] = rules
+        return rules
+
+
 class RuleEngine:
     @staticmethod
     def evaluate_condition(condition: Dict, context: Dict) -> bool:
-        for key, expected_value in condition.items():
-            if '__' in key:
-                field, operator = key.rsplit('__', 1)
-                actual_value = context.get(field)
-                
-                if actual_value is None:
-                    return False
-                
-                if operator == 'gte' and not (actual_value >= expected_value):
-                    return False
-                elif operator == 'lte' and not (actual_value <= expected_value):
-                    return False
-                elif operator == 'gt' and not (actual_value > expected_value):
-                    return False
-                elif operator == 'lt' and not (actual_value < expected_value):
-                    return False
-                elif operator == 'in' and actual_value not in expected_value:
-                    return False
-                elif operator == 'contains' and expected_value not in actual_value:
-                    return False
-            else:
-                if context.get(key) != expected_value:
-                    return False
-        
-        return True
-    
+        return compile_condition(condition)(context)
+
     @classmethod
     def get_mandatory_clauses(cls, tenant_id: uuid.UUID, contract_type: str, context: Dict) -> List[Dict]:
-        rules = BusinessRule.objects.filter(
-            tenant_id=tenant_id,
-            rule_type='mandatory_clause',
-            is_active=True
-        ).filter(
-            models.Q(contract_types=[]) | models.Q(contract_types__contains=[contract_type])
-        ).order_by('-priority')
-        
+        rule_set = CompiledRuleSet.for_tenant(tenant_id)
+
         mandatory_clauses = []
-        for rule in rules:
-            if cls.evaluate_condition(rule.conditions, context):
+        for rule in rule_set.rules_for('mandatory_clause', contract_type):
+            if rule.matches(context):
                 mandatory_clauses.append({
                     'clause_id': rule.action.get('clause_id'),
                     'message': rule.action.get('message', ''),
                     'rule_name': rule.name
                 })
-        
+
         return mandatory_clauses
-    
+
     @classmethod
     def get_clause_suggestions(cls, tenant_id: uuid.UUID, contract_type: str, context: Dict, clause_id: str) -> List[Dict]:
-        try:
-            clause = Clause.objects.get(
-                tenant_id=tenant_id,
-                clause_id=clause_id,
-                status='published'
-            )
-        except Clause.DoesNotExist:
+        rule_set = CompiledRuleSet.for_tenant(tenant_id)
+
+        alternatives = rule_set.clause_alternatives.get(clause_id)
+        if alternatives is None:
             return []
-        
+
         suggestions = []
-        
-        for alt in clause.alternatives:
-            trigger_rules = alt.get('trigger_rules', {})
-            if not trigger_rules or cls.evaluate_condition(trigger_rules, context):
+
+        for matches, alt in alternatives:
+            if matches is None or matches(context):
                 suggestions.append({
                     'clause_id': alt['clause_id'],
                     'rationale': alt.get('rationale', 'Alternative clause'),
                     'confidence': alt.get('confidence', 0.8),
                     'source': 'predefined'
                 })
-        
-        rules = BusinessRule.objects.filter(
-            tenant_id=tenant_id,
-            rule_type='clause_suggestion',
-            is_active=True,
-            action__target_clause_id=clause_id
-        ).order_by('-priority')
-        
-        for rule in rules:
-            if cls.evaluate_condition(rule.conditions, context):
+
+        for rule in rule_set.suggestions_by_target.get(clause_id, []):
+            if rule.matches(context):
                 suggestions.append({
                     'clause_id': rule.action.get('suggest_clause_id'),
                     'rationale': rule.action.get('rationale', rule.description),
                     'confidence': rule.action.get('confidence', 0.7),
                     'source': 'rule_based'
                 })
-        
+
         return suggestions
-    
+
     @classmethod
     def validate_contract(cls, tenant_id: uuid.UUID, contract_type: str, context: Dict, selected_clauses: List[str]) -> Tuple[bool, List[str]]:
         """
@@ -129,25 +275,18 @@ class RuleEngine:
         Returns: (is_valid, error_messages)
         """
         errors = []
-        
+
         mandatory = cls.get_mandatory_clauses(tenant_id, contract_type, context)
         for req in mandatory:
             if req['clause_id'] not in selected_clauses:
                 errors.append(f"Mandatory clause missing: {req['clause_id']} - {req['message']}")
-        
-        rules = BusinessRule.objects.filter(
-            tenant_id=tenant_id,
-            rule_type='validation',
-            is_active=True
-        ).filter(
-            models.Q(contract_types=[]) | models.Q(contract_types__contains=[contract_type])
-        )
-        
-        for rule in rules:
-            if cls.evaluate_condition(rule.conditions, context):
+
+        rule_set = CompiledRuleSet.for_tenant(tenant_id)
+        for rule in rule_set.rules_for('validation', contract_type):
+            if rule.matches(context):
                 if rule.action.get('type') == 'error':
                     errors.append(rule.action.get('message', rule.description))
-        
+
         return len(errors) == 0, errors
 
 
@@ -231,7 +370,9 @@ class ContractGenerator:
         if not is_valid:
             raise ValidationError({"clauses": errors})
         
-        doc = self._create_document(contract, selected_clauses, context)
+        # One clause query shared by rendering and provenance
+        clauses = self._fetch_clauses(selected_clauses)
+        doc = self._create_document(contract, selected_clauses, context, clauses=clauses)
         
         doc_bytes = BytesIO()
         doc.save(doc_bytes)
@@ -240,35 +381,49 @@ class ContractGenerator:
         content = doc_bytes.getvalue()
         file_hash = hashlib.sha256(content).hexdigest()
         
-        version_number = contract.current_version
-        version = ContractVersion.objects.create(
-            contract=contract,
-            version_number=version_number,
-            template_id=template.id,
-            template_version=template.version,
-            change_summary=change_summary or f'Version {version_number}',
-            created_by=self.user_id,
-            file_size=len(content),
-            file_hash=file_hash,
-            r2_key=f'contracts/{contract.id}/v{version_number}.docx'
-        )
-        
-        self._store_clause_provenance(version, selected_clauses, context)
-        
-        contract.current_version = version_number + 1
-        contract.save()
-        
-        WorkflowLog.objects.create(
-            contract=contract,
-            action='version_created',
-            performed_by=self.user_id,
-            comment=f'Version {version_number} created',
-            metadata={'clause_count': len(selected_clauses)}
-        )
+        with transaction.atomic():
+            version_number = contract.current_version
+            version = ContractVersion.objects.create(
+                contract=contract,
+                version_number=version_number,
+                template_id=template.id,
+                template_version=template.version,
+                change_summary=change_summary or f'Version {version_number}',
+                created_by=self.user_id,
+                file_size=len(content),
+                file_hash=file_hash,
+                r2_key=f'contracts/{contract.id}/v{version_number}.docx'
+            )
+            
+            self._store_clause_provenance(version, selected_clauses, context, clauses=clauses)
+            
+            contract.current_version = version_number + 1
+            contract.save(update_fields=['current_version', 'updated_at'])
+            
+            WorkflowLog.objects.create(
+                contract=contract,
+                action='version_created',
+                performed_by=self.user_id,
+                comment=f'Version {version_number} created',
+                metadata={'clause_count': len(selected_clauses)}
+            )
         
         return version
     
-    def _create_document(self, contract: Contract, clause_ids: List[str], context: Dict) -> Document:
+    def _fetch_clauses(self, clause_ids: List[str]) -> List[Clause]:
+        return list(Clause.objects.filter(
+            tenant_id=self.tenant_id,
+            clause_id__in=clause_ids,
+            status='published'
+        ).order_by('clause_id'))
+    
+    def _create_document(
+        self,
+        contract: Contract,
+        clause_ids: List[str],
+        context: Dict,
+        clauses: Optional[List[Clause]] = None
+    ) -> Document:
         doc = Document()
         doc.add_heading(contract.title, 0)
         p = doc.add_paragraph()
@@ -283,11 +438,8 @@ class ContractGenerator:
         p.add_run(f"{contract.created_at.strftime('%Y-%m-%d')}\n")
         doc.add_paragraph()  
         
-        clauses = Clause.objects.filter(
-            tenant_id=self.tenant_id,
-            clause_id__in=clause_ids,
-            status='published'
-        ).order_by('clause_id')
+        if clauses is None:
+            clauses = self._fetch_clauses(clause_ids)
         
         for i, clause in enumerate(clauses, 1):
             heading = doc.add_heading(f"{i}. {clause.name}", level=2)
@@ -301,29 +453,21 @@ class ContractGenerator:
         return doc
     
     def _replace_merge_fields(self, text: str, context: Dict) -> str:
-        result = text
-        for key, value in context.items():
-            placeholder = f"{{{{{key}}}}}"
-            if placeholder in result:
-                result = result.replace(placeholder, str(value))
-        return result
+        return render_template(text, context)
     
-    def _store_clause_provenance(self, version: ContractVersion, clause_ids: List[str], context: Dict):
-        clauses = Clause.objects.filter(
-            tenant_id=self.tenant_id,
-            clause_id__in=clause_ids,
-            status='published'
-        ).order_by('clause_id')
-        
-        for position, clause in enumerate(clauses, 1):
-            alternatives = self.rule_engine.get_clause_suggestions(
-                self.tenant_id,
-                version.contract.contract_type,
-                context,
-                clause.clause_id
-            )
-            
-            ContractClause.objects.create(
+    def _store_clause_provenance(
+        self,
+        version: ContractVersion,
+        clause_ids: List[str],
+        context: Dict,
+        clauses: Optional[List[Clause]] = None
+    ):
+        if clauses is None:
+            clauses = self._fetch_clauses(clause_ids)
+        
+        contract_type = version.contract.contract_type
+        ContractClause.objects.bulk_create([
+            ContractClause(
                 contract_version=version,
                 clause_id=clause.clause_id,
                 clause_version=clause.version,
@@ -331,8 +475,271 @@ class ContractGenerator:
                 clause_content=clause.content,
                 is_mandatory=clause.is_mandatory,
                 position=position,
-                alternatives_suggested=alternatives
+                alternatives_suggested=self.rule_engine.get_clause_suggestions(
+                    self.tenant_id,
+                    contract_type,
+                    context,
+                    clause.clause_id
+                )
             )
+            for position, clause in enumerate(clauses, 1)
+        ])
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class ContractStatistics:
+    """Dashboard status counts and monthly approved/rejected trend for a tenant
+
+    Both come from one grouped (month, status) count. By default that is a single
+    TruncMonth aggregate over the tenant's contracts; with CONTRACT_STATS_ROLLUP on
+    it is an indexed read of the tenant's ContractMonthlyStatistics rows instead,
+    which Contract save/delete signals refresh per month (see contracts/signals.py)
+    and the rebuild_contract_statistics task recomputes periodically to pick up
+    QuerySet.update()/bulk_create() writes.
+    """
+
+    STATUSES = [choice for choice, _ in Contract.STATUS_CHOICES]
+    TREND_STATUSES = ('approved', 'rejected')
+
+    @staticmethod
+    def rollup_enabled() -> bool:
+        return bool(getattr(settings, 'CONTRACT_STATS_ROLLUP', False))
+
+    @staticmethod
+    def _month_counts(queryset, *fields):
+        return queryset.annotate(
+            month=TruncMonth('created_at', output_field=DateField())
+        ).values(*fields, 'month', 'status').annotate(count=Count('id')).order_by()
+
+    @staticmethod
+    def _month_bounds(month: date) -> Tuple[datetime, datetime]:
+        tz = timezone.get_current_timezone()
+        next_month = _add_months(month, 1)
+        return (
+            timezone.make_aware(datetime(month.year, month.month, 1), tz),
+            timezone.make_aware(datetime(next_month.year, next_month.month, 1), tz),
+        )
+
+    @classmethod
+    def for_tenant(cls, tenant_id, months: int = 6) -> Dict[str, Any]:
+        if cls.rollup_enabled():
+            rows = ContractMonthlyStatistics.objects.filter(tenant_id=tenant_id).values('month', 'status', 'count')
+        else:
+            rows = cls._month_counts(Contract.objects.filter(tenant_id=tenant_id))
+
+        stats = {'total': 0, **{status: 0 for status in cls.STATUSES}}
+        current_month = timezone.localdate().replace(day=1)
+        trend = {
+            _add_months(current_month, -offset): {status: 0 for status in cls.TREND_STATUSES}
+            for offset in range(months - 1, -1, -1)
+        }
+        for row in rows:
+            stats['total'] += row['count']
+            if row['status'] in stats:
+                stats[row['status']] += row['count']
+            month_counts = trend.get(row['month'])
+            if month_counts is not None and row['status'] in month_counts:
+                month_counts[row['status']] += row['count']
+
+        stats['monthly_trends'] = [
+            {'month': month.strftime('%b'), **counts} for month, counts in trend.items()
+        ]
+        return stats
+
+    @classmethod
+    def refresh_month(cls, tenant_id, created_at: datetime) -> None:
+        """Recompute the tenant's rollup rows for the month ``created_at`` falls in"""
+        month = timezone.localtime(created_at).date().replace(day=1)
+        start, end = cls._month_bounds(month)
+        counts = {
+            row['status']: row['count']
+            for row in cls._month_counts(
+                Contract.objects.filter(tenant_id=tenant_id, created_at__gte=start, created_at__lt=end)
+            )
+        }
+        with transaction.atomic():
+            ContractMonthlyStatistics.objects.filter(tenant_id=tenant_id, month=month).exclude(
+                status__in=list(counts)
+            ).delete()
+            if counts:
+                ContractMonthlyStatistics.objects.bulk_create(
+                    [
+                        ContractMonthlyStatistics(tenant_id=tenant_id, month=month, status=status, count=count)
+                        for status, count in counts.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['tenant_id', 'month', 'status'],
+                    update_fields=['count', 'updated_at'],
+                )
+
+    @classmethod
+    def rebuild(cls, tenant_id=None) -> int:
+        """Recompute the rollup from the contracts table, for one tenant or all of them"""
+        contracts = Contract.objects.all()
+        rollups = ContractMonthlyStatistics.objects.all()
+        if tenant_id is not None:
+            contracts = contracts.filter(tenant_id=tenant_id)
+            rollups = rollups.filter(tenant_id=tenant_id)
+
+        rows = [
+            ContractMonthlyStatistics(
+                tenant_id=row['tenant_id'], month=row['month'], status=row['status'], count=row['count']
+            )
+            for row in cls._month_counts(contracts, 'tenant_id')
+        ]
+        with transaction.atomic():
+            rollups.delete()
+            ContractMonthlyStatistics.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
+class ClauseEmbeddingIndex:
+    """Persisted Voyage embeddings of the clause library and top-k retrieval over them
+
+    Each Clause stores the embedding of its name + content together with the sha256
+    of that text, so a save only re-embeds when the text changed (contracts/signals.py;
+    off the request via the embed_clauses task when CLAUSE_EMBEDDINGS_ASYNC is on).
+    `manage.py backfill_clause_embeddings` fills in existing rows. Retrieval is one
+    query embedding plus one ORDER BY cosine distance served by the HNSW index.
+    """
+
+    MAX_TEXT_CHARS = 8000
+    FIELDS = ('id', 'name', 'content', 'embedding_hash')
+
+    @classmethod
+    def text_for(cls, clause) -> str:
+        return f"{clause.name}\n\n{clause.content}"[:cls.MAX_TEXT_CHARS]
+
+    @classmethod
+    def text_hash(cls, clause) -> str:
+        return hashlib.sha256(cls.text_for(clause).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def is_stale(cls, clause) -> bool:
+        return clause.embedding_hash != cls.text_hash(clause)
+
+    @classmethod
+    def embed(cls, clauses, force: bool = False) -> int:
+        """Embed the stale clauses among ``clauses`` in one batch call; returns how many were stored"""
+        from repository.embeddings_service import VoyageEmbeddingsService
+
+        pending = [clause for clause in clauses if force or cls.is_stale(clause)]
+        if not pending:
+            return 0
+
+        embeddings = VoyageEmbeddingsService().embed_batch([cls.text_for(clause) for clause in pending])
+        updated = []
+        for clause, embedding in zip(pending, embeddings):
+            if not embedding:
+                continue
+            clause.embedding = embedding
+            clause.embedding_hash = cls.text_hash(clause)
+            updated.append(clause)
+        # bulk_update: no save signals, and updated_at is left alone
+        Clause.objects.bulk_update(updated, ['embedding', 'embedding_hash'])
+        return len(updated)
+
+    @classmethod
+    def refresh(cls, clause_ids) -> int:
+        """Re-embed the given clauses if their text changed since they were last embedded"""
+        return cls.embed(Clause.objects.filter(id__in=list(clause_ids)).only(*cls.FIELDS))
+
+    @classmethod
+    def schedule(cls, clause_ids) -> None:
+        """Refresh on a Celery worker when CLAUSE_EMBEDDINGS_ASYNC, inline otherwise
+
+        Clauses are saved on request paths, so a broker outage does not fall back to
+        embedding inline; the clauses stay stale until backfill_clause_embeddings.
+        """
+        clause_ids = [str(clause_id) for clause_id in clause_ids]
+        if getattr(settings, 'CLAUSE_EMBEDDINGS_ASYNC', True):
+            try:
+                from contracts.tasks import embed_clauses
+
+                embed_clauses.delay(clause_ids)
+            except Exception as e:
+                logger.warning(f"Could not queue embedding of {len(clause_ids)} clauses: {str(e)}")
+            return
+        try:
+            cls.refresh(clause_ids)
+        except Exception as e:
+            logger.warning(f"Clause embedding failed for {clause_ids}: {str(e)}")
+
+    @classmethod
+    def schedule_on_commit(cls, clause_id, using: str = 'default') -> None:
+        """Queue ``clause_id`` for one schedule() call covering every clause saved in the transaction"""
+        connection = transaction.get_connection(using)
+        batch = getattr(connection, '_clause_embedding_batch', None)
+        # A batch whose callback ran, or was dropped by a rollback, takes no more ids
+        if batch is not None and not batch.done and any(entry[1] is batch for entry in connection.run_on_commit):
+            batch.clause_ids.append(clause_id)
+            return
+        batch = _ClauseEmbeddingBatch(cls, clause_id)
+        connection._clause_embedding_batch = batch
+        transaction.on_commit(batch, using=using)
+
+    @classmethod
+    def backfill(cls, tenant_id=None, batch_size: int = 64, force: bool = False) -> Dict[str, int]:
+        """Embed every clause (of one tenant, or all) that is missing or stale"""
+        clauses = Clause.objects.only(*cls.FIELDS).order_by('id')
+        if tenant_id is not None:
+            clauses = clauses.filter(tenant_id=tenant_id)
+
+        totals = {'scanned': 0, 'embedded': 0}
+        batch = []
+        for clause in clauses.iterator(chunk_size=max(batch_size, 1) * 4):
+            totals['scanned'] += 1
+            if force or cls.is_stale(clause):
+                batch.append(clause)
+            if len(batch) >= batch_size:
+                totals['embedded'] += cls.embed(batch, force=force)
+                batch = []
+        if batch:
+            totals['embedded'] += cls.embed(batch, force=force)
+        return totals
+
+    @classmethod
+    def top_k(cls, tenant_id, query_embedding, k: int = 5, contract_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The tenant's k published clauses nearest to ``query_embedding``, in one indexed query
+
+        The HNSW index spans every tenant's library; repository.vector_search.nearest
+        keeps a small tenant from losing results to the post-scan filters.
+        """
+        from repository.vector_search import nearest
+
+        clauses = Clause.objects.filter(tenant_id=tenant_id, status='published', embedding__isnull=False)
+        if contract_type:
+            clauses = clauses.filter(contract_type=contract_type)
+        clauses = nearest(clauses.only('id', 'clause_id', 'name', 'content'), 'embedding', query_embedding, k)
+        return [
+            {
+                'clause_id': clause.clause_id,
+                'name': clause.name,
+                'similarity': round(1.0 - float(clause.distance), 4),
+                'content': clause.content,
+            }
+            for clause in clauses
+        ]
+
+    @classmethod
+    def relevant(cls, tenant_id, prompt: str, contract_type: Optional[str] = None, k: int = 5) -> List[Dict[str, Any]]:
+        """Clauses most relevant to an editor prompt; [] if the prompt cannot be embedded"""
+        from repository.embeddings_service import VoyageEmbeddingsService
+
+        try:
+            service = VoyageEmbeddingsService()
+            query_embedding = service.embed_query(prompt) or service.embed_text(prompt)
+            if not query_embedding:
+                return []
+            with observe('clauses', 'pgvector_query'):
+                return cls.top_k(tenant_id, query_embedding, k=k, contract_type=contract_type)
+        except Exception as e:
+            logger.warning(f"Clause retrieval failed for tenant {tenant_id}: {str(e)}")
+            return []
 
 
 from rest_framework.exceptions import ValidationError
@@ -342,6 +749,20 @@ from django.db import models
 
 # ========== GENERATION SERVICE ==========
 
+
+class _ClauseEmbeddingBatch:
+    """on_commit callback collecting the clauses saved in one transaction"""
+
+    def __init__(self, index, clause_id):
+        self.index = index
+        self.clause_ids = [clause_id]
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        self.index.schedule(list(dict.fromkeys(self.clause_ids)))
+
+
 class ContractGenerationService:
     """
     Service for generating contracts from templates and clauses
@@ -0,0 +1,68 @@
+"""
+Contracts signal handlers
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from contracts.models import BusinessRule, Clause, Contract, ContractEditingTemplate, ContractTemplate
+from contracts.response_cache import invalidate_responses
+from contracts.services import ClauseEmbeddingIndex, CompiledRuleSet, ContractStatistics
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=BusinessRule)
+@receiver(post_delete, sender=BusinessRule)
+@receiver(post_save, sender=Clause)
+@receiver(post_delete, sender=Clause)
+def invalidate_compiled_rule_set(sender, instance, **kwargs):
+    """Any rule or clause write makes the tenant's compiled rule set stale"""
+    CompiledRuleSet.invalidate(instance.tenant_id)
+
+
+@receiver(post_save, sender=Contract)
+@receiver(post_delete, sender=Contract)
+def invalidate_contract_responses(sender, instance, **kwargs):
+    """Cached dashboard responses built from the tenant's contracts are stale"""
+    invalidate_responses(instance.tenant_id, 'contracts')
+
+
+@receiver(post_save, sender=ContractTemplate)
+@receiver(post_delete, sender=ContractTemplate)
+@receiver(post_save, sender=ContractEditingTemplate)
+@receiver(post_delete, sender=ContractEditingTemplate)
+def invalidate_template_responses(sender, instance, **kwargs):
+    """Cached template listings for the tenant are stale"""
+    invalidate_responses(instance.tenant_id, 'templates')
+
+
+@receiver(post_save, sender=Contract)
+@receiver(post_delete, sender=Contract)
+def refresh_contract_statistics(sender, instance, **kwargs):
+    """Refresh the statistics rollup for the contract's tenant and creation month"""
+    if not ContractStatistics.rollup_enabled() or instance.created_at is None:
+        return
+
+    tenant_id, created_at = instance.tenant_id, instance.created_at
+
+    def refresh():
+        try:
+            ContractStatistics.refresh_month(tenant_id, created_at)
+        except Exception as e:
+            logger.warning(f"Contract statistics rollup refresh failed for tenant {tenant_id}: {e}")
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Clause)
+def refresh_clause_embedding(sender, instance, **kwargs):
+    """Re-embed the clause after commit when its name or content changed
+
+    Clauses saved in one transaction (e.g. library seeding) share one batched task.
+    """
+    if not ClauseEmbeddingIndex.is_stale(instance):
+        return
+    ClauseEmbeddingIndex.schedule_on_commit(instance.pk, using=kwargs.get('using') or 'default')
@@ -0,0 +1,31 @@
+"""
+Celery tasks for contracts
+
+rebuild_contract_statistics runs on the beat schedule when CONTRACT_STATS_ROLLUP is
+on and recomputes the per-tenant monthly statistics rollup from the contracts table.
+embed_clauses stores the embeddings of clauses whose text changed (queued by the
+Clause post_save signal).
+"""
+import logging
+
+from celery import shared_task
+
+from contracts.services import ClauseEmbeddingIndex, ContractStatistics
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def rebuild_contract_statistics(tenant_id=None):
+    """Recompute ContractMonthlyStatistics for one tenant, or all tenants"""
+    rows = ContractStatistics.rebuild(tenant_id)
+    logger.info(f"Rebuilt contract statistics rollup: {rows} rows")
+    return rows
+
+
+@shared_task(ignore_result=True)
+def embed_clauses(clause_ids):
+    """Embed the given clauses if their name/content changed since their last embedding"""
+    embedded = ClauseEmbeddingIndex.refresh(clause_ids)
+    logger.info(f"Embedded {embedded} of {len(clause_ids)} clauses")
+    return embedded
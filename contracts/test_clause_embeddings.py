@@ -0,0 +1,169 @@
+"""
+Tests for persisted clause embeddings and indexed clause retrieval
+"""
+
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from clm_backend.testing import unit_vector
+from repository.embeddings_service import VoyageEmbeddingsService
+
+from .clause_seed import ensure_tenant_clause_library_seeded
+from .models import Clause
+from .services import ClauseEmbeddingIndex
+
+
+def _embed_by_name(texts):
+    # Clause "c<n>" embeds to the n-th unit vector
+    return [unit_vector(int(text.split('\n', 1)[0][1:])) for text in texts]
+
+
+class TestClauseEmbeddingIndex(TestCase):
+    """Embeddings follow clause text; retrieval is one top-k query over the library"""
+
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        patcher = mock.patch.object(VoyageEmbeddingsService, 'embed_batch', side_effect=_embed_by_name)
+        self.embed_batch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _clause(self, n, tenant_id=None, **fields):
+        data = {
+            'tenant_id': tenant_id or self.tenant_id, 'clause_id': f'CL-{n}', 'name': f'c{n}',
+            'contract_type': 'NDA', 'content': f'Clause text {n}', 'created_by': uuid.uuid4(),
+        }
+        data.update(fields)
+        return Clause.objects.create(**data)
+
+    def test_save_embeds_only_when_text_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            clause = self._clause(3)
+        clause.refresh_from_db()
+        assert list(clause.embedding) == unit_vector(3)
+        assert clause.embedding_hash == ClauseEmbeddingIndex.text_hash(clause)
+        assert self.embed_batch.call_count == 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clause.is_mandatory = True
+            clause.save()
+        assert self.embed_batch.call_count == 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clause.content = 'Rewritten'
+            clause.save()
+        assert self.embed_batch.call_count == 2
+
+    def test_clauses_saved_in_one_transaction_share_one_task(self):
+        with mock.patch.object(ClauseEmbeddingIndex, 'schedule') as schedule:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                ensure_tenant_clause_library_seeded(tenant_id=self.tenant_id, user_id=uuid.uuid4(), contract_type='NDA')
+
+        seeded = set(Clause.objects.filter(tenant_id=self.tenant_id).values_list('id', flat=True))
+        assert len(seeded) > 1
+        assert len(callbacks) == 1
+        schedule.assert_called_once()
+        assert set(schedule.call_args.args[0]) == seeded
+
+    @override_settings(CLAUSE_EMBEDDINGS_ASYNC=True)
+    def test_broker_outage_does_not_embed_inline(self):
+        with mock.patch('contracts.tasks.embed_clauses.delay', side_effect=ConnectionError('broker down')), \
+                self.captureOnCommitCallbacks(execute=True):
+            clause = self._clause(1)
+
+        clause.refresh_from_db()
+        assert clause.embedding is None
+        assert not self.embed_batch.called
+
+    def test_top_k_covers_whole_library_in_one_query(self):
+        Clause.objects.bulk_create(
+            [
+                Clause(
+                    tenant_id=self.tenant_id, clause_id=f'CL-{n}', name=f'c{n}', contract_type='NDA',
+                    content='text', created_by=uuid.uuid4(), status='draft' if n == 7 else 'published',
+                )
+                for n in range(1, 60)
+            ]
+        )
+        ClauseEmbeddingIndex.backfill(self.tenant_id)
+        other_tenant = self._clause(0, tenant_id=uuid.uuid4())
+        ClauseEmbeddingIndex.refresh([other_tenant.pk])
+
+        ClauseEmbeddingIndex.top_k(self.tenant_id, unit_vector(1), k=3)  # pgvector version lookup, once per connection
+        with self.assertNumQueries(4):  # savepoint, SET LOCAL, SELECT, release
+            results = ClauseEmbeddingIndex.top_k(self.tenant_id, unit_vector(1), k=3)
+
+        assert len(results) == 3
+        assert results[0]['clause_id'] == 'CL-1' and results[0]['similarity'] == 1.0
+        assert ClauseEmbeddingIndex.top_k(self.tenant_id, unit_vector(7), k=1)[0]['clause_id'] != 'CL-7'
+        assert 'CL-0' not in [r['clause_id'] for r in ClauseEmbeddingIndex.top_k(self.tenant_id, unit_vector(0), k=60)]
+        assert ClauseEmbeddingIndex.top_k(self.tenant_id, unit_vector(1), k=5, contract_type='MSA') == []
+
+    def test_top_k_for_small_tenant_among_large_foreign_library(self):
+        # Hundreds of foreign clauses sit right next to the query vector, so an index
+        # scan limited to ef_search candidates sees nothing but foreign rows
+        foreign_tenant = uuid.uuid4()
+        foreign = []
+        for n in range(600):
+            embedding = unit_vector(1)
+            embedding[4 + n] = 0.05
+            foreign.append(
+                Clause(
+                    tenant_id=foreign_tenant, clause_id=f'F-{n}', name=f'f{n}', contract_type='NDA',
+                    content='text', created_by=uuid.uuid4(), status='published', embedding=embedding,
+                )
+            )
+        Clause.objects.bulk_create(foreign)
+        for n in (2, 3):
+            embedding = unit_vector(n)
+            embedding[1] = 0.5
+            self._clause(n, embedding=embedding, embedding_hash='seeded', status='published')
+        with connection.cursor() as cursor:
+            # Plan and size the scan as on a full-size table: HNSW index, small candidate list
+            cursor.execute('SET enable_sort = off')
+            cursor.execute('SET hnsw.ef_search = 10')
+        self.addCleanup(self._reset_planner)
+
+        results = ClauseEmbeddingIndex.top_k(self.tenant_id, unit_vector(1), k=3)
+
+        assert [r['clause_id'] for r in results] in (['CL-2', 'CL-3'], ['CL-3', 'CL-2'])
+        assert results[0]['similarity'] == results[1]['similarity'] > 0.4
+
+    @staticmethod
+    def _reset_planner():
+        with connection.cursor() as cursor:
+            cursor.execute('RESET enable_sort')
+            cursor.execute('RESET hnsw.ef_search')
+
+    def test_relevant_embeds_prompt_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._clause(1)
+            self._clause(2)
+
+        with mock.patch.object(VoyageEmbeddingsService, 'embed_query', return_value=unit_vector(2)) as embed_query:
+            results = ClauseEmbeddingIndex.relevant(self.tenant_id, 'add a confidentiality clause', contract_type='NDA')
+
+        embed_query.assert_called_once()
+        assert results[0] == {'clause_id': 'CL-2', 'name': 'c2', 'similarity': 1.0, 'content': 'Clause text 2'}
+
+    def test_backfill_command(self):
+        Clause.objects.bulk_create(
+            [
+                Clause(tenant_id=self.tenant_id, clause_id=f'CL-{n}', name=f'c{n}', contract_type='NDA',
+                       content='text', created_by=uuid.uuid4())
+                for n in range(1, 4)
+            ]
+        )
+        out = StringIO()
+
+        call_command('backfill_clause_embeddings', '--tenant', str(self.tenant_id), '--batch-size', '2', stdout=out)
+        call_command('backfill_clause_embeddings', stdout=out)
+
+        assert 'Embedded 3 of 3 clauses' in out.getvalue()
+        assert 'Embedded 0 of 3 clauses' in out.getvalue()
+        assert not Clause.objects.filter(tenant_id=self.tenant_id, embedding__isnull=True).exists()
+        assert self.embed_batch.call_count == 2
@@ -0,0 +1,80 @@
+"""
+Tests for ContractGenerator version creation
+"""
+
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import Clause, Contract, ContractClause, ContractTemplate, WorkflowLog
+from .services import ContractGenerator, CompiledRuleSet
+
+
+class TestCreateVersion(TestCase):
+    """Clauses fetched once, provenance bulk-inserted in one transaction"""
+
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        self.user_id = uuid.uuid4()
+        self.template = ContractTemplate.objects.create(
+            tenant_id=self.tenant_id,
+            name='MSA',
+            contract_type='MSA',
+            status='published',
+            r2_key='templates/msa.docx',
+            created_by=self.user_id,
+        )
+        self.generator = ContractGenerator(self.user_id, self.tenant_id)
+
+    def _contract(self):
+        return Contract.objects.create(
+            tenant_id=self.tenant_id,
+            template=self.template,
+            title='Acme MSA',
+            contract_type='MSA',
+            counterparty='Acme',
+            form_inputs={'party': 'Acme'},
+            created_by=self.user_id,
+            current_version=1,
+        )
+
+    def _clauses(self, count):
+        ids = []
+        for i in range(count):
+            clause_id = f'C-{count}-{i:03d}'
+            Clause.objects.create(
+                tenant_id=self.tenant_id,
+                clause_id=clause_id,
+                name=f'Clause {i}',
+                contract_type='MSA',
+                content='Between {{party}} and us.',
+                alternatives=[{'clause_id': f'{clause_id}-ALT'}],
+                created_by=self.user_id,
+            )
+            ids.append(clause_id)
+        return ids
+
+    def _queries_for_version(self, clause_count):
+        clause_ids = self._clauses(clause_count)
+        contract = self._contract()
+        CompiledRuleSet.for_tenant(self.tenant_id)
+        with CaptureQueriesContext(connection) as ctx:
+            version = self.generator.create_version(contract, selected_clauses=clause_ids)
+        return version, len(ctx.captured_queries)
+
+    def test_provenance_rows_written(self):
+        version, _ = self._queries_for_version(3)
+
+        rows = list(ContractClause.objects.filter(contract_version=version))
+        assert [row.position for row in rows] == [1, 2, 3]
+        assert rows[0].alternatives_suggested[0]['clause_id'] == f'{rows[0].clause_id}-ALT'
+        assert Contract.objects.get(pk=version.contract_id).current_version == 2
+        assert WorkflowLog.objects.filter(contract_id=version.contract_id, action='version_created').count() == 1
+
+    def test_query_count_independent_of_clause_count(self):
+        _, small = self._queries_for_version(3)
+        _, large = self._queries_for_version(30)
+
+        assert small == large
@@ -0,0 +1,118 @@
+"""
+Tests for dashboard contract statistics
+"""
+
+import uuid
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Contract, ContractMonthlyStatistics
+from .services import ContractStatistics, _add_months
+
+
+class TestContractStatistics(TestCase):
+    """Status totals and calendar-month trend from one grouped count"""
+
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        self.this_month = timezone.localdate().replace(day=1)
+
+    def _contract(self, status='draft', months_ago=0, tenant_id=None):
+        contract = Contract.objects.create(
+            tenant_id=tenant_id or self.tenant_id,
+            title='Contract',
+            status=status,
+            created_by=uuid.uuid4(),
+        )
+        if months_ago:
+            month = _add_months(self.this_month, -months_ago)
+            created_at = timezone.make_aware(datetime(month.year, month.month, 15))
+            Contract.objects.filter(pk=contract.pk).update(created_at=created_at)
+            contract.created_at = created_at
+        return contract
+
+    def _seed(self):
+        self._contract('approved')
+        self._contract('approved', months_ago=1)
+        self._contract('rejected', months_ago=1)
+        self._contract('draft', months_ago=5)
+        self._contract('approved', months_ago=7)  # outside the trend window
+        self._contract('approved', tenant_id=uuid.uuid4())
+
+    def _assert_stats(self, stats):
+        assert {k: stats[k] for k in ('total', 'draft', 'pending', 'approved', 'rejected', 'executed')} == {
+            'total': 5, 'draft': 1, 'pending': 0, 'approved': 3, 'rejected': 1, 'executed': 0,
+        }
+        trends = stats['monthly_trends']
+        assert [t['month'] for t in trends] == [
+            _add_months(self.this_month, -i).strftime('%b') for i in range(5, -1, -1)
+        ]
+        assert trends[-1] == {'month': self.this_month.strftime('%b'), 'approved': 1, 'rejected': 0}
+        assert trends[-2]['approved'] == 1 and trends[-2]['rejected'] == 1
+        assert sum(t['approved'] + t['rejected'] for t in trends) == 3
+
+    def test_live_aggregate_is_one_query(self):
+        self._seed()
+
+        with self.assertNumQueries(1):
+            stats = ContractStatistics.for_tenant(self.tenant_id)
+
+        self._assert_stats(stats)
+
+    @override_settings(CONTRACT_STATS_ROLLUP=True)
+    def test_rollup_maintained_by_signals(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._seed()
+        # update() bypasses signals; the periodic rebuild picks up the backdated rows
+        ContractStatistics.rebuild(self.tenant_id)
+
+        with self.assertNumQueries(1):
+            self._assert_stats(ContractStatistics.for_tenant(self.tenant_id))
+
+        contract = self._contract('draft')
+        with self.captureOnCommitCallbacks(execute=True):
+            contract.status = 'executed'
+            contract.save()
+        stats = ContractStatistics.for_tenant(self.tenant_id)
+        assert stats['total'] == 6 and stats['executed'] == 1 and stats['draft'] == 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            contract.delete()
+        assert ContractStatistics.for_tenant(self.tenant_id)['executed'] == 0
+        assert not ContractMonthlyStatistics.objects.filter(
+            tenant_id=self.tenant_id, month=self.this_month, status='executed'
+        ).exists()
+
+    @override_settings(CONTRACT_STATS_ROLLUP=True)
+    def test_rebuild_all_tenants(self):
+        self._seed()
+        ContractMonthlyStatistics.objects.all().delete()
+
+        ContractStatistics.rebuild()
+
+        self._assert_stats(ContractStatistics.for_tenant(self.tenant_id))
+        assert ContractMonthlyStatistics.objects.exclude(tenant_id=self.tenant_id).count() == 1
+
+    def test_add_months_crosses_years(self):
+        assert _add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+        assert _add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+
+
+class TestContractStatisticsAPI(TestCase):
+    """GET /api/v1/contracts/statistics/ keeps its response shape"""
+
+    def test_statistics_endpoint(self):
+        user = get_user_model().objects.create_user(email='stats@example.com', password='pass1234')
+        Contract.objects.create(tenant_id=user.tenant_id, title='A', status='pending', created_by=user.user_id)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get('/api/v1/contracts/statistics/')
+
+        assert response.status_code == 200
+        assert response.data['total'] == 1 and response.data['pending'] == 1
+        assert len(response.data['monthly_trends']) == 6
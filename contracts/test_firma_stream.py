@@ -0,0 +1,110 @@
+"""
+Tests for the Firma webhook SSE stream and its event bus
+"""
+
+import asyncio
+import json
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import firma_views
+from .firma_events import InMemoryFirmaEventBus, firma_event_bus, reset_firma_event_bus
+from .models import Contract
+
+
+def _frames(chunks, count):
+    return [next(chunks).decode('utf-8') for _ in range(count)]
+
+
+def _close(response):
+    # Close through the test client's iterator wrapper, which fires request_finished
+    # without close_old_connections so the test transaction's connection survives
+    response._iterator.close()
+
+
+def _data(frame):
+    return json.loads(frame.split('data: ', 1)[1])
+
+
+@override_settings(FIRMA_EVENT_BUS_URL='')
+class TestFirmaWebhookStream(TestCase):
+    """Published webhook events reach open streams with ids; reconnects replay missed events"""
+
+    def setUp(self):
+        reset_firma_event_bus()
+        self.addCleanup(reset_firma_event_bus)
+        self.user = get_user_model().objects.create_user(email='firma@example.com', password='pass1234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _contract_id(self, tenant_id=None):
+        contract = Contract.objects.create(
+            tenant_id=tenant_id or self.user.tenant_id, title='NDA', created_by=self.user.user_id
+        )
+        return str(contract.id)
+
+    def test_publish_reaches_subscriber(self):
+        contract_id = self._contract_id()
+        response = self.client.get(f'/api/v1/firma/webhooks/stream/{contract_id}/')
+        chunks = iter(response.streaming_content)
+
+        assert next(chunks) == b'event: ready\ndata: {}\n\n'
+        assert firma_event_bus().subscriber_count(contract_id) == 1
+
+        firma_views._firma_stream_publish(contract_id, {'type': 'firma_webhook', 'payload': {'status': 'signed'}})
+        frame = next(chunks).decode('utf-8')
+
+        assert frame.startswith('id: 1\nevent: firma\n')
+        assert _data(frame)['payload'] == {'status': 'signed'}
+
+        _close(response)
+        assert firma_event_bus().subscriber_count(contract_id) == 0
+
+    def test_last_event_id_replays_missed_events(self):
+        contract_id = self._contract_id()
+        for status in ('sent', 'viewed', 'signed'):
+            firma_views._firma_stream_publish(contract_id, {'status': status})
+
+        response = self.client.get(f'/api/v1/firma/webhooks/stream/{contract_id}/', HTTP_LAST_EVENT_ID='1')
+        frames = _frames(iter(response.streaming_content), 3)
+        _close(response)
+
+        assert frames[0].startswith('event: ready')
+        assert [_data(frame)['status'] for frame in frames[1:]] == ['viewed', 'signed']
+        assert frames[2].startswith('id: 3\n')
+
+    def test_other_tenants_contract_is_not_found(self):
+        contract_id = self._contract_id(tenant_id=uuid.uuid4())
+        firma_views._firma_stream_publish(contract_id, {'status': 'signed'})
+
+        response = self.client.get(f'/api/v1/firma/webhooks/stream/{contract_id}/', HTTP_LAST_EVENT_ID='0')
+
+        assert response.status_code == 404
+        assert firma_event_bus().subscriber_count(contract_id) == 0
+
+    def test_unknown_contract_is_not_found(self):
+        assert self.client.get('/api/v1/firma/webhooks/stream/contract-1/').status_code == 404
+
+
+class TestInMemoryFirmaEventBus(SimpleTestCase):
+    """Subscriber buffers are bounded; the oldest undelivered events are dropped"""
+
+    @override_settings(FIRMA_EVENT_SUBSCRIBER_BUFFER=2)
+    def test_slow_subscriber_keeps_newest(self):
+        bus = InMemoryFirmaEventBus()
+
+        async def run():
+            events = bus.subscribe('c', None, keepalive=0.05)
+            assert await events.__anext__() is None
+            for i in range(5):
+                bus.publish('c', {'n': i})
+            await asyncio.sleep(0)
+            received = [await events.__anext__(), await events.__anext__()]
+            await events.aclose()
+            return [payload['n'] for _, payload in received]
+
+        assert asyncio.run(run()) == [3, 4]
+        assert bus.subscriber_count('c') == 0
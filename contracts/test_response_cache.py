@@ -0,0 +1,114 @@
+"""
+Tests for the tenant-scoped response cache on dashboard endpoints
+"""
+
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from .models import Contract, ContractEditingTemplate
+from .views import ContractEditingTemplateViewSet
+
+
+class TestContractResponseCache(TestCase):
+    """Repeat polls are served from cache until the tenant's contracts change"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='dash@example.com', password='pass1234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _contract(self, title, tenant_id=None):
+        return Contract.objects.create(
+            tenant_id=tenant_id or self.user.tenant_id, title=title, created_by=self.user.user_id,
+        )
+
+    def test_repeat_poll_skips_database(self):
+        self._contract('First')
+        first = self.client.get('/api/v1/contracts/recent/')
+        stats = self.client.get('/api/v1/contracts/statistics/')
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/v1/contracts/recent/')
+            stats_again = self.client.get('/api/v1/contracts/statistics/')
+
+        assert second.status_code == 200
+        assert second.data == first.data
+        assert second['ETag'] == first['ETag']
+        assert stats_again.data == stats.data
+
+        # Query params are part of the key
+        limited = self.client.get('/api/v1/contracts/recent/', {'limit': 1})
+        assert limited.status_code == 200
+
+    def test_if_none_match_returns_304(self):
+        self._contract('First')
+        first = self.client.get('/api/v1/contracts/recent/')
+
+        response = self.client.get('/api/v1/contracts/recent/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert response.status_code == 304
+        assert response['ETag'] == first['ETag']
+        assert not response.content
+
+    def test_contract_write_invalidates(self):
+        contract = self._contract('First')
+        first = self.client.get('/api/v1/contracts/recent/')
+
+        contract.title = 'Renamed'
+        contract.save()
+        response = self.client.get('/api/v1/contracts/recent/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert response.status_code == 200
+        assert response.data[0]['title'] == 'Renamed'
+        assert response['ETag'] != first['ETag']
+
+    def test_cache_is_tenant_scoped(self):
+        self._contract('Mine')
+        other = get_user_model().objects.create_user(email='other@example.com', password='pass1234')
+        self._contract('Theirs', tenant_id=other.tenant_id)
+
+        mine = self.client.get('/api/v1/contracts/recent/')
+        self.client.force_authenticate(other)
+        theirs = self.client.get('/api/v1/contracts/recent/')
+
+        assert [c['title'] for c in mine.data] == ['Mine']
+        assert [c['title'] for c in theirs.data] == ['Theirs']
+
+
+class TestTemplateResponseCache(TestCase):
+    """Template listings are invalidated by template writes; errors are not cached"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='tmpl@example.com', password='pass1234')
+        self.factory = APIRequestFactory()
+        self.view = ContractEditingTemplateViewSet.as_view({'get': 'by_category'})
+
+    def _get(self, **params):
+        request = self.factory.get('/manual-templates/by_category/', params)
+        force_authenticate(request, user=self.user)
+        return self.view(request)
+
+    def _template(self, name):
+        return ContractEditingTemplate.objects.create(
+            tenant_id=self.user.tenant_id, base_template_id=uuid.uuid4(), name=name,
+            category='nda', contract_type='NDA', created_by=self.user.user_id,
+        )
+
+    def test_template_write_invalidates(self):
+        self._template('Mutual NDA')
+        assert self._get(category='nda').data['count'] == 1
+
+        with self.assertNumQueries(0):
+            assert self._get(category='nda').data['count'] == 1
+
+        self._template('One-way NDA')
+        assert self._get(category='nda').data['count'] == 2
+
+    def test_errors_not_cached(self):
+        for _ in range(2):
+            response = self._get()
+            assert response.status_code == 400
+            assert not response.has_header('ETag')
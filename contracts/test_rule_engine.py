@@ -0,0 +1,133 @@
+"""
+Tests for the compiled, cached business rule engine
+"""
+
+import uuid
+
+from django.test import TestCase
+
+from .models import BusinessRule, Clause
+from .services import CompiledRuleSet, RuleEngine, compile_condition
+
+
+class TestCompileCondition(TestCase):
+    """Compiled predicates keep evaluate_condition's semantics"""
+
+    def test_operators(self):
+        context = {'contract_value': 50000, 'region': 'EU', 'tags': ['nda', 'msa']}
+
+        assert compile_condition({'contract_value__gte': 50000})(context) is True
+        assert compile_condition({'contract_value__gt': 50000})(context) is False
+        assert compile_condition({'contract_value__lt': 60000, 'region': 'EU'})(context) is True
+        assert compile_condition({'region__in': ['US', 'CA']})(context) is False
+        assert compile_condition({'tags__contains': 'nda'})(context) is True
+        assert compile_condition({'region': 'US'})(context) is False
+
+    def test_missing_field_fails_and_empty_condition_passes(self):
+        assert compile_condition({'contract_value__gte': 1})({}) is False
+        assert compile_condition({'contract_value__unknown': 1})({'contract_value': 0}) is True
+        assert compile_condition({})({}) is True
+        assert compile_condition(None)({}) is True
+
+    def test_evaluate_condition_delegates(self):
+        assert RuleEngine.evaluate_condition({'a__lte': 3, 'b': 'x'}, {'a': 2, 'b': 'x'}) is True
+        assert RuleEngine.evaluate_condition({'a__lte': 3, 'b': 'x'}, {'a': 4, 'b': 'x'}) is False
+
+
+class TestCompiledRuleSet(TestCase):
+    """Per-tenant rule set cached until a rule or clause changes"""
+
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        self.user_id = uuid.uuid4()
+        self.context = {'contract_type': 'MSA', 'contract_value': 2_000_000}
+
+        self._rule('High value liability', 'mandatory_clause', {'contract_value__gte': 1_000_000},
+                   {'clause_id': 'LIAB-001', 'message': 'Liability required'}, priority=10)
+        self._rule('NDA only', 'mandatory_clause', {}, {'clause_id': 'CONF-001'}, contract_types=['NDA'])
+        self._rule('Cap value', 'validation', {'contract_value__gt': 1_500_000},
+                   {'type': 'error', 'message': 'Value needs CFO sign-off'})
+        self._rule('Suggest cap', 'clause_suggestion', {'contract_value__gte': 1_000_000},
+                   {'target_clause_id': 'LIAB-001', 'suggest_clause_id': 'LIAB-002', 'rationale': 'Cap liability'})
+        self._clause('LIAB-001', alternatives=[
+            {'clause_id': 'LIAB-003', 'trigger_rules': {'contract_value__lt': 100}},
+            {'clause_id': 'LIAB-004'},
+        ])
+        self._clause('TERM-001')
+
+    def _rule(self, name, rule_type, conditions, action, priority=0, contract_types=None):
+        return BusinessRule.objects.create(
+            tenant_id=self.tenant_id,
+            name=name,
+            description=name,
+            rule_type=rule_type,
+            contract_types=contract_types or [],
+            conditions=conditions,
+            action=action,
+            priority=priority,
+            created_by=self.user_id,
+        )
+
+    def _clause(self, clause_id, alternatives=None):
+        return Clause.objects.create(
+            tenant_id=self.tenant_id,
+            clause_id=clause_id,
+            name=clause_id,
+            contract_type='MSA',
+            content=f'{clause_id} text',
+            alternatives=alternatives or [],
+            created_by=self.user_id,
+        )
+
+    def test_results_match_rules(self):
+        mandatory = RuleEngine.get_mandatory_clauses(self.tenant_id, 'MSA', self.context)
+        is_valid, errors = RuleEngine.validate_contract(self.tenant_id, 'MSA', self.context, ['LIAB-001'])
+        suggestions = RuleEngine.get_clause_suggestions(self.tenant_id, 'MSA', self.context, 'LIAB-001')
+
+        assert [m['clause_id'] for m in mandatory] == ['LIAB-001']
+        assert is_valid is False
+        assert errors == ['Value needs CFO sign-off']
+        assert [(s['clause_id'], s['source']) for s in suggestions] == [
+            ('LIAB-004', 'predefined'),
+            ('LIAB-002', 'rule_based'),
+        ]
+        assert RuleEngine.get_clause_suggestions(self.tenant_id, 'MSA', self.context, 'MISSING') == []
+
+    def test_whole_contract_pass_is_query_free_once_built(self):
+        with self.assertNumQueries(2):
+            CompiledRuleSet.for_tenant(self.tenant_id)
+
+        with self.assertNumQueries(0):
+            RuleEngine.get_mandatory_clauses(self.tenant_id, 'MSA', self.context)
+            RuleEngine.validate_contract(self.tenant_id, 'MSA', self.context, ['LIAB-001', 'TERM-001'])
+            for clause_id in ('LIAB-001', 'TERM-001'):
+                RuleEngine.get_clause_suggestions(self.tenant_id, 'MSA', self.context, clause_id)
+
+    def test_rule_write_invalidates(self):
+        first = CompiledRuleSet.for_tenant(self.tenant_id)
+        rule = self._rule('Any contract', 'mandatory_clause', {}, {'clause_id': 'TERM-001'})
+
+        mandatory = RuleEngine.get_mandatory_clauses(self.tenant_id, 'MSA', self.context)
+        assert CompiledRuleSet.for_tenant(self.tenant_id) is not first
+        assert [m['clause_id'] for m in mandatory] == ['LIAB-001', 'TERM-001']
+
+        rule.is_active = False
+        rule.save()
+        mandatory = RuleEngine.get_mandatory_clauses(self.tenant_id, 'MSA', self.context)
+        assert [m['clause_id'] for m in mandatory] == ['LIAB-001']
+
+    def test_clause_write_invalidates(self):
+        assert RuleEngine.get_clause_suggestions(self.tenant_id, 'MSA', self.context, 'TERM-001') == []
+
+        clause = Clause.objects.get(tenant_id=self.tenant_id, clause_id='TERM-001')
+        clause.alternatives = [{'clause_id': 'TERM-002'}]
+        clause.save()
+
+        suggestions = RuleEngine.get_clause_suggestions(self.tenant_id, 'MSA', self.context, 'TERM-001')
+        assert [s['clause_id'] for s in suggestions] == ['TERM-002']
+
+    def test_rule_sets_are_tenant_scoped(self):
+        other_tenant = uuid.uuid4()
+
+        assert RuleEngine.get_mandatory_clauses(other_tenant, 'MSA', self.context) == []
+        assert CompiledRuleSet.for_tenant(other_tenant).rules_by_type == {}
@@ -0,0 +1,51 @@
+"""
+Tests for the shared compiled {{field}} renderer
+"""
+
+from django.test import SimpleTestCase, override_settings
+
+from .utils import template_renderer
+from .utils.template_renderer import compile_template, render_template
+
+
+class TestRenderTemplate(SimpleTestCase):
+    """Single-pass substitution keeps the per-key renderers' semantics"""
+
+    def setUp(self):
+        template_renderer.clear_template_cache()
+
+    def test_substitutes_all_fields(self):
+        text = 'Between {{party}} and {{ counterparty }}, effective {{effective_date}}. {{party}} agrees.'
+        values = {'party': 'Acme', 'counterparty': 'Globex', 'effective_date': '2026-01-01', 'unused': 'x'}
+
+        assert render_template(text, values) == (
+            'Between Acme and Globex, effective 2026-01-01. Acme agrees.'
+        )
+
+    def test_none_blank_and_unknown_fields(self):
+        text = '{{a}}|{{ b }}|{{missing}}|{{ also_missing }}'
+
+        assert render_template(text, {'a': None, 'b': 0}) == '|0|{{missing}}|{{ also_missing }}'
+        assert render_template('', {'a': 1}) == ''
+        assert render_template(None, {'a': 1}) == ''
+        assert render_template(text, {}) == text
+        assert render_template('no fields', {'a': 1}) == 'no fields'
+
+    def test_values_are_not_rescanned(self):
+        assert render_template('{{a}} {{b}}', {'a': '{{b}}', 'b': 'B'}) == '{{b}} B'
+
+    def test_compiled_form_cached_by_content(self):
+        first = compile_template('Hello {{name}}')
+
+        assert compile_template('Hello {{name}}') is first
+        assert first.fields == ('name',)
+        assert compile_template('Hello {{ name }}') is not first
+
+    @override_settings(CONTRACT_TEMPLATE_CACHE_MAX_ENTRIES=2)
+    def test_cache_is_bounded(self):
+        oldest = compile_template('{{a}}')
+        compile_template('{{b}}')
+        compile_template('{{c}}')
+
+        assert len(template_renderer._compiled) == 2
+        assert compile_template('{{a}}') is not oldest
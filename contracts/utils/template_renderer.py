@@ -0,0 +1,101 @@
+"""
+Shared {{field}} merge-field renderer for clause text and template files.
+
+A template is tokenized once into literal text and field slots, and the compiled
+form is cached in-process by content hash, so rendering the same clause or template
+file again only walks the slots and joins the pieces: one pass over the text,
+independent of how many keys the values dict carries.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Mapping, Optional, Tuple
+
+from django.conf import settings
+
+
+# {{field}} with optional whitespace inside the braces: {{ party_name }}
+PLACEHOLDER_RE = re.compile(r'\{\{\s*([^{}]+?)\s*\}\}')
+
+
+class CompiledTemplate:
+    """Template text split into literals and field slots
+
+    ``literals`` has one more entry than ``fields``; rendering interleaves them.
+    ``placeholders`` keeps each slot's original text so unknown fields are left as-is.
+    """
+
+    __slots__ = ('literals', 'fields', 'placeholders')
+
+    def __init__(self, text: str):
+        literals, fields, placeholders = [], [], []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            literals.append(text[position:match.start()])
+            fields.append(match.group(1))
+            placeholders.append(match.group(0))
+            position = match.end()
+        literals.append(text[position:])
+
+        self.literals: Tuple[str, ...] = tuple(literals)
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.placeholders: Tuple[str, ...] = tuple(placeholders)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        if not self.fields:
+            return self.literals[0]
+
+        literals = self.literals
+        parts = [literals[0]]
+        for index, field in enumerate(self.fields):
+            if field in values:
+                value = values[field]
+                parts.append('' if value is None else str(value))
+            else:
+                parts.append(self.placeholders[index])
+            parts.append(literals[index + 1])
+        return ''.join(parts)
+
+
+_compiled: 'OrderedDict[str, CompiledTemplate]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    """Get the compiled form of ``text``, tokenizing it only the first time it is seen"""
+    key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    with _lock:
+        compiled = _compiled.get(key)
+        if compiled is not None:
+            _compiled.move_to_end(key)
+            return compiled
+
+    compiled = CompiledTemplate(text)
+
+    with _lock:
+        _compiled[key] = compiled
+        max_templates = int(getattr(settings, 'CONTRACT_TEMPLATE_CACHE_MAX_ENTRIES', 256))
+        while len(_compiled) > max(max_templates, 1):
+            _compiled.popitem(last=False)
+    return compiled
+
+
+def render_template(text: Optional[str], values: Optional[Mapping[str, Any]]) -> str:
+    """Substitute every {{field}} in ``text`` from ``values`` in a single pass
+
+    None values render as ''. Placeholders whose field is not in ``values`` are left
+    untouched. Substituted values are never re-scanned for placeholders.
+    """
+    if not text:
+        return ''
+    if not values or '{{' not in text:
+        return text
+    return compile_template(text).render(values)
+
+
+def clear_template_cache() -> None:
+    with _lock:
+        _compiled.clear()
@@ -13,6 +13,8 @@ import json
 import re
 from datetime import datetime
 
+from clm_backend.metrics import instrument
+
 
 class TextToPDFConverter:
     """Converts filled text template to PDF"""
@@ -88,6 +90,7 @@ class TextToPDFConverter:
         
         return sections
     
+    @instrument('pdf', 'txt_to_pdf')
     def txt_to_pdf(self, txt_content, filename='contract.pdf', title='Contract Document'):
         """
         Convert txt template to PDF
@@ -27,7 +27,7 @@ from django.db.models.functions import Cast, Coalesce, Length
 from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
 from django.utils import timezone
-from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.http import FileResponse, HttpResponse
 from datetime import datetime, timedelta
 import uuid
 import hashlib
@@ -44,6 +44,8 @@ from .models import (
     ContractEditingSession, ContractEditingTemplate, ContractPreview,
     ContractEditingStep, ContractEdits, ContractFieldValidationRule
 )
+from .response_cache import cached_response
+from .utils.template_renderer import render_template
 from .serializers import (
     ContractSerializer, ContractListSerializer, ContractDetailSerializer, ContractDecisionSerializer,
     WorkflowLogSerializer, ContractTemplateSerializer, ContractTemplateListSerializer, ClauseSerializer,
@@ -59,12 +61,15 @@ from .serializers import (
     ContractEditAfterPreviewSerializer, FinalizedContractSerializer
 )
 from .services import (
-    ContractGenerator, RuleEngine,
+    ClauseEmbeddingIndex, ContractGenerator, RuleEngine,
     SignNowAPIService, SignNowAuthService
 )
 from .clause_seed import ensure_tenant_clause_library_seeded
 from .constraint_library import CONSTRAINT_LIBRARY
 from authentication.r2_service import R2StorageService
+from ai.streaming import stream_gemini_text
+from clm_backend.metrics import current_tenant_tier
+from clm_backend.sse import sse_event, sse_response
 
 logger = logging.getLogger(__name__)
 
@@ -407,6 +412,7 @@ class ClauseViewSet(viewsets.ModelViewSet):
         return queryset
 
     @action(detail=False, methods=['get'], url_path='constraints-library')
+    @cached_response('clauses.constraints_library')
     def constraints_library(self, request):
         """GET /clauses/constraints-library/
 
@@ -706,18 +712,7 @@ class ContractViewSet(viewsets.ModelViewSet):
         return base
 
     def _render_template_text(self, raw_text: str, values: dict) -> str:
-        if not raw_text:
-            return ''
-        if not values:
-            return raw_text
-
-        rendered = raw_text
-        for key, value in values.items():
-            if key is None:
-                continue
-            placeholder = re.compile(r'\{\{\s*' + re.escape(str(key)) + r'\s*\}\}')
-            rendered = placeholder.sub(str(value) if value is not None else '', rendered)
-        return rendered
+        return render_template(raw_text, values)
 
     def _infer_contract_type_from_filename(self, filename: str) -> str:
         name = (filename or '').lower()
@@ -1311,63 +1306,10 @@ class ContractViewSet(viewsets.ModelViewSet):
         if not isinstance(current_text, str):
             return Response({'error': 'current_text must be a string'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Retrieve a few relevant clauses using Voyage Law-2 embeddings.
-        def _pick_relevant_clauses() -> list[dict]:
-            try:
-                from repository.embeddings_service import VoyageEmbeddingsService
-                import numpy as np
-
-                svc = VoyageEmbeddingsService()
-                query_emb = svc.embed_query(prompt) or svc.embed_text(prompt)
-                if not query_emb:
-                    return []
-
-                qs = Clause.objects.filter(
-                    tenant_id=request.user.tenant_id,
-                    status='published',
-                )
-                if contract.contract_type:
-                    qs = qs.filter(contract_type=contract.contract_type)
-                # Keep it bounded for latency.
-                items = list(qs.order_by('-updated_at')[:40])
-                if not items:
-                    return []
-
-                texts = [f"{c.name}\n\n{c.content}"[:8000] for c in items]
-                embs = svc.embed_batch(texts)
-
-                q = np.array(query_emb, dtype=np.float32)
-                qn = float(np.linalg.norm(q))
-                if qn <= 0:
-                    return []
-
-                scored: list[tuple[float, Clause]] = []
-                for clause, emb in zip(items, embs):
-                    if not emb:
-                        continue
-                    v = np.array(emb, dtype=np.float32)
-                    vn = float(np.linalg.norm(v))
-                    if vn <= 0:
-                        continue
-                    sim = float(np.dot(q, v) / (qn * vn))
-                    scored.append((sim, clause))
-
-                scored.sort(key=lambda x: x[0], reverse=True)
-                out = []
-                for sim, clause in scored[:5]:
-                    out.append(
-                        {
-                            'clause_id': clause.clause_id,
-                            'name': clause.name,
-                            'similarity': round(sim, 4),
-                            'content': clause.content,
-                        }
-                    )
-                return out
-            except Exception:
-                return []
-
-        relevant = _pick_relevant_clauses()
+        # Retrieve a few relevant clauses: one indexed top-k over the tenant's clause embeddings.
+        relevant = ClauseEmbeddingIndex.relevant(
+            request.user.tenant_id, prompt, contract_type=contract.contract_type
+        )
 
         from django.conf import settings
         api_key = (getattr(settings, 'GEMINI_API_KEY', '') or '').strip()
@@ -1417,33 +1359,19 @@ Relevant clause library (optional):
 ---
 """.strip()
 
-        def event_stream():
-            # Initial metadata event
-            try:
-                yield f"event: meta\ndata: {json.dumps({'model': model_name})}\n\n"
-            except Exception:
-                pass
+        # The stream is consumed after MetricsMiddleware resets the request's tier
+        tier = current_tenant_tier()
 
+        async def event_stream():
+            yield sse_event('meta', {'model': model_name})
             try:
-                import google.generativeai as genai
-
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel(model_name)
-
-                for chunk in model.generate_content(generation_prompt, stream=True):
-                    delta = getattr(chunk, 'text', None)
-                    if not delta:
-                        continue
-                    yield f"event: delta\ndata: {json.dumps({'delta': delta})}\n\n"
-
-                yield f"event: done\ndata: {json.dumps({'ok': True})}\n\n"
+                async for delta in stream_gemini_text(model_name, generation_prompt, api_key=api_key, tier=tier):
+                    yield sse_event('delta', {'delta': delta})
+                yield sse_event('done', {'ok': True})
             except Exception as e:
-                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+                yield sse_event('error', {'error': str(e)})
 
-        resp = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
-        resp['Cache-Control'] = 'no-cache'
-        resp['X-Accel-Buffering'] = 'no'
-        return resp
+        return sse_response(request, event_stream())
 
     @action(detail=False, methods=['post'], url_path='create-from-content')
     def create_from_content(self, request):
@@ -1601,11 +1529,7 @@ Relevant clause library (optional):
         return 'SERVICE_AGREEMENT'
 
     def _render_template_text(self, raw_text: str, values: dict) -> str:
-        rendered = raw_text or ''
-        for key, value in (values or {}).items():
-            placeholder = re.compile(r'\{\{\s*' + re.escape(str(key)) + r'\s*\}\}')
-            rendered = placeholder.sub(str(value) if value is not None else '', rendered)
-        return rendered
+        return render_template(raw_text, values)
 
     def _assemble_additions_block(self, tenant_id, contract_type: str, selected_clause_ids, custom_clauses, constraints) -> str:
         selected_clause_ids = selected_clause_ids or []
@@ -1707,11 +1631,7 @@ Relevant clause library (optional):
         return 'SERVICE_AGREEMENT'
 
     def _render_template_text(self, raw_text: str, values: dict) -> str:
-        rendered = raw_text or ''
-        for key, value in (values or {}).items():
-            placeholder = re.compile(r'\{\{\s*' + re.escape(str(key)) + r'\s*\}\}')
-            rendered = placeholder.sub(str(value) if value is not None else '', rendered)
-        return rendered
+        return render_template(raw_text, values)
 
     def _assemble_additions_block(self, tenant_id, contract_type: str, selected_clause_ids, custom_clauses, constraints) -> str:
         selected_clause_ids = selected_clause_ids or []
@@ -1897,6 +1817,7 @@ Relevant clause library (optional):
         return Response({'history': result})
     
     @action(detail=False, methods=['get'], url_path='statistics')
+    @cached_response('contracts.statistics', depends_on=('contracts',))
     def statistics(self, request):
         """
         GET /contracts/statistics/
@@ -1916,49 +1837,12 @@ Relevant clause library (optional):
             ]
         }
         """
-        from django.db.models import Count, Q
-        from datetime import timedelta
-        from django.utils import timezone
-        
-        tenant_id = request.user.tenant_id
-        queryset = Contract.objects.filter(tenant_id=tenant_id)
-        
-        # Get status counts
-        stats = queryset.aggregate(
-            total=Count('id'),
-            draft=Count('id', filter=Q(status='draft')),
-            pending=Count('id', filter=Q(status='pending')),
-            approved=Count('id', filter=Q(status='approved')),
-            rejected=Count('id', filter=Q(status='rejected')),
-            executed=Count('id', filter=Q(status='executed'))
-        )
-        
-        # Get monthly trends for last 6 months
-        monthly_trends = []
-        for i in range(5, -1, -1):
-            month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30 * i)
-            month_end = (month_start + timedelta(days=32)).replace(day=1)
-            
-            month_contracts = queryset.filter(
-                created_at__gte=month_start,
-                created_at__lt=month_end
-            )
-            
-            approved_count = month_contracts.filter(status='approved').count()
-            rejected_count = month_contracts.filter(status='rejected').count()
-            
-            monthly_trends.append({
-                'month': month_start.strftime('%b'),
-                'approved': approved_count,
-                'rejected': rejected_count
-            })
-        
-        return Response({
-            **stats,
-            'monthly_trends': monthly_trends
-        })
+        from .services import ContractStatistics
+
+        return Response(ContractStatistics.for_tenant(request.user.tenant_id))
     
     @action(detail=False, methods=['get'], url_path='recent')
+    @cached_response('contracts.recent', depends_on=('contracts',))
     def recent(self, request):
         """
         GET /contracts/recent/?limit=10
@@ -2656,6 +2540,7 @@ class ContractEditingTemplateViewSet(viewsets.ReadOnlyModelViewSet):
         ).order_by('-created_at')
     
     @action(detail=False, methods=['get'])
+    @cached_response('templates.by_category', depends_on=('templates',))
     def by_category(self, request):
         """
         GET /manual-templates/by-category/?category=nda
@@ -2684,6 +2569,7 @@ class ContractEditingTemplateViewSet(viewsets.ReadOnlyModelViewSet):
         })
     
     @action(detail=False, methods=['get'])
+    @cached_response('templates.by_type', depends_on=('templates',))
     def by_type(self, request):
         """
         GET /manual-templates/by-type/?contract_type=nda
@@ -4383,6 +4269,7 @@ class ClauseViewSet(viewsets.ModelViewSet):
         return queryset
 
     @action(detail=False, methods=['get'], url_path='constraints-library')
+    @cached_response('clauses.constraints_library')
     def constraints_library(self, request):
         q = (request.query_params.get('q') or '').strip().lower()
         category = (request.query_params.get('category') or '').strip().lower()
@@ -4662,11 +4549,7 @@ class ContractViewSetLegacy(viewsets.ModelViewSet):
         return 'SERVICE_AGREEMENT'
 
     def _render_template_text(self, raw_text: str, values: dict) -> str:
-        rendered = raw_text or ''
-        for key, value in (values or {}).items():
-            placeholder = re.compile(r'\{\{\s*' + re.escape(str(key)) + r'\s*\}\}')
-            rendered = placeholder.sub(str(value) if value is not None else '', rendered)
-        return rendered
+        return render_template(raw_text, values)
 
     def _assemble_additions_block(self, tenant_id, contract_type: str, selected_clause_ids, custom_clauses, constraints) -> str:
         selected_clause_ids = selected_clause_ids or []
@@ -5019,6 +4902,7 @@ class ContractViewSetLegacy(viewsets.ModelViewSet):
         return Response({'history': result})
     
     @action(detail=False, methods=['get'], url_path='statistics')
+    @cached_response('contracts.statistics', depends_on=('contracts',))
     def statistics(self, request):
         """
         GET /contracts/statistics/
@@ -5038,49 +4922,12 @@ class ContractViewSetLegacy(viewsets.ModelViewSet):
             ]
         }
         """
-        from django.db.models import Count, Q
-        from datetime import timedelta
-        from django.utils import timezone
-        
-        tenant_id = request.user.tenant_id
-        queryset = Contract.objects.filter(tenant_id=tenant_id)
-        
-        # Get status counts
-        stats = queryset.aggregate(
-            total=Count('id'),
-            draft=Count('id', filter=Q(status='draft')),
-            pending=Count('id', filter=Q(status='pending')),
-            approved=Count('id', filter=Q(status='approved')),
-            rejected=Count('id', filter=Q(status='rejected')),
-            executed=Count('id', filter=Q(status='executed'))
-        )
-        
-        # Get monthly trends for last 6 months
-        monthly_trends = []
-        for i in range(5, -1, -1):
-            month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30 * i)
-            month_end = (month_start + timedelta(days=32)).replace(day=1)
-            
-            month_contracts = queryset.filter(
-                created_at__gte=month_start,
-                created_at__lt=month_end
-            )
-            
-            approved_count = month_contracts.filter(status='approved').count()
-            rejected_count = month_contracts.filter(status='rejected').count()
-            
-            monthly_trends.append({
-                'month': month_start.strftime('%b'),
-                'approved': approved_count,
-                'rejected': rejected_count
-            })
-        
-        return Response({
-            **stats,
-            'monthly_trends': monthly_trends
-        })
+        from .services import ContractStatistics
+
+        return Response(ContractStatistics.for_tenant(request.user.tenant_id))
     
     @action(detail=False, methods=['get'], url_path='recent')
+    @cached_response('contracts.recent', depends_on=('contracts',))
     def recent(self, request):
         """
         GET /contracts/recent/?limit=10
@@ -5604,6 +5451,7 @@ class ContractEditingTemplateViewSet(viewsets.ReadOnlyModelViewSet):
         ).order_by('-created_at')
     
     @action(detail=False, methods=['get'])
+    @cached_response('templates.by_category', depends_on=('templates',))
     def by_category(self, request):
         """
         GET /manual-templates/by-category/?category=nda
@@ -5632,6 +5480,7 @@ class ContractEditingTemplateViewSet(viewsets.ReadOnlyModelViewSet):
         })
     
     @action(detail=False, methods=['get'])
+    @cached_response('templates.by_type', depends_on=('templates',))
     def by_type(self, request):
         """
         GET /manual-templates/by-type/?contract_type=nda
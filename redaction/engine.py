@@ -0,0 +1,180 @@
+"""
+Single-pass PII redaction engine
+
+All patterns of a set are compiled once into one alternation of named groups, so a
+document is scanned by a single ``finditer`` that both redacts and counts. Shared by
+repository.document_service.PIIRedactionService and redaction.pii_service.PIIScrubber.
+"""
+
+import re
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+Replacement = Union[str, Callable[[str, str], str]]
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    """True if pattern contains a '|' outside any group or character class"""
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+    return False
+
+
+class RedactionEngine:
+    """
+    Compiled PII matcher/redactor for one ordered pattern set
+
+    Where patterns overlap, the leftmost match wins, and at the same position the
+    pattern listed first wins. Every character is redacted at most once.
+    """
+
+    # Streaming: text kept unprocessed at the end of the buffer until more input
+    # arrives (longer than any PII value), and already-emitted text kept in front
+    # of it so lookbehinds and \b see the real preceding characters.
+    STREAM_HOLDBACK = 256
+    STREAM_CONTEXT = 32
+
+    def __init__(self, patterns: Dict[str, str], flags: int = 0, replacement: Replacement = '[{TYPE}_REDACTED]'):
+        """
+        Args:
+            patterns: Ordered {pii_type: regex}; pii_type must be a valid group name
+            flags: re flags applied to the combined pattern
+            replacement: Format string ({type}/{TYPE} placeholders) or callable(pii_type, value)
+        """
+        self.patterns = dict(patterns)
+        self.regex = re.compile(self._combine(self.patterns), flags)
+        self.replacement = replacement
+
+    @staticmethod
+    def _combine(patterns: Dict[str, str]) -> str:
+        """
+        Build the alternation, hoisting a shared leading \\b out of consecutive patterns
+        
+        ``\\b(?:(?P<a>x)|(?P<b>y))`` matches exactly what ``(?P<a>\\bx)|(?P<b>\\by)`` does,
+        but the boundary is tested once per position instead of once per pattern,
+        which roughly doubles throughput on re's backtracking matcher.
+        """
+        branches, run = [], []
+        for pii_type, pattern in patterns.items():
+            if pattern.startswith('\\b') and not _has_top_level_alternation(pattern):
+                run.append(f'(?P<{pii_type}>{pattern[2:]})')
+                continue
+            if run:
+                branches.append('\\b(?:' + '|'.join(run) + ')')
+                run = []
+            branches.append(f'(?P<{pii_type}>{pattern})')
+        if run:
+            branches.append('\\b(?:' + '|'.join(run) + ')')
+        return '|'.join(branches)
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[Tuple[str, re.Match]]:
+        """Yield (pii_type, match) for every non-overlapping PII match"""
+        for match in self.regex.finditer(text, pos):
+            yield match.lastgroup, match
+
+    def redact(self, text: str, replacement: Optional[Replacement] = None) -> Tuple[str, Dict[str, int]]:
+        """
+        Redact text in one pass
+
+        Returns:
+            Tuple of (redacted_text, {pii_type: count})
+        """
+        if not text:
+            return text, {}
+        counts: Dict[str, int] = {}
+        redacted, _ = self._redact_span(text, 0, len(text), True, counts, replacement or self.replacement)
+        return redacted, counts
+
+    def redact_stream(
+        self,
+        segments: Iterable[str],
+        counts: Optional[Dict[str, int]] = None,
+        replacement: Optional[Replacement] = None,
+    ) -> Iterator[str]:
+        """
+        Redact a stream of text pieces (pages, blocks) as if they were one string
+
+        Matches that straddle piece boundaries are found. Output pieces do not line
+        up with input pieces.
+
+        Args:
+            segments: Iterable of text pieces in order
+            counts: Dict updated in place with {pii_type: count}
+            replacement: Overrides the engine's replacement
+
+        Yields:
+            Redacted text pieces; their concatenation equals redact(''.join(segments))[0]
+        """
+        counts = counts if counts is not None else {}
+        replacement = replacement or self.replacement
+        buffer = ''
+        pos = 0
+
+        for segment in segments:
+            if not segment:
+                continue
+            buffer += segment
+            limit = len(buffer) - self.STREAM_HOLDBACK
+            if limit <= pos:
+                continue
+
+            redacted, pos = self._redact_span(buffer, pos, limit, False, counts, replacement)
+            if redacted:
+                yield redacted
+
+            keep_from = max(pos - self.STREAM_CONTEXT, 0)
+            buffer = buffer[keep_from:]
+            pos -= keep_from
+
+        if pos < len(buffer):
+            redacted, _ = self._redact_span(buffer, pos, len(buffer), True, counts, replacement)
+            yield redacted
+
+    def _redact_span(
+        self,
+        buffer: str,
+        pos: int,
+        limit: int,
+        final: bool,
+        counts: Dict[str, int],
+        replacement: Replacement,
+    ) -> Tuple[str, int]:
+        """Redact matches starting in buffer[pos:limit]; returns (output, next position)"""
+        parts = []
+        last = pos
+        for match in self.regex.finditer(buffer, pos):
+            start, end = match.span()
+            if start >= limit:
+                break
+            if not final and end >= len(buffer):
+                # Could still grow with the next piece; resume from here
+                limit = start
+                break
+
+            pii_type = match.lastgroup
+            parts.append(buffer[last:start])
+            if callable(replacement):
+                parts.append(replacement(pii_type, match.group()))
+            else:
+                parts.append(replacement.format(type=pii_type, TYPE=pii_type.upper()))
+            counts[pii_type] = counts.get(pii_type, 0) + 1
+            last = end
+
+        cut = max(last, limit)
+        parts.append(buffer[last:cut])
+        return ''.join(parts), cut
@@ -8,9 +8,11 @@ Catches: email, phone, SSN, credit card, passport, driver license, bank account,
 import re
 import logging
 import json
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from dataclasses import dataclass
 
+from .engine import RedactionEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,7 +48,7 @@ class PIIScrubber:
         'ipv6': r'(?:[0-9a-fA-F]{0,4}:){2,7}[0-9a-fA-F]{0,4}',
         'medical_record': r'\bMRN[:\s]+([A-Z0-9\-]+)\b',
         'vin': r'\b[A-HJ-NPR-Z0-9]{17}\b',  # Vehicle Identification Number
-        'api_key': r'\b(?:api[_-]?key|apikey|api_token)[:\s=]+([A-Za-z0-9\-_.]{20,})\b',
+        'api_key': r'\b(?:api[_-]?key|apikey|api_token)[:\s=\'"]+([A-Za-z0-9\-_.]{20,})\b',
         'jwt': r'\beyJ[A-Za-z0-9\-_.]+\.[A-Za-z0-9\-_.]+\.[A-Za-z0-9\-_.]*\b',
         'aws_secret': r'\bAWS[_A-Z]{0,30}[:\s=]+([A-Za-z0-9/+=]{40})\b',
     }
@@ -74,10 +76,17 @@ class PIIScrubber:
         """
         self.redaction_char = redaction_char
         self.min_confidence = min_confidence
-        self.compiled_patterns = {
-            key: re.compile(pattern, re.IGNORECASE)
-            for key, pattern in self.PII_PATTERNS.items()
-        }
+        # Confidence is per type, so types below the threshold are left out of the
+        # combined pattern instead of being filtered per match.
+        self.engine = RedactionEngine(
+            {
+                key: pattern
+                for key, pattern in self.PII_PATTERNS.items()
+                if self._calculate_confidence(key, '') >= min_confidence
+            },
+            flags=re.IGNORECASE,
+            replacement=lambda entity_type, value: self._redact_value(value, entity_type),
+        )
     
     def scrub_text(self, text: str, return_details: bool = False) -> Union[str, Tuple[str, List[PiiEntity]]]:
         """
@@ -94,42 +103,44 @@ class PIIScrubber:
             return text if not return_details else (text, [])
         
         pii_entities: List[PiiEntity] = []
-        scrubbed_text = text
-        offset = 0  # Track position changes due to replacements
-        
-        # Detect PII entities
-        for entity_type, pattern in self.compiled_patterns.items():
-            for match in pattern.finditer(text):
-                value = match.group(0)
-                confidence = self._calculate_confidence(entity_type, value)
-                
-                if confidence >= self.min_confidence:
-                    redacted = self._redact_value(value, entity_type)
-                    entity = PiiEntity(
-                        entity_type=entity_type,
-                        value=value,
-                        redacted=redacted,
-                        confidence=confidence,
-                        start_pos=match.start(),
-                        end_pos=match.end()
-                    )
-                    pii_entities.append(entity)
+        parts = []
+        last = 0
         
-        # Sort by position (reverse) to avoid position shifts
-        pii_entities.sort(key=lambda e: e.start_pos, reverse=True)
-        
-        # Replace PII in text
-        for entity in pii_entities:
-            scrubbed_text = (
-                scrubbed_text[:entity.start_pos] + 
-                entity.redacted + 
-                scrubbed_text[entity.end_pos:]
-            )
+        # One pass over the text: detect, record and replace each entity
+        for entity_type, match in self.engine.finditer(text):
+            value = match.group(0)
+            redacted = self._redact_value(value, entity_type)
+            pii_entities.append(PiiEntity(
+                entity_type=entity_type,
+                value=value,
+                redacted=redacted,
+                confidence=self._calculate_confidence(entity_type, value),
+                start_pos=match.start(),
+                end_pos=match.end()
+            ))
+            parts.append(text[last:match.start()])
+            parts.append(redacted)
+            last = match.end()
+        parts.append(text[last:])
+        scrubbed_text = ''.join(parts)
         
         if return_details:
             return scrubbed_text, pii_entities
         return scrubbed_text
     
+    def scrub_stream(self, segments, counts: Optional[Dict[str, int]] = None):
+        """
+        Scrub PII from a stream of text pieces (e.g. pages of a large document)
+        
+        Args:
+            segments: Iterable of text pieces
+            counts: Dict updated in place with {entity_type: count}
+        
+        Yields:
+            Scrubbed text pieces
+        """
+        return self.engine.redact_stream(segments, counts)
+    
     def scrub_dict(self, data: dict, return_details: bool = False) -> Union[dict, Tuple[dict, Dict]]:
         """
         Scrub PII from dictionary values
@@ -234,9 +245,10 @@ class PIIScrubber:
         """Redact a value based on type"""
         # Keep some context for readability
         if entity_type == 'email':
-            # Keep email domain visible but redact local part
+            # Keep email domain visible but redact local part (fully, so the
+            # redacted value is not detected as an email again)
             parts = value.split('@')
-            return f"{self.redaction_char * max(1, len(parts[0]) - 2)}{parts[0][-2:]}@{parts[1]}"
+            return f"{self.redaction_char * max(1, len(parts[0]))}@{parts[1]}"
         
         elif entity_type in ['phone_us', 'phone_international']:
             # Show last 4 digits
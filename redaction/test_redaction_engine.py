@@ -0,0 +1,65 @@
+"""
+Tests for the single-pass redaction engine
+"""
+
+import random
+
+from django.test import TestCase
+
+from repository.document_service import PIIRedactionService
+
+from .engine import RedactionEngine
+
+
+SAMPLE = (
+    "Notices go to legal@acme-corp.com or 415-555-0142. "
+    "Employee SSN 123-45-6789 was paid with card 4111-1111-1111-1111. "
+    "Backup contact: ops.team+alerts@globex.io, phone 212.555.0199. "
+)
+
+
+class TestRedactionEngine(TestCase):
+    """One alternation, one finditer pass"""
+
+    def setUp(self):
+        self.engine = PIIRedactionService.ENGINE
+
+    def test_redacts_and_counts_in_one_pass(self):
+        redacted, counts = self.engine.redact(SAMPLE)
+
+        assert counts == {'email': 2, 'phone': 2, 'ssn': 1, 'credit_card': 1}
+        assert '[EMAIL_REDACTED]' in redacted
+        assert '123-45-6789' not in redacted
+        assert '4111' not in redacted
+
+    def test_first_listed_pattern_wins_on_overlap(self):
+        engine = RedactionEngine({'ssn': r'\b\d{3}-\d{2}-\d{4}\b', 'digits': r'\d+'}, replacement='<{type}>')
+
+        redacted, counts = engine.redact("id 123-45-6789 and 42")
+
+        assert redacted == "id <ssn> and <digits>"
+        assert counts == {'ssn': 1, 'digits': 1}
+
+    def test_callable_replacement(self):
+        engine = RedactionEngine({'ssn': r'\b\d{3}-\d{2}-\d{4}\b'}, replacement=lambda t, v: f"***-**-{v[-4:]}")
+
+        assert engine.redact("SSN 123-45-6789")[0] == "SSN ***-**-6789"
+
+    def test_stream_matches_whole_text_across_boundaries(self):
+        text = SAMPLE * 40
+        expected, expected_counts = self.engine.redact(text)
+
+        rng = random.Random(3)
+        for _ in range(5):
+            cuts = sorted(rng.sample(range(1, len(text)), 60))
+            pieces = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+            counts = {}
+
+            assert ''.join(self.engine.redact_stream(pieces, counts)) == expected
+            assert counts == expected_counts
+
+    def test_stream_respects_word_boundary_at_piece_start(self):
+        # "9123-45-6789" is not an SSN; a naive per-piece scan would match "123-45-6789"
+        pieces = ["x" * 300 + " 9", "123-45-6789 end"]
+
+        assert ''.join(self.engine.redact_stream(pieces)) == ''.join(pieces)
@@ -35,6 +35,8 @@ class DocumentAdmin(TenantScopedAdminMixin, admin.ModelAdmin):
         "filename",
         "document_type",
         "status",
+        "processing_stage",
+        "processing_progress",
         "tenant",
         "uploaded_by",
         "file_size",
@@ -59,6 +61,9 @@ class DocumentAdmin(TenantScopedAdminMixin, admin.ModelAdmin):
         "r2_key",
         "document_type",
         "status",
+        "processing_stage",
+        "processing_progress",
+        "completed_stages",
         "processing_error",
         "full_text",
         "extracted_metadata_pretty",
@@ -72,6 +77,7 @@ class DocumentAdmin(TenantScopedAdminMixin, admin.ModelAdmin):
         ("tenant", "uploaded_by"),
         ("filename", "file_type"),
         ("document_type", "status"),
+        ("processing_stage", "processing_progress", "completed_stages"),
         "file_size",
         "r2_key",
         "processing_error",
@@ -90,9 +96,19 @@ class DocumentAdmin(TenantScopedAdminMixin, admin.ModelAdmin):
 
     extracted_metadata_pretty.short_description = "Extracted metadata"
 
-    @admin.action(description="Retry processing (set status=uploaded, clear error)")
+    @admin.action(description="Retry processing (re-queue ingestion; completed stages are skipped)")
     def retry_processing(self, request, queryset):
-        queryset.update(status="uploaded", processing_error=None)
+        from repository.tasks import enqueue_document_ingestion
+
+        queued = 0
+        for document_id in queryset.values_list("id", flat=True):
+            try:
+                Document.objects.filter(id=document_id).update(status="processing", processing_error=None)
+                enqueue_document_ingestion(document_id)
+                queued += 1
+            except Exception as e:
+                Document.objects.filter(id=document_id).update(status="failed", processing_error=f"retry: {e}")
+        self.message_user(request, f"Queued {queued} document(s) for processing")
 
 
 @admin.register(DocumentChunk, site=admin_site)
@@ -4,14 +4,24 @@ Handles text extraction, chunking, embedding generation, and metadata extraction
 """
 import re
 import json
-from typing import List, Dict, Optional, Tuple
+import codecs
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from django.conf import settings
 from authentication.r2_service import R2StorageService
 from repository.embeddings_service import VoyageEmbeddingsService
+from redaction.engine import RedactionEngine
 import logging
 
 logger = logging.getLogger(__name__)
 
+_WORD_RE = re.compile(r'\S+')
+
+
+def _count_words(text: str) -> int:
+    """len(text.split()) without building the word list"""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
 
 class DocumentChunkingService:
     """Service for chunking documents into semantic segments"""
@@ -40,18 +50,26 @@ class DocumentChunkingService:
         if not text or len(text.strip()) == 0:
             return []
         
-        # Clean text
-        text = self._clean_text(text)
+        return list(self.chunk_stream([text]))
+    
+    def chunk_stream(self, segments: Iterable[str]) -> Iterator[Dict]:
+        """
+        Chunk a stream of text segments (pages, paragraphs) as if they were one text
+        
+        Segments may split anywhere, even mid-word. Only the current chunk and the
+        trailing unfinished sentence are held in memory.
         
-        # Split into sentences first
-        sentences = self._split_into_sentences(text)
+        Args:
+            segments: Iterable of text pieces in document order
         
-        chunks = []
+        Yields:
+            Chunks with position info (same shape as chunk_text)
+        """
         current_chunk = []
         current_word_count = 0
         start_char_index = 0
         
-        for sentence in sentences:
+        for sentence in self._iter_sentences(segments):
             words = sentence.split()
             word_count = len(words)
             
@@ -60,12 +78,12 @@ class DocumentChunkingService:
                 chunk_text = ' '.join(current_chunk)
                 end_char_index = start_char_index + len(chunk_text)
                 
-                chunks.append({
+                yield {
                     'text': chunk_text,
                     'start_char_index': start_char_index,
                     'end_char_index': end_char_index,
                     'word_count': current_word_count
-                })
+                }
                 
                 # Handle overlap
                 overlap_sentences = current_chunk[-2:] if len(current_chunk) > 1 else current_chunk
@@ -81,14 +99,34 @@ class DocumentChunkingService:
             chunk_text = ' '.join(current_chunk)
             end_char_index = start_char_index + len(chunk_text)
             
-            chunks.append({
+            yield {
                 'text': chunk_text,
                 'start_char_index': start_char_index,
                 'end_char_index': end_char_index,
                 'word_count': current_word_count
-            })
+            }
+    
+    def _iter_sentences(self, segments: Iterable[str]) -> Iterator[str]:
+        """Yield complete sentences, carrying an unfinished one into the next segment"""
+        carry = ''
+        for segment in segments:
+            if not segment:
+                continue
+            raw = carry + segment
+            sentences = self._split_into_sentences(self._clean_text(raw))
+            carry = sentences.pop() if sentences else ''
+            yield from sentences
+            
+            # Text without sentence punctuation: don't let the carry grow unbounded
+            if len(carry.split()) > self.chunk_size:
+                yield carry
+                carry = ''
+            elif carry and raw[-1].isspace():
+                # Keep the word boundary: the next segment starts a new word
+                carry += ' '
         
-        return chunks
+        if carry.strip():
+            yield carry.strip()
     
     @staticmethod
     def _clean_text(text: str) -> str:
@@ -122,53 +160,101 @@ class TextExtractionService:
             Extracted text or None if extraction failed
         """
         try:
-            if file_type.lower() == 'txt':
-                return TextExtractionService._extract_txt(file_obj)
-            elif file_type.lower() == 'pdf':
-                return TextExtractionService._extract_pdf(file_obj)
-            elif file_type.lower() in ['docx', 'doc']:
-                return TextExtractionService._extract_docx(file_obj)
-            else:
-                logger.warning(f"Unsupported file type: {file_type}")
+            segments = TextExtractionService.iter_from_file(file_obj, file_type)
+            if segments is None:
                 return None
+            return ''.join(segments) or None
         except Exception as e:
             logger.error(f"Text extraction error for {file_type}: {str(e)}")
             return None
     
+    @staticmethod
+    def iter_from_file(file_obj, file_type: str) -> Optional[Iterator[str]]:
+        """
+        Extract text from uploaded file one page/paragraph at a time
+        
+        Every yielded segment ends on whitespace, so segments can be fed straight
+        into DocumentChunkingService.chunk_stream.
+        
+        Args:
+            file_obj: Django UploadedFile object
+            file_type: File extension (pdf, docx, txt, etc.)
+        
+        Returns:
+            Iterator of text segments, or None for unsupported file types
+        """
+        file_type = (file_type or '').lower()
+        if file_type == 'txt':
+            return TextExtractionService._iter_txt(file_obj)
+        elif file_type == 'pdf':
+            return TextExtractionService._iter_pdf(file_obj)
+        elif file_type in ['docx', 'doc']:
+            return TextExtractionService._iter_docx(file_obj)
+        else:
+            logger.warning(f"Unsupported file type: {file_type}")
+            return None
+    
     @staticmethod
     def _extract_txt(file_obj) -> str:
         """Extract text from plain text file"""
-        return file_obj.read().decode('utf-8', errors='ignore')
+        return ''.join(TextExtractionService._iter_txt(file_obj))
     
     @staticmethod
     def _extract_pdf(file_obj) -> Optional[str]:
         """Extract text from PDF"""
+        return ''.join(TextExtractionService._iter_pdf(file_obj)) or None
+    
+    @staticmethod
+    def _extract_docx(file_obj) -> Optional[str]:
+        """Extract text from DOCX"""
+        return ''.join(TextExtractionService._iter_docx(file_obj)) or None
+    
+    @staticmethod
+    def _iter_txt(file_obj, block_size: int = 64 * 1024) -> Iterator[str]:
+        """Decode a plain text file block by block, breaking segments on whitespace"""
+        if hasattr(file_obj, 'chunks'):
+            blocks = file_obj.chunks(block_size)
+        else:
+            blocks = iter(lambda: file_obj.read(block_size), b'')
+        
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        pending = ''
+        for block in blocks:
+            pending += block if isinstance(block, str) else decoder.decode(block)
+            cut = max(pending.rfind('\n'), pending.rfind(' '))
+            if cut >= 0:
+                yield pending[:cut + 1]
+                pending = pending[cut + 1:]
+        
+        pending += decoder.decode(b'', final=True)
+        if pending:
+            yield pending
+    
+    @staticmethod
+    def _iter_pdf(file_obj) -> Iterator[str]:
+        """Yield PDF text page by page"""
         try:
             from PyPDF2 import PdfReader
-            
-            reader = PdfReader(file_obj)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
         except ImportError:
             logger.warning("PyPDF2 not installed. PDF extraction unavailable.")
-            return None
+            return
+        
+        reader = PdfReader(file_obj)
+        for page in reader.pages:
+            yield (page.extract_text() or '') + "\n"
     
     @staticmethod
-    def _extract_docx(file_obj) -> Optional[str]:
-        """Extract text from DOCX"""
+    def _iter_docx(file_obj) -> Iterator[str]:
+        """Yield DOCX text paragraph by paragraph"""
         try:
             from docx import Document
-            
-            doc = Document(file_obj)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
         except ImportError:
             logger.warning("python-docx not installed. DOCX extraction unavailable.")
-            return None
+            return
+        
+        doc = Document(file_obj)
+        for paragraph in doc.paragraphs:
+            yield paragraph.text + "\n"
 
 
 class PIIRedactionService:
@@ -182,6 +268,9 @@ class PIIRedactionService:
         'credit_card': r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b',
     }
     
+    # All patterns in one precompiled alternation: a single finditer redacts and counts
+    ENGINE = RedactionEngine(PII_PATTERNS)
+    
     @classmethod
     def redact_pii(cls, text: str) -> Tuple[str, Dict[str, int]]:
         """
@@ -193,16 +282,24 @@ class PIIRedactionService:
         Returns:
             Tuple of (redacted_text, redaction_counts)
         """
-        redacted_text = text
-        redaction_counts = {}
+        return cls.ENGINE.redact(text)
+    
+    @classmethod
+    def redact_stream(cls, segments: Iterable[str], redaction_counts: Dict[str, int]) -> Iterator[str]:
+        """
+        Redact PII from a stream of text pieces (pages, paragraphs)
+        
+        PII split across piece boundaries is still found, so output pieces do not
+        line up with the input pieces.
         
-        for pii_type, pattern in cls.PII_PATTERNS.items():
-            matches = re.findall(pattern, text)
-            if matches:
-                redaction_counts[pii_type] = len(matches)
-                redacted_text = re.sub(pattern, f"[{pii_type.upper()}_REDACTED]", redacted_text)
+        Args:
+            segments: Iterable of text pieces
+            redaction_counts: Dict updated in place with per-type counts
         
-        return redacted_text, redaction_counts
+        Yields:
+            Redacted text pieces
+        """
+        return cls.ENGINE.redact_stream(segments, redaction_counts)
 
 
 class MetadataExtractionService:
@@ -325,6 +422,9 @@ Respond with ONLY valid JSON, no markdown, no code blocks."""
 class DocumentProcessingService:
     """Orchestrator service for complete document processing"""
     
+    # Chunks embedded per Voyage request while streaming
+    EMBEDDING_BATCH_SIZE = 64
+    
     def __init__(self):
         self.chunking_service = DocumentChunkingService()
         self.text_extraction = TextExtractionService()
@@ -332,10 +432,19 @@ class DocumentProcessingService:
         self.metadata_extraction = MetadataExtractionService()
         self.embeddings_service = VoyageEmbeddingsService()
     
-    def process_document(self, file_obj, document_model, r2_service: R2StorageService) -> Dict:
+    def process_document(
+        self,
+        file_obj,
+        document_model,
+        r2_service: R2StorageService,
+    ) -> Dict:
         """
         Complete document processing pipeline
         
+        Extraction, redaction and chunking run as one stream: pages/paragraphs are
+        redacted and chunked as they are read, and chunks are embedded in batches of
+        EMBEDDING_BATCH_SIZE. Only the redacted text (stored on the document) is kept whole.
+        
         Args:
             file_obj: Uploaded file object
             document_model: Document model instance
@@ -345,40 +454,65 @@ class DocumentProcessingService:
             Processing result with status, metadata, chunks, and embeddings
         """
         try:
-            # Step 1: Extract text
+            # Step 1: Extract text (lazily, page by page)
             logger.info(f"Extracting text from {document_model.filename}")
-            full_text = self.text_extraction.extract_from_file(file_obj, document_model.file_type)
+            segments = self.text_extraction.iter_from_file(file_obj, document_model.file_type)
             
-            if not full_text:
+            if segments is None:
                 return {
                     'success': False,
                     'error': 'Failed to extract text from file'
                 }
             
-            # Step 2: Redact PII
+            # Step 2: Redact PII as segments arrive
             logger.info(f"Redacting PII from {document_model.filename}")
-            redacted_text, redaction_counts = self.pii_redaction.redact_pii(full_text)
+            redaction_counts = {}
+            redacted_parts = []
             
-            # Step 3: Extract metadata
-            logger.info(f"Extracting metadata from {document_model.filename}")
-            metadata = self.metadata_extraction.extract_metadata(redacted_text[:3000])
+            def redacted_segments():
+                for part in self.pii_redaction.redact_stream(segments, redaction_counts):
+                    redacted_parts.append(part)
+                    yield part
             
-            # Step 4: Create chunks
+            # Step 3: Create chunks and embed them batch by batch
             logger.info(f"Creating chunks for {document_model.filename}")
-            chunks = self.chunking_service.chunk_text(redacted_text)
+            chunks = []
+            embeddings = []
+            chunk_count = 0
+            embeddings_count = 0
+            chunk_stream = self.chunking_service.chunk_stream(redacted_segments())
+            while True:
+                batch = list(islice(chunk_stream, self.EMBEDDING_BATCH_SIZE))
+                if not batch:
+                    break
+                batch_embeddings = self._generate_chunk_embeddings(batch)
+                chunk_count += len(batch)
+                embeddings_count += sum(1 for e in batch_embeddings if e is not None)
+                chunks.extend(batch)
+                embeddings.extend(batch_embeddings)
             
-            # Step 5: Generate embeddings for chunks
-            logger.info(f"Generating embeddings for {len(chunks)} chunks")
-            embeddings = self._generate_chunk_embeddings(chunks)
+            redacted_text = ''.join(redacted_parts)
+            redacted_parts.clear()
+            total_words = _count_words(redacted_text)
+            if not redacted_text:
+                return {
+                    'success': False,
+                    'error': 'Failed to extract text from file'
+                }
+            logger.info(f"Generated embeddings for {embeddings_count}/{chunk_count} chunks")
+            
+            # Step 4: Extract metadata
+            logger.info(f"Extracting metadata from {document_model.filename}")
+            metadata = self.metadata_extraction.extract_metadata(redacted_text[:3000])
             
             # Update document
             document_model.full_text = redacted_text
             document_model.extracted_metadata = {
                 **metadata,
                 'redaction_counts': redaction_counts,
-                'chunk_count': len(chunks),
-                'total_words': len(redacted_text.split()),
-                'embeddings_generated': sum(1 for e in embeddings if e is not None)
+                'chunk_count': chunk_count,
+                'total_words': total_words,
+                'embeddings_generated': embeddings_count
             }
             document_model.status = 'processed'
             document_model.save()
@@ -390,8 +524,8 @@ class DocumentProcessingService:
                 'chunks': chunks,
                 'embeddings': embeddings,
                 'redaction_counts': redaction_counts,
-                'chunk_count': len(chunks),
-                'embeddings_count': sum(1 for e in embeddings if e is not None)
+                'chunk_count': chunk_count,
+                'embeddings_count': embeddings_count
             }
         
         except Exception as e:
@@ -430,3 +564,257 @@ class DocumentProcessingService:
             embeddings = [None] * len(chunk_texts)
         
         return embeddings
+
+
+class DocumentIngestionPipeline(DocumentProcessingService):
+    """
+    Staged ingestion for an uploaded Document
+    
+    Each stage persists its output and is recorded in Document.completed_stages, so
+    re-running the pipeline (a Celery retry, or a manual retry after a failure)
+    skips finished stages and resumes at the one that failed. Stages are run one per
+    Celery task by repository.tasks, or in-process by run().
+    
+    The stages stream like process_document: extract redacts page by page and
+    records where each page ends in the stored text, and chunk feeds those pages
+    to chunk_stream.
+    """
+    
+    STAGES = ['extract', 'chunk', 'embed', 'metadata']
+    
+    # processing_progress once each stage has finished
+    STAGE_PROGRESS = {
+        'extract': 30,
+        'chunk': 45,
+        'embed': 85,
+        'metadata': 95,
+    }
+    
+    CHUNK_INSERT_BATCH_SIZE = 500
+    
+    def run(self, document_id, file_obj=None):
+        """Run every remaining stage in-process and finish the document"""
+        for stage in self.STAGES:
+            self.run_stage(document_id, stage, file_obj=file_obj)
+        return self.finalize(document_id)
+    
+    def run_stage(self, document_id, stage: str, file_obj=None):
+        """
+        Run one stage unless it already completed
+        
+        Args:
+            document_id: Document UUID
+            stage: One of STAGES
+            file_obj: Uploaded file for the extract stage (downloaded from R2 if None)
+        
+        Returns:
+            The Document
+        """
+        from repository.models import Document
+        
+        if stage not in self.STAGES:
+            raise ValueError(f"Unknown ingestion stage: {stage}")
+        
+        document = Document.objects.get(id=document_id)
+        if stage in (document.completed_stages or []):
+            logger.info(f"Document {document_id}: stage '{stage}' already completed, skipping")
+            return document
+        
+        document.status = 'processing'
+        document.processing_stage = stage
+        document.processing_error = None
+        document.save(update_fields=['status', 'processing_stage', 'processing_error', 'updated_at'])
+        
+        logger.info(f"Document {document_id}: running stage '{stage}'")
+        if stage == 'extract':
+            self._extract(document, file_obj)
+        elif stage == 'chunk':
+            self._chunk(document)
+        elif stage == 'embed':
+            self._embed(document)
+        elif stage == 'metadata':
+            self._metadata(document)
+        
+        document.completed_stages = [*(document.completed_stages or []), stage]
+        document.processing_progress = self.STAGE_PROGRESS[stage]
+        document.save(update_fields=['completed_stages', 'processing_progress', 'updated_at'])
+        return document
+    
+    def finalize(self, document_id):
+        """Mark the document processed once every stage is done"""
+        from django.utils import timezone
+        from repository.models import Document
+        
+        document = Document.objects.get(id=document_id)
+        missing = [stage for stage in self.STAGES if stage not in (document.completed_stages or [])]
+        if missing:
+            raise RuntimeError(f"Cannot finalize document {document_id}: stages not completed: {missing}")
+        
+        document.status = 'processed'
+        document.processing_stage = 'completed'
+        document.processing_progress = 100
+        document.processed_at = timezone.now()
+        document.save(update_fields=['status', 'processing_stage', 'processing_progress', 'processed_at', 'updated_at'])
+        return document
+    
+    @staticmethod
+    def mark_failed(document_id, stage: str, error: str):
+        """Record a stage failure; completed stages are kept for the next attempt"""
+        from repository.models import Document
+        
+        Document.objects.filter(id=document_id).update(
+            status='failed',
+            processing_stage=stage,
+            processing_error=f"{stage}: {error}",
+        )
+    
+    def _extract(self, document, file_obj=None):
+        """Extract and redact text page by page, storing the redacted text"""
+        if file_obj is None:
+            import tempfile
+            # Large uploads spill to disk instead of being held in memory
+            with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spooled:
+                R2StorageService().download_fileobj(document.r2_key, spooled)
+                return self._extract(document, spooled)
+        file_obj.seek(0)
+        
+        segments = self.text_extraction.iter_from_file(file_obj, document.file_type)
+        if segments is None:
+            raise ValueError(f"Unsupported file type: {document.file_type}")
+        
+        redaction_counts = {}
+        parts = []
+        segment_ends = []
+        length = 0
+        for part in self.pii_redaction.redact_stream(segments, redaction_counts):
+            parts.append(part)
+            length += len(part)
+            segment_ends.append(length)
+        full_text = ''.join(parts)
+        parts.clear()
+        if not full_text.strip():
+            raise ValueError('Failed to extract text from file')
+        
+        document.full_text = full_text
+        document.extracted_metadata = {
+            **(document.extracted_metadata or {}),
+            'redaction_counts': redaction_counts,
+            'total_words': _count_words(full_text),
+            # Page/paragraph boundaries for the chunk stage; removed once chunked
+            'segment_ends': segment_ends,
+        }
+        document.save(update_fields=['full_text', 'extracted_metadata', 'updated_at'])
+    
+    @staticmethod
+    def _iter_segments(document) -> Iterator[str]:
+        """The extracted pages of full_text, as recorded by the extract stage"""
+        text = document.full_text or ''
+        # Documents extracted before segment_ends was recorded chunk as one segment
+        ends = (document.extracted_metadata or {}).get('segment_ends') or [len(text)]
+        start = 0
+        for end in ends:
+            yield text[start:end]
+            start = end
+        if start < len(text):
+            yield text[start:]
+    
+    def _chunk(self, document):
+        """Replace the document's chunks with a fresh chunking of the extracted pages"""
+        from django.db import transaction
+        from repository.models import DocumentChunk
+        from repository.search_service import ChunkEmbeddingMatrix
+        
+        chunk_count = 0
+        chunk_stream = self.chunking_service.chunk_stream(self._iter_segments(document))
+        with transaction.atomic():
+            # A retried stage must not leave chunks from the previous attempt behind
+            DocumentChunk.objects.filter(document=document).delete()
+            while True:
+                batch = list(islice(chunk_stream, self.CHUNK_INSERT_BATCH_SIZE))
+                if not batch:
+                    break
+                DocumentChunk.objects.bulk_create([
+                    DocumentChunk(
+                        document=document,
+                        tenant_id=document.tenant_id,
+                        chunk_number=chunk_count + offset,
+                        text=chunk['text'],
+                        start_char_index=chunk['start_char_index'],
+                        end_char_index=chunk['end_char_index'],
+                        is_processed=False,
+                    )
+                    for offset, chunk in enumerate(batch, 1)
+                ])
+                chunk_count += len(batch)
+        
+        # The bulk delete sends no signals, so invalidate the tenant's chunk matrix here
+        ChunkEmbeddingMatrix.invalidate(document.tenant_id)
+        
+        metadata = {**(document.extracted_metadata or {}), 'chunk_count': chunk_count}
+        metadata.pop('segment_ends', None)
+        document.extracted_metadata = metadata
+        document.save(update_fields=['extracted_metadata', 'updated_at'])
+    
+    def _embed(self, document):
+        """Embed chunks that have no embedding yet, one Voyage batch at a time"""
+        from repository.models import Document, DocumentChunk
+        from repository.search_service import ChunkEmbeddingMatrix
+        
+        pending = DocumentChunk.objects.filter(document=document, embedding__isnull=True)
+        total = pending.count()
+        if total and not self.embeddings_service.is_available():
+            logger.warning(f"Voyage AI not available, {total} chunks of document {document.id} left without embeddings")
+            total = 0
+        
+        start, end = self.STAGE_PROGRESS['chunk'], self.STAGE_PROGRESS['embed']
+        done = 0
+        last_number = 0
+        while done < total:
+            batch = list(
+                pending.filter(chunk_number__gt=last_number)
+                .order_by('chunk_number')
+                .only('id', 'chunk_number', 'text')[:self.EMBEDDING_BATCH_SIZE]
+            )
+            if not batch:
+                break
+            
+            embeddings = self.embeddings_service.embed_batch([chunk.text for chunk in batch])
+            for chunk, embedding in zip(batch, embeddings):
+                chunk.embedding = embedding
+                chunk.is_processed = embedding is not None
+            DocumentChunk.objects.bulk_update(batch, ['embedding', 'is_processed'])
+            
+            done += len(batch)
+            last_number = batch[-1].chunk_number
+            Document.objects.filter(id=document.id).update(
+                processing_progress=start + (end - start) * done // total,
+            )
+        
+        embedded = DocumentChunk.objects.filter(document=document, embedding__isnull=False).count()
+        document.extracted_metadata = {**(document.extracted_metadata or {}), 'embeddings_generated': embedded}
+        document.save(update_fields=['extracted_metadata', 'updated_at'])
+        
+        # bulk_update skips post_save, so invalidate the tenant's chunk matrix here
+        ChunkEmbeddingMatrix.invalidate(document.tenant_id)
+    
+    def _metadata(self, document):
+        """Extract contract metadata with Gemini and store it on the document"""
+        from repository.models import DocumentMetadata
+        
+        metadata = self.metadata_extraction.extract_metadata((document.full_text or '')[:3000])
+        
+        DocumentMetadata.objects.update_or_create(
+            document=document,
+            defaults={
+                'tenant_id': document.tenant_id,
+                'parties': metadata.get('parties') or [],
+                'contract_value': metadata.get('contract_value'),
+                'currency': metadata.get('currency'),
+                'summary': metadata.get('summary'),
+                'identified_clauses': metadata.get('identified_clauses') or [],
+                'risk_score': metadata.get('risk_score'),
+            },
+        )
+        
+        document.extracted_metadata = {**(document.extracted_metadata or {}), **metadata}
+        document.save(update_fields=['extracted_metadata', 'updated_at'])
@@ -10,14 +10,17 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from django.utils import timezone
 from django.db.models import Q
 from authentication.r2_service import R2StorageService
+from django.conf import settings
 from repository.models import Document, DocumentChunk, DocumentMetadata
 from repository.document_service import (
+    DocumentIngestionPipeline,
     DocumentProcessingService,
     DocumentChunkingService,
     TextExtractionService,
     MetadataExtractionService,
     PIIRedactionService
 )
+from repository.tasks import enqueue_document_ingestion
 from tenants.models import TenantModel
 import logging
 import uuid
@@ -96,48 +99,45 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 file_size=file_obj.size,
                 r2_key=r2_key,
                 document_type=doc_type,
-                status='processing'
+                status='processing',
+                processing_stage='queued',
             )
             
             logger.info(f"Created document record: {document.id}")
             
-            # Step 3: Process document (text extraction, chunking, metadata)
-            file_obj.seek(0)  # Reset file pointer
-            processing_service = DocumentProcessingService()
-            result = processing_service.process_document(file_obj, document, r2_service)
+            # Step 3: Process document (extract, chunk, embed, metadata) on a Celery
+            # worker; fall back to processing in-request if the broker is unreachable.
+            if getattr(settings, 'DOCUMENT_INGEST_ASYNC', True):
+                try:
+                    task_id = enqueue_document_ingestion(document.id)
+                    logger.info(f"Queued ingestion for document {document.id} (task {task_id})")
+                    return Response({
+                        'success': True,
+                        'document_id': str(document.id),
+                        'filename': document.filename,
+                        'status': document.status,
+                        'processing_stage': document.processing_stage,
+                        'r2_key': r2_key,
+                        'task_id': task_id,
+                        'message': 'Document uploaded; processing in background'
+                    }, status=status.HTTP_202_ACCEPTED)
+                except Exception as e:
+                    logger.warning(f"Could not queue ingestion for {document.id}, processing inline: {str(e)}")
             
-            if not result['success']:
+            pipeline = DocumentIngestionPipeline()
+            try:
+                document = pipeline.run(document.id, file_obj=file_obj)
+            except Exception as e:
+                logger.error(f"Document processing error: {str(e)}", exc_info=True)
+                document.refresh_from_db(fields=['processing_stage'])
+                DocumentIngestionPipeline.mark_failed(document.id, document.processing_stage, str(e))
                 return Response({
                     'success': False,
-                    'error': result.get('error', 'Processing failed')
+                    'document_id': str(document.id),
+                    'error': str(e) or 'Processing failed'
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
-            # Step 4: Create document chunks
-            chunks_created = 0
-            for chunk_num, chunk in enumerate(result['chunks'], 1):
-                DocumentChunk.objects.create(
-                    document=document,
-                    tenant=tenant_obj,
-                    chunk_number=chunk_num,
-                    text=chunk['text'],
-                    start_char_index=chunk['start_char_index'],
-                    end_char_index=chunk['end_char_index'],
-                    is_processed=False  # Will be processed with embeddings in next step
-                )
-                chunks_created += 1
-            
-            # Step 5: Create metadata record
-            DocumentMetadata.objects.create(
-                document=document,
-                tenant=tenant_obj,
-                parties=result['metadata'].get('parties', []),
-                contract_value=result['metadata'].get('contract_value'),
-                currency=result['metadata'].get('currency'),
-                summary=result['metadata'].get('summary'),
-                identified_clauses=result['metadata'].get('identified_clauses', []),
-                risk_score=result['metadata'].get('risk_score')
-            )
-            
+            chunks_created = (document.extracted_metadata or {}).get('chunk_count', 0)
             logger.info(f"Document processed successfully: {document.id} ({chunks_created} chunks)")
             
             return Response({
@@ -158,6 +158,56 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=True, methods=['get'], url_path='status')
+    def processing_status(self, request, pk=None):
+        """
+        GET /api/documents/<id>/status/
+        Ingestion progress: status, current stage and percent complete
+        """
+        document = self.get_object()
+        return Response({
+            'success': True,
+            'document_id': str(document.id),
+            'status': document.status,
+            'processing_stage': document.processing_stage,
+            'processing_progress': document.processing_progress,
+            'completed_stages': document.completed_stages or [],
+            'error': document.processing_error,
+            'chunk_count': (document.extracted_metadata or {}).get('chunk_count'),
+            'processed_at': document.processed_at.isoformat() if document.processed_at else None,
+        })
+    
+    @action(detail=True, methods=['post'], url_path='retry')
+    def retry_processing(self, request, pk=None):
+        """
+        POST /api/documents/<id>/retry/
+        Re-queue a failed ingestion; completed stages are skipped
+        """
+        document = self.get_object()
+        if document.status != 'failed':
+            return Response({
+                'success': False,
+                'error': f'Document is {document.status}; only failed documents can be retried'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            Document.objects.filter(id=document.id).update(status='processing', processing_error=None)
+            task_id = enqueue_document_ingestion(document.id)
+        except Exception as e:
+            logger.error(f"Failed to re-queue document {document.id}: {str(e)}")
+            DocumentIngestionPipeline.mark_failed(document.id, document.processing_stage, str(e))
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        return Response({
+            'success': True,
+            'document_id': str(document.id),
+            'task_id': task_id,
+            'completed_stages': document.completed_stages or [],
+        }, status=status.HTTP_202_ACCEPTED)
+    
     # ==================== RETRIEVE & DOWNLOAD ====================
     
     @action(detail=False, methods=['get'], url_path='download')
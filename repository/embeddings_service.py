@@ -3,12 +3,19 @@ Voyage AI Embeddings Service
 Generates vector embeddings for document chunks using Voyage AI Law-2 model
 Falls back to semantic mock embeddings for testing/demo
 """
+import hashlib
 import json
 import logging
+import threading
+import unicodedata
+from collections import OrderedDict
 from typing import List, Optional, Dict
 from django.conf import settings
+from django.core.cache import caches
 import numpy as np
 
+from clm_backend.metrics import observe, record_cache_lookup
+
 try:
     import voyageai  # type: ignore
 except Exception:  # pragma: no cover
@@ -128,14 +135,22 @@ class VoyageEmbeddingsService:
         if self.client and not self.use_mock:
             try:
                 text_to_embed = text[:8000]
-                response = self.client.embed(
-                    [text_to_embed],
-                    model=self.MODEL,
-                    input_type="document"
-                )
+                cache = get_embedding_cache()
+                cache_key = cache.make_key(self.MODEL, "document", text_to_embed)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+                with observe('embeddings', 'voyage_embed', batch_size=1):
+                    response = self.client.embed(
+                        [text_to_embed],
+                        model=self.MODEL,
+                        input_type="document"
+                    )
                 
                 if response and response.embeddings:
                     embedding = response.embeddings[0]
+                    cache.set(cache_key, embedding)
                     logger.info(f"Generated embedding from Voyage AI ({len(embedding)} dims)")
                     return embedding
                 else:
@@ -178,20 +193,39 @@ class VoyageEmbeddingsService:
                     logger.warning("All texts are empty")
                     return [None] * len(texts)
                 
-                response = self.client.embed(
-                    non_empty_texts,
-                    model=self.MODEL,
-                    input_type="document"
-                )
+                # Only send texts that are not cached yet (and each distinct text once)
+                cache = get_embedding_cache()
+                keys = [cache.make_key(self.MODEL, "document", t) for t in non_empty_texts]
+                embeddings_by_key = cache.get_many(keys)
+                to_embed = {}
+                for key, text in zip(keys, non_empty_texts):
+                    if key not in embeddings_by_key and key not in to_embed:
+                        to_embed[key] = text
                 
-                if response and response.embeddings:
+                response = None
+                if to_embed:
+                    with observe('embeddings', 'voyage_embed', batch_size=len(to_embed)):
+                        response = self.client.embed(
+                            list(to_embed.values()),
+                            model=self.MODEL,
+                            input_type="document"
+                        )
+                
+                if not to_embed or (response and response.embeddings):
+                    if to_embed:
+                        fresh = dict(zip(to_embed.keys(), response.embeddings))
+                        cache.set_many(fresh)
+                        embeddings_by_key.update(fresh)
+                    
                     # Map embeddings back to original indices
                     result = [None] * len(texts)
                     for i, embedding_idx in enumerate(non_empty_indices):
-                        if i < len(response.embeddings):
-                            result[embedding_idx] = response.embeddings[i]
+                        result[embedding_idx] = embeddings_by_key.get(keys[i])
                     
-                    logger.info(f"Generated {len([e for e in result if e is not None])} embeddings from Voyage AI")
+                    logger.info(
+                        f"Generated {len(to_embed)} embeddings from Voyage AI "
+                        f"({len(non_empty_texts) - len(to_embed)} served from cache)"
+                    )
                     return result
                 else:
                     logger.error("Empty response from Voyage AI, falling back to mock")
@@ -234,14 +268,22 @@ class VoyageEmbeddingsService:
         if self.client and not self.use_mock:
             try:
                 query_text = query[:2000]
-                response = self.client.embed(
-                    [query_text],
-                    model=self.MODEL,
-                    input_type="query"
-                )
+                cache = get_embedding_cache()
+                cache_key = cache.make_key(self.MODEL, "query", query_text)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+                with observe('embeddings', 'voyage_embed', batch_size=1):
+                    response = self.client.embed(
+                        [query_text],
+                        model=self.MODEL,
+                        input_type="query"
+                    )
                 
                 if response and response.embeddings:
                     embedding = response.embeddings[0]
+                    cache.set(cache_key, embedding)
                     logger.info(f"Generated query embedding from Voyage AI ({len(embedding)} dims)")
                     return embedding
                 else:
@@ -262,20 +304,196 @@ class VoyageEmbeddingsService:
 
 
 class EmbeddingCacheService:
-    """Service for caching embeddings to reduce API calls"""
-    
-    def __init__(self):
-        """Initialize cache (in-memory for now, can use Redis later)"""
-        self.cache = {}
-    
-    def get(self, text_hash: str) -> Optional[List[float]]:
+    """Content-addressed, two-tier cache for embedding vectors
+
+    Keys are derived from (model, input_type, sha256(normalized text)), so the
+    same text embedded for the same purpose is only ever sent to Voyage once.
+
+    - Tier 1: in-process LRU bounded by entry count and bytes (float32 vectors)
+    - Tier 2: Django cache backend from settings.CACHES (Redis in production)
+
+    Both tiers are best-effort: a failing cache backend never breaks embedding.
+    """
+
+    KEY_PREFIX = 'emb:v1'
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[int] = None,
+        cache_alias: Optional[str] = None,
+    ):
+        """Initialize cache tiers from settings (overridable for tests)"""
+        self.max_entries = int(max_entries if max_entries is not None else getattr(settings, 'EMBEDDING_CACHE_MAX_ENTRIES', 4096))
+        self.max_bytes = int(max_bytes if max_bytes is not None else getattr(settings, 'EMBEDDING_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+        self.timeout = int(timeout if timeout is not None else getattr(settings, 'EMBEDDING_CACHE_TIMEOUT', 30 * 24 * 60 * 60))
+        self.cache_alias = cache_alias or getattr(settings, 'EMBEDDING_CACHE_ALIAS', 'default')
+
+        self._lru: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize text so trivially different inputs share one key"""
+        return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+    @classmethod
+    def make_key(cls, model: str, input_type: str, text: str) -> str:
+        """Build the cache key for a (model, input_type, text) triple"""
+        digest = hashlib.sha256(cls.normalize_text(text).encode('utf-8')).hexdigest()
+        return f"{cls.KEY_PREFIX}:{model}:{input_type}:{digest}"
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[List[float]]:
         """Get cached embedding"""
-        return self.cache.get(text_hash)
-    
-    def set(self, text_hash: str, embedding: List[float]) -> None:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Get cached embeddings for several keys (one round trip to the shared tier)"""
+        found: Dict[str, List[float]] = {}
+        remote_keys = []
+        shared_hits = 0
+
+        with self._lock:
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is None:
+                    remote_keys.append(key)
+                    continue
+                self._lru.move_to_end(key)
+                self.local_hits += 1
+                found[key] = vector.tolist()
+
+        if remote_keys:
+            remote = {}
+            backend = self._backend()
+            if backend is not None:
+                try:
+                    remote = backend.get_many(remote_keys) or {}
+                except Exception as e:
+                    logger.warning(f"Embedding cache read failed: {str(e)}")
+                    remote = {}
+
+            for key in remote_keys:
+                raw = remote.get(key)
+                if raw is None:
+                    with self._lock:
+                        self.misses += 1
+                    continue
+                vector = np.frombuffer(raw, dtype=np.float32)
+                self._remember(key, vector)
+                with self._lock:
+                    self.shared_hits += 1
+                shared_hits += 1
+                found[key] = vector.tolist()
+
+        record_cache_lookup('embeddings', 'local_hit', len(keys) - len(remote_keys))
+        record_cache_lookup('embeddings', 'shared_hit', shared_hits)
+        record_cache_lookup('embeddings', 'miss', len(remote_keys) - shared_hits)
+        return found
+
+    def set(self, key: str, embedding: List[float]) -> None:
         """Cache an embedding"""
-        self.cache[text_hash] = embedding
-    
+        self.set_many({key: embedding})
+
+    def set_many(self, items: Dict[str, List[float]]) -> None:
+        """Cache several embeddings in both tiers"""
+        payload = {}
+        for key, embedding in items.items():
+            if embedding is None:
+                continue
+            vector = np.asarray(embedding, dtype=np.float32)
+            self._remember(key, vector)
+            payload[key] = vector.tobytes()
+
+        if not payload:
+            return
+
+        backend = self._backend()
+        if backend is not None:
+            try:
+                backend.set_many(payload, timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {str(e)}")
+
     def clear(self) -> None:
-        """Clear cache"""
-        self.cache.clear()
+        """Clear the in-process tier and reset counters"""
+        with self._lock:
+            self._lru.clear()
+            self._bytes = 0
+            self.local_hits = 0
+            self.shared_hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and local tier size"""
+        with self._lock:
+            hits = self.local_hits + self.shared_hits
+            total = hits + self.misses
+            return {
+                'local_hits': self.local_hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_rate': (hits / total) if total else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._lru),
+                'bytes': self._bytes,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _backend(self):
+        try:
+            return caches[self.cache_alias]
+        except Exception:
+            return None
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Insert into the local LRU, evicting by count and byte budget"""
+        size = int(vector.nbytes)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            previous = self._lru.pop(key, None)
+            if previous is not None:
+                self._bytes -= int(previous.nbytes)
+
+            self._lru[key] = vector
+            self._bytes += size
+
+            while self._lru and (len(self._lru) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._lru.popitem(last=False)
+                self._bytes -= int(evicted.nbytes)
+                self.evictions += 1
+
+
+_embedding_cache: Optional[EmbeddingCacheService] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCacheService:
+    """Get the process-wide embedding cache shared by all embedding call sites"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCacheService()
+    return _embedding_cache
@@ -0,0 +1,58 @@
+# Generated by Django 5.0 on 2026-10-17
+
+from django.db import migrations
+
+from pgvector.django import HnswIndex, VectorField
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("repository", "0002_document_documentchunk_documentmetadata_and_more"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE EXTENSION IF NOT EXISTS vector;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        # Convert double precision[] -> vector(1024) in place, backfilling existing rows.
+        # Rows whose array does not have 1024 dimensions cannot be indexed and are reset
+        # to NULL (they will be re-embedded on the next processing run).
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=[
+                        "ALTER TABLE document_chunks ADD COLUMN embedding_vec vector(1024) NULL;",
+                        "UPDATE document_chunks SET embedding_vec = embedding::vector(1024) "
+                        "WHERE embedding IS NOT NULL AND array_length(embedding, 1) = 1024;",
+                        "ALTER TABLE document_chunks DROP COLUMN embedding;",
+                        "ALTER TABLE document_chunks RENAME COLUMN embedding_vec TO embedding;",
+                    ],
+                    reverse_sql=[
+                        "ALTER TABLE document_chunks ADD COLUMN embedding_arr double precision[] NULL;",
+                        "UPDATE document_chunks SET embedding_arr = embedding::real[]::double precision[] "
+                        "WHERE embedding IS NOT NULL;",
+                        "ALTER TABLE document_chunks DROP COLUMN embedding;",
+                        "ALTER TABLE document_chunks RENAME COLUMN embedding_arr TO embedding;",
+                    ],
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="documentchunk",
+                    name="embedding",
+                    field=VectorField(blank=True, dimensions=1024, null=True),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="documentchunk",
+            index=HnswIndex(
+                ef_construction=64,
+                fields=["embedding"],
+                m=16,
+                name="document_chunk_embedding_hnsw",
+                opclasses=["vector_cosine_ops"],
+            ),
+        ),
+    ]
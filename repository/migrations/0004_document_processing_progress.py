@@ -0,0 +1,39 @@
+# Generated by Django 5.0 on 2026-10-17 06:31
+
+from django.db import migrations, models
+
+
+def mark_processed_documents_completed(apps, schema_editor):
+    """Documents processed before stage tracking existed are fully ingested"""
+    Document = apps.get_model('repository', 'Document')
+    Document.objects.filter(status='processed').update(
+        processing_stage='completed',
+        processing_progress=100,
+        completed_stages=['extract', 'chunk', 'embed', 'metadata'],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('repository', '0003_documentchunk_embedding_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='completed_stages',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='processing_progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='processing_stage',
+            field=models.CharField(choices=[('queued', 'Queued'), ('extract', 'Extracting text'), ('chunk', 'Chunking'), ('embed', 'Generating embeddings'), ('metadata', 'Extracting metadata'), ('completed', 'Completed')], default='queued', max_length=20),
+        ),
+        migrations.RunPython(mark_processed_documents_completed, migrations.RunPython.noop),
+    ]
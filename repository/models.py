@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from pgvector.django import HnswIndex, VectorField
 from tenants.models import TenantModel
 from authentication.models import User
 import uuid
@@ -49,6 +50,15 @@ class Document(models.Model):
         ('failed', 'Failed'),
     ]
     
+    PROCESSING_STAGE_CHOICES = [
+        ('queued', 'Queued'),
+        ('extract', 'Extracting text'),
+        ('chunk', 'Chunking'),
+        ('embed', 'Generating embeddings'),
+        ('metadata', 'Extracting metadata'),
+        ('completed', 'Completed'),
+    ]
+    
     DOCUMENT_TYPE_CHOICES = [
         ('contract', 'Contract'),
         ('template', 'Template'),
@@ -67,6 +77,10 @@ class Document(models.Model):
     document_type = models.CharField(max_length=20, choices=DOCUMENT_TYPE_CHOICES, default='other')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploaded')
     processing_error = models.TextField(null=True, blank=True)
+    # Ingestion progress (see repository.document_service.DocumentIngestionPipeline)
+    processing_stage = models.CharField(max_length=20, choices=PROCESSING_STAGE_CHOICES, default='queued')
+    processing_progress = models.PositiveSmallIntegerField(default=0)  # 0-100
+    completed_stages = models.JSONField(default=list, blank=True)
     full_text = models.TextField(null=True, blank=True)  
     extracted_metadata = models.JSONField(default=dict, null=True, blank=True)
     
@@ -99,7 +113,8 @@ class DocumentChunk(models.Model):
     text = models.TextField()
     start_char_index = models.IntegerField()
     end_char_index = models.IntegerField()
-    embedding = ArrayField(models.FloatField(), null=True, blank=True)
+    # Voyage law-2 embedding (pgvector). Top-k similarity runs in SQL via the HNSW index.
+    embedding = VectorField(dimensions=1024, null=True, blank=True)
     is_processed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -110,6 +125,13 @@ class DocumentChunk(models.Model):
         indexes = [
             models.Index(fields=['document', 'chunk_number']),
             models.Index(fields=['tenant']),
+            HnswIndex(
+                name='document_chunk_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
         ]
     
     def __str__(self):
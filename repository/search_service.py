@@ -3,16 +3,142 @@ Semantic Search Service
 Performs vector similarity search across document chunks
 """
 import logging
-from typing import List, Dict, Optional
+import threading
+import uuid
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from django.conf import settings
 from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
+from django.core.cache import cache
 from django.db.models import F, Q
 from repository.models import DocumentChunk, Document
 from repository.embeddings_service import VoyageEmbeddingsService
+from repository.vector_search import nearest
 from tenants.models import TenantModel
 
 logger = logging.getLogger(__name__)
 
 
+class ChunkEmbeddingMatrix:
+    """In-process, per-tenant float32 matrix of L2-normalized chunk embeddings
+
+    Used when pgvector is unavailable (or REPOSITORY_CHUNK_SEARCH_BACKEND='memory').
+    The matrix is built once per tenant and reused across queries, so scoring is a
+    single matrix-vector product plus np.argpartition for top-k.
+
+    Staleness is tracked with a per-tenant version stamp in the Django cache, bumped
+    by DocumentChunk save/delete signals (see repository/signals.py), so every worker
+    process notices writes made elsewhere.
+    """
+    
+    VERSION_KEY = 'repository:chunk_matrix_version:{tenant_id}'
+    
+    _matrices: 'OrderedDict[str, ChunkEmbeddingMatrix]' = OrderedDict()
+    _lock = threading.Lock()
+    
+    def __init__(self, tenant_id: str, version: str, chunk_ids: List, matrix: np.ndarray):
+        self.tenant_id = tenant_id
+        self.version = version
+        self.chunk_ids = chunk_ids
+        self.matrix = matrix
+    
+    @classmethod
+    def for_tenant(cls, tenant_id) -> 'ChunkEmbeddingMatrix':
+        """Get the tenant's matrix, rebuilding it if a chunk changed since it was built"""
+        tenant_key = str(tenant_id)
+        version = cls._current_version(tenant_key)
+        
+        with cls._lock:
+            current = cls._matrices.get(tenant_key)
+            if current is not None and current.version == version:
+                cls._matrices.move_to_end(tenant_key)
+                return current
+        
+        built = cls._build(tenant_key, version)
+        
+        with cls._lock:
+            cls._matrices[tenant_key] = built
+            cls._matrices.move_to_end(tenant_key)
+            max_tenants = int(getattr(settings, 'REPOSITORY_CHUNK_MATRIX_MAX_TENANTS', 8))
+            while len(cls._matrices) > max(max_tenants, 1):
+                cls._matrices.popitem(last=False)
+        return built
+    
+    @classmethod
+    def invalidate(cls, tenant_id) -> None:
+        """Mark the tenant's matrix stale in every process"""
+        tenant_key = str(tenant_id)
+        try:
+            cache.set(cls.VERSION_KEY.format(tenant_id=tenant_key), uuid.uuid4().hex, None)
+        except Exception as e:
+            logger.warning(f"Failed to bump chunk matrix version for tenant {tenant_key}: {str(e)}")
+        with cls._lock:
+            cls._matrices.pop(tenant_key, None)
+    
+    @classmethod
+    def _current_version(cls, tenant_key: str) -> Optional[str]:
+        key = cls.VERSION_KEY.format(tenant_id=tenant_key)
+        try:
+            cache.add(key, uuid.uuid4().hex, None)
+            return cache.get(key)
+        except Exception:
+            return None
+    
+    @classmethod
+    def _build(cls, tenant_key: str, version: Optional[str]) -> 'ChunkEmbeddingMatrix':
+        dimension = VoyageEmbeddingsService.EMBEDDING_DIMENSION
+        qs = DocumentChunk.objects.filter(tenant_id=tenant_key, embedding__isnull=False)
+        
+        matrix = np.empty((qs.count(), dimension), dtype=np.float32)
+        chunk_ids = []
+        for chunk_id, embedding in qs.values_list('id', 'embedding').iterator(chunk_size=2000):
+            if embedding is None or len(embedding) != dimension:
+                continue
+            if len(chunk_ids) == matrix.shape[0]:
+                # Rows were added between count() and iteration
+                matrix = np.resize(matrix, (matrix.shape[0] * 2 + 1, dimension))
+            matrix[len(chunk_ids)] = embedding
+            chunk_ids.append(chunk_id)
+        matrix = matrix[:len(chunk_ids)]
+        
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        
+        logger.info(f"Built chunk embedding matrix for tenant {tenant_key}: {matrix.shape[0]} chunks")
+        return cls(tenant_key, version, chunk_ids, matrix)
+    
+    def top_k(self, query_embedding: List[float], k: int, threshold: float) -> List[Tuple]:
+        """
+        Score every chunk with one matrix product and return the best k
+        
+        Returns:
+            List of (chunk_id, similarity) sorted by similarity (descending)
+        """
+        if k <= 0 or not self.chunk_ids:
+            return []
+        
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query_vec)
+        if query_norm == 0:
+            return []
+        
+        scores = self.matrix @ (query_vec / query_norm)
+        
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        candidates = candidates[np.argsort(-scores[candidates])]
+        
+        return [
+            (self.chunk_ids[i], float(scores[i]))
+            for i in candidates
+            if scores[i] > threshold
+        ]
+
+
 class SemanticSearchService:
     """Service for semantic search using pgvector"""
     
@@ -53,61 +179,17 @@ class SemanticSearchService:
             results = []
             
             try:
-                # Method: Use Django ORM with Python-side similarity calculation
-                # Since embeddings are stored as arrays, not pgvector type
-                
-                # Get all chunks with embeddings for this tenant
-                chunks = DocumentChunk.objects.filter(
-                    document__tenant_id=tenant_id,
-                    embedding__isnull=False
-                ).select_related('document')
-                
-                chunk_count = chunks.count()
-                logger.info(f"Found {chunk_count} chunks for tenant {tenant_id} with embeddings")
-                
-                # Calculate cosine similarity for each chunk
-                import numpy as np
-                query_vec = np.array(query_embedding, dtype=np.float32)
-                query_norm = np.linalg.norm(query_vec)
-                
-                chunk_scores = []
-                
-                for chunk in chunks:
+                backend = getattr(settings, 'REPOSITORY_CHUNK_SEARCH_BACKEND', 'pgvector')
+                if backend == 'memory':
+                    scored = self._in_memory_top_k(query_embedding, tenant_id, top_k, threshold)
+                else:
                     try:
-                        # Convert chunk embedding to numpy array
-                        chunk_vec = np.array(chunk.embedding, dtype=np.float32)
-                        chunk_norm = np.linalg.norm(chunk_vec)
-                        
-                        # Calculate cosine similarity
-                        if chunk_norm > 0 and query_norm > 0:
-                            similarity = np.dot(query_vec, chunk_vec) / (query_norm * chunk_norm)
-                        else:
-                            similarity = 0.0
-                        
-                        # Filter by threshold
-                        if similarity > threshold:
-                            chunk_scores.append({
-                                'chunk': chunk,
-                                'similarity': float(similarity)
-                            })
+                        scored = self._pgvector_top_k(query_embedding, tenant_id, top_k, threshold)
                     except Exception as e:
-                        logger.warning(f"Error calculating similarity for chunk {chunk.id}: {str(e)}")
-                        continue
-                
-                # Sort by similarity (descending) and limit
-                chunk_scores.sort(key=lambda x: x['similarity'], reverse=True)
-                chunk_scores = chunk_scores[:top_k]
+                        logger.warning(f"pgvector search unavailable ({str(e)}), using in-process scorer")
+                        scored = self._in_memory_top_k(query_embedding, tenant_id, top_k, threshold)
                 
-                logger.info(f"Semantic search returned {len(chunk_scores)} results above threshold {threshold}")
-                if chunk_scores:
-                    top_sim = chunk_scores[0]['similarity']
-                    logger.info(f"Top similarity score: {top_sim:.6f}")
-                
-                # Format results
-                for item in chunk_scores:
-                    chunk = item['chunk']
-                    similarity = item['similarity']
-                    
+                for chunk, similarity in scored:
                     results.append({
                         'chunk_id': str(chunk.id),
                         'chunk_number': chunk.chunk_number,
@@ -120,7 +202,9 @@ class SemanticSearchService:
                         'source': 'semantic'
                     })
                 
-                logger.info(f"Returning {len(results)} formatted semantic search results")
+                logger.info(f"Semantic search returned {len(results)} results above threshold {threshold}")
+                if results:
+                    logger.info(f"Top similarity score: {results[0]['similarity']:.6f}")
                 return results
             
             except Exception as e:
@@ -131,6 +215,43 @@ class SemanticSearchService:
             logger.error(f"Semantic search failed: {str(e)}")
             return []
     
+    @staticmethod
+    def _result_chunks():
+        """Chunk queryset loading only the columns returned to clients"""
+        return DocumentChunk.objects.select_related('document').only(
+            'id', 'chunk_number', 'text', 'document_id',
+            'document__filename', 'document__document_type',
+        )
+    
+    def _pgvector_top_k(self, query_embedding, tenant_id, top_k, threshold) -> List[Tuple]:
+        """Top-k in SQL: pgvector cosine distance served by the HNSW index
+
+        The threshold is applied to the tenant's k nearest chunks rather than in SQL,
+        so a short result means "nothing closer", not "the index scan ran dry".
+        """
+        chunks = nearest(
+            self._result_chunks().filter(tenant_id=tenant_id, embedding__isnull=False),
+            'embedding', query_embedding, top_k,
+        )
+        return [
+            (chunk, 1.0 - float(chunk.distance))
+            for chunk in chunks
+            if float(chunk.distance) < 1.0 - threshold
+        ]
+    
+    def _in_memory_top_k(self, query_embedding, tenant_id, top_k, threshold) -> List[Tuple]:
+        """Top-k with the cached per-tenant embedding matrix, then one fetch for the winners"""
+        scored = ChunkEmbeddingMatrix.for_tenant(tenant_id).top_k(query_embedding, top_k, threshold)
+        if not scored:
+            return []
+        
+        chunks = self._result_chunks().in_bulk([chunk_id for chunk_id, _ in scored])
+        return [
+            (chunks[chunk_id], similarity)
+            for chunk_id, similarity in scored
+            if chunk_id in chunks
+        ]
+    
     def keyword_search(
         self,
         query: str,
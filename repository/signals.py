@@ -0,0 +1,23 @@
+"""
+Repository signal handlers
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from repository.models import Document, DocumentChunk
+from repository.search_service import ChunkEmbeddingMatrix
+
+
+@receiver(post_save, sender=DocumentChunk)
+def invalidate_chunk_embedding_matrix(sender, instance, **kwargs):
+    """Any chunk write makes the tenant's in-process embedding matrix stale"""
+    ChunkEmbeddingMatrix.invalidate(instance.tenant_id)
+
+
+# No post_delete receiver on DocumentChunk: it would turn off Django's fast delete,
+# loading every chunk (and its vector) on a cascade. Bulk chunk deletes invalidate
+# the matrix themselves; a deleted document's cascade is covered here, once.
+@receiver(post_delete, sender=Document)
+def invalidate_chunk_embedding_matrix_on_document_delete(sender, instance, **kwargs):
+    """A deleted document takes its chunks out of the tenant's matrix"""
+    ChunkEmbeddingMatrix.invalidate(instance.tenant_id)
@@ -0,0 +1,86 @@
+"""
+Celery tasks for document ingestion
+
+One task per DocumentIngestionPipeline stage, linked as a chain. A failing stage is
+retried on its own; stages that already completed are skipped, so retries and
+re-enqueued chains never redo finished work.
+"""
+import logging
+
+from celery import chain, shared_task
+
+from repository.document_service import DocumentIngestionPipeline
+
+logger = logging.getLogger(__name__)
+
+
+def _run_stage(task, document_id: str, stage: str):
+    try:
+        DocumentIngestionPipeline().run_stage(document_id, stage)
+    except Exception as e:
+        logger.error(f"Document {document_id}: stage '{stage}' failed: {str(e)}")
+        if task.request.retries < task.max_retries:
+            raise task.retry(exc=e, countdown=30 * (task.request.retries + 1))
+        DocumentIngestionPipeline.mark_failed(document_id, stage, str(e))
+        # Re-raise so the rest of the chain does not run
+        raise
+    return document_id
+
+
+@shared_task(bind=True, max_retries=3)
+def extract_document_text(self, document_id: str):
+    """Stage 1: download from R2, extract and redact text"""
+    return _run_stage(self, document_id, 'extract')
+
+
+@shared_task(bind=True, max_retries=3)
+def chunk_document(self, document_id: str):
+    """Stage 2: split the redacted text into DocumentChunk rows"""
+    return _run_stage(self, document_id, 'chunk')
+
+
+@shared_task(bind=True, max_retries=3)
+def embed_document_chunks(self, document_id: str):
+    """Stage 3: embed chunks that have no embedding yet"""
+    return _run_stage(self, document_id, 'embed')
+
+
+@shared_task(bind=True, max_retries=3)
+def extract_document_metadata(self, document_id: str):
+    """Stage 4: Gemini metadata extraction"""
+    return _run_stage(self, document_id, 'metadata')
+
+
+@shared_task(bind=True, max_retries=3)
+def finalize_document(self, document_id: str):
+    """Mark the document processed"""
+    try:
+        DocumentIngestionPipeline().finalize(document_id)
+    except Exception as e:
+        logger.error(f"Document {document_id}: finalize failed: {str(e)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=30 * (self.request.retries + 1))
+        raise
+    return document_id
+
+
+def enqueue_document_ingestion(document_id) -> str:
+    """
+    Queue the ingestion chain for a document
+
+    Raises if the broker is unreachable (publishing is not retried), so callers can
+    fall back to DocumentIngestionPipeline.run().
+
+    Returns:
+        Celery id of the chain
+    """
+    document_id = str(document_id)
+    workflow = chain(
+        extract_document_text.si(document_id),
+        chunk_document.si(document_id),
+        embed_document_chunks.si(document_id),
+        extract_document_metadata.si(document_id),
+        finalize_document.si(document_id),
+    )
+    result = workflow.apply_async(retry=False)
+    return result.id
@@ -0,0 +1,154 @@
+"""
+Tests for staged (Celery) document ingestion
+"""
+
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from clm_backend.testing import unit_vector
+from tenants.models import TenantModel
+
+from .document_service import DocumentIngestionPipeline, TextExtractionService
+from .document_views import DocumentViewSet
+from .models import Document, DocumentChunk, DocumentMetadata
+from .tasks import embed_document_chunks
+
+
+TEXT = ' '.join(f"Clause {i} requires notice within {i + 1} days." for i in range(300)) + ' Mail ops@acme.test.'
+
+
+class TestDocumentIngestionPipeline(TestCase):
+    """Stages persist their output and are skipped once completed"""
+
+    def setUp(self):
+        self.tenant = TenantModel.objects.create(name='Acme', domain='acme.test')
+        self.document = Document.objects.create(
+            tenant=self.tenant,
+            filename='msa.txt',
+            file_type='txt',
+            file_size=len(TEXT),
+            r2_key='tenant/acme/msa.txt',
+            status='processing',
+        )
+        self.pipeline = DocumentIngestionPipeline()
+        self.pipeline.EMBEDDING_BATCH_SIZE = 2
+        self.metadata = mock.patch.object(
+            self.pipeline.metadata_extraction, 'extract_metadata',
+            return_value={'parties': ['Acme'], 'summary': 'MSA'},
+        )
+        self.available = mock.patch.object(self.pipeline.embeddings_service, 'is_available', return_value=True)
+        self.metadata.start()
+        self.available.start()
+        self.addCleanup(self.metadata.stop)
+        self.addCleanup(self.available.stop)
+
+    def test_run_processes_every_stage(self):
+        with mock.patch.object(
+            self.pipeline.embeddings_service, 'embed_batch',
+            side_effect=lambda texts: [unit_vector(0) for _ in texts],
+        ):
+            document = self.pipeline.run(self.document.id, file_obj=io.BytesIO(TEXT.encode('utf-8')))
+
+        assert document.status == 'processed'
+        assert document.processing_stage == 'completed'
+        assert document.processing_progress == 100
+        assert document.completed_stages == ['extract', 'chunk', 'embed', 'metadata']
+        assert '[EMAIL_REDACTED]' in document.full_text
+        chunk_count = document.extracted_metadata['chunk_count']
+        assert chunk_count > 2
+        assert DocumentChunk.objects.filter(document=document, is_processed=True).count() == chunk_count
+        assert DocumentMetadata.objects.get(document=document).parties == ['Acme']
+
+    def test_chunk_stage_streams_extracted_pages(self):
+        iter_txt = TextExtractionService._iter_txt
+        with mock.patch.object(TextExtractionService, '_iter_txt', side_effect=lambda f: iter_txt(f, block_size=1024)):
+            self.pipeline.run_stage(self.document.id, 'extract', file_obj=io.BytesIO(TEXT.encode('utf-8')))
+        self.document.refresh_from_db()
+        pages = list(DocumentIngestionPipeline._iter_segments(self.document))
+        assert len(pages) > 1 and ''.join(pages) == self.document.full_text
+
+        self.pipeline.run_stage(self.document.id, 'chunk')
+
+        self.document.refresh_from_db()
+        assert 'segment_ends' not in self.document.extracted_metadata
+        expected = self.pipeline.chunking_service.chunk_text(self.document.full_text)
+        assert list(
+            DocumentChunk.objects.filter(document=self.document).order_by('chunk_number').values_list('text', flat=True)
+        ) == [chunk['text'] for chunk in expected]
+
+    def test_failed_stage_resumes_without_redoing_completed_ones(self):
+        file_obj = io.BytesIO(TEXT.encode('utf-8'))
+        with mock.patch.object(self.pipeline.embeddings_service, 'embed_batch', side_effect=RuntimeError('voyage down')):
+            with self.assertRaises(RuntimeError):
+                self.pipeline.run(self.document.id, file_obj=file_obj)
+        DocumentIngestionPipeline.mark_failed(self.document.id, 'embed', 'voyage down')
+
+        self.document.refresh_from_db()
+        assert self.document.status == 'failed'
+        assert self.document.completed_stages == ['extract', 'chunk']
+        chunk_ids = set(DocumentChunk.objects.filter(document=self.document).values_list('id', flat=True))
+
+        with mock.patch.object(self.pipeline, '_extract') as extract, \
+                mock.patch.object(self.pipeline, '_chunk') as chunk, \
+                mock.patch.object(
+                    self.pipeline.embeddings_service, 'embed_batch',
+                    side_effect=lambda texts: [unit_vector(0) for _ in texts],
+                ):
+            document = self.pipeline.run(self.document.id)
+
+        extract.assert_not_called()
+        chunk.assert_not_called()
+        assert document.status == 'processed'
+        assert set(DocumentChunk.objects.filter(document=document).values_list('id', flat=True)) == chunk_ids
+
+    def test_task_marks_document_failed_after_retries(self):
+        with mock.patch.object(DocumentIngestionPipeline, 'run_stage', side_effect=RuntimeError('boom')) as run_stage:
+            result = embed_document_chunks.apply(args=[str(self.document.id)])
+
+        assert result.failed()
+        assert run_stage.call_count == embed_document_chunks.max_retries + 1
+        self.document.refresh_from_db()
+        assert self.document.status == 'failed'
+        assert self.document.processing_error == 'embed: boom'
+
+
+class TestDocumentStatusEndpoint(TestCase):
+    """GET documents/<id>/status/ reports stage and progress"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='ops@acme.test', password='x')
+        self.tenant = TenantModel.objects.create(id=self.user.tenant_id, name='Acme', domain='acme.test')
+        self.document = Document.objects.create(
+            tenant=self.tenant,
+            filename='msa.pdf',
+            file_type='pdf',
+            file_size=10,
+            r2_key='tenant/acme/status.pdf',
+            status='processing',
+            processing_stage='embed',
+            processing_progress=60,
+            completed_stages=['extract', 'chunk'],
+        )
+
+    def _call(self, method, action):
+        request = getattr(APIRequestFactory(), method)(f'/documents/{self.document.id}/{action}/')
+        force_authenticate(request, user=self.user)
+        view = DocumentViewSet.as_view({method: 'processing_status' if action == 'status' else 'retry_processing'})
+        return view(request, pk=str(self.document.id))
+
+    def test_status_reports_progress(self):
+        response = self._call('get', 'status')
+
+        assert response.status_code == 200
+        assert response.data['processing_stage'] == 'embed'
+        assert response.data['processing_progress'] == 60
+        assert response.data['completed_stages'] == ['extract', 'chunk']
+
+    def test_retry_requires_failed_document(self):
+        response = self._call('post', 'retry')
+
+        assert response.status_code == 400
@@ -0,0 +1,90 @@
+"""
+Tests for the streaming document processing pipeline
+"""
+
+import io
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+
+from .document_service import (
+    DocumentChunkingService,
+    DocumentProcessingService,
+    PIIRedactionService,
+    TextExtractionService,
+)
+
+
+def _contract_text(sentences: int) -> str:
+    return ' '.join(
+        f"Section {i} obliges the Supplier to deliver item {i} within {i % 30 + 1} days."
+        for i in range(sentences)
+    )
+
+
+class TestStreamingChunking(TestCase):
+    """chunk_stream over pages must match chunk_text over the joined text"""
+
+    def test_stream_matches_whole_text(self):
+        chunker = DocumentChunkingService(chunk_size=40)
+        text = _contract_text(60)
+        words = text.split(' ')
+        # Page breaks land mid-sentence, like real PDF pages
+        pages = [' '.join(words[i:i + 37]) + "\n" for i in range(0, len(words), 37)]
+
+        assert list(chunker.chunk_stream(pages)) == chunker.chunk_text(''.join(pages))
+
+    def test_unpunctuated_text_is_bounded(self):
+        chunker = DocumentChunkingService(chunk_size=10)
+        pages = ["word " * 7 + "\n" for _ in range(20)]
+
+        sentences = list(chunker._iter_sentences(pages))
+
+        assert sum(len(s.split()) for s in sentences) == 140
+        # Never carries more than chunk_size words plus one page
+        assert max(len(s.split()) for s in sentences) <= 10 + 7
+
+
+class TestStreamingExtraction(TestCase):
+    """Text files are decoded block by block without splitting words or characters"""
+
+    def test_txt_segments_break_on_whitespace(self):
+        text = "Vertragspartner: Müller GmbH.\n" * 50
+        segments = list(TextExtractionService._iter_txt(io.BytesIO(text.encode('utf-8')), block_size=7))
+
+        assert ''.join(segments) == text
+        assert all(s[-1].isspace() for s in segments[:-1])
+
+    def test_redact_stream_accumulates_counts(self):
+        counts = {}
+        pages = ["Mail a@example.com\n", "or b@example.com, SSN 123-45-6789\n"]
+
+        redacted = list(PIIRedactionService.redact_stream(pages, counts))
+
+        assert counts == {'email': 2, 'ssn': 1}
+        assert '[EMAIL_REDACTED]' in redacted[0]
+
+
+class TestStreamingProcessDocument(TestCase):
+    """process_document embeds chunks in embedding-sized batches"""
+
+    def test_chunks_are_embedded_in_batches(self):
+        document = SimpleNamespace(filename='msa.txt', file_type='txt', save=mock.Mock())
+        file_obj = io.BytesIO((_contract_text(400) + " Contact legal@example.com.").encode('utf-8'))
+
+        service = DocumentProcessingService()
+        service.EMBEDDING_BATCH_SIZE = 2
+        with mock.patch.object(service.metadata_extraction, 'extract_metadata', return_value={'parties': []}), \
+                mock.patch.object(service.embeddings_service, 'is_available', return_value=True), \
+                mock.patch.object(
+                    service.embeddings_service, 'embed_batch', side_effect=lambda texts: [None] * len(texts),
+                ) as embed_batch:
+            result = service.process_document(file_obj, document, r2_service=None)
+
+        assert result['success']
+        assert all(len(call.args[0]) <= 2 for call in embed_batch.call_args_list)
+        assert len(result['chunks']) == len(result['embeddings']) == result['chunk_count'] > 2
+        assert document.extracted_metadata['redaction_counts'] == {'email': 1}
+        assert document.extracted_metadata['total_words'] == len(document.full_text.split())
+        assert document.status == 'processed'
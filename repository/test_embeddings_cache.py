@@ -0,0 +1,86 @@
+"""
+Tests for the content-addressed embedding cache
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from .embeddings_service import EmbeddingCacheService, VoyageEmbeddingsService
+
+
+class FakeVoyageClient:
+    """Records every embed() call and returns a deterministic vector per text"""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts, model=None, input_type=None):
+        self.calls.append(list(texts))
+        return SimpleNamespace(embeddings=[[float(len(t)), 1.0, 0.5] for t in texts])
+
+
+class TestEmbeddingCacheService(TestCase):
+    """Test EmbeddingCacheService"""
+
+    def setUp(self):
+        cache.clear()
+        self.cache = EmbeddingCacheService(max_entries=2)
+
+    def test_key_is_content_addressed(self):
+        """Whitespace-only differences share a key; model and input_type do not"""
+        a = EmbeddingCacheService.make_key('voyage-law-2', 'document', 'Payment  terms\n')
+        b = EmbeddingCacheService.make_key('voyage-law-2', 'document', 'Payment terms')
+        c = EmbeddingCacheService.make_key('voyage-law-2', 'query', 'Payment terms')
+
+        assert a == b
+        assert a != c
+
+    def test_local_then_shared_tier(self):
+        """Entries evicted from the LRU are still served by the shared tier"""
+        for i in range(3):
+            self.cache.set(f'k{i}', [float(i), 0.0])
+
+        stats = self.cache.stats()
+        assert stats['entries'] == 2
+        assert stats['evictions'] == 1
+
+        assert self.cache.get('k0') == [0.0, 0.0]
+        assert self.cache.get('missing') is None
+
+        stats = self.cache.stats()
+        assert stats['shared_hits'] == 1
+        assert stats['misses'] == 1
+
+
+class TestVoyageEmbeddingsServiceCaching(TestCase):
+    """Repeated texts must not go back to the Voyage API"""
+
+    def setUp(self):
+        cache.clear()
+        self.cache = EmbeddingCacheService()
+        patcher = mock.patch('repository.embeddings_service.get_embedding_cache', return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.service = VoyageEmbeddingsService()
+        self.service.client = FakeVoyageClient()
+        self.service.use_mock = False
+
+    def test_embed_text_is_cached(self):
+        first = self.service.embed_text('Confidential information')
+        second = self.service.embed_text('Confidential information')
+
+        assert first == second
+        assert len(self.service.client.calls) == 1
+
+    def test_embed_batch_only_sends_misses_once(self):
+        self.service.embed_text('alpha')
+        result = self.service.embed_batch(['alpha', 'beta', 'beta', ''])
+
+        assert result[0] == [5.0, 1.0, 0.5]
+        assert result[1] == result[2] == [4.0, 1.0, 0.5]
+        assert result[3] is None
+        assert self.service.client.calls == [['alpha'], ['beta']]
@@ -0,0 +1,107 @@
+"""
+Tests for repository semantic search over document chunks
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from clm_backend.testing import unit_vector
+from tenants.models import TenantModel
+
+from .models import Document, DocumentChunk
+from .search_service import ChunkEmbeddingMatrix, SemanticSearchService
+
+
+class TestSemanticSearchService(TestCase):
+    """Top-k chunk similarity is computed in SQL with pgvector"""
+
+    def setUp(self):
+        cache.clear()
+        self.tenant = TenantModel.objects.create(name='Acme', domain='acme.test')
+        self.other_tenant = TenantModel.objects.create(name='Globex', domain='globex.test')
+        self.document = Document.objects.create(
+            tenant=self.tenant,
+            filename='msa.pdf',
+            file_type='pdf',
+            file_size=10,
+            r2_key='tenant/acme/msa.pdf',
+        )
+        other_document = Document.objects.create(
+            tenant=self.other_tenant,
+            filename='other.pdf',
+            file_type='pdf',
+            file_size=10,
+            r2_key='tenant/globex/other.pdf',
+        )
+
+        near = unit_vector(0)
+        near[1] = 0.2
+        self._chunk(self.document, 1, 'exact match', unit_vector(0))
+        self._chunk(self.document, 2, 'close match', near)
+        self._chunk(self.document, 3, 'unrelated', unit_vector(5))
+        self._chunk(other_document, 1, 'other tenant', unit_vector(0))
+
+        self.service = SemanticSearchService()
+
+    def _chunk(self, document, number, text, embedding):
+        return DocumentChunk.objects.create(
+            document=document,
+            tenant=document.tenant,
+            chunk_number=number,
+            text=text,
+            start_char_index=0,
+            end_char_index=len(text),
+            embedding=embedding,
+        )
+
+    def test_semantic_search_orders_by_similarity_within_tenant(self):
+        with mock.patch.object(self.service.embeddings_service, 'embed_query', return_value=unit_vector(0)):
+            results = self.service.semantic_search('payment', str(self.tenant.id), top_k=5, threshold=0.5)
+
+        assert [r['text'] for r in results] == ['exact match', 'close match']
+        assert abs(results[0]['similarity'] - 1.0) < 1e-6
+        assert results[0]['filename'] == 'msa.pdf'
+
+    def test_semantic_search_respects_top_k(self):
+        with mock.patch.object(self.service.embeddings_service, 'embed_query', return_value=unit_vector(0)):
+            results = self.service.semantic_search('payment', str(self.tenant.id), top_k=1, threshold=0.0)
+
+        assert len(results) == 1
+        assert results[0]['text'] == 'exact match'
+
+    @override_settings(REPOSITORY_CHUNK_SEARCH_BACKEND='memory')
+    def test_in_memory_scorer_matches_pgvector(self):
+        with mock.patch.object(self.service.embeddings_service, 'embed_query', return_value=unit_vector(0)):
+            results = self.service.semantic_search('payment', str(self.tenant.id), top_k=5, threshold=0.5)
+
+        assert [r['text'] for r in results] == ['exact match', 'close match']
+        assert abs(results[1]['similarity'] - (1.0 / (1.04 ** 0.5))) < 1e-5
+
+    def test_matrix_is_reused_and_invalidated_on_chunk_save(self):
+        first = ChunkEmbeddingMatrix.for_tenant(self.tenant.id)
+        assert ChunkEmbeddingMatrix.for_tenant(self.tenant.id) is first
+        assert first.matrix.shape == (3, 1024)
+
+        self._chunk(self.document, 4, 'new chunk', unit_vector(7))
+
+        rebuilt = ChunkEmbeddingMatrix.for_tenant(self.tenant.id)
+        assert rebuilt is not first
+        assert rebuilt.matrix.shape == (4, 1024)
+        assert rebuilt.top_k(unit_vector(7), 1, 0.5)[0][1] > 0.99
+
+    def test_document_delete_fast_deletes_chunks_and_invalidates_once(self):
+        first = ChunkEmbeddingMatrix.for_tenant(self.tenant.id)
+
+        with mock.patch.object(ChunkEmbeddingMatrix, 'invalidate', wraps=ChunkEmbeddingMatrix.invalidate) as invalidate, \
+                CaptureQueriesContext(connection) as queries:
+            self.document.delete()
+
+        invalidate.assert_called_once_with(self.tenant.id)
+        # Chunks go in one DELETE without being loaded first
+        chunk_queries = [q['sql'] for q in queries.captured_queries if 'document_chunks' in q['sql']]
+        assert len(chunk_queries) == 1 and chunk_queries[0].startswith('DELETE')
+        assert ChunkEmbeddingMatrix.for_tenant(self.tenant.id) is not first
@@ -0,0 +1,70 @@
+"""
+Filtered nearest-neighbour queries over pgvector HNSW indexes
+
+An HNSW index scan produces the hnsw.ef_search (default 40) nearest rows of the whole
+index; WHERE filters such as tenant or status are applied to those candidates
+afterwards. A tenant whose rows are a small share of the table therefore gets fewer
+than k results, or none. nearest() runs the query in a transaction that
+
+- on pgvector >= 0.8 enables iterative index scans (hnsw.iterative_scan =
+  relaxed_order), so the scan keeps going until k rows pass the filters;
+- on older pgvector raises hnsw.ef_search to PGVECTOR_FILTERED_EF_SEARCH, and
+  repeats the query as an exact scan when it still comes back short.
+"""
+
+import re
+from typing import List
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, FloatField, Value
+from pgvector.django import CosineDistance
+
+ITERATIVE_SCAN_VERSION = (0, 8)
+# pgvector rejects larger values
+MAX_EF_SEARCH = 1000
+
+
+def supports_iterative_scan(using: str = 'default') -> bool:
+    """True when the vector extension has hnsw.iterative_scan (checked once per connection)"""
+    connection = connections[using]
+    supported = getattr(connection, '_pgvector_iterative_scan', None)
+    if supported is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            row = cursor.fetchone()
+        version = tuple(int(part) for part in re.findall(r'\d+', row[0] if row else '')[:2])
+        supported = version >= ITERATIVE_SCAN_VERSION
+        connection._pgvector_iterative_scan = supported
+    return supported
+
+
+def nearest(queryset, field: str, query_embedding, k: int) -> List:
+    """
+    The ``k`` rows of ``queryset`` nearest to ``query_embedding`` by cosine distance
+
+    Rows are annotated with ``distance`` and returned closest first. Filters already
+    on ``queryset`` are honoured even when they exclude most of the index.
+    """
+    if k <= 0:
+        return []
+    queryset = queryset.annotate(distance=CosineDistance(field, query_embedding))
+    using = queryset.db
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return list(queryset.order_by('distance')[:k])
+
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        if supports_iterative_scan(using):
+            cursor.execute('SET LOCAL hnsw.iterative_scan = relaxed_order')
+            # relaxed_order may return the k rows slightly out of order
+            return sorted(queryset.order_by('distance')[:k], key=lambda row: row.distance)
+
+        ef_search = min(max(k, int(getattr(settings, 'PGVECTOR_FILTERED_EF_SEARCH', 400))), MAX_EF_SEARCH)
+        cursor.execute(f'SET LOCAL hnsw.ef_search = {ef_search}')
+        rows = list(queryset.order_by('distance')[:k])
+        if len(rows) < k:
+            # Either the filters leave fewer than k rows or the index scan missed some;
+            # ordering by an expression the index cannot serve forces an exact scan
+            rows = list(queryset.order_by(F('distance') + Value(0.0, output_field=FloatField()))[:k])
+        return rows
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+ENTITY_TYPES = ("contract", "clause")
 
 
 class Command(BaseCommand):
@@ -10,14 +16,22 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--tenant", required=True, help="Tenant UUID")
-        parser.add_argument("--contracts", action="store_true", help="Index contracts")
-        parser.add_argument("--clauses", action="store_true", help="Index clause library")
+        parser.add_argument(
+            "--entity-type",
+            action="append",
+            choices=ENTITY_TYPES,
+            dest="entity_types",
+            help="Entity type to index (repeatable; default: all)",
+        )
+        parser.add_argument("--contracts", action="store_true", help="Index contracts (same as --entity-type contract)")
+        parser.add_argument("--clauses", action="store_true", help="Index clause library (same as --entity-type clause)")
         parser.add_argument("--limit", type=int, default=0, help="Max items per type (0 = no limit)")
+        parser.add_argument("--batch-size", type=int, default=0, help="Items per embedding/upsert batch (default: ModelConfig.INDEX_BATCH_SIZE)")
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent batches (threads)")
         parser.add_argument("--dry-run", action="store_true", help="Print what would be indexed")
 
     def handle(self, *args, **options):
-        from contracts.models import Clause, Contract
-        from search.services import SearchIndexingService
+        from search.services import ModelConfig
 
         tenant_raw = (options.get("tenant") or "").strip()
         try:
@@ -25,70 +39,128 @@ class Command(BaseCommand):
         except Exception as e:
             raise SystemExit(f"Invalid --tenant UUID: {tenant_raw} ({e})")
 
-        do_contracts = bool(options.get("contracts"))
-        do_clauses = bool(options.get("clauses"))
+        entity_types = list(options.get("entity_types") or [])
+        if options.get("contracts") and "contract" not in entity_types:
+            entity_types.append("contract")
+        if options.get("clauses") and "clause" not in entity_types:
+            entity_types.append("clause")
+        if not entity_types:
+            entity_types = list(ENTITY_TYPES)
+
         limit = int(options.get("limit") or 0)
+        batch_size = int(options.get("batch_size") or 0) or ModelConfig.INDEX_BATCH_SIZE
+        workers = max(int(options.get("workers") or 1), 1)
         dry_run = bool(options.get("dry_run"))
 
-        if not do_contracts and not do_clauses:
-            do_contracts = True
-            do_clauses = True
+        totals = {"created": 0, "updated": 0, "skipped": 0, "failed": 0, "indexed": 0}
+        started = time.monotonic()
+
+        for entity_type in entity_types:
+            items = list(self._items(entity_type, tenant_id, limit))
+
+            if dry_run:
+                for item in items:
+                    self.stdout.write(f"[dry-run] {entity_type} {item['entity_id']} title={item['title']!r}")
+                self.stdout.write(self.style.SUCCESS(f"{entity_type.title()}s indexed: {len(items)}"))
+                totals["indexed"] += len(items)
+                continue
+
+            stats = self._index(entity_type, items, str(tenant_id), batch_size, workers)
+            for key in totals:
+                totals[key] += stats[key]
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{entity_type.title()}s indexed: {stats['indexed']} "
+                    f"(created {stats['created']}, updated {stats['updated']}, "
+                    f"unchanged {stats['skipped']}, failed {stats['failed']})"
+                )
+            )
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Total indexed: {totals['indexed']} in {elapsed:.1f}s ({totals['indexed'] / elapsed:.1f} items/s); "
+                f"re-embedded {totals['created'] + totals['updated']}, unchanged {totals['skipped']}"
+            )
+        )
 
-        total_indexed = 0
+    def _items(self, entity_type: str, tenant_id: uuid.UUID, limit: int):
+        from contracts.models import Clause, Contract
 
-        if do_contracts:
+        if entity_type == "contract":
             qs = Contract.objects.filter(tenant_id=tenant_id).order_by("-updated_at")
             if limit > 0:
                 qs = qs[:limit]
 
-            indexed = 0
-            for c in qs:
+            for c in qs.iterator(chunk_size=500):
                 md = c.metadata or {}
                 text = (md.get("rendered_text") or "").strip()
                 if not text:
                     continue
-
-                if dry_run:
-                    self.stdout.write(f"[dry-run] contract {c.id} title={c.title!r}")
-                    indexed += 1
-                    continue
-
-                SearchIndexingService.create_index(
-                    entity_type="contract",
-                    entity_id=str(c.id),
-                    title=c.title or "Contract",
-                    content=text,
-                    tenant_id=str(tenant_id),
-                    keywords=[x for x in [c.contract_type, c.status] if x],
-                )
-                indexed += 1
-
-            total_indexed += indexed
-            self.stdout.write(self.style.SUCCESS(f"Contracts indexed: {indexed}"))
-
-        if do_clauses:
+                yield {
+                    "entity_type": "contract",
+                    "entity_id": str(c.id),
+                    "title": c.title or "Contract",
+                    "content": text,
+                    "keywords": [x for x in [c.contract_type, c.status] if x],
+                }
+
+        elif entity_type == "clause":
             qs = Clause.objects.filter(tenant_id=tenant_id).order_by("-updated_at")
             if limit > 0:
                 qs = qs[:limit]
 
-            indexed = 0
-            for cl in qs:
-                if dry_run:
-                    self.stdout.write(f"[dry-run] clause {cl.id} name={cl.name!r}")
-                    indexed += 1
-                    continue
-
-                SearchIndexingService.create_index(
-                    entity_type="clause",
-                    entity_id=str(cl.id),
-                    title=cl.name or cl.clause_id or "Clause",
-                    content=cl.content or "",
-                    tenant_id=str(tenant_id),
-                    keywords=[x for x in [cl.contract_type, cl.status] if x],
-                )
-                indexed += 1
+            for cl in qs.iterator(chunk_size=500):
+                yield {
+                    "entity_type": "clause",
+                    "entity_id": str(cl.id),
+                    "title": cl.name or cl.clause_id or "Clause",
+                    "content": cl.content or "",
+                    "keywords": [x for x in [cl.contract_type, cl.status] if x],
+                }
 
-            total_indexed += indexed
-            self.stdout.write(self.style.SUCCESS(f"Clauses indexed: {indexed}"))
+    def _index(self, entity_type: str, items: list, tenant_id: str, batch_size: int, workers: int) -> dict:
+        from search.services import SearchIndexingService
 
-        self.stdout.write(self.style.SUCCESS(f"Total indexed: {total_indexed}"))
+        stats = {"created": 0, "updated": 0, "skipped": 0, "failed": 0, "indexed": 0}
+        batches = list(SearchIndexingService.iter_batches(items, batch_size))
+        if not batches:
+            return stats
+
+        done = 0
+        started = time.monotonic()
+
+        def progress(batch_len, batch_stats):
+            nonlocal done
+            done += batch_len
+            for key in stats:
+                stats[key] += batch_stats[key]
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f"[{entity_type}] {done}/{len(items)} processed, {stats['indexed']} indexed, "
+                f"{stats['skipped']} unchanged ({done / elapsed:.1f} items/s)"
+            )
+
+        if workers == 1:
+            for batch in batches:
+                progress(len(batch), SearchIndexingService.bulk_index_stats(batch, tenant_id, batch_size=batch_size))
+            return stats
+
+        def run(batch):
+            try:
+                return SearchIndexingService.bulk_index_stats(batch, tenant_id, batch_size=batch_size)
+            finally:
+                # Worker threads open their own DB connections.
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run, batch): len(batch) for batch in batches}
+            for future in as_completed(futures):
+                try:
+                    batch_stats = future.result()
+                except Exception as e:
+                    self.stderr.write(f"[{entity_type}] batch failed: {e}")
+                    batch_stats = {"created": 0, "updated": 0, "skipped": 0, "failed": futures[future], "indexed": 0}
+                progress(futures[future], batch_stats)
+
+        return stats
@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0004_alter_searchindexmodel_entity_type"),
+    ]
+
+    operations = [
+        # Older data can contain duplicate rows per entity; keep the newest one.
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM search_indices a
+                USING search_indices b
+                WHERE a.tenant_id = b.tenant_id
+                  AND a.entity_type = b.entity_type
+                  AND a.entity_id = b.entity_id
+                  AND (a.updated_at, a.created_at, a.id) < (b.updated_at, b.created_at, b.id);
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="searchindexmodel",
+            constraint=models.UniqueConstraint(
+                fields=("tenant_id", "entity_type", "entity_id"),
+                name="search_index_unique_entity",
+            ),
+        ),
+    ]
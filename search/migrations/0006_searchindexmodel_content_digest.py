@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0005_searchindexmodel_unique_entity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchindexmodel',
+            name='content_digest',
+            field=models.CharField(blank=True, default='', help_text='sha256 of embedding model + title + content; unchanged content is not re-embedded', max_length=64),
+        ),
+    ]
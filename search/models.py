@@ -28,6 +28,12 @@ class SearchIndexModel(models.Model):
     entity_id = models.UUIDField()
     title = models.CharField(max_length=500, db_index=True)
     content = models.TextField()
+    content_digest = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        help_text="sha256 of embedding model + title + content; unchanged content is not re-embedded",
+    )
     keywords = models.JSONField(default=list, help_text="Array of searchable keywords")
     metadata = models.JSONField(default=dict, help_text="Additional metadata for filtering")
     
@@ -54,6 +60,12 @@ class SearchIndexModel(models.Model):
             models.Index(fields=['tenant_id', 'entity_type'], name='tenant_entity_idx'),
             models.Index(fields=['entity_type', 'entity_id'], name='entity_lookup_idx'),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant_id', 'entity_type', 'entity_id'],
+                name='search_index_unique_entity',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.entity_type}: {self.title}"
@@ -4,6 +4,7 @@ from rest_framework import serializers
 class SearchHybridRequestSerializer(serializers.Serializer):
     query = serializers.CharField()
     limit = serializers.IntegerField(required=False, default=20)
+    mode = serializers.ChoiceField(choices=['rrf', 'weighted'], required=False)
 
 
 class SearchAdvancedRequestSerializer(serializers.Serializer):
@@ -3,6 +3,7 @@ Search Services - Production Implementation
 Uses PostgreSQL FTS + Voyage AI Embeddings (Pre-trained Legal Model)
 """
 import os
+import hashlib
 import logging
 import numpy as np
 from typing import List, Dict, Optional, Tuple
@@ -14,6 +15,9 @@ from django.conf import settings
 
 from pgvector.django import CosineDistance
 
+from clm_backend.metrics import instrument, observe
+from repository.embeddings_service import get_embedding_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,6 +37,23 @@ class ModelConfig:
     FTS_STRATEGY = "PostgreSQL FTS + GIN Index"
     SEMANTIC_STRATEGY = "pgvector + Voyage AI Embeddings"
     HYBRID_STRATEGY = "Weighted Hybrid (60% semantic + 30% FTS + 10% recency)"
+    
+    # Hybrid ranking
+    # - "rrf": one SQL statement fusing FTS rank, vector distance and recency
+    #   with reciprocal rank fusion (only the final `limit` rows leave Postgres)
+    # - "weighted": legacy two-query merge in Python
+    HYBRID_MODE = getattr(settings, 'SEARCH_HYBRID_MODE', 'rrf')
+    HYBRID_SEMANTIC_WEIGHT = 0.6
+    HYBRID_FTS_WEIGHT = 0.3
+    HYBRID_RECENCY_WEIGHT = 0.1
+    HYBRID_RRF_K = 60
+    HYBRID_CANDIDATES = 100
+    HYBRID_SEMANTIC_THRESHOLD = 0.6
+    
+    # Voyage request limits (voyage-law-2) and bulk indexing batch size
+    VOYAGE_MAX_BATCH_SIZE = 128
+    VOYAGE_MAX_BATCH_TOKENS = 120_000
+    INDEX_BATCH_SIZE = 128
 
 
 # ============================================================================
@@ -82,6 +103,13 @@ class EmbeddingService:
             return None
         
         try:
+            text_limited = text[:2000]  # Limit to 2000 chars
+            cache = get_embedding_cache()
+            cache_key = cache.make_key(EmbeddingService.MODEL, input_type, text_limited)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
             client = EmbeddingService._get_client()
             
             if not client:
@@ -89,14 +117,16 @@ class EmbeddingService:
                 return None
             
             # Call Voyage AI API
-            response = client.embed(
-                [text[:2000]],  # Limit to 2000 chars
-                model=EmbeddingService.MODEL,
-                input_type=input_type
-            )
+            with observe('embeddings', 'voyage_embed', batch_size=1):
+                response = client.embed(
+                    [text_limited],
+                    model=EmbeddingService.MODEL,
+                    input_type=input_type
+                )
             
             if response and response.embeddings and len(response.embeddings) > 0:
                 embedding = response.embeddings[0]
+                cache.set(cache_key, embedding)
                 logger.debug(f"Generated {len(embedding)}-dim embedding for text ({len(text)} chars)")
                 return embedding
             else:
@@ -120,26 +150,46 @@ class EmbeddingService:
             List of embeddings (some may be None on failure)
         """
         try:
-            client = EmbeddingService._get_client()
-            
-            if not client or len(texts) == 0:
-                return [None] * len(texts)
+            if len(texts) == 0:
+                return []
             
             # Limit each text to 2000 chars
             texts_limited = [t[:2000] if t else "" for t in texts]
             
-            response = client.embed(
-                texts_limited,
-                model=EmbeddingService.MODEL,
-                input_type=input_type
-            )
+            # Serve what we can from the embedding cache; embed each missing text once
+            cache = get_embedding_cache()
+            keys = [cache.make_key(EmbeddingService.MODEL, input_type, t) for t in texts_limited]
+            embeddings_by_key = cache.get_many(keys)
+            to_embed = {}
+            for key, text in zip(keys, texts_limited):
+                if key not in embeddings_by_key and key not in to_embed:
+                    to_embed[key] = text
             
-            if response and response.embeddings:
-                logger.info(f"Generated {len(response.embeddings)} embeddings via Voyage AI")
-                return response.embeddings
-            else:
-                logger.error("Empty batch response from Voyage AI")
-                return [None] * len(texts)
+            if to_embed:
+                client = EmbeddingService._get_client()
+                if not client:
+                    return [embeddings_by_key.get(k) for k in keys]
+                
+                with observe('embeddings', 'voyage_embed', batch_size=len(to_embed)):
+                    response = client.embed(
+                        list(to_embed.values()),
+                        model=EmbeddingService.MODEL,
+                        input_type=input_type
+                    )
+                
+                if not (response and response.embeddings):
+                    logger.error("Empty batch response from Voyage AI")
+                    return [embeddings_by_key.get(k) for k in keys]
+                
+                fresh = dict(zip(to_embed.keys(), response.embeddings))
+                cache.set_many(fresh)
+                embeddings_by_key.update(fresh)
+            
+            logger.info(
+                f"Generated {len(to_embed)} embeddings via Voyage AI "
+                f"({len(texts) - len(to_embed)} served from cache)"
+            )
+            return [embeddings_by_key.get(k) for k in keys]
         
         except Exception as e:
             logger.error(f"Batch embedding failed: {str(e)}")
@@ -161,6 +211,7 @@ class FullTextSearchService:
     """
     
     @staticmethod
+    @instrument('search', 'fts')
     def search(query: str, tenant_id: str, limit: int = 50, entity_type: str | None = None):
         """
         Perform PostgreSQL FTS search
@@ -193,9 +244,11 @@ class FullTextSearchService:
                 score=(0.85 * F('rank')) + (0.15 * F('trigram'))
             )
 
-            results = qs.order_by('-score')[:limit]
+            with observe('search', 'fts_query'):
+                results = qs.order_by('-score')[:limit]
+                count = len(results)
             
-            logger.info(f"FTS Search: '{query}' returned {len(results)} results (strategy={ModelConfig.FTS_STRATEGY})")
+            logger.info(f"FTS Search: '{query}' returned {count} results (strategy={ModelConfig.FTS_STRATEGY})")
             return results
         
         except Exception as e:
@@ -239,6 +292,7 @@ class SemanticSearchService:
     """
     
     @staticmethod
+    @instrument('search', 'semantic')
     def search(query: str, tenant_id: str, 
                similarity_threshold: float = 0.6, 
                limit: int = 50,
@@ -282,7 +336,8 @@ class SemanticSearchService:
                 .order_by('-similarity')[:limit]
             )
 
-            results = list(qs)
+            with observe('search', 'pgvector_query'):
+                results = list(qs)
             logger.info(
                 f"Semantic search (pgvector+Voyage): '{query}' returned {len(results)} results "
                 f"(threshold={similarity_threshold})"
@@ -329,7 +384,8 @@ class HybridSearchService:
     """
     
     @staticmethod
-    def search(query: str, tenant_id: str, limit: int = 20) -> list:
+    @instrument('search', 'hybrid')
+    def search(query: str, tenant_id: str, limit: int = 20, mode: str | None = None) -> list:
         """
         Perform hybrid search combining multiple strategies
         
@@ -337,10 +393,119 @@ class HybridSearchService:
             query: Search query
             tenant_id: Filter by tenant
             limit: Max results
+            mode: "rrf" (single SQL statement) or "weighted" (legacy merge);
+                  defaults to ModelConfig.HYBRID_MODE
         
         Returns:
             Results sorted by hybrid score (highest first)
         """
+        mode = (mode or ModelConfig.HYBRID_MODE or 'rrf').lower()
+        if mode == 'rrf':
+            try:
+                return HybridSearchService._search_rrf(query, tenant_id, limit)
+            except Exception as e:
+                logger.error(f"RRF hybrid search failed, using weighted merge: {str(e)}")
+        
+        return HybridSearchService._search_weighted(query, tenant_id, limit)
+    
+    @staticmethod
+    def _search_rrf(query: str, tenant_id: str, limit: int = 20) -> list:
+        """
+        Hybrid search in one CTE-based SQL statement using reciprocal rank fusion
+        
+        Each candidate list (FTS, vector) contributes weight * (k + 1) / (k + rank),
+        so the top hit of a list scores exactly its weight, matching the scale of the
+        weighted merge. Recency is computed in SQL from created_at.
+        """
+        from .models import SearchIndexModel
+        
+        query_embedding = EmbeddingService.generate(query, input_type="query")
+        
+        params = {
+            'query': query,
+            'tenant_id': str(tenant_id),
+            'candidates': int(ModelConfig.HYBRID_CANDIDATES),
+            'rrf_k': float(ModelConfig.HYBRID_RRF_K),
+            'w_semantic': float(ModelConfig.HYBRID_SEMANTIC_WEIGHT),
+            'w_fts': float(ModelConfig.HYBRID_FTS_WEIGHT),
+            'w_recency': float(ModelConfig.HYBRID_RECENCY_WEIGHT),
+            'max_distance': 1.0 - float(ModelConfig.HYBRID_SEMANTIC_THRESHOLD),
+            'limit': int(limit),
+        }
+        
+        if query_embedding:
+            params['embedding'] = '[' + ','.join(str(float(x)) for x in query_embedding) + ']'
+            semantic_cte = """
+                SELECT id, ROW_NUMBER() OVER (ORDER BY distance) AS rank_pos
+                FROM (
+                    SELECT id, embedding <=> %(embedding)s::vector AS distance
+                    FROM {table}
+                    WHERE tenant_id = %(tenant_id)s AND embedding IS NOT NULL
+                    ORDER BY distance
+                    LIMIT %(candidates)s
+                ) s
+                WHERE distance <= %(max_distance)s::float8
+            """
+        else:
+            logger.warning(f"Failed to generate query embedding, hybrid search uses FTS only: '{query}'")
+            semantic_cte = "SELECT NULL::uuid AS id, NULL::bigint AS rank_pos WHERE false"
+        
+        sql = ("""
+            WITH fts AS (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY score DESC) AS rank_pos
+                FROM (
+                    SELECT id,
+                           0.85 * COALESCE(ts_rank(search_vector, plainto_tsquery(%(query)s)), 0)
+                           + 0.15 * similarity(title, %(query)s) AS score
+                    FROM {table}
+                    WHERE tenant_id = %(tenant_id)s
+                      AND (search_vector @@ plainto_tsquery(%(query)s) OR similarity(title, %(query)s) >= 0.2)
+                    ORDER BY score DESC
+                    LIMIT %(candidates)s
+                ) f
+            ),
+            semantic AS (""" + semantic_cte + """),
+            fused AS (
+                SELECT COALESCE(fts.id, semantic.id) AS id,
+                       fts.rank_pos AS fts_rank,
+                       semantic.rank_pos AS semantic_rank
+                FROM fts FULL OUTER JOIN semantic ON fts.id = semantic.id
+            ),
+            scored AS (
+                SELECT si.*,
+                       COALESCE((%(rrf_k)s::float8 + 1) / (%(rrf_k)s::float8 + fused.fts_rank), 0) AS fts_score,
+                       COALESCE((%(rrf_k)s::float8 + 1) / (%(rrf_k)s::float8 + fused.semantic_rank), 0) AS semantic_score,
+                       (CASE
+                           WHEN si.created_at IS NULL THEN 0.5
+                           WHEN si.created_at > now() - interval '7 days' THEN 1.0
+                           WHEN si.created_at > now() - interval '30 days' THEN 0.8
+                           WHEN si.created_at > now() - interval '90 days' THEN 0.6
+                           ELSE 0.5
+                       END)::float8 AS recency_score,
+                       CASE
+                           WHEN fused.fts_rank IS NOT NULL AND fused.semantic_rank IS NOT NULL THEN 'hybrid'
+                           WHEN fused.fts_rank IS NOT NULL THEN 'fts'
+                           ELSE 'semantic'
+                       END AS hybrid_source
+                FROM fused JOIN {table} si ON si.id = fused.id
+            )
+            SELECT *,
+                   %(w_semantic)s::float8 * semantic_score + %(w_fts)s::float8 * fts_score
+                   + %(w_recency)s::float8 * recency_score
+                       AS final_score
+            FROM scored
+            ORDER BY final_score DESC
+            LIMIT %(limit)s
+        """).format(table=SearchIndexModel._meta.db_table)
+        
+        with observe('search', 'rrf_query'):
+            results = list(SearchIndexModel.objects.raw(sql, params))
+        logger.info(f"Hybrid search (rrf): '{query}' returned {len(results)} results")
+        return results
+    
+    @staticmethod
+    def _search_weighted(query: str, tenant_id: str, limit: int = 20) -> list:
+        """Legacy hybrid search: two candidate queries merged in Python"""
         
         # Step 1: Get FTS results
         fts_results = FullTextSearchService.search(query, tenant_id, limit=100)
@@ -382,9 +547,9 @@ class HybridSearchService:
         # Step 4: Calculate final scores using weights
         for result_id, scores in merged.items():
             scores['final_score'] = (
-                (0.6 * scores['semantic_score']) +
-                (0.3 * scores['fts_score']) +
-                (0.1 * scores['recency_score'])
+                (ModelConfig.HYBRID_SEMANTIC_WEIGHT * scores['semantic_score']) +
+                (ModelConfig.HYBRID_FTS_WEIGHT * scores['fts_score']) +
+                (ModelConfig.HYBRID_RECENCY_WEIGHT * scores['recency_score'])
             )
 
             # Attach scores onto the model object for serialization/metadata.
@@ -606,49 +771,54 @@ class SearchIndexingService:
         from .models import SearchIndexModel
         
         try:
-            # Generate embedding (best-effort). If the embeddings provider is not
-            # configured (or key is invalid), still create the index entry.
-            embedding = None
-            try:
-                embedding = EmbeddingService.generate(
-                    f"{title}\n\n{content}",
-                    input_type="document",
-                )
-            except Exception as e:
-                logger.warning(f"Embedding generation failed (continuing without embedding): {str(e)}")
+            digest = SearchIndexingService.content_digest(title, content)
             
-            qs = SearchIndexModel.objects.filter(
+            # (tenant_id, entity_type, entity_id) is unique (search_index_unique_entity)
+            existing = SearchIndexModel.objects.filter(
                 tenant_id=tenant_id,
                 entity_type=entity_type,
                 entity_id=entity_id,
-            )
-
-            # Defensive: older data can contain duplicates (no unique constraint).
-            # Keep the newest row and delete the rest to prevent update_or_create()
-            # from raising MultipleObjectsReturned.
-            existing = qs.order_by('-updated_at', '-created_at').first()
-            try:
-                if qs.count() > 1 and existing:
-                    qs.exclude(id=existing.id).delete()
-            except Exception:
-                pass
+            ).first()
             existing_md = (getattr(existing, 'metadata', None) or {}) if existing else {}
 
             merged_md = {
                 **(existing_md if isinstance(existing_md, dict) else {}),
                 **(metadata if isinstance(metadata, dict) else {}),
-                'embedding_hash': hash(str(embedding)[:100]),
                 'indexed_by': 'SearchIndexingService',
             }
+            merged_md.pop('embedding_hash', None)
+            
+            if existing is not None and existing.content_digest == digest:
+                # Same title/content as indexed: keep search_vector, only fill a
+                # missing embedding and carry keyword/metadata changes.
+                changed_fields = []
+                if existing.embedding is None:
+                    embedding = SearchIndexingService._embed_document(title, content)
+                    if embedding is not None:
+                        existing.embedding = embedding
+                        changed_fields.append('embedding')
+                if existing.keywords != (keywords or []):
+                    existing.keywords = keywords or []
+                    changed_fields.append('keywords')
+                if existing.metadata != merged_md:
+                    existing.metadata = merged_md
+                    changed_fields.append('metadata')
+                if changed_fields:
+                    existing.save(update_fields=changed_fields + ['updated_at'])
+                logger.info(f"Index {'updated' if changed_fields else 'unchanged'} (content digest match): {entity_id}")
+                return existing, False
+            
+            embedding = SearchIndexingService._embed_document(title, content)
 
             if existing:
                 # Update in-place (avoids any chance of MultipleObjectsReturned)
                 existing.title = title
                 existing.content = content
+                existing.content_digest = digest
                 existing.keywords = keywords or []
                 existing.embedding = embedding
                 existing.metadata = merged_md
-                existing.save(update_fields=['title', 'content', 'keywords', 'embedding', 'metadata', 'updated_at'])
+                existing.save(update_fields=['title', 'content', 'content_digest', 'keywords', 'embedding', 'metadata', 'updated_at'])
                 index_obj, created = existing, False
             else:
                 index_obj = SearchIndexModel.objects.create(
@@ -657,6 +827,7 @@ class SearchIndexingService:
                     entity_id=entity_id,
                     title=title,
                     content=content,
+                    content_digest=digest,
                     keywords=keywords or [],
                     embedding=embedding,
                     metadata=merged_md,
@@ -678,25 +849,182 @@ class SearchIndexingService:
             raise
     
     @staticmethod
-    def bulk_index(items: List[Dict], tenant_id: str) -> int:
-        """Bulk create/update indexes"""
-        count = 0
-        for item in items:
+    def content_digest(title: str, content: str) -> str:
+        """Stable digest of everything that feeds the embedding and search_vector"""
+        payload = f"{EmbeddingService.MODEL}\x00{title or ''}\x00{content or ''}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _embed_document(title: str, content: str):
+        # Best-effort: if the embeddings provider is not configured (or key is
+        # invalid), still create the index entry.
+        try:
+            return EmbeddingService.generate(f"{title}\n\n{content}", input_type="document")
+        except Exception as e:
+            logger.warning(f"Embedding generation failed (continuing without embedding): {str(e)}")
+            return None
+    
+    @staticmethod
+    def bulk_index(items: List[Dict], tenant_id: str, batch_size: int | None = None) -> int:
+        """
+        Bulk create/update indexes
+        
+        Returns:
+            Number of items indexed (created, updated or already up to date)
+        """
+        return SearchIndexingService.bulk_index_stats(items, tenant_id, batch_size=batch_size)['indexed']
+    
+    @staticmethod
+    def bulk_index_stats(items: List[Dict], tenant_id: str, batch_size: int | None = None) -> Dict:
+        """
+        Bulk create/update indexes, reporting what was actually written
+        
+        Items are grouped into batches that fit Voyage request limits. Each batch costs
+        one SELECT (existing digests/metadata), at most one batch_generate call for
+        items whose title/content changed, and one INSERT ... ON CONFLICT DO UPDATE
+        per kind of change. Items whose content digest matches are not re-embedded.
+        
+        Returns:
+            {'created', 'updated', 'skipped', 'failed', 'indexed'}
+        """
+        stats = {'created': 0, 'updated': 0, 'skipped': 0, 'failed': 0}
+        for batch in SearchIndexingService.iter_batches(items, batch_size):
             try:
-                SearchIndexingService.create_index(
-                    entity_type=item['entity_type'],
-                    entity_id=item['entity_id'],
-                    title=item['title'],
-                    content=item['content'],
-                    tenant_id=tenant_id,
-                    keywords=item.get('keywords', [])
-                )
-                count += 1
+                batch_stats = SearchIndexingService.bulk_upsert_batch(batch, tenant_id)
             except Exception as e:
-                logger.error(f"Bulk index failed for {item['entity_id']}: {str(e)}")
+                logger.error(f"Bulk index batch failed ({len(batch)} items): {str(e)}")
+                stats['failed'] += len(batch)
                 continue
+            for key, value in batch_stats.items():
+                stats[key] += value
+        
+        stats['indexed'] = stats['created'] + stats['updated'] + stats['skipped']
+        return stats
+    
+    @staticmethod
+    def iter_batches(items: List[Dict], batch_size: int | None = None):
+        """Yield lists of items bounded by item count and estimated Voyage tokens"""
+        max_items = min(int(batch_size or ModelConfig.INDEX_BATCH_SIZE), ModelConfig.VOYAGE_MAX_BATCH_SIZE)
+        max_items = max(max_items, 1)
+        
+        batch, batch_tokens = [], 0
+        for item in items:
+            # ~4 chars per token; batch_generate truncates each text to 2000 chars
+            tokens = min(len(item.get('title') or '') + len(item.get('content') or '') + 2, 2000) // 4 + 1
+            if batch and (len(batch) >= max_items or batch_tokens + tokens > ModelConfig.VOYAGE_MAX_BATCH_TOKENS):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(item)
+            batch_tokens += tokens
+        
+        if batch:
+            yield batch
+    
+    @staticmethod
+    def bulk_upsert_batch(items: List[Dict], tenant_id: str) -> Dict:
+        """Embed and upsert one batch of items (see bulk_index_stats)"""
+        from .models import SearchIndexModel
+        from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+        
+        stats = {'created': 0, 'updated': 0, 'skipped': 0}
+        
+        # Last write wins for repeated entities (ON CONFLICT cannot touch a row twice)
+        unique_items = {}
+        for item in items:
+            unique_items[(item['entity_type'], str(item['entity_id']))] = item
+        items = list(unique_items.values())
+        if not items:
+            return stats
+        
+        existing = {
+            (row['entity_type'], str(row['entity_id'])): row
+            for row in SearchIndexModel.objects.filter(
+                tenant_id=tenant_id,
+                entity_id__in=[item['entity_id'] for item in items],
+            ).annotate(
+                has_embedding=ExpressionWrapper(Q(embedding__isnull=False), output_field=BooleanField()),
+            ).values('entity_type', 'entity_id', 'metadata', 'keywords', 'content_digest', 'has_embedding')
+        }
+        
+        plans = []
+        for item in items:
+            row = existing.get((item['entity_type'], str(item['entity_id'])))
+            previous_md = (row or {}).get('metadata') or {}
+            metadata = {
+                **(previous_md if isinstance(previous_md, dict) else {}),
+                **(item.get('metadata') if isinstance(item.get('metadata'), dict) else {}),
+                'indexed_by': 'SearchIndexingService',
+            }
+            metadata.pop('embedding_hash', None)
+            digest = SearchIndexingService.content_digest(item['title'], item['content'])
+            plans.append({
+                'item': item,
+                'row': row,
+                'digest': digest,
+                'metadata': metadata,
+                'keywords': item.get('keywords') or [],
+                'content_changed': row is None or row['content_digest'] != digest,
+                'needs_embedding': row is None or row['content_digest'] != digest or not row['has_embedding'],
+            })
+        
+        to_embed = [plan for plan in plans if plan['needs_embedding']]
+        if to_embed:
+            embeddings = EmbeddingService.batch_generate(
+                [f"{plan['item']['title']}\n\n{plan['item']['content']}" for plan in to_embed],
+                input_type="document",
+            )
+            for plan, embedding in zip(to_embed, embeddings):
+                plan['embedding'] = embedding
         
-        return count
+        # Group writes by the columns they touch so unchanged columns are left alone
+        full, embedding_only, metadata_only = [], [], []
+        for plan in plans:
+            item, row = plan['item'], plan['row']
+            obj = SearchIndexModel(
+                tenant_id=tenant_id,
+                entity_type=item['entity_type'],
+                entity_id=item['entity_id'],
+                title=item['title'],
+                content=item['content'],
+                content_digest=plan['digest'],
+                keywords=plan['keywords'],
+                embedding=plan.get('embedding'),
+                metadata=plan['metadata'],
+            )
+            if plan['content_changed']:
+                obj.search_vector = (
+                    SearchVector(Value(item['title']), weight='A') +
+                    SearchVector(Value(item['content']), weight='B')
+                )
+                full.append(obj)
+                stats['created' if row is None else 'updated'] += 1
+            elif plan.get('embedding') is not None:
+                embedding_only.append(obj)
+                stats['updated'] += 1
+            elif row['keywords'] != plan['keywords'] or row['metadata'] != plan['metadata']:
+                metadata_only.append(obj)
+                stats['updated'] += 1
+            else:
+                stats['skipped'] += 1
+        
+        for objs, update_fields in (
+            (full, ['title', 'content', 'content_digest', 'keywords', 'embedding', 'metadata', 'search_vector', 'indexed_at']),
+            (embedding_only, ['keywords', 'embedding', 'metadata']),
+            (metadata_only, ['keywords', 'metadata']),
+        ):
+            if objs:
+                SearchIndexModel.objects.bulk_create(
+                    objs,
+                    update_conflicts=True,
+                    unique_fields=['tenant_id', 'entity_type', 'entity_id'],
+                    update_fields=update_fields + ['updated_at'],
+                )
+        
+        logger.info(
+            f"Bulk indexed tenant {tenant_id}: {stats['created']} created, "
+            f"{stats['updated']} updated, {stats['skipped']} unchanged"
+        )
+        return stats
     
     @staticmethod
     def delete_index(entity_id: str):
@@ -0,0 +1,181 @@
+"""
+Tests for search services
+"""
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.postgres.search import SearchVector
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from clm_backend.testing import unit_vector
+
+from .models import SearchIndexModel
+from .services import HybridSearchService, ModelConfig, SearchIndexingService
+
+
+class HybridSearchRRFTests(TestCase):
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        self.both = self._index('Payment terms', 'Invoices are payable within thirty days.', unit_vector(0))
+        self.fts_only = self._index('Payment schedule', 'Payment is due monthly.', unit_vector(9))
+        self.semantic_only = self._index('Fees', 'Amounts owed are settled net 30.', unit_vector(0))
+        self._index('Governing law', 'Delaware law governs.', unit_vector(5))
+        self._index('Payment terms', 'Other tenant.', unit_vector(0), tenant_id=uuid.uuid4())
+
+        SearchIndexModel.objects.update(
+            search_vector=SearchVector('title', weight='A') + SearchVector('content', weight='B')
+        )
+        SearchIndexModel.objects.filter(id=self.semantic_only.id).update(
+            created_at=timezone.now() - timedelta(days=365)
+        )
+
+    def _index(self, title, content, embedding, tenant_id=None):
+        return SearchIndexModel.objects.create(
+            tenant_id=tenant_id or self.tenant_id,
+            entity_type='contract',
+            entity_id=uuid.uuid4(),
+            title=title,
+            content=content,
+            embedding=embedding,
+        )
+
+    def test_rrf_fuses_fts_vector_and_recency_in_one_query(self):
+        with mock.patch('search.services.EmbeddingService.generate', return_value=unit_vector(0)):
+            with self.assertNumQueries(1):
+                results = HybridSearchService.search('payment', str(self.tenant_id), limit=10, mode='rrf')
+
+        ids = [r.id for r in results]
+        assert ids[0] == self.both.id
+        assert set(ids) == {self.both.id, self.fts_only.id, self.semantic_only.id}
+
+        top = results[0]
+        assert top.hybrid_source == 'hybrid'
+        assert abs(top.semantic_score - 1.0) < 1e-9
+        assert abs(top.final_score - (0.6 * top.semantic_score + 0.3 * top.fts_score + 0.1 * 1.0)) < 1e-9
+
+        by_id = {r.id: r for r in results}
+        assert by_id[self.fts_only.id].hybrid_source == 'fts'
+        assert by_id[self.semantic_only.id].hybrid_source == 'semantic'
+        assert by_id[self.semantic_only.id].recency_score == 0.5
+
+        metadata = HybridSearchService.get_hybrid_metadata(results)
+        assert metadata[0]['relevance_score'] == top.final_score
+
+    def test_rrf_returns_only_limit_rows(self):
+        with mock.patch('search.services.EmbeddingService.generate', return_value=unit_vector(0)):
+            results = HybridSearchService.search('payment', str(self.tenant_id), limit=1, mode='rrf')
+
+        assert [r.id for r in results] == [self.both.id]
+
+    def test_rrf_without_query_embedding_uses_fts_only(self):
+        with mock.patch('search.services.EmbeddingService.generate', return_value=None):
+            results = HybridSearchService.search('payment', str(self.tenant_id), limit=10, mode='rrf')
+
+        assert {r.id for r in results} == {self.both.id, self.fts_only.id}
+        assert all(r.hybrid_source == 'fts' for r in results)
+
+
+class BulkIndexTests(TestCase):
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+
+    def _items(self, n, prefix='Clause'):
+        return [
+            {
+                'entity_type': 'clause',
+                'entity_id': str(uuid.UUID(int=i + 1)),
+                'title': f'{prefix} {i}',
+                'content': f'Indemnification obligations number {i}.',
+            }
+            for i in range(n)
+        ]
+
+    def test_bulk_index_embeds_and_upserts_per_batch(self):
+        batch_generate = mock.Mock(side_effect=lambda texts, input_type: [unit_vector(0) for _ in texts])
+        with mock.patch('search.services.EmbeddingService.batch_generate', batch_generate):
+            # 1 SELECT (existing metadata) + 1 INSERT ... ON CONFLICT per batch
+            with self.assertNumQueries(6):
+                count = SearchIndexingService.bulk_index(self._items(5), str(self.tenant_id), batch_size=2)
+
+        assert count == 5
+        assert batch_generate.call_count == 3
+        assert SearchIndexModel.objects.filter(tenant_id=self.tenant_id).count() == 5
+
+        row = SearchIndexModel.objects.get(tenant_id=self.tenant_id, title='Clause 0')
+        assert row.search_vector is not None
+        assert row.embedding is not None
+
+    def test_bulk_index_updates_existing_rows_in_place(self):
+        with mock.patch('search.services.EmbeddingService.batch_generate', side_effect=lambda texts, input_type: [None] * len(texts)):
+            SearchIndexingService.bulk_index(self._items(3), str(self.tenant_id))
+            first_ids = set(SearchIndexModel.objects.values_list('id', flat=True))
+            SearchIndexingService.bulk_index(self._items(3, prefix='Renamed'), str(self.tenant_id))
+
+        assert set(SearchIndexModel.objects.values_list('id', flat=True)) == first_ids
+        assert SearchIndexModel.objects.filter(title__startswith='Renamed').count() == 3
+        assert SearchIndexModel.objects.filter(search_vector='renamed').count() == 3
+
+    def test_bulk_index_skips_unchanged_content(self):
+        batch_generate = mock.Mock(side_effect=lambda texts, input_type: [unit_vector(0) for _ in texts])
+        with mock.patch('search.services.EmbeddingService.batch_generate', batch_generate):
+            first = SearchIndexingService.bulk_index_stats(self._items(3), str(self.tenant_id))
+            items = self._items(3)
+            items[1]['content'] = 'Rewritten limitation of liability.'
+            # 1 SELECT + 1 INSERT ... ON CONFLICT for the single changed row
+            with self.assertNumQueries(2):
+                second = SearchIndexingService.bulk_index_stats(items, str(self.tenant_id))
+
+        assert first['created'] == 3
+        assert second == {'created': 0, 'updated': 1, 'skipped': 2, 'failed': 0, 'indexed': 3}
+        assert batch_generate.call_args_list[-1].args[0] == ['Clause 1\n\nRewritten limitation of liability.']
+        assert SearchIndexModel.objects.filter(search_vector='liability').count() == 1
+
+    def test_create_index_reuses_embedding_when_digest_matches(self):
+        generate = mock.Mock(return_value=unit_vector(0))
+        entity_id = str(uuid.uuid4())
+        with mock.patch('search.services.EmbeddingService.generate', generate):
+            row, created = SearchIndexingService.create_index('clause', entity_id, 'Term', 'Two years.', str(self.tenant_id))
+            again, created_again = SearchIndexingService.create_index(
+                'clause', entity_id, 'Term', 'Two years.', str(self.tenant_id), keywords=['NDA'],
+            )
+
+        assert created and not created_again
+        assert generate.call_count == 1
+        assert again.keywords == ['NDA']
+        assert row.content_digest == SearchIndexingService.content_digest('Term', 'Two years.')
+        assert 'embedding_hash' not in again.metadata
+
+    def test_iter_batches_respects_voyage_limits(self):
+        items = self._items(300)
+        batches = list(SearchIndexingService.iter_batches(items, batch_size=1000))
+
+        assert all(len(b) <= ModelConfig.VOYAGE_MAX_BATCH_SIZE for b in batches)
+        assert sum(len(b) for b in batches) == 300
+
+    def test_reindex_search_command(self):
+        from contracts.models import Clause
+
+        for i in range(3):
+            Clause.objects.create(
+                tenant_id=self.tenant_id,
+                clause_id=f'CL-{i}',
+                name=f'Clause {i}',
+                contract_type='NDA',
+                content='Confidential information stays confidential.',
+                created_by=uuid.uuid4(),
+            )
+
+        out = StringIO()
+        with mock.patch('search.services.EmbeddingService.batch_generate', side_effect=lambda texts, input_type: [None] * len(texts)):
+            call_command(
+                'reindex_search', '--tenant', str(self.tenant_id), '--entity-type', 'clause',
+                '--batch-size', '2', '--workers', '1', stdout=out,
+            )
+
+        assert SearchIndexModel.objects.filter(tenant_id=self.tenant_id, entity_type='clause').count() == 3
+        assert 'Total indexed: 3' in out.getvalue()
+        assert 'items/s' in out.getvalue()
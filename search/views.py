@@ -239,7 +239,8 @@ class SearchHybridView(APIView):
         Request Body:
             {
                 'query': str,
-                'limit': int (default=20)
+                'limit': int (default=20),
+                'mode': 'rrf' | 'weighted' (optional)
             }
             
         Response: Real results from both strategies
@@ -248,6 +249,7 @@ class SearchHybridView(APIView):
         
         query = request.data.get('query', '').strip()
         limit = request.data.get('limit', 20)
+        mode = request.data.get('mode') or None
         
         if not query:
             return Response({
@@ -263,7 +265,8 @@ class SearchHybridView(APIView):
             results = HybridSearchService.search(
                 query=query,
                 tenant_id=tenant_id,
-                limit=limit
+                limit=limit,
+                mode=mode
             )
             
             # Get formatted results
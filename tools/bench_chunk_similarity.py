@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Chunk similarity scoring benchmark.
+
+Goal
+- Compare the old per-row scoring loop used by
+  repository.search_service.SemanticSearchService.semantic_search (one np.array +
+  np.dot per ORM row) against the vectorized in-process scorer
+  (repository.search_service.ChunkEmbeddingMatrix: one matrix product + argpartition).
+- Report per-query latency for several corpus sizes.
+
+Notes
+- Synthetic data only; no Django/DB access. Matrix build time is reported separately
+  because it is paid once per tenant, not per query.
+- Memory: the matrix needs rows * dim * 4 bytes (1M x 1024 = ~4 GB). Use --dim to
+  scale down on small machines; latency scales roughly linearly with dim.
+- The loop is only timed up to --loop-max rows (it holds one Python object per row);
+  larger sizes are extrapolated linearly and marked with "~".
+
+Usage examples
+  python3 CLM_Backend/tools/bench_chunk_similarity.py
+  python3 CLM_Backend/tools/bench_chunk_similarity.py --sizes 10000,100000,1000000 --dim 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import List
+
+import numpy as np
+
+
+def _loop_top_k(rows: List[np.ndarray], query: List[float], k: int, threshold: float) -> list:
+    """The original implementation: score one row at a time in Python."""
+    query_vec = np.array(query, dtype=np.float32)
+    query_norm = np.linalg.norm(query_vec)
+
+    scores = []
+    for i, row in enumerate(rows):
+        chunk_vec = np.array(row, dtype=np.float32)
+        chunk_norm = np.linalg.norm(chunk_vec)
+        if chunk_norm > 0 and query_norm > 0:
+            similarity = np.dot(query_vec, chunk_vec) / (query_norm * chunk_norm)
+        else:
+            similarity = 0.0
+        if similarity > threshold:
+            scores.append((i, float(similarity)))
+
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return scores[:k]
+
+
+def _build_matrix(data: np.ndarray) -> np.ndarray:
+    matrix = data.copy()
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def _matrix_top_k(matrix: np.ndarray, query: List[float], k: int, threshold: float) -> list:
+    """Mirror of ChunkEmbeddingMatrix.top_k."""
+    query_vec = np.asarray(query, dtype=np.float32)
+    scores = matrix @ (query_vec / np.linalg.norm(query_vec))
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    candidates = candidates[np.argsort(-scores[candidates])]
+    return [(int(i), float(scores[i])) for i in candidates if scores[i] > threshold]
+
+
+def _time_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated chunk counts")
+    parser.add_argument("--dim", type=int, default=1024, help="Embedding dimension (voyage-law-2 = 1024)")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.0)
+    parser.add_argument("--repeats", type=int, default=5, help="Queries per size (median reported)")
+    parser.add_argument("--loop-max", type=int, default=100000, help="Largest size to time the loop on")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    rng = np.random.default_rng(args.seed)
+
+    print(f"dim={args.dim} top_k={args.top_k} threshold={args.threshold} repeats={args.repeats}")
+    print()
+    print("| chunks | loop (ms/query) | matrix (ms/query) | speedup | matrix build (ms) |")
+    print("|---:|---:|---:|---:|---:|")
+
+    loop_ms_per_row = None
+    for size in sizes:
+        data = rng.standard_normal((size, args.dim), dtype=np.float32)
+        query = rng.standard_normal(args.dim).astype(np.float32).tolist()
+
+        started = time.perf_counter()
+        matrix = _build_matrix(data)
+        build_ms = (time.perf_counter() - started) * 1000.0
+
+        matrix_ms = _time_ms(lambda: _matrix_top_k(matrix, query, args.top_k, args.threshold), args.repeats)
+
+        if size <= args.loop_max:
+            rows = list(data)
+            loop_ms = _time_ms(lambda: _loop_top_k(rows, query, args.top_k, args.threshold), max(1, args.repeats // 2))
+            loop_ms_per_row = loop_ms / size
+            loop_label = f"{loop_ms:,.1f}"
+            del rows
+        elif loop_ms_per_row is not None:
+            loop_ms = loop_ms_per_row * size
+            loop_label = f"~{loop_ms:,.0f}"
+        else:
+            loop_ms = None
+            loop_label = "n/a"
+
+        speedup = f"{loop_ms / matrix_ms:,.0f}x" if loop_ms else "n/a"
+        print(f"| {size:,} | {loop_label} | {matrix_ms:,.2f} | {speedup} | {build_ms:,.0f} |")
+
+        del data, matrix
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
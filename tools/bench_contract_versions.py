@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Contract version creation benchmark.
+
+Goal
+- Compare the previous ContractGenerator.create_version flow against the current one:
+  - legacy: clauses queried twice (render + provenance), one Clause.get and one
+    BusinessRule query per clause for suggestions, one ContractClause INSERT per clause,
+    autocommit per statement.
+  - current: clauses fetched once and shared, suggestions from the tenant's compiled
+    rule set (contracts.services.CompiledRuleSet), one ContractClause bulk_create, all
+    writes in one transaction.
+- Report queries per version and median wall time for 10, 50 and 200 clauses.
+
+Notes
+- Needs Django settings and a reachable database (same env as manage.py). All rows are
+  created inside a transaction that is rolled back at the end.
+- Wall time includes DOCX rendering, which is identical for both flows.
+
+Usage examples
+  python3 CLM_Backend/tools/bench_contract_versions.py
+  python3 CLM_Backend/tools/bench_contract_versions.py --sizes 10,50,200,1000 --repeats 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import time
+import uuid
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clm_backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, models, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from contracts.models import (  # noqa: E402
+    BusinessRule, Clause, Contract, ContractClause, ContractTemplate, ContractVersion, WorkflowLog,
+)
+from contracts.services import CompiledRuleSet, ContractGenerator, RuleEngine  # noqa: E402
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_suggestions(tenant_id, contract_type, context, clause_id):
+    """The original RuleEngine.get_clause_suggestions (two queries per clause)"""
+    try:
+        clause = Clause.objects.get(tenant_id=tenant_id, clause_id=clause_id, status='published')
+    except Clause.DoesNotExist:
+        return []
+    suggestions = []
+    for alt in clause.alternatives:
+        trigger_rules = alt.get('trigger_rules', {})
+        if not trigger_rules or RuleEngine.evaluate_condition(trigger_rules, context):
+            suggestions.append({'clause_id': alt['clause_id'], 'source': 'predefined'})
+    rules = BusinessRule.objects.filter(
+        tenant_id=tenant_id, rule_type='clause_suggestion', is_active=True,
+        action__target_clause_id=clause_id,
+    ).order_by('-priority')
+    for rule in rules:
+        if RuleEngine.evaluate_condition(rule.conditions, context):
+            suggestions.append({'clause_id': rule.action.get('suggest_clause_id'), 'source': 'rule_based'})
+    return suggestions
+
+
+def _legacy_rules(tenant_id, rule_type, contract_type):
+    return BusinessRule.objects.filter(tenant_id=tenant_id, rule_type=rule_type, is_active=True).filter(
+        models.Q(contract_types=[]) | models.Q(contract_types__contains=[contract_type])
+    ).order_by('-priority')
+
+
+class LegacyContractGenerator(ContractGenerator):
+    """The original create_version, kept here for comparison"""
+
+    def create_version(self, contract, selected_clauses=None, change_summary=None):
+        template = contract.template
+        context = {'contract_type': contract.contract_type, **contract.form_inputs}
+        for rule_type in ('mandatory_clause', 'mandatory_clause', 'validation'):
+            for rule in _legacy_rules(self.tenant_id, rule_type, contract.contract_type):
+                RuleEngine.evaluate_condition(rule.conditions, context)
+
+        doc = self._create_document(contract, selected_clauses, context)
+        doc_bytes = BytesIO()
+        doc.save(doc_bytes)
+        content = doc_bytes.getvalue()
+
+        version_number = contract.current_version
+        version = ContractVersion.objects.create(
+            contract=contract, version_number=version_number, template_id=template.id,
+            template_version=template.version, change_summary=f'Version {version_number}',
+            created_by=self.user_id, file_size=len(content),
+            file_hash=hashlib.sha256(content).hexdigest(),
+            r2_key=f'contracts/{contract.id}/v{version_number}.docx',
+        )
+        clauses = Clause.objects.filter(
+            tenant_id=self.tenant_id, clause_id__in=selected_clauses, status='published'
+        ).order_by('clause_id')
+        for position, clause in enumerate(clauses, 1):
+            ContractClause.objects.create(
+                contract_version=version, clause_id=clause.clause_id, clause_version=clause.version,
+                clause_name=clause.name, clause_content=clause.content, is_mandatory=clause.is_mandatory,
+                position=position,
+                alternatives_suggested=_legacy_suggestions(
+                    self.tenant_id, version.contract.contract_type, context, clause.clause_id
+                ),
+            )
+        contract.current_version = version_number + 1
+        contract.save()
+        WorkflowLog.objects.create(
+            contract=contract, action='version_created', performed_by=self.user_id,
+            comment=f'Version {version_number} created', metadata={'clause_count': len(selected_clauses)},
+        )
+        return version
+
+
+def _seed(tenant_id, user_id, size):
+    template = ContractTemplate.objects.create(
+        tenant_id=tenant_id, name=f'Bench {size}', contract_type='MSA', status='published',
+        r2_key='bench.docx', created_by=user_id,
+    )
+    clause_ids = [f'BENCH-{size}-{i:04d}' for i in range(size)]
+    Clause.objects.bulk_create([
+        Clause(
+            tenant_id=tenant_id, clause_id=clause_id, name=f'Clause {i}', contract_type='MSA',
+            content='The parties, {{party}} and the Customer, agree as follows. ' * 4,
+            alternatives=[{'clause_id': f'{clause_id}-ALT', 'trigger_rules': {'party': 'Acme'}}],
+            created_by=user_id,
+        )
+        for i, clause_id in enumerate(clause_ids)
+    ])
+    BusinessRule.objects.create(
+        tenant_id=tenant_id, name='Suggest', description='', rule_type='clause_suggestion',
+        conditions={}, action={'target_clause_id': clause_ids[0], 'suggest_clause_id': 'X'},
+        created_by=user_id,
+    )
+    # bulk_create bypasses the invalidation signals
+    CompiledRuleSet.invalidate(tenant_id)
+    return template, clause_ids
+
+
+def _run(generator, template, clause_ids, tenant_id, user_id, repeats):
+    queries, samples = [], []
+    for _ in range(repeats):
+        contract = Contract.objects.create(
+            tenant_id=tenant_id, template=template, title='Bench', contract_type='MSA',
+            form_inputs={'party': 'Acme'}, created_by=user_id, current_version=1,
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            generator.create_version(contract, selected_clauses=clause_ids)
+            samples.append((time.perf_counter() - started) * 1000.0)
+        queries.append(len(ctx.captured_queries))
+    return statistics.median(queries), statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,50,200", help="Comma-separated clause counts")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"repeats={args.repeats} (median reported; first current run per size includes the rule set build)")
+    print()
+    print("| clauses | legacy queries | current queries | legacy ms | current ms | speedup |")
+    print("|---:|---:|---:|---:|---:|---:|")
+
+    try:
+        with transaction.atomic():
+            for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+                tenant_id, user_id = uuid.uuid4(), uuid.uuid4()
+                template, clause_ids = _seed(tenant_id, user_id, size)
+
+                legacy_q, legacy_ms = _run(
+                    LegacyContractGenerator(user_id, tenant_id), template, clause_ids, tenant_id, user_id, args.repeats
+                )
+                current_q, current_ms = _run(
+                    ContractGenerator(user_id, tenant_id), template, clause_ids, tenant_id, user_id, args.repeats
+                )
+                print(
+                    f"| {size} | {legacy_q:g} | {current_q:g} | {legacy_ms:,.1f} | {current_ms:,.1f} "
+                    f"| {legacy_ms / current_ms:,.1f}x |"
+                )
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""PII redaction throughput benchmark.
+
+Goal
+- Compare the previous redaction loops against redaction.engine.RedactionEngine (one
+  precompiled alternation, one finditer pass that redacts and counts):
+  - document: repository.document_service.PIIRedactionService (re.findall + re.sub
+    per pattern = 2 passes per pattern).
+  - scrubber: redaction.pii_service.PIIScrubber.scrub_text (finditer per pattern, then
+    one string slice per entity).
+- Report MB/s for several document sizes, plus streaming (64 KB pieces) throughput.
+
+Notes
+- Synthetic contract-like text with ~1 PII value per 400 bytes; no Django/DB access.
+- The pattern sets are copied from the services so the script runs standalone; keep
+  them in sync if the services change.
+
+Usage examples
+  python3 CLM_Backend/tools/bench_pii_redaction.py
+  python3 CLM_Backend/tools/bench_pii_redaction.py --sizes 1,10 --repeats 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from redaction.engine import RedactionEngine  # noqa: E402
+
+DOCUMENT_PATTERNS = {
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'phone': r'\b(?:\+1[-.]?)?\(?([0-9]{3})\)?[-.]?([0-9]{3})[-.]?([0-9]{4})\b',
+    'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
+    'credit_card': r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b',
+}
+
+SCRUBBER_PATTERNS = {
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'phone_us': r'\b(\+1)?[-.\s]?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b',
+    'phone_international': r'\+(?:[0-9] ?){6,14}[0-9]',
+    'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
+    'ssn_no_dash': r'\b\d{9}\b(?<!\d)',
+    'credit_card': r'\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}\b',
+    'amex': r'\b3[47]\d{13}\b',
+    'visa': r'\b4\d{12}(?:\d{3})?\b',
+    'mastercard': r'\b5[1-5]\d{14}\b',
+    'passport': r'\b[A-Z]{1,2}\d{6,9}\b',
+    'driver_license': r'\b[A-Z]{1,2}\d{5,8}\b',
+    'bank_account': r'\b\d{8,17}\b',
+    'ipv4': r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b',
+    'ipv6': r'(?:[0-9a-fA-F]{0,4}:){2,7}[0-9a-fA-F]{0,4}',
+    'medical_record': r'\bMRN[:\s]+([A-Z0-9\-]+)\b',
+    'vin': r'\b[A-HJ-NPR-Z0-9]{17}\b',
+    'api_key': r'\b(?:api[_-]?key|apikey|api_token)[:\s=\'"]+([A-Za-z0-9\-_.]{20,})\b',
+    'jwt': r'\beyJ[A-Za-z0-9\-_.]+\.[A-Za-z0-9\-_.]+\.[A-Za-z0-9\-_.]*\b',
+    'aws_secret': r'\bAWS[_A-Z]{0,30}[:\s=]+([A-Za-z0-9/+=]{40})\b',
+}
+
+FILLER = (
+    "The Supplier shall deliver the Services in accordance with Schedule 2 and the "
+    "Customer shall pay all undisputed invoices within thirty days of receipt. "
+)
+PII = [
+    "legal@acme-corp.com", "415-555-0142", "123-45-6789", "4111-1111-1111-1111",
+    "ops.team+alerts@globex.io", "212.555.0199",
+]
+
+
+def _document(size_bytes: int, seed: int) -> str:
+    rng = random.Random(seed)
+    parts, total = [], 0
+    while total < size_bytes:
+        piece = FILLER + f"Contact {rng.choice(PII)} for notices. "
+        parts.append(piece)
+        total += len(piece)
+    return ''.join(parts)[:size_bytes]
+
+
+def _legacy_document(text: str):
+    """The original PIIRedactionService.redact_pii"""
+    redacted_text = text
+    redaction_counts = {}
+    for pii_type, pattern in DOCUMENT_PATTERNS.items():
+        matches = re.findall(pattern, text)
+        if matches:
+            redaction_counts[pii_type] = len(matches)
+            redacted_text = re.sub(pattern, f"[{pii_type.upper()}_REDACTED]", redacted_text)
+    return redacted_text, redaction_counts
+
+
+_SCRUBBER_COMPILED = {k: re.compile(p, re.IGNORECASE) for k, p in SCRUBBER_PATTERNS.items()}
+
+
+def _legacy_scrubber(text: str):
+    """The original PIIScrubber.scrub_text detection + replacement loop"""
+    entities = []
+    for entity_type, pattern in _SCRUBBER_COMPILED.items():
+        for match in pattern.finditer(text):
+            entities.append((match.start(), match.end(), '*' * (match.end() - match.start())))
+    entities.sort(key=lambda e: e[0], reverse=True)
+    scrubbed = text
+    for start, end, redacted in entities:
+        scrubbed = scrubbed[:start] + redacted + scrubbed[end:]
+    return scrubbed
+
+
+def _mb_per_s(fn, text: str, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(text)
+        samples.append(time.perf_counter() - started)
+    return len(text.encode('utf-8')) / 1e6 / statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="0.1,1,10", help="Comma-separated document sizes in MB")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--scrubber-max-mb", type=float, default=1.0,
+                        help="Largest size to time the legacy scrubber on (it is quadratic)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    document_engine = RedactionEngine(DOCUMENT_PATTERNS)
+    scrubber_engine = RedactionEngine(SCRUBBER_PATTERNS, flags=re.IGNORECASE, replacement=lambda t, v: '*' * len(v))
+
+    def stream(text: str):
+        pieces = (text[i:i + 65536] for i in range(0, len(text), 65536))
+        return ''.join(document_engine.redact_stream(pieces))
+
+    print(f"repeats={args.repeats} (median reported)")
+    print()
+    print("| size (MB) | document legacy | document engine | engine streamed | speedup | scrubber legacy | scrubber engine | speedup |")
+    print("|---:|---:|---:|---:|---:|---:|---:|---:|")
+
+    for size_mb in [float(s) for s in args.sizes.split(",") if s.strip()]:
+        text = _document(int(size_mb * 1e6), args.seed)
+        assert document_engine.redact(text)[0] == _legacy_document(text)[0]
+
+        legacy = _mb_per_s(_legacy_document, text, args.repeats)
+        engine = _mb_per_s(document_engine.redact, text, args.repeats)
+        streamed = _mb_per_s(stream, text, args.repeats)
+
+        scrub_engine = _mb_per_s(scrubber_engine.redact, text, args.repeats)
+        if size_mb <= args.scrubber_max_mb:
+            scrub_legacy = _mb_per_s(_legacy_scrubber, text, 1)
+            scrub_legacy_label = f"{scrub_legacy:,.1f}"
+            scrub_speedup = f"{scrub_engine / scrub_legacy:,.1f}x"
+        else:
+            scrub_legacy_label, scrub_speedup = "n/a", "n/a"
+
+        print(
+            f"| {size_mb:g} | {legacy:,.1f} | {engine:,.1f} | {streamed:,.1f} | {engine / legacy:,.1f}x "
+            f"| {scrub_legacy_label} | {scrub_engine:,.1f} | {scrub_speedup} |"
+        )
+
+    print()
+    print("Throughput in MB/s.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Merge-field rendering benchmark.
+
+Goal
+- Compare the previous per-key renderers against contracts.utils.template_renderer:
+  - legacy regex: one compiled regex and one re.sub over the full text per values key
+    (ContractViewSet._render_template_text).
+  - legacy replace: one str.replace per context key (ContractGenerator._replace_merge_fields).
+  - current: template tokenized once (cached by content hash), one pass per render.
+- Report median microseconds per render for a few text sizes / key counts.
+
+Notes
+- Pure Python; no database or network needed.
+
+Usage examples
+  python3 CLM_Backend/tools/bench_template_render.py
+  python3 CLM_Backend/tools/bench_template_render.py --keys 10,100,500 --repeats 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clm_backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from contracts.utils.template_renderer import render_template  # noqa: E402
+
+
+def legacy_regex(raw_text, values):
+    rendered = raw_text or ''
+    for key, value in (values or {}).items():
+        placeholder = re.compile(r'\{\{\s*' + re.escape(str(key)) + r'\s*\}\}')
+        rendered = placeholder.sub(str(value) if value is not None else '', rendered)
+    return rendered
+
+
+def legacy_replace(text, context):
+    result = text
+    for key, value in context.items():
+        placeholder = f"{{{{{key}}}}}"
+        if placeholder in result:
+            result = result.replace(placeholder, str(value))
+    return result
+
+
+def _median_us(func, text, values, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func(text, values)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", default="10,50,200", help="Comma-separated values-dict sizes")
+    parser.add_argument("--paragraphs", type=int, default=200, help="Paragraphs of template text")
+    parser.add_argument("--repeats", type=int, default=100)
+    args = parser.parse_args()
+
+    print("| keys | text KB | legacy regex us | legacy replace us | current us |")
+    print("|---:|---:|---:|---:|---:|")
+    for count in [int(k) for k in args.keys.split(",") if k.strip()]:
+        values = {f"field_{i}": f"value {i}" for i in range(count)}
+        text = "\n\n".join(
+            f"Section {p}. The party {{{{ field_{p % count} }}}} agrees with {{{{field_{(p * 7) % count}}}}} "
+            "that this paragraph is ordinary contract prose of a realistic length. " * 2
+            for p in range(args.paragraphs)
+        )
+        assert legacy_regex(text, values) == render_template(text, values)
+
+        print(
+            f"| {count} | {len(text) / 1024:,.0f} "
+            f"| {_median_us(legacy_regex, text, values, args.repeats):,.0f} "
+            f"| {_median_us(legacy_replace, text, values, args.repeats):,.0f} "
+            f"| {_median_us(render_template, text, values, args.repeats):,.0f} |"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
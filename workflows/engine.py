@@ -18,7 +18,8 @@ from typing import Dict, List, Optional, Tuple, Any
 from uuid import UUID
 import uuid
 
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Q
 from django.utils import timezone
 from django.core.mail import send_mail
 
@@ -548,64 +549,134 @@ class WorkflowEngine:
             'approvals': approval_list
         }
     
-    def get_pending_approvals(self, approver_id: UUID) -> List[Dict]:
+    def get_pending_approvals(
+        self,
+        approver_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Dict]:
         """
-        Get all pending approvals for an approver
+        Get pending approvals for an approver, oldest first
+        
+        Served by approvals_inbox_idx; pass limit and the (created_at, id) of the
+        last row seen as `after` to page through large inboxes.
         
         Args:
             approver_id: UUID of approver
+            limit: Maximum rows to return (all if None)
+            after: Keyset cursor (created_at, id) of the previous page's last row
             
         Returns:
             List of pending approval records
         """
         approvals = ApprovalModel.objects.filter(
+            tenant_id=self.tenant_id,
             approver_id=approver_id,
-            status=ApprovalStatus.PENDING.value,
-            tenant_id=self.tenant_id
-        ).order_by('created_at')
-        
-        result = []
-        for approval in approvals:
-            result.append({
-                'id': str(approval.id),
-                'entity_id': str(approval.entity_id),
-                'entity_type': approval.entity_type,
-                'requester_id': str(approval.requester_id),
-                'status': approval.status,
-                'comment': approval.comment,
-                'created_at': approval.created_at.isoformat() if approval.created_at else None,
-                'days_pending': (timezone.now() - approval.created_at).days if approval.created_at else 0
-            })
+            status=ApprovalStatus.PENDING.value
+        )
+        if after is not None:
+            after_created_at, after_id = after
+            approvals = approvals.filter(
+                Q(created_at__gt=after_created_at) | Q(created_at=after_created_at, id__gt=after_id)
+            )
+        approvals = approvals.order_by('created_at', 'id').values(
+            'id', 'entity_id', 'entity_type', 'requester_id', 'status', 'comment', 'created_at', 'escalated_at'
+        )
+        if limit is not None:
+            approvals = approvals[:limit]
         
-        return result
+        now = timezone.now()
+        return [
+            {
+                'id': str(approval['id']),
+                'entity_id': str(approval['entity_id']),
+                'entity_type': approval['entity_type'],
+                'requester_id': str(approval['requester_id']),
+                'status': approval['status'],
+                'comment': approval['comment'],
+                'created_at': approval['created_at'].isoformat() if approval['created_at'] else None,
+                'days_pending': (now - approval['created_at']).days if approval['created_at'] else 0,
+                'escalated': approval['escalated_at'] is not None
+            }
+            for approval in approvals
+        ]
     
-    def escalate_overdue(self, days_threshold: int = 3) -> List[UUID]:
+    def escalate_overdue(self, days_threshold: int = 3, batch_size: int = 500) -> List[UUID]:
         """
-        Escalate approvals pending for more than threshold days
+        Escalate this tenant's approvals pending for more than threshold days
+        
+        Escalation stamps escalated_at and leaves the approval pending, so its
+        approver can still approve or reject it and it stays in their inbox.
+        Each approval is escalated once. Runs as batched set-based
+        UPDATE ... RETURNING statements (each its own short transaction under
+        autocommit) instead of loading and saving rows one by one.
         
         Args:
             days_threshold: Number of days before escalation
+            batch_size: Rows updated per statement
             
         Returns:
             List of escalated approval IDs
         """
-        cutoff_date = timezone.now() - timedelta(days=days_threshold)
-        
-        old_approvals = ApprovalModel.objects.filter(
-            status=ApprovalStatus.PENDING.value,
-            created_at__lt=cutoff_date
+        now = timezone.now()
+        cutoff_date = now - timedelta(days=days_threshold)
+        
+        table = connection.ops.quote_name(ApprovalModel._meta.db_table)
+        skip_locked = ' FOR UPDATE SKIP LOCKED' if connection.features.has_select_for_update_skip_locked else ''
+        sql = (
+            f"UPDATE {table} SET escalated_at = %s WHERE id IN ("
+            f"SELECT id FROM {table} WHERE tenant_id = %s AND status = %s AND escalated_at IS NULL "
+            f"AND created_at < %s ORDER BY created_at LIMIT %s{skip_locked}"
+            f") RETURNING id"
         )
+        params = [
+            now,
+            self.tenant_id,
+            ApprovalStatus.PENDING.value,
+            cutoff_date,
+            batch_size,
+        ]
         
         escalated = []
-        for approval in old_approvals:
-            approval.status = ApprovalStatus.ESCALATED.value
-            approval.save()
-            escalated.append(approval.id)
-            logger.info(f"Escalated approval {approval.id}")
-        
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                batch = [row[0] if isinstance(row[0], UUID) else UUID(str(row[0])) for row in cursor.fetchall()]
+            escalated.extend(batch)
+            if len(batch) < batch_size:
+                break
+        
+        if escalated:
+            logger.info(f"Escalated {len(escalated)} overdue approvals for tenant {self.tenant_id}")
         return escalated
 
 
+def escalate_overdue_approvals(days_threshold: int = 3, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Escalate overdue approvals for every tenant that has any
+    
+    Returns:
+        {tenant_id: escalated_count} for tenants with escalations
+    """
+    cutoff_date = timezone.now() - timedelta(days=days_threshold)
+    tenant_ids = ApprovalModel.objects.filter(
+        status=ApprovalStatus.PENDING.value,
+        escalated_at__isnull=True,
+        created_at__lt=cutoff_date
+    ).values_list('tenant_id', flat=True).distinct()
+    
+    results = {}
+    for tenant_id in tenant_ids:
+        try:
+            escalated = WorkflowEngine(tenant_id).escalate_overdue(days_threshold, batch_size)
+        except Exception as e:
+            logger.error(f"Escalation failed for tenant {tenant_id}: {str(e)}")
+            continue
+        if escalated:
+            results[str(tenant_id)] = len(escalated)
+    return results
+
+
 # ============================================================================
 # Configuration Templates for Different Scenarios
 # ============================================================================
@@ -0,0 +1,27 @@
+"""
+Celery tasks for approval workflows
+
+escalate_overdue_approvals runs on the beat schedule (CELERY_BEAT_SCHEDULE in
+settings) when APPROVAL_ESCALATION_ENABLED is on, and marks each tenant's overdue
+approvals as escalated with batched set-based UPDATEs.
+"""
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from workflows.engine import escalate_overdue_approvals as _escalate_overdue_approvals
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def escalate_overdue_approvals():
+    """Escalate approvals pending longer than APPROVAL_ESCALATION_DAYS"""
+    results = _escalate_overdue_approvals(
+        days_threshold=int(getattr(settings, 'APPROVAL_ESCALATION_DAYS', 3)),
+        batch_size=int(getattr(settings, 'APPROVAL_ESCALATION_BATCH_SIZE', 500)),
+    )
+    if results:
+        logger.info(f"Escalated overdue approvals: {results}")
+    return results
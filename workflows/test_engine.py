@@ -0,0 +1,132 @@
+"""
+Tests for set-based escalation and the pending approvals inbox
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from approvals.models import ApprovalModel
+
+from .engine import WorkflowEngine, escalate_overdue_approvals
+
+
+class TestWorkflowEngineApprovals(TestCase):
+    """Escalation UPDATE ... RETURNING and keyset-paged inbox"""
+
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        self.approver_id = uuid.uuid4()
+        self.engine = WorkflowEngine(self.tenant_id)
+
+    def _approval(self, tenant_id=None, approver_id=None, age_days=0, status='pending'):
+        approval = ApprovalModel.objects.create(
+            tenant_id=tenant_id or self.tenant_id,
+            entity_type='contract',
+            entity_id=uuid.uuid4(),
+            requester_id=uuid.uuid4(),
+            approver_id=approver_id or self.approver_id,
+            status=status,
+        )
+        if age_days:
+            ApprovalModel.objects.filter(pk=approval.pk).update(
+                created_at=timezone.now() - timedelta(days=age_days)
+            )
+        return approval.pk
+
+    def test_escalate_overdue_in_batches_for_own_tenant(self):
+        overdue = {self._approval(age_days=5) for _ in range(5)}
+        recent = self._approval(age_days=1)
+        decided = self._approval(age_days=5, status='approved')
+        other_tenant = self._approval(tenant_id=uuid.uuid4(), age_days=5)
+
+        with self.assertNumQueries(3):  # batches of 2, 2 and 1
+            escalated = self.engine.escalate_overdue(days_threshold=3, batch_size=2)
+
+        assert set(escalated) == overdue
+        escalated_at = dict(ApprovalModel.objects.values_list('id', 'escalated_at'))
+        assert all(escalated_at[pk] is not None for pk in overdue)
+        assert escalated_at[recent] is None
+        assert escalated_at[decided] is None
+        assert escalated_at[other_tenant] is None
+        # Escalated approvals stay pending, and are escalated only once
+        assert set(ApprovalModel.objects.filter(status='pending', pk__in=overdue).values_list('pk', flat=True)) == overdue
+        assert self.engine.escalate_overdue(days_threshold=3, batch_size=2) == []
+
+    def test_escalate_overdue_approvals_covers_all_tenants(self):
+        other_tenant = uuid.uuid4()
+        self._approval(age_days=5)
+        self._approval(tenant_id=other_tenant, age_days=5)
+        self._approval(tenant_id=other_tenant, age_days=4)
+
+        results = escalate_overdue_approvals(days_threshold=3)
+
+        assert results == {str(self.tenant_id): 1, str(other_tenant): 2}
+        assert not ApprovalModel.objects.filter(escalated_at__isnull=True).exists()
+        assert escalate_overdue_approvals(days_threshold=3) == {}
+
+    def test_escalated_approval_can_still_be_approved(self):
+        approval_id = self._approval(age_days=5)
+        self.engine.escalate_overdue(days_threshold=3)
+
+        inbox = self.engine.get_pending_approvals(self.approver_id)
+        assert [(a['id'], a['escalated']) for a in inbox] == [(str(approval_id), True)]
+
+        assert self.engine.approve(approval_id, self.approver_id, 'ok') == (True, 'Approval successful')
+        assert ApprovalModel.objects.get(pk=approval_id).status == 'approved'
+
+    def test_pending_approvals_keyset_pages(self):
+        expected = [str(self._approval(age_days=days)) for days in (9, 7, 5, 3, 1)]
+        self._approval(approver_id=uuid.uuid4())
+
+        first = self.engine.get_pending_approvals(self.approver_id, limit=2)
+        last_row = ApprovalModel.objects.get(pk=first[-1]['id'])
+        rest = self.engine.get_pending_approvals(
+            self.approver_id, after=(last_row.created_at, last_row.id)
+        )
+
+        assert [a['id'] for a in first + rest] == expected
+        assert first[0]['days_pending'] == 9
+        assert len(self.engine.get_pending_approvals(self.approver_id)) == 5
+
+
+class TestPendingApprovalsAPI(TestCase):
+    """GET /api/v1/approvals/pending/ is cursor-paginated"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='approver@example.com', password='pass1234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages_through_inbox(self):
+        ids = []
+        for _ in range(3):
+            approval = ApprovalModel.objects.create(
+                tenant_id=self.user.tenant_id,
+                entity_type='contract',
+                entity_id=uuid.uuid4(),
+                requester_id=uuid.uuid4(),
+                approver_id=self.user.user_id,
+            )
+            ids.append(str(approval.id))
+        ApprovalModel.objects.create(
+            tenant_id=self.user.tenant_id,
+            entity_type='contract',
+            entity_id=uuid.uuid4(),
+            requester_id=uuid.uuid4(),
+            approver_id=uuid.uuid4(),
+        )
+
+        response = self.client.get('/api/v1/approvals/pending/', {'page_size': 2})
+        assert response.status_code == 200
+        seen = [row['id'] for row in response.data['results']]
+
+        response = self.client.get(response.data['next'])
+        seen += [row['id'] for row in response.data['results']]
+
+        assert seen == ids
+        assert response.data['next'] is None